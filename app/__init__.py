@@ -1,9 +1,23 @@
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import mongoengine
 
 from app.config import LocalhostConfig, Config
 from app.views import register_api
+from app.commands import register_commands
+from app.utils.cache import auth_user_cache, post_list_cache
+from app.models.category import category_registry
+from app.utils.password import password_hasher
+from app.utils.rate_limit import rate_limiter
+from app.utils.counter import counter_buffer
+from app.utils.access_log import access_logger
+from app.utils.monitoring import mongo_command_listener, register_metrics
+from app.utils.slow_query import slow_query_recorder
+from app.utils.trending import trending_scorer
+from app.utils.fast_json import json_engine, jsonify
+from app.utils.schema_compiler import compile_view_schemas
+from app.utils.conditional import register_conditional_responses
 
 
 def create_app(is_localhost: bool = False) -> Flask:
@@ -13,19 +27,101 @@ def create_app(is_localhost: bool = False) -> Flask:
     try:
         if is_localhost is True:
             app.config.from_object(LocalhostConfig)
-            mongoengine.connect(db=LocalhostConfig.MONGODB_DB, host=LocalhostConfig.MONGODB_URI)
+            mongoengine.connect(db=LocalhostConfig.MONGODB_DB, host=LocalhostConfig.MONGODB_URI, event_listeners=[mongo_command_listener, slow_query_recorder])
         else:
             app.config.from_object(Config)
-            mongoengine.connect(db=Config.MONGODB_DB, host=Config.MONGODB_URI)
+            mongoengine.connect(db=Config.MONGODB_DB, host=Config.MONGODB_URI, event_listeners=[mongo_command_listener, slow_query_recorder])
     except Exception as db_err:
         print(f"[ERROR] Something went wrong with MongoDB connection\n{str(db_err)}")
 
+    # 인증 사용자 캐시 설정
+    auth_user_cache.configure(maxsize=app.config["AUTH_CACHE_MAXSIZE"], ttl=app.config["AUTH_CACHE_TTL"], check_interval=app.config["AUTH_CACHE_CHECK_INTERVAL"])
+
+    # 포스트 목록 응답 캐시 설정
+    post_list_cache.configure(
+        backend=app.config["POST_LIST_CACHE_BACKEND"],
+        ttl=app.config["POST_LIST_CACHE_TTL"],
+        maxsize=app.config["POST_LIST_CACHE_MAXSIZE"],
+        redis_url=app.config["REDIS_URL"],
+        check_interval=app.config["POST_LIST_CACHE_CHECK_INTERVAL"],
+    )
+
+    # 카테고리 저장소 버전 확인 주기 설정
+    category_registry.configure(check_interval=app.config["CATEGORY_REGISTRY_CHECK_INTERVAL"])
+
+    # 비밀번호 hash 전용 thread pool 설정
+    password_hasher.configure(
+        rounds=app.config["BCRYPT_ROUNDS"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        queue_limit=app.config["PASSWORD_HASH_QUEUE_LIMIT"],
+        timeout=app.config["PASSWORD_HASH_TIMEOUT"],
+    )
+
+    # 로그인 / 회원 가입 요청 한도 설정
+    rate_limiter.configure(
+        backend=app.config["RATE_LIMIT_BACKEND"],
+        limits=app.config["RATE_LIMITS"],
+        path=app.config["RATE_LIMIT_PATH"],
+        slots=app.config["RATE_LIMIT_SLOTS"],
+    )
+
+    # 좋아요 수 증감량 모아서 반영 설정
+    counter_buffer.configure(
+        enabled=app.config["LIKE_COUNTER_BUFFER"],
+        flush_interval=app.config["COUNTER_FLUSH_INTERVAL"],
+        max_pending=app.config["COUNTER_FLUSH_MAX_PENDING"],
+    )
+
+    # 인기 점수 감쇠 / 가중치 설정
+    trending_scorer.configure(
+        half_life_hours=app.config["TRENDING_HALF_LIFE_HOURS"],
+        like_weight=app.config["TRENDING_LIKE_WEIGHT"],
+        comment_weight=app.config["TRENDING_COMMENT_WEIGHT"],
+    )
+
+    # 느린 MongoDB 명령 기록 설정
+    slow_query_recorder.configure(
+        threshold_ms=app.config["SLOW_QUERY_THRESHOLD_MS"],
+        sample_rate=app.config["SLOW_QUERY_EXPLAIN_SAMPLE_RATE"],
+        explain_interval=app.config["SLOW_QUERY_EXPLAIN_INTERVAL"],
+        queue_size=app.config["SLOW_QUERY_QUEUE_SIZE"],
+    )
+
+    # access log 설정
+    access_logger.configure(
+        enabled=app.config["ACCESS_LOG_ENABLED"],
+        path=app.config["ACCESS_LOG_PATH"],
+        sample_rate=app.config["ACCESS_LOG_SAMPLE_RATE"],
+        queue_size=app.config["ACCESS_LOG_QUEUE_SIZE"],
+    )
+
+    # 응답 JSON 직렬화 (flask_apispec marshal_with 의 응답도 같은 함수 사용)
+    json_engine.configure(engine=app.config["JSON_ENGINE"])
+    app.config["APISPEC_FORMAT_RESPONSE"] = jsonify
+
+    # 앞단 proxy 가 전달한 X-Forwarded-For 로 접속 IP 지정 (설정한 proxy 수만큼만 신뢰, 요청 한도의 IP key 로 사용)
+    if app.config["PROXY_FIX_X_FOR"]:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"])
+
     # CORS apply
-    CORS(app)
+    CORS(app, expose_headers=["X-Next-Cursor", "X-Request-ID", "ETag"])
 
     # register api router
     register_api(app)
 
+    # 라우트에 등록된 요청 / 응답 schema 를 미리 분석한 load / dump 함수로 교체
+    if app.config["COMPILED_SCHEMAS"]:
+        compile_view_schemas(app)
+
+    # 라우트별 요청 처리 시간 / MongoDB 명령 집계 및 /metrics 등록
+    register_metrics(app)
+
+    # ETag 가 있는 응답의 If-None-Match 확인 (304 응답도 metrics 에 기록되도록 register_metrics 뒤에 등록)
+    register_conditional_responses(app)
+
+    # flask CLI 명령어 등록
+    register_commands(app)
+
     # health check
     @app.route("/")
     def health_check():
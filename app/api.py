@@ -1,12 +1,13 @@
-from typing import Optional
+from typing import Dict, Optional
 from marshmallow import Schema, fields
 
 
 class ApiError(Exception):
-    def __init__(self, message: str, status_code: Optional[int] = None):
+    def __init__(self, message: str, status_code: Optional[int] = None, headers: Optional[Dict[str, str]] = None):
         Exception.__init__(self)
         self.status_code = status_code or 400
         self.message = message
+        self.headers = headers or dict()
 
 
 class ApiStatusSchema(Schema):
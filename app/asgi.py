@@ -0,0 +1,318 @@
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, request
+from flask_apispec import utils as apispec_utils
+from flask_apispec.wrapper import Wrapper, packed, unpack
+from webargs import flaskparser
+from werkzeug.exceptions import HTTPException
+
+from app import create_app
+from app.api import ApiError
+from app.decorators.user import auth_user_steps, get_auth_token
+from app.models.user import User
+from app.utils.access_log import access_logger, new_request_id
+from app.utils.monitoring import current_request, request_metrics, track_async_request, untrack_async_request
+from app.utils.reads import Aggregate, Call, ReadSteps, Step, advance
+from app.utils.slow_query import slow_query_recorder
+from app.views.category import CategoryView, category_list_view_steps
+from app.views.comment import CommentListView, comment_list_view_steps
+from app.views.post import PostMasterView, PostDetailView, post_detail_view_steps, post_list_view_steps
+from app.views.user import UserView, user_info_view_steps
+
+
+class AsgiApp:
+    """
+    읽기 API (포스트 목록/상세, 댓글 목록, 카테고리 목록, 회원 정보) 를 asyncio + motor 로 처리하는 ASGI app
+
+    - view 함수가 사용하는 조회 generator (app.utils.reads) 를 motor 로 실행하므로 조회 조건 / 캐시 / ETag / 직렬화는 WSGI 와 동일
+    - 라우트 / use_kwargs, marshal_with schema / ApiError 처리도 Flask app 에 등록된 것을 그대로 사용
+    - flask request context 는 thread 단위라서 generator 를 진행하는 구간 (await 없음) 에서만 push (after_request 훅은 응답을 만들 때 실행)
+    - 그 외 요청 (쓰기 API, OPTIONS 등) 은 thread pool 에서 기존 WSGI app 으로 처리
+    """
+
+    # WSGI 응답 chunk 를 넘겨받는 queue 크기 (클라이언트가 느리면 WSGI thread 가 기다리도록)
+    WSGI_QUEUE_SIZE = 16
+
+    def __init__(self, flask_app: Flask, sync_workers: int = 16, database: Any = None):
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(max_workers=sync_workers, thread_name_prefix="asgi-sync")
+        self._database = database
+
+        # endpoint -> (schema 정보를 가진 view 함수, view 함수와 같은 조회 generator)
+        self.handlers = {
+            "api.PostMasterView:get_list": (PostMasterView.get_list, post_list_view_steps),
+            "api.PostDetailView:get_post_detail": (PostDetailView.get_post_detail, post_detail_view_steps),
+            "api.CommentListView:list": (CommentListView.list, comment_list_view_steps),
+            "api.CategoryView:list": (CategoryView.list, category_list_view_steps),
+            "api.UserView:info": (UserView.info, user_info_view_steps),
+        }
+
+    @property
+    def database(self):
+        # motor client 는 event loop 안에서 처음 사용할 때 생성
+        if self._database is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            # 느린 명령 기록은 WSGI 와 같이 적용 (명령이 motor thread 에서 실행되므로 호출한 model 함수는 기록되지 않음)
+            self._database = AsyncIOMotorClient(self.flask_app.config["MONGODB_URI"], event_listeners=[slow_query_recorder])[self.flask_app.config["MONGODB_DB"]]
+        return self._database
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        environ = build_environ(scope)
+        matched = self.match(environ)
+        if matched is None:
+            await self.call_wsgi(environ, receive, send)
+            return
+
+        environ["wsgi.input"] = io.BytesIO(await read_body(receive))
+        response = await self.handle(environ, *matched)
+        await send_response(response, environ, send)
+
+    async def lifespan(self, receive: Callable, send: Callable):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                _ = self.database
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def match(self, environ: Dict) -> Optional[Tuple[str, Dict, Callable, Callable]]:
+        # 비동기 처리 대상인 GET 라우트면 (endpoint, path 변수, view 함수, 조회 generator 함수) return, 아니면 None
+        if environ["REQUEST_METHOD"] != "GET":
+            return None
+        try:
+            endpoint, view_args = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return None
+        handler = self.handlers.get(endpoint)
+        return (endpoint, view_args) + handler if handler else None
+
+    def in_context(self, environ: Dict, user: Optional[User], func: Callable, *args: Any) -> Any:
+        # login_required 를 거친 요청과 같이 g.user 를 지정해서 실행
+        with self.flask_app.request_context(environ):
+            g.user = user
+            return func(*args)
+
+    async def run_sync(self, func: Callable, *args: Any) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(self.executor, partial(func, *args))
+
+    async def handle(self, environ: Dict, endpoint: str, view_args: Dict, view_func: Callable, view_steps: Callable) -> Response:
+        # 요청 처리 시간 / MongoDB 명령 / access log 는 flask 훅 대신 직접 처리 (asyncio task 단위로 기록)
+        stats, user = track_async_request(request_id=new_request_id(environ.get("HTTP_X_REQUEST_ID"))), None
+        try:
+            try:
+                kwargs, token = self.in_context(environ, None, parse_request, view_func)
+                user = await self.run_steps(environ, None, auth_user_steps(token))
+                rv = await self.run_steps(environ, user, view_steps(**view_args, **kwargs))
+            except Exception as e:
+                rv = e
+            response = self.in_context(environ, user, self.make_response, view_func, rv)
+        finally:
+            untrack_async_request()
+        response.headers["X-Request-ID"] = stats.request_id
+        elapsed = stats.elapsed
+        request_metrics.observe(endpoint, environ["REQUEST_METHOD"], response.status_code, elapsed, stats.mongo_count, stats.mongo_seconds)
+        access_logger.log(
+            request_id=stats.request_id,
+            method=environ["REQUEST_METHOD"],
+            route=endpoint,
+            path=environ["PATH_INFO"],
+            status=response.status_code,
+            user_id=str(user.id) if user is not None else None,
+            latency=elapsed,
+            mongo_seconds=stats.mongo_seconds,
+            mongo_commands=stats.mongo_count,
+        )
+        return response
+
+    def make_response(self, view_func: Callable, rv: Any) -> Response:
+        # 처리 결과 (또는 에러) 를 view 함수의 marshal_with schema / 등록된 에러 handler 로 응답 객체로 변환
+        app = self.flask_app
+        try:
+            try:
+                if isinstance(rv, Exception):
+                    raise rv
+                if not isinstance(rv, Response):
+                    data, status_code, headers = unpack(rv)
+                    rv = packed(Wrapper(view_func).marshal_result(data, status_code), status_code, headers)
+                response = app.make_response(rv)
+            except (ApiError, HTTPException):
+                raise
+            except Exception as e:
+                # login_required 와 동일하게 처리되지 않은 에러는 500 으로 응답 (handle_user_exception 은 처리 중인 에러만 받으므로 다시 raise)
+                raise ApiError(message=str(e), status_code=500)
+        except (ApiError, HTTPException) as e:
+            response = app.make_response(app.handle_user_exception(e))
+        return app.process_response(response)
+
+    async def run_steps(self, environ: Dict, user: Optional[User], steps: ReadSteps) -> Any:
+        # app.utils.reads.run_steps 의 비동기 버전 (generator 는 request context 안에서 진행하고, 단계는 motor / thread pool 에서 실행)
+        value, error = None, None
+        while True:
+            try:
+                step = self.in_context(environ, user, advance, steps, value, error)
+            except StopIteration as e:
+                return e.value
+
+            value, error = None, None
+            try:
+                value = await self.execute(step)
+            except Exception as e:
+                error = e
+
+    async def execute(self, step: Step) -> Any:
+        if isinstance(step, Call):
+            return await self.run_sync(step.func, *step.args)
+
+        collection = self.database[step.document_cls._get_collection_name()]
+        if isinstance(step, Aggregate):
+            cursor = collection.aggregate(step.pipeline)
+        else:
+            cursor = collection.find(step.filter, step.projection, sort=step.sort, skip=step.skip, limit=step.limit)
+
+        # motor 는 별도 thread 에서 pymongo 를 실행하므로 command listener 대신 조회 단위로 집계
+        started_at = time.perf_counter()
+        sons = [son async for son in cursor]
+        stats = current_request()
+        if stats is not None:
+            stats.mongo_count += 1
+            stats.mongo_seconds += time.perf_counter() - started_at
+        return sons
+
+    async def call_wsgi(self, environ: Dict, receive: Callable, send: Callable):
+        # 기존 WSGI app 을 thread pool 에서 실행 (요청 body 는 읽는 만큼 받아오고, 응답은 chunk 단위로 전달)
+        loop = asyncio.get_event_loop()
+        queue = asyncio.Queue(maxsize=self.WSGI_QUEUE_SIZE)
+        environ["wsgi.input"] = io.BufferedReader(ReceiveStream(receive, loop))
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def run():
+            started = dict()
+
+            def start_response(status, headers, exc_info=None):
+                started.update(status=int(status.split(" ", 1)[0]), headers=headers)
+
+            try:
+                body = self.flask_app.wsgi_app(environ, start_response)
+                try:
+                    put(("start", started["status"], started["headers"]))
+                    for chunk in body:
+                        if chunk:
+                            put(("body", chunk))
+                finally:
+                    if hasattr(body, "close"):
+                        body.close()
+            finally:
+                put(None)
+
+        future = loop.run_in_executor(self.executor, run)
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            if item[0] == "start":
+                await send({"type": "http.response.start", "status": item[1], "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in item[2]]})
+            else:
+                await send({"type": "http.response.body", "body": item[1], "more_body": True})
+        await future
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class ReceiveStream(io.RawIOBase):
+    """WSGI thread 에서 ASGI 요청 body 를 읽을 수 있도록 receive() 를 감싼 blocking stream"""
+
+    def __init__(self, receive: Callable, loop: asyncio.AbstractEventLoop):
+        super().__init__()
+        self._receive = receive
+        self._loop = loop
+        self._buffer = b""
+        self._more_body = True
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer and self._more_body:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            self._buffer = message.get("body", b"")
+            self._more_body = message.get("more_body", False) and message["type"] == "http.request"
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def parse_request(view_func: Callable) -> Tuple[Dict, str]:
+    # view 함수의 use_kwargs 로 요청 값 검증 후, login_required 와 같은 순서로 토큰 확인
+    parser = current_app.config.get("APISPEC_WEBARGS_PARSER", flaskparser.parser)
+    kwargs = dict()
+    for option in apispec_utils.resolve_annotations(view_func, "args").options:
+        kwargs.update(parser.parse(apispec_utils.resolve_schema(option["args"], request=request), locations=option["kwargs"]["locations"]))
+    return kwargs, get_auth_token()
+
+
+def build_environ(scope: Dict) -> Dict:
+    # ASGI scope 로 WSGI environ 생성 (flask request context / url 매칭에 사용)
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", list()):
+        name, value = name.decode("latin-1").upper().replace("-", "_"), value.decode("latin-1")
+        key = name if name in ("CONTENT_TYPE", "CONTENT_LENGTH") else f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def read_body(receive: Callable) -> bytes:
+    body, more_body = b"", True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False) and message["type"] == "http.request"
+    return body
+
+
+async def send_response(response: Response, environ: Dict, send: Callable):
+    headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response.get_wsgi_headers(environ).items()]
+    await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+    # 304 등 body 가 없어야 하는 응답은 get_app_iter 가 body 를 제외 (WSGI 와 동일)
+    await send({"type": "http.response.body", "body": b"".join(response.get_app_iter(environ))})
+
+
+def create_asgi_app(is_localhost: bool = False) -> AsgiApp:
+    # 읽기 API 는 motor (pip install motor) 로 처리하고, 나머지는 create_app 으로 만든 WSGI app 으로 처리
+    flask_app = create_app(is_localhost=is_localhost)
+    return AsgiApp(flask_app, sync_workers=flask_app.config["ASGI_SYNC_WORKERS"])
@@ -0,0 +1,95 @@
+import click
+from flask import Flask, current_app
+from flask.cli import AppGroup
+
+from app.api import ApiError
+from app.models.user import User
+from app.models.post import Post
+from app.models.comment import Comment
+from app.models.job import Job
+from app.serializers.post import PostCreateFormSchema
+from app.serializers.comment import CommentCreateFormSchema
+from app.utils.bulk import import_jsonl
+from app.utils.jobs import JobWorker
+
+import_cli = AppGroup("import", help="JSONL 파일로 포스트/댓글 대량 추가")
+jobs_cli = AppGroup("jobs", help="백그라운드 작업 (카테고리 삭제, 회원 탈퇴 정리 등) 처리")
+
+
+def _get_author(email: str) -> User:
+    try:
+        return User.get_user_info(email=email)
+    except ApiError as e:
+        raise click.ClickException(e.message)
+
+
+def _print_result(result):
+    click.echo(f"total: {result.total} / inserted: {result.inserted} / failed: {result.failed}")
+    for error in result.errors:
+        click.echo(f"  line {error['line']}: {error['message']}", err=True)
+
+
+@import_cli.command("posts")
+@click.argument("path", type=click.File("rb"))
+@click.option("--email", required=True, help="작성자로 기록할 사용자 이메일")
+@click.option("--ordered/--unordered", default=False, help="batch 안에서 실패한 row 이후를 중단할지 여부")
+@click.option("--chunk-size", default=1000, show_default=True)
+def import_posts(path, email: str, ordered: bool, chunk_size: int):
+    author = _get_author(email)
+    result = import_jsonl(path, schema=PostCreateFormSchema(), insert_rows=lambda rows: Post.bulk_create_posts(rows=rows, created_by=author, ordered=ordered), chunk_size=chunk_size)
+    _print_result(result)
+
+
+@import_cli.command("comments")
+@click.argument("path", type=click.File("rb"))
+@click.option("--email", required=True, help="작성자로 기록할 사용자 이메일")
+@click.option("--ordered/--unordered", default=False, help="batch 안에서 실패한 row 이후를 중단할지 여부")
+@click.option("--chunk-size", default=1000, show_default=True)
+def import_comments(path, email: str, ordered: bool, chunk_size: int):
+    author = _get_author(email)
+    result = import_jsonl(path, schema=CommentCreateFormSchema(), insert_rows=lambda rows: Comment.bulk_create_comments(rows=rows, created_by=author, ordered=ordered), chunk_size=chunk_size)
+    _print_result(result)
+
+
+@import_cli.command("title-ngrams")
+def rebuild_title_ngrams():
+    """검색용 n-gram 이 없는 기존 포스트들의 제목 색인 채우기"""
+    click.echo(f"updated: {Post.rebuild_title_ngrams()}")
+
+
+@jobs_cli.command("work")
+@click.option("--once", is_flag=True, help="대기 중인 작업을 모두 처리하면 종료")
+@click.option("--worker-id", default=None, help="작업을 가져갈 때 기록할 worker 이름 (기본값: host:pid)")
+def work_jobs(once: bool, worker_id: str):
+    """백그라운드 작업 처리 (병렬 처리가 필요하면 프로세스를 여러 개 실행)"""
+    # import 할 때 작업 처리 함수가 등록되므로 이름은 사용하지 않음
+    import app.jobs  # noqa: F401  # pylint: disable=unused-import
+
+    config = current_app.config
+    worker = JobWorker(chunk_size=config["JOB_CHUNK_SIZE"], lease_seconds=config["JOB_LEASE_SECONDS"], poll_interval=config["JOB_POLL_INTERVAL"], retry_delay=config["JOB_RETRY_DELAY"], worker_id=worker_id)
+    click.echo(f"worker {worker.worker_id} 시작")
+    worker.run(once=once, log=click.echo)
+
+
+@jobs_cli.command("reconcile-comments")
+def enqueue_reconcile_comments():
+    """포스트별 댓글 수 / 최근 댓글 미리보기 재계산 작업 등록 (worker 가 처리)"""
+    click.echo(f"job_id: {Job.enqueue('post.reconcile_comment_stats').id}")
+
+
+@jobs_cli.command("reconcile-likes")
+def enqueue_reconcile_likes():
+    """포스트 / 댓글 / 대댓글 좋아요 수 재계산 작업 등록 (좋아요 수를 모아서 반영하는 중 비정상 종료된 worker 가 있으면 실행)"""
+    job = Job.enqueue("likes.reconcile", params={"settle_seconds": current_app.config["COUNTER_RECONCILE_SETTLE_SECONDS"]})
+    click.echo(f"job_id: {job.id}")
+
+
+@jobs_cli.command("move-post-likes")
+def enqueue_move_post_likes():
+    """포스트 document 의 좋아요 목록을 post_like collection 으로 옮기는 작업 등록 (post_like 로 바뀐 버전 배포 직후 1번 실행)"""
+    click.echo(f"job_id: {Job.enqueue('post.move_likes').id}")
+
+
+def register_commands(app: Flask):
+    app.cli.add_command(import_cli)
+    app.cli.add_command(jobs_cli)
@@ -3,6 +3,54 @@ class Config:
     ALGORITHM = "HS256"
     MONGODB_URI = "mongodb+srv://127.0.0.1:27017"
     MONGODB_DB = "welcome_aboard_db_real"
+    AUTH_CACHE_MAXSIZE = 10000
+    AUTH_CACHE_TTL = 60
+    AUTH_CACHE_CHECK_INTERVAL = 1  # 공유 세대 번호 (MongoDB) 확인 주기 (다른 worker 에서 비밀번호 변경 / 탈퇴한 사용자는 최대 이 시간 동안 이전 정보로 인증됨)
+    REDIS_URL = "redis://127.0.0.1:6379/0"
+    POST_LIST_CACHE_BACKEND = "local"  # "local" (응답은 프로세스 내부 LRU, 세대 번호는 MongoDB 로 공유) / "redis" (host 공유) / None (사용 안 함)
+    POST_LIST_CACHE_TTL = 30  # 좋아요 수 / 인기 점수 변경은 캐시를 무효화하지 않으므로 목록에는 최대 이 시간 뒤에 반영
+    POST_LIST_CACHE_MAXSIZE = 1024
+    POST_LIST_CACHE_CHECK_INTERVAL = 1  # local backend 가 공유 세대 번호 (MongoDB) 를 확인하는 주기 (다른 worker 의 쓰기 작업은 최대 이 시간 뒤에 반영), 댓글 수 / 미리보기 변경의 무효화도 이 주기마다 한 번만
+    CATEGORY_REGISTRY_CHECK_INTERVAL = 5
+    BCRYPT_ROUNDS = 12
+    PASSWORD_HASH_WORKERS = 2
+    PASSWORD_HASH_QUEUE_LIMIT = 32
+    PASSWORD_HASH_TIMEOUT = 10
+    ASGI_SYNC_WORKERS = 16
+    SLOW_QUERY_THRESHOLD_MS = 100  # None 이면 기록 안 함
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 0.2
+    SLOW_QUERY_EXPLAIN_INTERVAL = 300
+    SLOW_QUERY_QUEUE_SIZE = 256
+    METRICS_TOKEN = None  # /metrics 조회용 토큰 (Authorization: Bearer <토큰>), None 이면 /metrics 를 등록하지 않음
+    METRICS_SHARED_DIR = None  # worker 프로세스가 여러 개일 때 집계를 합치는 디렉토리 (서버 시작 전에 비워야 함), None 이면 프로세스별 값
+    METRICS_WRITE_INTERVAL = 5  # METRICS_SHARED_DIR 에 자기 집계를 저장하는 주기 (다른 worker 의 값은 최대 이 시간 늦게 반영)
+    ACCESS_LOG_ENABLED = True
+    ACCESS_LOG_PATH = None  # None 이면 stdout
+    ACCESS_LOG_SAMPLE_RATE = 1.0  # 5xx 응답은 항상 기록
+    ACCESS_LOG_QUEUE_SIZE = 10000
+    JOB_CHUNK_SIZE = 500  # 백그라운드 작업에서 한 번에 update 할 document 수
+    JOB_LEASE_SECONDS = 60  # 진행 상황 기록 없이 이 시간이 지나면 다른 worker 가 이어서 처리
+    JOB_POLL_INTERVAL = 1
+    JOB_RETRY_DELAY = 10  # 재시도 간격 (시도할 때마다 2배)
+    TRENDING_HALF_LIFE_HOURS = 24  # 인기 점수가 절반으로 줄어드는 시간
+    TRENDING_LIKE_WEIGHT = 1.0
+    TRENDING_COMMENT_WEIGHT = 2.0
+    RAW_LIST_RESPONSES = False  # True 이면 목록 API 를 Document 대신 pymongo dict + 미리 분석한 직렬화 함수로 처리 (응답은 동일, 운영 환경에서 응답 비교 후 켜기)
+    COMPILED_SCHEMAS = False  # True 이면 use_kwargs / marshal_with schema 를 시작할 때 분석한 load / dump 함수로 처리 (결과는 동일, 운영 환경에서 응답 비교 후 켜기)
+    JSON_ENGINE = "flask"  # "flask" (jsonify) / "orjson" (설치되어 있으면 사용, 응답 byte 는 jsonify 와 동일, 운영 환경에서 응답 비교 후 켜기)
+    CONDITIONAL_RESPONSES = False  # True 이면 포스트 상세 / 목록, 카테고리 목록에 ETag 를 붙이고 If-None-Match 가 같으면 304
+    RATE_LIMIT_BACKEND = "shared"  # "shared" (host 의 worker 프로세스가 mmap 파일로 공유) / "local" (프로세스별) / None (사용 안 함)
+    RATE_LIMIT_PATH = None  # shared backend 파일 경로 (None 이면 /dev/shm, 없으면 임시 디렉토리)
+    RATE_LIMIT_SLOTS = 65536  # 동시에 기억하는 key (IP / email) 수
+    RATE_LIMITS = {  # 라우트별 key 종류마다 (허용 요청 수, 기간 초), ip_email 은 (접속 IP, 요청 email) 조합, email 은 비밀번호가 틀린 요청만 셈 (여러 IP 에서 한 계정의 비밀번호 추측 방지)
+        "api.UserView:login": {"ip": (60, 60), "ip_email": (10, 60), "email": (30, 900)},
+        "api.UserView:signup": {"ip": (10, 60), "ip_email": (5, 60)},
+    }
+    PROXY_FIX_X_FOR = 1  # 앞단 proxy (load balancer) 수, X-Forwarded-For 의 뒤에서 이 번째 값을 접속 IP 로 사용 (proxy 없이 직접 노출하면 0, 0 이면 X-Forwarded-For 무시)
+    LIKE_COUNTER_BUFFER = False  # True 이면 좋아요 수 증감량을 모아서 반영 (좋아요 목록은 바로 반영, 좋아요 수는 최대 COUNTER_FLUSH_INTERVAL 초 늦게 반영)
+    COUNTER_FLUSH_INTERVAL = 1.0
+    COUNTER_FLUSH_MAX_PENDING = 1000  # 모인 대상 document 수가 이만큼이 되면 주기를 기다리지 않고 반영
+    COUNTER_RECONCILE_SETTLE_SECONDS = 5  # 좋아요 수 재계산 작업에서 다른 프로세스의 증감량이 반영되기를 기다리는 시간 (COUNTER_FLUSH_INTERVAL 보다 길게)
 
 
 class LocalhostConfig:
@@ -10,3 +58,51 @@ class LocalhostConfig:
     ALGORITHM = "HS256"
     MONGODB_URI = "mongodb://127.0.0.1:27017"
     MONGODB_DB = "welcome_aboard_db"
+    AUTH_CACHE_MAXSIZE = 10000
+    AUTH_CACHE_TTL = 60
+    AUTH_CACHE_CHECK_INTERVAL = 1
+    REDIS_URL = "redis://127.0.0.1:6379/0"
+    POST_LIST_CACHE_BACKEND = "local"
+    POST_LIST_CACHE_TTL = 30
+    POST_LIST_CACHE_MAXSIZE = 1024
+    POST_LIST_CACHE_CHECK_INTERVAL = 1
+    CATEGORY_REGISTRY_CHECK_INTERVAL = 5
+    BCRYPT_ROUNDS = 12
+    PASSWORD_HASH_WORKERS = 2
+    PASSWORD_HASH_QUEUE_LIMIT = 32
+    PASSWORD_HASH_TIMEOUT = 10
+    ASGI_SYNC_WORKERS = 16
+    SLOW_QUERY_THRESHOLD_MS = 100
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 0.2
+    SLOW_QUERY_EXPLAIN_INTERVAL = 300
+    SLOW_QUERY_QUEUE_SIZE = 256
+    METRICS_TOKEN = None
+    METRICS_SHARED_DIR = None
+    METRICS_WRITE_INTERVAL = 5
+    ACCESS_LOG_ENABLED = True
+    ACCESS_LOG_PATH = None
+    ACCESS_LOG_SAMPLE_RATE = 1.0
+    ACCESS_LOG_QUEUE_SIZE = 10000
+    JOB_CHUNK_SIZE = 500
+    JOB_LEASE_SECONDS = 60
+    JOB_POLL_INTERVAL = 1
+    JOB_RETRY_DELAY = 10
+    TRENDING_HALF_LIFE_HOURS = 24
+    TRENDING_LIKE_WEIGHT = 1.0
+    TRENDING_COMMENT_WEIGHT = 2.0
+    RAW_LIST_RESPONSES = False
+    COMPILED_SCHEMAS = False
+    JSON_ENGINE = "flask"
+    CONDITIONAL_RESPONSES = False
+    RATE_LIMIT_BACKEND = "shared"
+    RATE_LIMIT_PATH = None
+    RATE_LIMIT_SLOTS = 65536
+    RATE_LIMITS = {
+        "api.UserView:login": {"ip": (60, 60), "ip_email": (10, 60), "email": (30, 900)},
+        "api.UserView:signup": {"ip": (10, 60), "ip_email": (5, 60)},
+    }
+    PROXY_FIX_X_FOR = 0
+    LIKE_COUNTER_BUFFER = False
+    COUNTER_FLUSH_INTERVAL = 1.0
+    COUNTER_FLUSH_MAX_PENDING = 1000
+    COUNTER_RECONCILE_SETTLE_SECONDS = 5
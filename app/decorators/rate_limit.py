@@ -0,0 +1,26 @@
+from functools import wraps
+
+from flask import request
+
+from app.api import ApiError
+from app.utils.rate_limit import rate_limiter
+
+
+def rate_limited(func):
+    # RATE_LIMITS 에 설정된 라우트별 한도를 접속 IP / (접속 IP, 요청 email) / 요청 email 기준으로 확인 (use_kwargs 아래에 두어야 email 을 받음, 초과하면 DB 조회 / bcrypt 전에 429)
+    # (email 만으로 요청마다 확인하면 누구나 다른 사용자의 email 로 요청해서 그 사용자의 로그인을 막을 수 있으므로,
+    #  email 한도는 비밀번호가 틀린 요청 (401) 만 세어서 여러 IP 에서 한 계정의 비밀번호를 추측하는 요청만 막음)
+    @wraps(func)
+    def _wrapper(*args, **kwargs):
+        email = kwargs.get("email")
+        email = email.strip().lower() if email else None
+        ip = request.remote_addr
+        rate_limiter.check(request.endpoint, ip=ip, ip_email=f"{ip}|{email}" if ip and email else None, failure_keys={"email": email})
+        try:
+            return func(*args, **kwargs)
+        except ApiError as e:
+            if e.status_code == 401:
+                rate_limiter.record_failure(request.endpoint, email=email)
+            raise
+
+    return _wrapper
@@ -1,11 +1,14 @@
+from typing import Dict, List, Optional
+
 import jwt
 from jwt.exceptions import DecodeError, InvalidTokenError
 from functools import wraps
 from flask import request, current_app, g
-from mongoengine import DoesNotExist, MultipleObjectsReturned
 
 from app.api import ApiError
 from app.models.user import User
+from app.utils.cache import auth_user_cache
+from app.utils.reads import Call, Find, ReadSteps, run_steps, to_documents
 
 
 def login_required(func):
@@ -42,20 +45,54 @@ def master_login_required(func):
 
 
 def do_setup_flask_g():
+    g.user = run_steps(auth_user_steps(get_auth_token()))
+
+
+def auth_user_steps(token: str) -> ReadSteps[User]:
+    # 다른 worker 에서 수정/삭제된 사용자가 캐시로 인증되지 않도록 check_interval 마다 공유 세대 번호 확인
+    if auth_user_cache.needs_check:
+        yield Call(auth_user_cache.check_generation)
+
+    # 캐시된 토큰이면 decode 및 DB 조회 없이 사용자 snapshot 으로 복원
+    user = get_cached_user(token)
+    if user is not None:
+        return user
+
+    # 토큰을 decode 해서 payload 불러오기
+    payload = decode_auth_token(token)
+
+    # 가져온 payload를 기반으로 DB로부터 user 정보를 불러오기 (중복 확인을 위해 최대 2명까지 조회)
+    users = yield Find(User, {"email": payload["email"], "is_deleted": False}, limit=2)
+    return resolve_auth_user(token, payload=payload, users=to_documents(User, users))
+
+
+def get_auth_token() -> str:
     if "X-Auth-Token" not in request.headers:
         raise ApiError(message="User login required", status_code=401)
+    return request.headers.get("X-Auth-Token")
 
-    # 토큰을 decode 해서 payload 불러오기
+
+def get_cached_user(token: str) -> Optional[User]:
+    cached = auth_user_cache.get(token)
+    if cached is None:
+        return None
+    _, user_son = cached
+    return User._from_son(user_son)
+
+
+def decode_auth_token(token: str) -> Dict:
     try:
-        payload = jwt.decode(request.headers.get("X-Auth-Token"), key=current_app.config["TOKEN_KEY"], algorithms=[current_app.config["ALGORITHM"]])
+        return jwt.decode(token, key=current_app.config["TOKEN_KEY"], algorithms=[current_app.config["ALGORITHM"]])
     except (DecodeError, InvalidTokenError):
         raise ApiError(message="Not valid authorization token", status_code=401)
 
-    # 가져온 payload를 기반으로 DB로부터 user 정보를 불러오기 (없으면 DoesNotExist, 복수 조회 시 MultipleObjectsReturned)
-    try:
-        g.user = User.objects.get(email=payload["email"], is_deleted=False)
-        print(f"[decorators/user.py] id: {g.user.id} / email: {g.user.email} / is_master: {g.user.is_master} / is_deleted: {g.user.is_deleted}")
-    except DoesNotExist:
+
+def resolve_auth_user(token: str, payload: Dict, users: List[User]) -> User:
+    # 토큰의 email 로 조회된 사용자 확인 후 캐시에 저장
+    if not users:
         raise ApiError(message="User not found based on submitted token", status_code=401)
-    except MultipleObjectsReturned:
+    if len(users) > 1:
         raise ApiError(message="Error occurred while checking user", status_code=500)
+
+    auth_user_cache.set(token, payload=payload, user_son=users[0].to_mongo().to_dict())
+    return users[0]
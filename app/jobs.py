@@ -0,0 +1,65 @@
+from bson import ObjectId
+
+from app.models.comment import Comment, ReComment
+from app.models.post import Post
+from app.utils.bulk import iter_id_chunks
+from app.utils.jobs import JobContext, job_handler
+
+
+@job_handler("category.remove_references")
+def remove_category_references(ctx: JobContext, category_id: ObjectId):
+    """삭제된 카테고리를 포스트들에서 chunk 단위로 제거"""
+    ctx.progress(step="posts", total=Post.objects(categories=category_id).count())
+    while True:
+        removed = Post.remove_category_chunk(category_id=category_id, chunk_size=ctx.chunk_size)
+        if not removed:
+            break
+        ctx.progress(removed)
+
+
+@job_handler("user.delete_cascade")
+def delete_user_cascade(ctx: JobContext, user_id: ObjectId):
+    """탈퇴한 사용자의 포스트 / 댓글 삭제 처리 및 좋아요 취소 (단계마다 남은 대상이 없을 때까지 chunk 단위로 반복)"""
+    steps = (
+        ("posts", Post.delete_posts_by_user_chunk),
+        ("comments", Comment.delete_comments_by_user_chunk),
+        ("post_likes", Post.remove_user_likes_chunk),
+        ("comment_likes", Comment.remove_user_likes_chunk),
+    )
+    for step, run_chunk in steps:
+        ctx.progress(step=step)
+        while True:
+            processed = run_chunk(user_id=user_id, chunk_size=ctx.chunk_size)
+            if not processed:
+                break
+            ctx.progress(processed)
+
+
+@job_handler("post.reconcile_comment_stats")
+def reconcile_comment_stats(ctx: JobContext):
+    """모든 포스트의 comments_cnt / latest_comments 를 댓글 collection 기준으로 다시 계산"""
+    ctx.progress(step="posts", total=Post.objects.count())
+    for post_ids in iter_id_chunks(Post._get_collection(), dict(), chunk_size=ctx.chunk_size):
+        Comment.reconcile_post_stats(post_ids)
+        ctx.progress(len(post_ids))
+
+
+@job_handler("likes.reconcile")
+def reconcile_likes(ctx: JobContext, settle_seconds: float):
+    """포스트 / 댓글 / 대댓글의 likes_cnt 를 좋아요 수 (포스트는 post_like, 댓글 / 대댓글은 좋아요 목록 길이) 기준으로 다시 계산 (프로세스가 비정상 종료되어 반영되지 못한 증감량 복구)"""
+    for step, document_cls in (("posts", Post), ("comments", Comment), ("re_comments", ReComment)):
+        ctx.progress(step=step, total=document_cls.objects.count())
+        for target_ids in iter_id_chunks(document_cls._get_collection(), dict(), chunk_size=ctx.chunk_size):
+            document_cls.reconcile_likes_cnt(target_ids, settle_seconds=settle_seconds)
+            ctx.progress(len(target_ids))
+
+
+@job_handler("post.move_likes")
+def move_post_likes(ctx: JobContext):
+    """포스트 document 에 남아 있는 (기존) 좋아요 목록을 post_like collection 으로 옮김 (likes.reconcile 보다 먼저 실행)"""
+    ctx.progress(step="posts", total=Post.objects(likes__0__exists=True).count())
+    while True:
+        moved = Post.move_likes_chunk(chunk_size=ctx.chunk_size)
+        if not moved:
+            break
+        ctx.progress(moved)
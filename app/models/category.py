@@ -1,11 +1,17 @@
+import time
 from datetime import datetime
+from threading import RLock
+from bson import ObjectId
 from flask import g
-from typing import Optional
+from typing import Optional, List
 
-from mongoengine import Document, StringField, ReferenceField, DateTimeField, OperationError, ValidationError, DoesNotExist, MultipleObjectsReturned
+from mongoengine import Document, StringField, ReferenceField, DateTimeField, OperationError, ValidationError
 
 from app.api import ApiError
 from app.models.user import User
+from app.models.version import VersionCounter
+from app.utils.cache import post_list_cache
+from app.utils.prefetch import register_resolver
 
 
 class Category(Document):
@@ -26,28 +32,109 @@ class Category(Document):
         except (OperationError, ValidationError):
             raise ApiError(message="DB 업데이트 실패", status_code=500)
 
-    @classmethod
-    def get_category_list(cls, name: Optional[str] = None):
-        search_query = dict()
-        if name:
-            search_query["name__icontains"] = name
+        # 카테고리 저장소 버전 갱신
+        VersionCounter.bump(CategoryRegistry.VERSION_NAME)
+        category_registry.invalidate()
 
+    @classmethod
+    def get_category_list(cls, name: Optional[str] = None, as_pymongo: bool = False):
+        # 카테고리 저장소에서 조회 (as_pymongo 이면 저장된 형식의 dict 로 return)
         try:
-            return cls.objects(**search_query).exclude("created_at").order_by("+name")
+            categories = category_registry.search(name=name)
+            return [category.to_mongo().to_dict() for category in categories] if as_pymongo else categories
         except Exception as e:
             raise ApiError(message=str(e), status_code=500)
 
     @classmethod
     def get_category_by_name(cls, name: str):
-        try:
-            return cls.objects.get(name=name)
-        except DoesNotExist:
+        # 관리자 작업에서 사용하므로 항상 최신 버전인지 확인 후 조회
+        category = category_registry.get_by_name(name, force_refresh=True)
+        if category is None:
             raise ApiError(message=f"Category '{name}' not found", status_code=404)
-        except MultipleObjectsReturned:
-            raise ApiError(message="Duplicate categories found", status_code=500)
+        return category
 
     def delete_category(self):
         try:
             self.delete()
         except (OperationError, ValidationError):
             raise ApiError(message="카테고리 삭제 실패", status_code=500)
+
+        # 카테고리 저장소 버전 갱신
+        VersionCounter.bump(CategoryRegistry.VERSION_NAME)
+        category_registry.invalidate()
+
+        # 포스트들의 참조는 백그라운드 작업에서 제거되므로, 캐시된 포스트 목록에 삭제된 카테고리가 남지 않도록 바로 무효화
+        post_list_cache.invalidate()
+
+
+class CategoryRegistry:
+    """
+    카테고리 전체를 id / name 으로 색인해서 메모리에 보관하는 저장소
+
+    - 카테고리는 수가 적고 거의 바뀌지 않으므로, 조회 시 DB 를 거치지 않고 메모리에서 처리
+    - create_category / delete_category 에서 VersionCounter("category") 를 올리고,
+      각 프로세스는 check_interval 초마다 버전을 비교해서 바뀌었을 때만 다시 불러옴
+    """
+
+    VERSION_NAME = "category"
+
+    def __init__(self, check_interval: float = 5):
+        self.check_interval = check_interval
+        self._lock = RLock()
+        self._version = None
+        self._checked_at = 0.0
+        self._by_id = dict()
+        self._by_name = dict()
+
+    def configure(self, check_interval: float):
+        self.check_interval = check_interval
+
+    @property
+    def version(self) -> int:
+        self.refresh()
+        return self._version
+
+    def invalidate(self):
+        # 다음 조회 시 버전 확인 후 다시 불러오도록 처리
+        with self._lock:
+            self._checked_at = 0.0
+
+    def refresh(self, force: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._version is not None and now - self._checked_at < self.check_interval:
+                return
+
+            # 버전을 먼저 읽고 목록을 불러와야, 그 사이에 바뀐 내용은 다음 확인 때 다시 불러오게 됨
+            version = VersionCounter.get_version(self.VERSION_NAME)
+            if version != self._version:
+                categories = list(Category.objects.order_by("+name"))
+                self._by_id = {category.id: category for category in categories}
+                self._by_name = {category.name: category for category in categories}
+                self._version = version
+            self._checked_at = now
+
+    def get_by_id(self, category_id: ObjectId) -> Optional["Category"]:
+        self.refresh()
+        return self._by_id.get(category_id)
+
+    def get_by_name(self, name: str, force_refresh: bool = False) -> Optional["Category"]:
+        self.refresh(force=force_refresh)
+        return self._by_name.get(name)
+
+    def get_many(self, category_ids: List[ObjectId]) -> List["Category"]:
+        # 존재하지 않는 id 는 제외 (기존 `id__in` 조회와 동일)
+        self.refresh()
+        return [self._by_id[category_id] for category_id in dict.fromkeys(category_ids) if category_id in self._by_id]
+
+    def search(self, name: Optional[str] = None) -> List["Category"]:
+        # 이름 오름차순, name 이 있으면 대소문자 구분 없는 부분 일치 (기존 `name__icontains` 와 동일)
+        self.refresh()
+        categories = sorted(self._by_name.values(), key=lambda category: category.name)
+        if name:
+            categories = [category for category in categories if name.casefold() in category.name.casefold()]
+        return categories
+
+
+category_registry: CategoryRegistry = CategoryRegistry()
+register_resolver(Category, category_registry.get_many)
@@ -1,14 +1,19 @@
-from typing import List, Any
+from typing import List, Any, Optional, Tuple, Dict
 
 from bson.objectid import ObjectId
 from flask import g
-from mongoengine import Document, ReferenceField, BooleanField, DateTimeField, StringField, ListField, IntField
+from mongoengine import Q, Document, ReferenceField, BooleanField, DateTimeField, StringField, ListField, IntField
 from mongoengine.errors import OperationError, ValidationError, DoesNotExist, MultipleObjectsReturned
 from datetime import datetime
+from pymongo.errors import PyMongoError
 
 from app.api import ApiError
 from app.models.user import User
-from app.models.post import Post
+from app.models.post import Post, CommentPreview
+from app.utils.bulk import insert_documents, update_chunk
+from app.utils.counter import array_sizes, counter_buffer, inc_counters, reconcile_counters
+from app.utils.reads import Find, ReadSteps, field_projection, run_steps, to_documents
+from app.utils.trending import trending_scorer, utc_timestamp
 
 
 class Comment(Document):
@@ -22,29 +27,89 @@ class Comment(Document):
     updated_at = DateTimeField(default=datetime.utcnow())
     is_deleted = BooleanField(default=False)
 
-    meta = {"collection": "comment", "indexes": [{"fields": ("created_at",)}, {"fields": ("post",)}, {"fields": ("is_deleted",)}]}
+    meta = {"collection": "comment", "indexes": [{"fields": ("created_at",)}, {"fields": ("post", "is_deleted", "created_at", "id")}, {"fields": ("is_deleted",)}, {"fields": ("updated_at", "id")}]}
 
     @classmethod
     def create_comment(cls, post: Post, content: str) -> None:
-        # 댓글 생성
+        # 댓글 생성 (미리보기 정렬에 사용하므로 작성 시각은 직접 지정)
+        now = datetime.utcnow()
+        comment = cls(post=post, content=content, created_by=g.user, created_at=now, updated_at=now)
         try:
-            cls(post=post, content=content, created_by=g.user).save()
+            comment.save()
         except OperationError:
             raise ApiError(message="댓글 생성 실패", status_code=500)
 
+        # 포스트의 댓글 수 / 최근 댓글 미리보기 반영
+        Post.add_comment_previews({post.id: (1, [CommentPreview.make_son(comment.id, content, {"email": g.user.email, "name": g.user.name}, now)])})
+
+        # 인기 점수 반영
+        Post.add_trend_score(post.id, trending_scorer.comment_weight)
+
+    @classmethod
+    def bulk_create_comments(cls, rows: List[Tuple[int, Dict]], created_by: User, ordered: bool = False) -> Tuple[int, List[Tuple[int, str]]]:
+        # 대상 포스트들은 한 번에 조회해서 확인하고, 댓글 document 들을 insert_many 한 번으로 추가
+        post_ids = {row["post_id"] for _, row in rows}
+        existing_post_ids = {post.id for post in Post.objects(id__in=list(post_ids), is_deleted=False).only("id")}
+
+        documents, failures = list(), list()
+        for line, row in rows:
+            if row["post_id"] not in existing_post_ids:
+                failures.append((line, "포스트를 찾을 수 없습니다."))
+                continue
+
+            now = datetime.utcnow()
+            comment = cls(post=row["post_id"], content=row["content"], created_by=created_by, created_at=now, updated_at=now)
+            try:
+                comment.validate()
+            except ValidationError as e:
+                failures.append((line, str(e)))
+                continue
+            documents.append((line, comment.to_mongo()))
+
+        try:
+            inserted, insert_failures = insert_documents(cls._get_collection(), documents, ordered=ordered)
+        except PyMongoError:
+            raise ApiError(message="댓글 대량 추가 실패", status_code=500)
+
+        # 추가된 댓글들을 포스트별로 모아서 댓글 수 / 최근 댓글 미리보기 반영 (insert_many 가 document 에 _id 를 채워둠)
+        failed_lines, previews = {line for line, _ in insert_failures}, dict()
+        for line, document in documents:
+            if line in failed_lines or "_id" not in document:
+                continue
+            count, items = previews.setdefault(document["post"], (0, list()))
+            items.append(CommentPreview.make_son(document["_id"], document["content"], {"email": created_by.email, "name": created_by.name}, document["created_at"]))
+            previews[document["post"]] = (count + 1, items)
+        Post.add_comment_previews(previews)
+
+        # 인기 점수는 포스트별로 추가된 댓글 수만큼 한 번에 반영
+        for post_id, (count, _) in previews.items():
+            Post.add_trend_score(post_id, trending_scorer.comment_weight * count)
+        return inserted, failures + insert_failures
+
+    @classmethod
+    def get_comment_list(cls, page_no: int, page_size: int, post: Post, cursor: Optional[Tuple[datetime, ObjectId]] = None, fields: Optional[Tuple[str, ...]] = None, as_pymongo: bool = False) -> List[Any]:
+        return run_steps(cls.comment_list_steps(page_no=page_no, page_size=page_size, post_id=post.id, cursor=cursor, fields=fields, as_pymongo=as_pymongo))
+
     @classmethod
-    def get_comment_list(cls, page_no: int, page_size: int, post: Post) -> List[Any]:
-        # 댓글 목록 return
+    def comment_list_steps(cls, page_no: int, page_size: int, post_id: ObjectId, cursor: Optional[Tuple[datetime, ObjectId]] = None, fields: Optional[Tuple[str, ...]] = None, as_pymongo: bool = False) -> ReadSteps[List[Any]]:
+        # 댓글 목록 return (cursor 가 있으면 skip 대신 (created_at, _id) 기준으로 이어서 조회, fields 가 있으면 해당 field 와 cursor 용 created_at 만 조회)
+        # as_pymongo 이면 Document 대신 pymongo dict 로 return
+        query, skip = Q(post=post_id, is_deleted=False), (page_no - 1) * page_size
+        if cursor:
+            created_at, last_id = cursor
+            query, skip = query & (Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=last_id)), 0
         try:
-            return cls.objects(post=post, is_deleted=False).skip((page_no - 1) * page_size).limit(page_size).order_by("+created_at")
+            comments = yield Find(cls, query.to_query(cls), field_projection(cls, fields and fields + ("created_at",)), sort=[("created_at", 1), ("_id", 1)], skip=skip, limit=page_size)
         except Exception as e:
             raise ApiError(message=str(e), status_code=500)
+        return comments if as_pymongo else to_documents(cls, comments, fields and fields + ("created_at",))
 
     @classmethod
-    def get_comment_by_id(cls, comment_id: ObjectId):
-        # 댓글 불러오기
+    def get_comment_by_id(cls, comment_id: ObjectId, with_likes: bool = True):
+        # 댓글 불러오기 (좋아요 처리처럼 좋아요 목록이 필요 없으면 제외하고 조회)
         try:
-            return cls.objects.get(id=comment_id, is_deleted=False)
+            queryset = cls.objects if with_likes else cls.objects.exclude("likes")
+            return queryset.get(id=comment_id, is_deleted=False)
         except DoesNotExist:
             raise ApiError(message="댓글을 찾을 수 없습니다.", status_code=404)
         except MultipleObjectsReturned:
@@ -55,33 +120,96 @@ class Comment(Document):
         if self.created_by != g.user:
             raise ApiError(message="해당 댓글을 삭제할 권한이 없습니다.", status_code=403)
 
-        # 댓글 삭제 진행
+        # 댓글 삭제 진행 (동시에 삭제 요청이 와도 댓글 수는 한 번만 줄어들도록 조건부 update)
         try:
-            self.update(set__is_deleted=True, set__updated_at=datetime.utcnow())
+            deleted = Comment.objects(id=self.id, is_deleted=False).update_one(set__is_deleted=True, set__updated_at=datetime.utcnow())
         except (OperationError, ValidationError):
             raise ApiError(message="댓글 삭제 실패", status_code=500)
+        if not deleted:
+            return
+
+        # 포스트의 댓글 수를 줄이고 미리보기에서 제거 (미리보기가 부족해지면 남은 댓글로 다시 채움)
+        # (포스트 id 는 참조를 불러오지 않고 저장된 값으로 확인)
+        post_id = self.to_mongo(fields=["post"])["post"]
+        updated = Post.remove_comment_preview(post_id=post_id, comment_id=self.id)
+        if updated is not None and len(updated.get("latest_comments", list())) < min(updated.get("comments_cnt", 0), Post.LATEST_COMMENTS_SIZE):
+            Post.replace_comment_previews(post_id, Comment.get_latest_previews([post_id])[post_id], expected=updated.get("latest_comments", list()))
+
+        # 삭제된 댓글 (스팸 등) 로 인기 순위가 유지되지 않도록 인기 점수에서도 뺌 (댓글 작성 시각 기준 점수를 빼서 작성 때 더한 점수만큼만 줄어듦)
+        Post.add_trend_score(post_id, -trending_scorer.comment_weight, now=utc_timestamp(self.created_at))
 
     def add_like(self):
+        # 좋아요 추가 진행 (좋아요 목록을 불러오지 않고, 아직 누르지 않은 경우에만 추가되도록 조건부 update)
+        try:
+            updated = Comment.objects(id=self.id, likes__ne=g.user).update_one(push__likes=g.user, **counter_buffer.inline("likes_cnt", 1))
+        except OperationError:
+            raise ApiError(message="좋아요 추가 실패", status_code=500)
+
         # 좋아요 여부가 있으면 error
-        if g.user in self.likes:
+        if not updated:
             raise ApiError(message="이미 좋아요를 누른 댓글 입니다.", status_code=409)
 
-        # 좋아요 추가 진행
+        # 좋아요 수는 모아서 반영
+        counter_buffer.add(Comment.add_likes_counts, self.id, 1)
+
+    def remove_like(self):
+        # 좋아요 취소 진행 (좋아요를 누른 경우에만 취소되도록 조건부 update)
         try:
-            self.update(push__likes=g.user, inc__likes_cnt=1)
+            updated = Comment.objects(id=self.id, likes=g.user).update_one(pull__likes=g.user, **counter_buffer.inline("likes_cnt", -1))
         except OperationError:
-            raise ApiError(message="좋아요 추가 실패", status_code=500)
+            raise ApiError(message="좋아요 철회 실패", status_code=500)
 
-    def remove_like(self):
         # 좋아요 여부가 없으면 error
-        if g.user not in self.likes:
+        if not updated:
             raise ApiError(message="좋아요를 누른 댓글이 아닙니다.", status_code=409)
 
-        # 좋아요 취소 진행
-        try:
-            self.update(pull__likes=g.user, dec__likes_cnt=1)
-        except OperationError:
-            raise ApiError(message="좋아요 철회 실패", status_code=500)
+        # 좋아요 수는 모아서 반영
+        counter_buffer.add(Comment.add_likes_counts, self.id, -1)
+
+    @classmethod
+    def add_likes_counts(cls, deltas: Dict[ObjectId, int]):
+        # counter_buffer 에 모인 댓글별 좋아요 수 증감량 반영
+        inc_counters(cls._get_collection(), "likes_cnt", deltas)
+
+    @classmethod
+    def reconcile_likes_cnt(cls, comment_ids: List[ObjectId], settle_seconds: float) -> int:
+        # likes_cnt 를 좋아요 목록 길이로 다시 계산, 수정한 댓글 수 return
+        return reconcile_counters(cls._get_collection(), comment_ids, "likes_cnt", array_sizes(cls._get_collection(), "likes"), settle_seconds=settle_seconds)
+
+    @classmethod
+    def delete_comments_by_user_chunk(cls, user_id: ObjectId, chunk_size: int) -> int:
+        # 탈퇴한 사용자의 댓글 chunk_size 개를 삭제 처리하고, 해당 포스트들의 댓글 수 / 미리보기를 다시 계산
+        collection, query = cls._get_collection(), {"created_by": user_id, "is_deleted": False}
+        comments = list(collection.find(query, {"post": 1}).limit(chunk_size))
+        if not comments:
+            return 0
+        collection.update_many({"_id": {"$in": [comment["_id"] for comment in comments]}, **query}, {"$set": {"is_deleted": True, "updated_at": datetime.utcnow()}})
+        cls.reconcile_post_stats(list({comment["post"] for comment in comments}))
+        return len(comments)
+
+    @classmethod
+    def get_latest_previews(cls, post_ids: List[ObjectId]) -> Dict[ObjectId, List[Dict]]:
+        # 포스트별 최근 댓글 미리보기 (포스트마다 (post, is_deleted, created_at, id) index 로 LATEST_COMMENTS_SIZE 개만 조회)
+        collection, latest = cls._get_collection(), dict()
+        for post_id in post_ids:
+            latest[post_id] = list(collection.find({"post": post_id, "is_deleted": False}, {"content": 1, "created_by": 1, "created_at": 1}).sort([("created_at", -1), ("_id", -1)]).limit(Post.LATEST_COMMENTS_SIZE))
+
+        author_ids = list({comment["created_by"] for comments in latest.values() for comment in comments})
+        authors = {user["_id"]: user for user in User._get_collection().find({"_id": {"$in": author_ids}}, {"email": 1, "name": 1})}
+        return {post_id: [CommentPreview.make_son(comment["_id"], comment.get("content", ""), authors.get(comment["created_by"], dict()), comment.get("created_at")) for comment in comments] for post_id, comments in latest.items()}
+
+    @classmethod
+    def reconcile_post_stats(cls, post_ids: List[ObjectId]) -> int:
+        # 댓글 collection 기준으로 포스트들의 comments_cnt / latest_comments 를 다시 계산 (값이 바뀐 포스트 수 return)
+        pipeline = [{"$match": {"post": {"$in": post_ids}, "is_deleted": False}}, {"$group": {"_id": "$post", "count": {"$sum": 1}}}]
+        counts = {item["_id"]: item["count"] for item in cls._get_collection().aggregate(pipeline)}
+        previews = cls.get_latest_previews(post_ids)
+        return Post.set_comment_stats({post_id: (counts.get(post_id, 0), previews.get(post_id, list())) for post_id in post_ids})
+
+    @classmethod
+    def remove_user_likes_chunk(cls, user_id: ObjectId, chunk_size: int) -> int:
+        # 탈퇴한 사용자가 누른 좋아요를 댓글 chunk_size 개에서 취소
+        return update_chunk(cls._get_collection(), {"likes": user_id}, {"$pull": {"likes": user_id}, "$inc": {"likes_cnt": -1}}, chunk_size=chunk_size)
 
 
 class ReComment(Document):
@@ -99,16 +227,32 @@ class ReComment(Document):
 
     def add_like(self):
         try:
-            self.update(push__likes=g.user, inc__likes_cnt=1)
+            updated = ReComment.objects(id=self.id, likes__ne=g.user).update_one(push__likes=g.user, **counter_buffer.inline("likes_cnt", 1))
         except OperationError:
             raise ApiError(message="좋아요 추가 실패", status_code=500)
 
+        if not updated:
+            raise ApiError(message="이미 좋아요를 누른 댓글 입니다.", status_code=409)
+        counter_buffer.add(ReComment.add_likes_counts, self.id, 1)
+
     def remove_like(self):
         try:
-            self.update(pull__likes=g.user, dec__likes_cnt=1)
+            updated = ReComment.objects(id=self.id, likes=g.user).update_one(pull__likes=g.user, **counter_buffer.inline("likes_cnt", -1))
         except OperationError:
             raise ApiError(message="좋아요 철회 실패", status_code=500)
 
+        if not updated:
+            raise ApiError(message="좋아요를 누른 댓글이 아닙니다.", status_code=409)
+        counter_buffer.add(ReComment.add_likes_counts, self.id, -1)
+
+    @classmethod
+    def add_likes_counts(cls, deltas: Dict[ObjectId, int]):
+        inc_counters(cls._get_collection(), "likes_cnt", deltas)
+
+    @classmethod
+    def reconcile_likes_cnt(cls, re_comment_ids: List[ObjectId], settle_seconds: float) -> int:
+        return reconcile_counters(cls._get_collection(), re_comment_ids, "likes_cnt", array_sizes(cls._get_collection(), "likes"), settle_seconds=settle_seconds)
+
     @classmethod
     def add_re_comment(cls, parent_comment_id_str: str, content: str):
         try:
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from bson import ObjectId
+from mongoengine import Document, DictField, DateTimeField, IntField, StringField, OperationError, ValidationError, DoesNotExist
+from pymongo import ReturnDocument
+
+from app.api import ApiError
+
+
+class Job(Document):
+    """
+    worker 프로세스 (flask jobs work) 가 처리하는 백그라운드 작업
+
+    - 상태: queued -> running -> succeeded / failed (실패하면 max_attempts 까지 run_at 을 늦춰서 다시 queued)
+    - running 상태의 작업은 locked_until 까지만 해당 worker 가 소유하고, 진행 상황을 기록할 때마다 연장
+      (worker 가 중간에 종료되면 locked_until 이 지난 뒤 다른 worker 가 이어서 처리)
+    - 작업 처리 함수는 여러 번 실행되어도 결과가 같도록 (이미 처리된 document 는 조건에서 빠지도록) 작성
+    """
+
+    STATUS_QUEUED, STATUS_RUNNING, STATUS_SUCCEEDED, STATUS_FAILED = "queued", "running", "succeeded", "failed"
+
+    name = StringField(required=True)
+    params = DictField(default=dict)
+    status = StringField(required=True, default=STATUS_QUEUED, choices=(STATUS_QUEUED, STATUS_RUNNING, STATUS_SUCCEEDED, STATUS_FAILED))
+    attempts = IntField(default=0)
+    max_attempts = IntField(default=3)
+
+    step = StringField()
+    processed = IntField(default=0)
+    total = IntField()
+    error = StringField()
+
+    run_at = DateTimeField(default=datetime.utcnow)
+    locked_by = StringField()
+    locked_until = DateTimeField()
+
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    finished_at = DateTimeField()
+
+    meta = {"collection": "job", "indexes": [{"fields": ("status", "run_at")}, {"fields": ("status", "locked_until")}]}
+
+    @classmethod
+    def enqueue(cls, name: str, params: Optional[Dict] = None, max_attempts: int = 3) -> "Job":
+        try:
+            return cls(name=name, params=params or dict(), max_attempts=max_attempts).save()
+        except (OperationError, ValidationError):
+            raise ApiError(message="작업 등록 실패", status_code=500)
+
+    @classmethod
+    def get_job(cls, job_id: ObjectId) -> "Job":
+        try:
+            return cls.objects.get(id=job_id)
+        except DoesNotExist:
+            raise ApiError(message="존재하지 않는 작업입니다.", status_code=404)
+
+    @classmethod
+    def claim_next(cls, worker_id: str, lease_seconds: float) -> Optional["Job"]:
+        # 실행할 차례인 작업 또는 소유 기간이 지난 (worker 가 종료된) 작업 하나를 find_one_and_update 한 번으로 가져옴
+        now = datetime.utcnow()
+        son = cls._get_collection().find_one_and_update(
+            {"$or": [{"status": cls.STATUS_QUEUED, "run_at": {"$lte": now}}, {"status": cls.STATUS_RUNNING, "locked_until": {"$lt": now}}]},
+            {"$set": {"status": cls.STATUS_RUNNING, "locked_by": worker_id, "locked_until": now + timedelta(seconds=lease_seconds), "updated_at": now}, "$inc": {"attempts": 1}},
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return cls._from_son(son) if son else None
+
+    def _update_owned(self, **update) -> bool:
+        # 이 worker 가 아직 소유한 경우에만 변경 (소유 기간이 지나서 다른 worker 가 가져갔으면 False)
+        update["set__updated_at"] = datetime.utcnow()
+        return Job.objects(id=self.id, status=self.STATUS_RUNNING, locked_by=self.locked_by).update_one(**update) == 1
+
+    def report_progress(self, processed: int, lease_seconds: float, step: Optional[str] = None, total: Optional[int] = None) -> bool:
+        self.processed, self.step, self.total = processed, step or self.step, total if total is not None else self.total
+        return self._update_owned(set__processed=self.processed, set__step=self.step, set__total=self.total, set__locked_until=datetime.utcnow() + timedelta(seconds=lease_seconds))
+
+    def mark_succeeded(self) -> bool:
+        return self._update_owned(set__status=self.STATUS_SUCCEEDED, set__finished_at=datetime.utcnow(), unset__locked_until=True, unset__error=True)
+
+    def mark_failed(self, error: str, retry_delay: float) -> bool:
+        # 남은 시도 횟수가 있으면 retry_delay * 2^(시도 횟수 - 1) 초 뒤에 다시 실행
+        if self.attempts < self.max_attempts:
+            run_at = datetime.utcnow() + timedelta(seconds=retry_delay * 2 ** (self.attempts - 1))
+            return self._update_owned(set__status=self.STATUS_QUEUED, set__run_at=run_at, set__error=error, unset__locked_until=True)
+        return self._update_owned(set__status=self.STATUS_FAILED, set__finished_at=datetime.utcnow(), set__error=error, unset__locked_until=True)
@@ -1,20 +1,95 @@
-from typing import Optional, List
+import time
+from typing import NamedTuple, Optional, List, Tuple, Dict, Union
 from bson.objectid import ObjectId
-from mongoengine import Document, ReferenceField, BooleanField, DateTimeField, StringField, ListField, IntField, OperationError, ValidationError, MultipleObjectsReturned, DoesNotExist
+from mongoengine import Q, Document, EmbeddedDocument, EmbeddedDocumentField, ReferenceField, BooleanField, DateTimeField, DictField, FloatField, ObjectIdField, StringField, ListField, IntField, OperationError, ValidationError
 from datetime import datetime
 from flask import g
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 
 from app.api import ApiError
+from app.utils import ngram
+from app.utils.bulk import insert_documents, update_chunk
+from app.utils.cache import post_list_cache
+from app.utils.counter import counter_buffer, grouped_counts, inc_counters, reconcile_counters
+from app.utils.projection import project
+from app.utils.reads import Aggregate, Call, Find, ReadSteps, field_projection, find_one, run_steps, to_documents
+from app.utils.trending import trending_scorer, utc_timestamp
 from app.models.user import User
-from app.models.category import Category
+from app.models.category import Category, category_registry
+
+
+class CommentPreview(EmbeddedDocument):
+    """포스트 목록에서 보여주는 최근 댓글 (작성자는 email / name 만 복사해서 보관)"""
+
+    CONTENT_LENGTH = 100
+
+    comment_id = ObjectIdField(required=True)
+    content = StringField()
+    created_by = DictField()
+    created_at = DateTimeField()
+
+    @classmethod
+    def make_son(cls, comment_id: ObjectId, content: str, created_by: Dict, created_at: datetime) -> Dict:
+        return {"comment_id": comment_id, "content": content[: cls.CONTENT_LENGTH], "created_by": {"email": created_by.get("email"), "name": created_by.get("name")}, "created_at": created_at}
+
+
+class LikesDelta(NamedTuple):
+    """
+    포스트별로 모아서 반영하는 좋아요 증감량
+
+    - likes: 좋아요 수 증감량, changes: 좋아요 추가 / 취소 횟수
+    - score: epoch 기준 인기 점수 증감량 (좋아요는 누른 시각, 취소는 취소한 좋아요를 누른 시각 기준으로 계산해서 추가 / 취소 한 쌍은 합쳐서 0)
+    """
+
+    likes: int
+    changes: int
+    score: float
+    epoch: int
+
+    @classmethod
+    def event(cls, likes: int, liked_at: Optional[float] = None, now: Optional[float] = None) -> "LikesDelta":
+        # 좋아요 추가 (likes=1) / 취소 (likes=-1) 1번 (liked_at 은 좋아요를 누른 시각, 없으면 현재 시각)
+        now = time.time() if now is None else now
+        epoch = trending_scorer.epoch(now)
+        return cls(likes, 1, trending_scorer.delta(trending_scorer.like_weight * likes, epoch, now if liked_at is None else liked_at), epoch)
+
+    def rebased_score(self, epoch: int) -> float:
+        return self.score * trending_scorer.rebase_factor(self.epoch, epoch)
+
+    def __add__(self, other: "LikesDelta") -> "LikesDelta":
+        # 모으는 사이에 epoch 가 바뀌었으면 나중 epoch 기준으로 합침
+        epoch = max(self.epoch, other.epoch)
+        return LikesDelta(self.likes + other.likes, self.changes + other.changes, self.rebased_score(epoch) + other.rebased_score(epoch), epoch)
+
+    def __bool__(self) -> bool:
+        # 좋아요 수 증감량이 합쳐서 0 이어도 좋아요 목록은 바뀌었을 수 있으므로 (version 증가) 추가 / 취소가 있었으면 반영
+        return bool(self.changes)
 
 
 class Post(Document):
+    # 목록에 함께 보여주는 최근 댓글 수
+    LATEST_COMMENTS_SIZE = 3
+    # 제목 검색에서 한 번에 읽는 후보 수이자 랭킹을 계산하는 묶음 크기 (검색어가 흔해도 점수 계산 / 정렬은 이 수만큼씩)
+    SEARCH_CANDIDATES_SIZE = 1000
+    # 목록 조회에서 (응답 schema 로 조회 field 를 지정하지 않은 경우) 제외하는 field
+    LIST_EXCLUDED_FIELDS = ("content", "likes", "title_ngrams")
+
     title = StringField(required=True, max_length=100)
+    title_ngrams = ListField(StringField(), default=list)
     content = StringField(required=True, max_length=1000)
     categories = ListField(ReferenceField(Category), default=list)
+    # 좋아요 사용자 (post_like collection 에 저장하고 상세 조회에서만 채움, 포스트 document 에는 저장하지 않음)
     likes = ListField(ReferenceField(User), default=list)
     likes_cnt = IntField(default=0)
+    comments_cnt = IntField(default=0)
+    latest_comments = ListField(EmbeddedDocumentField(CommentPreview), default=list)
+    # 인기 점수 (trend_epoch 기준 시간 감쇠 점수, 좋아요 / 댓글이 없던 포스트는 두 필드 모두 없음)
+    trend_score = FloatField()
+    trend_epoch = IntField()
+    # 상세 조회 응답이 바뀌는 변경마다 1 씩 증가 (ETag 생성용, 인기 점수 변경은 제외)
+    # 좋아요 추가/취소는 좋아요 수와 같은 $inc 로 올리므로 LIKE_COUNTER_BUFFER 이면 최대 COUNTER_FLUSH_INTERVAL 초 늦게 바뀜 (그 사이에는 이전 ETag 로 304)
+    version = IntField(default=0)
 
     created_by = ReferenceField(User, required=True)
     created_at = DateTimeField(default=datetime.utcnow())
@@ -23,15 +98,23 @@ class Post(Document):
 
     meta = {
         "collection": "post",
-        "indexes": [{"fields": ("created_at",)}, {"fields": ("title", "categories")}, {"fields": ("is_deleted",)}],
+        "indexes": [
+            {"fields": ("created_at",)},
+            {"fields": ("title", "categories")},
+            {"fields": ("is_deleted",)},
+            {"fields": ("is_deleted", "-created_at", "-id")},
+            {"fields": ("title_ngrams", "is_deleted", "-created_at", "-id")},
+            {"fields": ("updated_at", "id")},
+            {"fields": ("is_deleted", "trend_epoch", "-trend_score")},
+        ],
     }
 
     @classmethod
     def create_post(cls, title: str, content: str, category_ids: Optional[List[ObjectId]] = None):
         # 포스트 객체 정의
-        new_post = cls(title=title, content=content, created_by=g.user)
+        new_post = cls(title=title, title_ngrams=ngram.title_ngrams(title), content=content, created_by=g.user)
         if category_ids:
-            new_post.categories = Category.objects(id__in=category_ids).all()
+            new_post.categories = category_registry.get_many(category_ids)
 
         # 포스트 추가 진행
         try:
@@ -39,40 +122,208 @@ class Post(Document):
         except OperationError:
             raise ApiError(message="포스트 생성 실패", status_code=500)
 
+        # 포스트 목록 캐시 무효화
+        post_list_cache.invalidate()
+
     @classmethod
-    def get_post_list(cls, page_no: int, page_size: int, title: Optional[str] = None, category_id: Optional[ObjectId] = None):
-        # 검색 쿼리 정의
-        search_query = dict(is_deleted=False)
-        if title:
-            search_query["title__icontains"] = title
-        if category_id:
-            # 카테고리 id가 파라미터에 포함되어 있으면 카테고리를 조회
+    def bulk_create_posts(cls, rows: List[Tuple[int, Dict]], created_by: User, ordered: bool = False) -> Tuple[int, List[Tuple[int, str]]]:
+        # create_post 와 같은 값으로 포스트 document 들을 만들고, insert_many 한 번으로 추가 (카테고리는 저장소에서 조회)
+        documents, failures = list(), list()
+        for line, row in rows:
+            now = datetime.utcnow()
+            post = cls(title=row["title"], title_ngrams=ngram.title_ngrams(row["title"]), content=row["content"], created_by=created_by, created_at=now, updated_at=now)
+            if row.get("category_ids"):
+                post.categories = category_registry.get_many(row["category_ids"])
             try:
-                category = Category.objects.get(id=category_id)
-                if category:
-                    search_query["categories__in"] = [category]
-            except DoesNotExist:
+                post.validate()
+            except ValidationError as e:
+                failures.append((line, str(e)))
+                continue
+            documents.append((line, post.to_mongo()))
+
+        try:
+            inserted, insert_failures = insert_documents(cls._get_collection(), documents, ordered=ordered)
+        except PyMongoError:
+            raise ApiError(message="포스트 대량 추가 실패", status_code=500)
+
+        # 포스트 목록 캐시 무효화
+        if inserted:
+            post_list_cache.invalidate()
+        return inserted, failures + insert_failures
+
+    @classmethod
+    def get_post_list(
+        cls, page_no: int, page_size: int, title: Optional[str] = None, category_id: Optional[ObjectId] = None, cursor: Optional[Tuple[datetime, ObjectId]] = None, fields: Optional[Tuple[str, ...]] = None, as_pymongo: bool = False
+    ) -> List[Union["Post", Dict]]:
+        return run_steps(cls.post_list_steps(page_no=page_no, page_size=page_size, title=title, category_id=category_id, cursor=cursor, fields=fields, as_pymongo=as_pymongo))
+
+    @classmethod
+    def post_list_steps(
+        cls, page_no: int, page_size: int, title: Optional[str] = None, category_id: Optional[ObjectId] = None, cursor: Optional[Tuple[datetime, ObjectId]] = None, fields: Optional[Tuple[str, ...]] = None, as_pymongo: bool = False
+    ) -> ReadSteps[List[Union["Post", Dict]]]:
+        # 제목 검색은 랭킹 순으로 정렬되어 (created_at, _id) 커서로 이어서 조회할 수 없으므로 page_no 로만 조회
+        if title and cursor:
+            raise ApiError(message="제목 검색은 cursor 없이 page_no 로 조회해야 합니다.", status_code=422)
+
+        # 검색 쿼리 정의 (as_pymongo 이면 Document 대신 pymongo dict 로 return)
+        search_query = Q(is_deleted=False)
+        if category_id:
+            # 카테고리 id가 파라미터에 포함되어 있으면 카테고리 저장소에서 조회
+            category = yield Call(category_registry.get_by_id, (category_id,))
+            if category is None:
                 # 존재하지 않는 카테고리일 경우 empty list 를 return
                 return list()
-            except MultipleObjectsReturned:
-                # 중복된 카테고리가 조회되면 error
-                raise ApiError(message="카테고리 아이템(id)이 중복으로 발견되었습니다.", status_code=500)
+            search_query &= Q(categories__in=[category])
+
+        # 제목 검색은 n-gram 인덱스로 랭킹 조회 (n-gram 을 만들 수 없는 검색어만 부분 일치 검색)
+        if title:
+            if ngram.query_ngrams(title):
+                posts = yield from cls.search_steps(title=title, search_query=search_query, page_no=page_no, page_size=page_size, fields=fields)
+                return posts if as_pymongo else to_documents(cls, posts, fields and fields + ("created_at",))
+            search_query &= Q(title__icontains=title)
 
-        # 검색 결과 return
+        # 검색 결과 return (cursor 가 있으면 skip 대신 (created_at, _id) 기준으로 이어서 조회, fields 가 있으면 해당 field 와 cursor 용 created_at 만 조회)
+        skip = (page_no - 1) * page_size
+        if cursor:
+            created_at, last_id = cursor
+            search_query &= Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id)
+            skip = 0
         try:
-            return cls.objects(**search_query).skip((page_no - 1) * page_size).limit(page_size).exclude("content", "likes").order_by("-created_at")
+            posts = yield Find(cls, search_query.to_query(cls), field_projection(cls, fields and fields + ("created_at",), exclude=cls.LIST_EXCLUDED_FIELDS), sort=[("created_at", -1), ("_id", -1)], skip=skip, limit=page_size)
         except Exception as e:
             raise ApiError(message=str(e), status_code=500)
+        return posts if as_pymongo else to_documents(cls, posts, fields and fields + ("created_at",))
+
+    @classmethod
+    def search_post_list(cls, title: str, search_query: Q, page_no: int, page_size: int, fields: Optional[Tuple[str, ...]] = None, as_pymongo: bool = False) -> List[Union["Post", Dict]]:
+        posts = run_steps(cls.search_steps(title=title, search_query=search_query, page_no=page_no, page_size=page_size, fields=fields))
+        return posts if as_pymongo else to_documents(cls, posts, fields and fields + ("created_at",))
 
     @classmethod
-    def get_post_detail(cls, post_id: ObjectId):
-        # 포스트 상세정보 조회
+    def search_steps(cls, title: str, search_query: Q, page_no: int, page_size: int, fields: Optional[Tuple[str, ...]] = None) -> ReadSteps[List[Dict]]:
+        """
+        검색어 n-gram 을 모두 포함하는 포스트를 제목 대비 일치 비율이 높은 순 -> 최신순으로 조회
+
+        - n-gram 은 단어를 나눠서 만들기 때문에 검색어가 제목에 그대로 없어도 후보가 될 수 있으므로 (ex. "abc" -> "ab bc"), 정규화한 제목에 검색어가 포함된 후보만 사용
+        - 후보는 인덱스 순서 (최신순) 로 SEARCH_CANDIDATES_SIZE 개씩 읽고, 검색어를 포함하는 포스트를 최신순으로 SEARCH_CANDIDATES_SIZE 개씩 묶어서 묶음 안에서 랭킹
+          (요청한 페이지가 들어있는 묶음까지만 읽으므로 점수 계산 / 정렬은 묶음 크기만큼씩, 더 오래된 포스트는 다음 묶음의 랭킹으로 이어짐)
+        """
+        grams, needle, size = ngram.query_ngrams(title), ngram.normalize_text(title), cls.SEARCH_CANDIDATES_SIZE
+        # 요청한 페이지의 마지막 포스트가 들어있는 묶음까지 필요한 (검색어를 포함하는) 포스트 수
+        needed = -(-page_no * page_size // size) * size
+        matched, after = list(), None
         try:
-            return cls.objects.get(id=post_id, is_deleted=False)
-        except DoesNotExist:
-            raise ApiError(message="포스트를 찾을 수 없습니다.", status_code=404)
-        except MultipleObjectsReturned:
-            raise ApiError(message="조회 도중 에러 발생 (multiple_found_error)", status_code=500)
+            while len(matched) < needed:
+                query = Q(title_ngrams__all=grams) & search_query
+                if after is not None:
+                    query &= Q(created_at__lt=after["created_at"]) | Q(created_at=after["created_at"], id__lt=after["_id"])
+                pipeline = [
+                    {"$match": query.to_query(cls)},
+                    {"$sort": {"created_at": -1, "_id": -1}},
+                    {"$limit": size},
+                    {"$project": {"created_at": 1, "title": 1, "ngrams_size": {"$size": {"$ifNull": ["$title_ngrams", []]}}}},
+                ]
+                candidates = yield Aggregate(cls, pipeline)
+                matched.extend(item for item in candidates if needle in ngram.normalize_text(item.get("title")))
+                if len(candidates) < size:
+                    break
+                after = candidates[-1]
+
+            ranked = [item for i in range(0, len(matched), size) for item in sorted(matched[i : i + size], key=lambda item: (len(grams) / max(item["ngrams_size"], 1), item["created_at"], item["_id"]), reverse=True)]
+            post_ids = [item["_id"] for item in ranked[(page_no - 1) * page_size : page_no * page_size]]
+            posts = {post["_id"]: post for post in (yield Find(cls, {"_id": {"$in": post_ids}}, field_projection(cls, fields and fields + ("created_at",), exclude=cls.LIST_EXCLUDED_FIELDS)))}
+        except Exception as e:
+            raise ApiError(message=str(e), status_code=500)
+
+        # 랭킹 순서대로 return
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+    @classmethod
+    def get_trending_list(cls, page_size: int, now: Optional[float] = None, fields: Optional[Tuple[str, ...]] = None) -> List["Post"]:
+        # 현재 epoch 의 점수 순으로 인덱스 범위 조회 한 번 (epoch 가 바뀐 직후에는 이전 epoch 상위 포스트도 조회해서 현재 시각 기준 점수로 병합)
+        now = time.time() if now is None else now
+        epochs = [trending_scorer.epoch(now), trending_scorer.previous_epoch(now)]
+        try:
+            posts = [
+                post
+                for epoch in epochs
+                if epoch is not None
+                for post in project(cls.objects(is_deleted=False, trend_epoch=epoch, trend_score__gt=0), fields and fields + ("trend_score", "trend_epoch"), exclude=cls.LIST_EXCLUDED_FIELDS).order_by("-trend_score").limit(page_size)
+            ]
+        except Exception as e:
+            raise ApiError(message=str(e), status_code=500)
+
+        if epochs[1] is not None:
+            posts = sorted(posts, key=lambda post: trending_scorer.decay(post.trend_score, post.trend_epoch, now), reverse=True)[:page_size]
+        return posts
+
+    @classmethod
+    def add_trend_score(cls, post_id: ObjectId, weight: float, now: Optional[float] = None):
+        # 좋아요 / 댓글 이벤트 점수를 $inc 로 더함 (현재 epoch 이거나 점수가 없는 포스트는 update 한 번)
+        # 이벤트를 취소할 때는 now 에 원래 이벤트 시각을 넘겨서 더했던 점수를 그대로 뺌 (저장된 epoch 가 더 나중이면 해당 epoch 기준으로 계산)
+        # 이전 epoch 점수 변환이 실패하는 경우는 다른 요청이 먼저 변환해서 저장된 epoch 가 앞으로 바뀐 경우뿐이므로, 더해질 때까지 반복해도 epoch 가 바뀌는 횟수만큼만 반복됨
+        now = time.time() if now is None else now
+        epoch, collection = trending_scorer.epoch(now), cls._get_collection()
+        try:
+            while True:
+                if collection.update_one({"_id": post_id, "trend_epoch": {"$in": [epoch, None]}}, {"$inc": {"trend_score": trending_scorer.delta(weight, epoch, now)}, "$set": {"trend_epoch": epoch}}).matched_count:
+                    return
+
+                item = collection.find_one({"_id": post_id}, {"trend_score": 1, "trend_epoch": 1})
+                if item is None:
+                    return
+                if item["trend_epoch"] > epoch:
+                    # 다른 서버의 시각이 앞서서 이미 다음 epoch 로 변환된 경우 해당 epoch 기준으로 더함
+                    epoch = item["trend_epoch"]
+                    continue
+
+                # 이전 epoch 기준 점수를 현재 epoch 기준으로 변환한 뒤 다시 시도 (그 사이 다른 요청이 점수를 바꿨으면 조건에서 빠짐)
+                collection.update_one(
+                    {"_id": post_id, "trend_epoch": item["trend_epoch"], "trend_score": item["trend_score"]},
+                    {"$set": {"trend_score": item["trend_score"] * trending_scorer.rebase_factor(item["trend_epoch"], epoch), "trend_epoch": epoch}},
+                )
+        except PyMongoError:
+            raise ApiError(message="인기 점수 업데이트 실패", status_code=500)
+
+    @classmethod
+    def rebuild_title_ngrams(cls, batch_size: int = 1000) -> int:
+        # 검색용 n-gram 이 없는 (기존) 포스트들을 채워넣고, 업데이트된 포스트 수를 return
+        collection, updated, requests = cls._get_collection(), 0, list()
+        for item in collection.find({"title_ngrams": {"$exists": False}}, {"title": 1}):
+            requests.append(UpdateOne({"_id": item["_id"]}, {"$set": {"title_ngrams": ngram.title_ngrams(item.get("title"))}}))
+            if len(requests) >= batch_size:
+                updated += collection.bulk_write(requests, ordered=False).modified_count
+                requests = list()
+        if requests:
+            updated += collection.bulk_write(requests, ordered=False).modified_count
+        return updated
+
+    @classmethod
+    def get_post_version(cls, post_id: ObjectId) -> Optional[int]:
+        return run_steps(cls.post_version_steps(post_id))
+
+    @classmethod
+    def post_version_steps(cls, post_id: ObjectId) -> ReadSteps[Optional[int]]:
+        # 상세 조회 ETag 확인용으로 version 만 _id 로 조회 (삭제되었거나 없는 포스트는 None)
+        posts = yield Find(cls, {"_id": post_id, "is_deleted": False}, {"_id": 0, "version": 1}, limit=1)
+        return posts[0].get("version", 0) if posts else None
+
+    @classmethod
+    def get_post_detail(cls, post_id: ObjectId, with_likes: bool = True, fields: Optional[Tuple[str, ...]] = None):
+        return run_steps(cls.post_detail_steps(post_id=post_id, with_likes=with_likes, fields=fields))
+
+    @classmethod
+    def post_detail_steps(cls, post_id: ObjectId, with_likes: bool = True, fields: Optional[Tuple[str, ...]] = None) -> ReadSteps["Post"]:
+        # 포스트 상세정보 조회 (fields 가 있으면 해당 field 만 조회)
+        # 좋아요 사용자는 post_like 에서 조회하고 (좋아요 처리처럼 필요 없으면 생략), 좋아요 수도 조회한 목록 기준으로 채움 (모아서 반영 중인 증감량과 상관없이 목록과 일치)
+        with_likes = with_likes and (not fields or "likes" in fields)
+        stored_fields = fields and tuple(name for name in fields if name != "likes")
+        find = Find(cls, {"_id": post_id, "is_deleted": False}, field_projection(cls, stored_fields, exclude=("likes",)))
+        son = yield from find_one(find, "포스트를 찾을 수 없습니다.", "조회 도중 에러 발생 (multiple_found_error)")
+        if with_likes:
+            son["likes"] = yield from PostLike.user_ids_steps(post_id)
+            son["likes_cnt"] = len(son["likes"])
+        return to_documents(cls, [son], fields)[0]
 
     def update_post(self, title: str, content: str, category_ids: Optional[List[str]] = None):
         # 수정 권한 확인
@@ -80,9 +331,9 @@ class Post(Document):
             raise ApiError(message="해당 포스트를 수정할 권한이 없습니다.", status_code=403)
 
         # 업데이트 쿼리 정의
-        update_query = dict(set__title=title, set__content=content, set__updated_at=datetime.utcnow())
+        update_query = dict(set__title=title, set__title_ngrams=ngram.title_ngrams(title), set__content=content, set__updated_at=datetime.utcnow(), inc__version=1)
         if category_ids:
-            update_query["set__categories"] = Category.objects(id__in=category_ids).all()
+            update_query["set__categories"] = category_registry.get_many(category_ids)
 
         # 업데이트 진행
         try:
@@ -90,6 +341,9 @@ class Post(Document):
         except OperationError:
             raise ApiError(message="포스트 수정 실패", status_code=500)
 
+        # 포스트 목록 캐시 무효화
+        post_list_cache.invalidate()
+
     def delete_post(self):
         # 삭제 권한 확인
         if self.created_by != g.user:
@@ -97,36 +351,247 @@ class Post(Document):
 
         try:
             # 포스트 삭제 진행
-            self.update(set__is_deleted=True, set__updated_at=datetime.utcnow())
+            self.update(set__is_deleted=True, set__updated_at=datetime.utcnow(), inc__version=1)
         except (OperationError, ValidationError):
             raise ApiError(message="포스트 삭제 실패", status_code=500)
 
+        # 포스트 목록 캐시 무효화
+        post_list_cache.invalidate()
+
     def add_like(self):
+        # 좋아요 추가 진행 (post_like 에 추가, 이미 누른 경우는 (post, user) unique index 로 실패, 포스트 document 는 수정하지 않음)
+        try:
+            added = PostLike.add(self.id, g.user.id)
+        except PyMongoError:
+            raise ApiError(message="좋아요 추가 실패", status_code=500)
+
         # 좋아요 여부가 있으면 error
-        if g.user in self.likes:
+        if not added:
             raise ApiError(message="이미 좋아요를 누른 포스트 입니다.", status_code=409)
 
-        # 좋아요 추가 진행
-        try:
-            self.update(push__likes=g.user, inc__likes_cnt=1)
-        except (OperationError, ValidationError):
-            raise ApiError(message="좋아요 추가 실패", status_code=500)
+        # 좋아요 수 / 인기 점수 / version 은 모아서 포스트마다 $inc 1번으로 반영 (모으지 않으면 바로 반영)
+        delta = LikesDelta.event(1)
+        if counter_buffer.enabled:
+            counter_buffer.add(Post.add_likes_counts, self.id, delta)
+        else:
+            Post.add_likes_counts({self.id: delta})
 
     def remove_like(self):
+        # 좋아요 취소 진행 (post_like 에서 삭제, 좋아요를 누른 경우에만 삭제됨, 포스트 document 는 수정하지 않음)
+        try:
+            removed = PostLike.remove(self.id, g.user.id)
+        except PyMongoError:
+            raise ApiError(message="좋아요 취소 실패", status_code=500)
+
         # 좋아요 여부가 없으면 error
-        if g.user not in self.likes:
+        if removed is None:
             raise ApiError(message="좋아요를 누른 포스트가 아닙니다.", status_code=409)
 
-        # 좋아요 취소 진행
+        # 좋아요 수 / 인기 점수 반영 (좋아요를 누른 시각 기준 점수를 빼서 좋아요 때 더한 점수만큼만 줄어듦)
+        delta = LikesDelta.event(-1, liked_at=utc_timestamp(removed["created_at"]) if removed.get("created_at") else None)
+        if counter_buffer.enabled:
+            counter_buffer.add(Post.add_likes_counts, self.id, delta)
+        else:
+            Post.add_likes_counts({self.id: delta})
+
+    @classmethod
+    def add_likes_counts(cls, deltas: Dict[ObjectId, LikesDelta], now: Optional[float] = None):
+        """
+        포스트별 좋아요 수 증감량과 인기 점수, 상세 조회 ETag 용 version 을 포스트마다 update 1번 ($inc) 으로 반영 (counter_buffer 의 반영 함수)
+
+        - 좋아요 목록은 post_like 에 있으므로 좋아요가 몰리는 포스트 document 에는 모아둔 증감량의 $inc 만 씀 (좋아요 / 취소 여러 번이 update 1번)
+        - 인기 점수가 이전 epoch 기준인 포스트 (epoch 가 바뀐 뒤 첫 반영) 만 좋아요 수와 인기 점수 (epoch 변환) 를 따로 반영
+        """
+        now = time.time() if now is None else now
+        epoch, collection = trending_scorer.epoch(now), cls._get_collection()
+        requests = [
+            UpdateOne(
+                {"_id": post_id, "trend_epoch": {"$in": [epoch, None]}},
+                {"$inc": {"likes_cnt": delta.likes, "version": 1, "trend_score": delta.rebased_score(epoch)}, "$set": {"trend_epoch": epoch}},
+            )
+            for post_id, delta in deltas.items()
+        ]
+        if not requests:
+            return
+
         try:
-            self.update(pull__likes=g.user, dec__likes_cnt=1)
-        except (OperationError, ValidationError):
-            raise ApiError(message="좋아요 취소 실패", status_code=500)
+            matched = collection.bulk_write(requests, ordered=False).matched_count
+            if matched < len(requests):
+                # 조건에서 빠진 포스트 중 epoch 가 다른 포스트만 따로 반영 (없는 포스트는 제외)
+                # (bulk 와 이 조회 사이에 다른 서버가 다음 epoch 로 변환한 포스트는 좋아요 수가 두 번 반영될 수 있으며, reconcile_likes_cnt 로 복구)
+                others = {item["_id"]: deltas[item["_id"]] for item in collection.find({"_id": {"$in": list(deltas)}, "trend_epoch": {"$nin": [epoch, None]}}, {"_id": 1})}
+                inc_counters(collection, "likes_cnt", {post_id: delta.likes for post_id, delta in others.items()}, extra={"version": 1})
+                for post_id, delta in others.items():
+                    # delta.epoch 기준 점수는 delta.epoch 시작 시각의 이벤트 점수와 같음
+                    if delta.score:
+                        cls.add_trend_score(post_id, delta.score, now=delta.epoch)
+        except PyMongoError:
+            raise ApiError(message="좋아요 수 업데이트 실패", status_code=500)
+        # 포스트 목록 캐시는 무효화하지 않음 (좋아요가 몰려도 캐시가 유지되도록, 목록의 좋아요 수는 최대 POST_LIST_CACHE_TTL 초 늦게 반영)
+
+    @classmethod
+    def reconcile_likes_cnt(cls, post_ids: List[ObjectId], settle_seconds: float) -> int:
+        # likes_cnt 를 post_like 의 포스트별 좋아요 수로 다시 계산 (반영되지 못하고 유실된 증감량 복구), 수정한 포스트 수 return
+        fixed = reconcile_counters(cls._get_collection(), post_ids, "likes_cnt", grouped_counts(PostLike._get_collection(), "post"), settle_seconds=settle_seconds)
+        if fixed:
+            post_list_cache.invalidate()
+        return fixed
+
+    @classmethod
+    def move_likes_chunk(cls, chunk_size: int) -> int:
+        # 포스트 document 에 좋아요 목록이 남아 있는 (기존) 포스트 chunk_size 개의 좋아요를 post_like 로 옮기고 목록 제거 (0 이 될 때까지 반복)
+        collection = cls._get_collection()
+        posts = list(collection.find({"likes.0": {"$exists": True}}, {"likes": 1}).limit(chunk_size))
+        if not posts:
+            return 0
+        PostLike.add_many([(post["_id"], user_id) for post in posts for user_id in post["likes"]])
+        collection.update_many({"_id": {"$in": [post["_id"] for post in posts]}}, {"$unset": {"likes": ""}})
+        return len(posts)
+
+    @classmethod
+    def remove_category_chunk(cls, category_id: ObjectId, chunk_size: int) -> int:
+        # 해당 카테고리가 있는 포스트 chunk_size 개에서 카테고리를 제거 (카테고리 삭제 작업에서 0 이 될 때까지 반복)
+        removed = update_chunk(cls._get_collection(), {"categories": category_id}, {"$pull": {"categories": category_id}, "$inc": {"version": 1}}, chunk_size=chunk_size)
+
+        # 포스트 목록 캐시 무효화
+        if removed:
+            post_list_cache.invalidate()
+        return removed
+
+    @classmethod
+    def delete_posts_by_user_chunk(cls, user_id: ObjectId, chunk_size: int) -> int:
+        # 탈퇴한 사용자의 포스트 chunk_size 개를 삭제 처리
+        deleted = update_chunk(cls._get_collection(), {"created_by": user_id, "is_deleted": False}, {"$set": {"is_deleted": True, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}}, chunk_size=chunk_size)
+        if deleted:
+            post_list_cache.invalidate()
+        return deleted
 
     @classmethod
-    def remove_category_from_all(cls, category: Category):
-        # 모든 포스트 document 로부터 해당 category 객체를 제거
+    def remove_user_likes_chunk(cls, user_id: ObjectId, chunk_size: int) -> int:
+        # 탈퇴한 사용자가 누른 좋아요 chunk_size 개를 post_like 에서 삭제하고 해당 포스트들의 좋아요 수를 줄임
+        post_ids = PostLike.remove_by_user_chunk(user_id, chunk_size=chunk_size)
+        if post_ids:
+            inc_counters(cls._get_collection(), "likes_cnt", {post_id: -1 for post_id in post_ids}, extra={"version": 1})
+            post_list_cache.invalidate()
+        return len(post_ids)
+
+    @classmethod
+    def add_comment_previews(cls, previews: Dict[ObjectId, Tuple[int, List[Dict]]]):
+        # 포스트별 (추가된 댓글 수, 최근 댓글 미리보기 목록) 을 $inc / $push ($sort + $slice) 로 반영 (여러 요청이 동시에 추가해도 최신 댓글만 남음)
+        requests = [
+            UpdateOne(
+                {"_id": post_id},
+                {"$inc": {"comments_cnt": count, "version": 1}, "$push": {"latest_comments": {"$each": items, "$sort": {"created_at": -1, "comment_id": -1}, "$slice": cls.LATEST_COMMENTS_SIZE}}},
+            )
+            for post_id, (count, items) in previews.items()
+        ]
+        if not requests:
+            return
+
         try:
-            cls.objects(categories__in=[category]).update(pull__categories=category)
-        except (OperationError, ValidationError):
-            raise ApiError(message="카테고리 제거 실패", status_code=500)
+            cls._get_collection().bulk_write(requests, ordered=False)
+        except PyMongoError:
+            raise ApiError(message="댓글 수 업데이트 실패", status_code=500)
+
+        # 포스트 목록 캐시 무효화 (comments_cnt / latest_comments 변경, 댓글이 몰려도 세대 번호는 check_interval 마다 한 번만 올림)
+        post_list_cache.invalidate(coalesce=True)
+
+    @classmethod
+    def remove_comment_preview(cls, post_id: ObjectId, comment_id: ObjectId) -> Optional[Dict]:
+        # 댓글 수를 줄이고 미리보기에서 제거한 뒤, 변경된 (comments_cnt, latest_comments) 를 return
+        try:
+            updated = cls._get_collection().find_one_and_update(
+                {"_id": post_id},
+                {"$inc": {"comments_cnt": -1, "version": 1}, "$pull": {"latest_comments": {"comment_id": comment_id}}},
+                projection={"comments_cnt": 1, "latest_comments": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+        except PyMongoError:
+            raise ApiError(message="댓글 수 업데이트 실패", status_code=500)
+
+        post_list_cache.invalidate(coalesce=True)
+        return updated
+
+    @classmethod
+    def replace_comment_previews(cls, post_id: ObjectId, latest_comments: List[Dict], expected: List[Dict]) -> bool:
+        # 미리보기가 expected 그대로인 경우에만 교체 (그 사이 다른 요청이 댓글을 추가/삭제했으면 그 결과를 유지)
+        replaced = cls._get_collection().update_one({"_id": post_id, "latest_comments": expected}, {"$set": {"latest_comments": latest_comments}, "$inc": {"version": 1}}).matched_count == 1
+        if replaced:
+            post_list_cache.invalidate(coalesce=True)
+        return replaced
+
+    @classmethod
+    def set_comment_stats(cls, stats: Dict[ObjectId, Tuple[int, List[Dict]]]) -> int:
+        # 댓글 collection 에서 다시 계산한 포스트별 (댓글 수, 최근 댓글 미리보기) 로 덮어쓰고, 값이 바뀐 포스트 수를 return (값이 다른 포스트만 version 증가)
+        requests = [
+            UpdateOne(
+                {"_id": post_id, "$or": [{"comments_cnt": {"$ne": count}}, {"latest_comments": {"$ne": items}}]},
+                {"$set": {"comments_cnt": count, "latest_comments": items}, "$inc": {"version": 1}},
+            )
+            for post_id, (count, items) in stats.items()
+        ]
+        if not requests:
+            return 0
+
+        modified = cls._get_collection().bulk_write(requests, ordered=False).modified_count
+        if modified:
+            post_list_cache.invalidate()
+        return modified
+
+
+class PostLike(Document):
+    """
+    포스트 좋아요 (포스트 / 사용자마다 1건)
+
+    - 좋아요가 몰리는 포스트 document 에 좋아요 목록을 push / pull 하지 않도록 별도 collection 에 보관
+    - 중복 좋아요는 (post, user) unique index 로 막고, 좋아요 목록은 (post, _id) index 로 누른 순서대로 조회
+    """
+
+    post = ReferenceField(Post, required=True)
+    user = ReferenceField(User, required=True)
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {"collection": "post_like", "indexes": [{"fields": ("post", "user"), "unique": True}, {"fields": ("post", "id")}, {"fields": ("user",)}]}
+
+    @classmethod
+    def add(cls, post_id: ObjectId, user_id: ObjectId) -> bool:
+        # 좋아요 추가 (이미 누른 경우 False)
+        try:
+            cls._get_collection().insert_one({"post": post_id, "user": user_id, "created_at": datetime.utcnow()})
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @classmethod
+    def add_many(cls, likes: List[Tuple[ObjectId, ObjectId]]) -> int:
+        # (포스트 id, 사용자 id) 목록을 insert_many 한 번으로 추가하고 추가된 개수 return (이미 있는 좋아요는 건너뜀)
+        if not likes:
+            return 0
+        now = datetime.utcnow()
+        try:
+            return len(cls._get_collection().insert_many([{"post": post_id, "user": user_id, "created_at": now} for post_id, user_id in likes], ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", list())):
+                raise
+            return e.details.get("nInserted", 0)
+
+    @classmethod
+    def remove(cls, post_id: ObjectId, user_id: ObjectId) -> Optional[Dict]:
+        # 좋아요 취소 후 삭제한 좋아요 (_id, created_at) return (누르지 않은 경우 None)
+        return cls._get_collection().find_one_and_delete({"post": post_id, "user": user_id}, projection={"created_at": 1})
+
+    @classmethod
+    def remove_by_user_chunk(cls, user_id: ObjectId, chunk_size: int) -> List[ObjectId]:
+        # 사용자의 좋아요 chunk_size 개를 삭제하고 해당 포스트 id 목록 return (빈 목록이면 남은 좋아요 없음)
+        collection = cls._get_collection()
+        likes = list(collection.find({"user": user_id}, {"post": 1}).limit(chunk_size))
+        if not likes:
+            return list()
+        collection.delete_many({"_id": {"$in": [like["_id"] for like in likes]}})
+        return [like["post"] for like in likes]
+
+    @classmethod
+    def user_ids_steps(cls, post_id: ObjectId) -> ReadSteps[List[ObjectId]]:
+        # 포스트에 좋아요를 누른 사용자 id (누른 순서대로)
+        likes = yield Find(cls, {"post": post_id}, {"_id": 0, "user": 1}, sort=[("_id", 1)])
+        return [like["user"] for like in likes]
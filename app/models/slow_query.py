@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from mongoengine import Document, DateTimeField, FloatField, IntField, ListField, StringField
+
+
+class SlowQuery(Document):
+    """
+    설정한 시간보다 오래 걸린 MongoDB 명령 기록 (app.utils.slow_query.SlowQueryRecorder 가 추가)
+
+    - capped collection 이라 오래된 기록부터 자동으로 지워짐
+    - plan_* / *_examined 값은 explain 을 실행한 기록에만 있음
+    """
+
+    command = StringField(required=True)
+    collection_name = StringField(db_field="collection")
+    shape = StringField(required=True)
+    caller = StringField()
+    endpoint = StringField()
+    duration_ms = FloatField(required=True)
+
+    plan_stage = StringField()
+    plan_indexes = ListField(StringField(), default=list)
+    n_returned = IntField()
+    docs_examined = IntField()
+    keys_examined = IntField()
+
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {"collection": "slow_query", "max_size": 16 * 1024 * 1024, "max_documents": 10000}
+
+    @classmethod
+    def insert_record(cls, record: Dict) -> None:
+        # 기록용 thread 에서 호출하므로 document 변환 없이 바로 추가
+        cls._get_collection().insert_one(cls(**record).to_mongo())
+
+    @classmethod
+    def get_slow_query_list(cls, command: Optional[str] = None, collection_name: Optional[str] = None, plan_stage: Optional[str] = None, limit: int = 50) -> List["SlowQuery"]:
+        # 최근 기록부터 (capped collection 은 추가된 순서로 저장되므로 $natural 역순)
+        query = dict()
+        if command:
+            query["command"] = command
+        if collection_name:
+            query["collection_name"] = collection_name
+        if plan_stage:
+            query["plan_stage"] = plan_stage
+        return list(cls.objects(**query).order_by("-$natural").limit(limit))
@@ -1,10 +1,13 @@
-from typing import Optional
-import bcrypt
-from mongoengine import Document, EmailField, StringField, BooleanField, DateTimeField, OperationError, ValidationError, DoesNotExist, MultipleObjectsReturned
-from bcrypt import checkpw
+from typing import Optional, Tuple
+from mongoengine import Document, EmailField, StringField, BooleanField, DateTimeField, OperationError, ValidationError
 from datetime import datetime
 
 from app.api import ApiError
+from app.models.job import Job
+from app.utils.cache import auth_user_cache
+from app.utils.password import password_hasher
+from app.utils.projection import project
+from app.utils.reads import Find, ReadSteps, field_projection, find_one, run_steps, to_documents
 
 
 class User(Document):
@@ -20,31 +23,44 @@ class User(Document):
 
     meta = {
         "collection": "user",
-        "indexes": [{"fields": ("email", "name")}, {"fields": ("is_deleted",)}],
+        "indexes": [{"fields": ("email", "name")}, {"fields": ("is_deleted",)}, {"fields": ("updated_at", "id")}],
     }
 
     def check_pw(self, password: str) -> bool:
-        return checkpw(password.encode("utf-8"), self.password.encode("utf-8"))
+        return password_hasher.check(password, self.password)
+
+    def rehash_pw_if_needed(self, password: str):
+        # 저장된 hash 의 work factor 가 현재 설정과 다르면, 확인된 비밀번호로 다시 hash 해서 저장 (실패해도 로그인은 진행)
+        if not password_hasher.needs_rehash(self.password):
+            return
+
+        try:
+            self.update(set__password=password_hasher.hash(password))
+        except (ApiError, OperationError, ValidationError):
+            pass
 
     @classmethod
-    def get_user_list(cls, page_no: int, page_size: int, email: Optional[str] = None):
+    def get_user_list(cls, page_no: int, page_size: int, email: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None, as_pymongo: bool = False):
         search_query = dict()
         if email:
             search_query["email"] = email
 
         try:
-            return cls.objects(**search_query).skip((page_no - 1) * page_size).limit(page_size)
+            # 목록 조회에는 비밀번호 hash 를 불러오지 않음
+            queryset = project(cls.objects(**search_query), fields, exclude=("password",)).skip((page_no - 1) * page_size).limit(page_size)
+            return queryset.as_pymongo() if as_pymongo else queryset
         except Exception as e:
             raise ApiError(message=str(e), status_code=500)
 
     @classmethod
-    def get_user_info(cls, email: str):
-        try:
-            return cls.objects.get(email=email, is_deleted=False)
-        except DoesNotExist:
-            raise ApiError(message="존재하지 않는 계정입니다.", status_code=404)
-        except MultipleObjectsReturned:
-            raise ApiError(message="계정 조회 도중 에러가 발생했습니다.", status_code=500)
+    def get_user_info(cls, email: str, fields: Optional[Tuple[str, ...]] = None):
+        # 비밀번호 확인 / 수정에 사용하는 경우는 fields 없이 전체 조회
+        return run_steps(cls.user_info_steps(email=email, fields=fields))
+
+    @classmethod
+    def user_info_steps(cls, email: str, fields: Optional[Tuple[str, ...]] = None) -> ReadSteps["User"]:
+        find = Find(cls, {"email": email, "is_deleted": False}, field_projection(cls, fields))
+        return to_documents(cls, [(yield from find_one(find, "존재하지 않는 계정입니다.", "계정 조회 도중 에러가 발생했습니다."))], fields)[0]
 
     def update_user_info(self, change_pw: bool, password: Optional[str] = None, new_password: Optional[str] = None, subscribing: Optional[bool] = None):
         if change_pw is True:
@@ -55,7 +71,7 @@ class User(Document):
             if self.check_pw(password=password) is not True:
                 raise ApiError(message="비밀번호가 일치하지 않습니다", status_code=401)
 
-            self.password = bcrypt.hashpw(password=new_password.encode(encoding="utf-8"), salt=bcrypt.gensalt()).decode(encoding="utf-8")
+            self.password = password_hasher.hash(new_password)
         if subscribing is not None:
             self.subscribing = subscribing
 
@@ -65,8 +81,17 @@ class User(Document):
         except (OperationError, ValidationError) as e:
             raise ApiError(message="DB 업데이트 실패", status_code=500)
 
-    def delete_user(self):
+        # 인증 캐시에 남아있는 이전 사용자 정보 제거
+        auth_user_cache.invalidate(email=self.email)
+
+    def delete_user(self) -> Job:
         try:
             self.update(is_deleted=True, updated_at=datetime.utcnow())
         except (OperationError, ValidationError):
             raise ApiError(message="DB 업데이트 실패", status_code=500)
+
+        # 삭제된 사용자의 토큰이 캐시로 계속 인증되지 않도록 제거
+        auth_user_cache.invalidate(email=self.email)
+
+        # 작성한 포스트 / 댓글 및 좋아요 정리는 백그라운드 작업으로 처리 (app.jobs.delete_user_cascade)
+        return Job.enqueue("user.delete_cascade", params={"user_id": self.id})
@@ -0,0 +1,26 @@
+from mongoengine import Document, StringField, IntField
+
+
+class VersionCounter(Document):
+    """
+    이름별 버전 번호 (ex. "category")
+
+    - 여러 worker 프로세스가 메모리에 들고 있는 데이터가 최신인지 확인하는 용도로 사용
+    - 데이터를 변경한 쪽에서 bump() 로 버전을 올리고, 읽는 쪽은 get_version() 으로 비교
+    """
+
+    name = StringField(primary_key=True)
+    version = IntField(default=0)
+
+    meta = {"collection": "version_counter"}
+
+    @classmethod
+    def get_version(cls, name: str) -> int:
+        counter = cls._get_collection().find_one({"_id": name}, {"version": 1})
+        return counter["version"] if counter else 0
+
+    @classmethod
+    def bump(cls, name: str) -> int:
+        # 한 번의 upsert 로 버전을 올리고, 올라간 버전을 return
+        counter = cls.objects(name=name).modify(upsert=True, new=True, inc__version=1)
+        return counter.version
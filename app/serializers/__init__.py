@@ -1,10 +1,13 @@
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Tuple
 
 from bson import ObjectId
 from bson.errors import InvalidId
 from marshmallow import ValidationError
 from marshmallow.fields import Field
 
+from app.utils.cursor import encode_cursor, decode_cursor
+
 
 class ObjectIdSchemaField(Field):
     """
@@ -16,10 +19,29 @@ class ObjectIdSchemaField(Field):
             return None
         return value if isinstance(value, str) else str(value)
 
-    def _deserialize(self, value, attr, data) -> Optional[ObjectId]:
+    def _deserialize(self, value, attr, data, **kwargs) -> Optional[ObjectId]:
         if value is None:
             return None
         try:
             return ObjectId(value)
         except (TypeError, InvalidId):
             raise ValidationError("invalid ObjectId `%s`" % value)
+
+
+class CursorSchemaField(Field):
+    """
+    Marshmallow field for keyset pagination cursor (:func:`app.utils.cursor.encode_cursor`)
+    """
+
+    def _serialize(self, value, attr, obj) -> Optional[str]:
+        if value is None:
+            return None
+        return value if isinstance(value, str) else encode_cursor(*value)
+
+    def _deserialize(self, value, attr, data, **kwargs) -> Optional[Tuple[datetime, ObjectId]]:
+        if value is None:
+            return None
+        try:
+            return decode_cursor(value)
+        except ValueError:
+            raise ValidationError("invalid cursor `%s`" % value)
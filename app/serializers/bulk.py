@@ -0,0 +1,18 @@
+from marshmallow import fields, Schema, validate
+
+
+class BulkImportFormSchema(Schema):
+    ordered = fields.Boolean(load_default=False)
+    chunk_size = fields.Integer(load_default=1000, validate=validate.Range(min=1, max=10000, error="chunk 크기는 1~10,000 입니다."))
+
+
+class BulkImportErrorSchema(Schema):
+    line = fields.Integer()
+    message = fields.String()
+
+
+class BulkImportResultSchema(Schema):
+    total = fields.Integer()
+    inserted = fields.Integer()
+    failed = fields.Integer()
+    errors = fields.Nested(BulkImportErrorSchema, many=True)
@@ -1,6 +1,6 @@
 from marshmallow import fields, Schema, validate
 
-from app.serializers import ObjectIdSchemaField
+from app.serializers import ObjectIdSchemaField, CursorSchemaField
 from app.serializers.user import UserInfoSchema
 from app.serializers.post import PostMasterInfoSchema
 
@@ -9,6 +9,7 @@ class CommentListSearchFormSchema(Schema):
     post_id = ObjectIdSchemaField(required=True)
     page_no = fields.Integer(load_default=1, validate=validate.Range(min=1, error="페이지 번호는 1부터 입니다."))
     page_size = fields.Integer(load_default=20, validate=validate.OneOf(choices=(10, 20, 50, 100), error="조회 가능한 페이지 크기는 [10, 20, 50, 100] 입니다."))
+    cursor = CursorSchemaField(load_default=None, allow_none=True)
 
 
 class CommentCreateFormSchema(Schema):
@@ -0,0 +1,16 @@
+from marshmallow import fields, Schema, pre_load
+
+
+class ExportFormSchema(Schema):
+    updated_from = fields.DateTime(load_default=None, allow_none=True)
+    updated_to = fields.DateTime(load_default=None, allow_none=True)
+    field_names = fields.List(fields.String(), data_key="fields", load_default=None, allow_none=True)
+
+    @pre_load
+    def split_field_names(self, data, **kwargs):
+        # "?fields=title,likes_cnt" / "?fields=title&fields=likes_cnt" 형식을 모두 list 로 변환
+        value = data.get("fields")
+        if value is None:
+            return data
+        values = [value] if isinstance(value, str) else value
+        return dict(data, fields=[name.strip() for item in values for name in item.split(",") if name.strip()])
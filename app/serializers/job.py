@@ -0,0 +1,20 @@
+from marshmallow import fields, Schema
+
+from app.serializers import ObjectIdSchemaField
+
+
+class JobInfoSchema(Schema):
+    id = ObjectIdSchemaField(data_key="job_id")
+    name = fields.String()
+    status = fields.String()
+    attempts = fields.Integer()
+    max_attempts = fields.Integer()
+
+    step = fields.String()
+    processed = fields.Integer()
+    total = fields.Integer()
+    error = fields.String()
+
+    created_at = fields.DateTime()
+    updated_at = fields.DateTime()
+    finished_at = fields.DateTime()
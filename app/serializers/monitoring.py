@@ -0,0 +1,28 @@
+from marshmallow import fields, Schema, validate
+
+from app.serializers import ObjectIdSchemaField
+
+
+class SlowQuerySearchFormSchema(Schema):
+    command = fields.String(load_default=None, allow_none=True)
+    collection = fields.String(load_default=None, allow_none=True)
+    plan_stage = fields.String(load_default=None, allow_none=True, validate=validate.OneOf(choices=("COLLSCAN", "IXSCAN", "IDHACK"), error="실행 계획은 [COLLSCAN, IXSCAN, IDHACK] 중 하나입니다."))
+    limit = fields.Integer(load_default=50, validate=validate.Range(min=1, max=500, error="조회 가능한 개수는 1~500 입니다."))
+
+
+class SlowQueryInfoSchema(Schema):
+    id = ObjectIdSchemaField(data_key="slow_query_id")
+    command = fields.String()
+    collection_name = fields.String(data_key="collection")
+    shape = fields.String()
+    caller = fields.String()
+    endpoint = fields.String()
+    duration_ms = fields.Float()
+
+    plan_stage = fields.String()
+    plan_indexes = fields.List(fields.String())
+    n_returned = fields.Integer()
+    docs_examined = fields.Integer()
+    keys_examined = fields.Integer()
+
+    created_at = fields.DateTime()
@@ -1,8 +1,9 @@
 from marshmallow import fields, Schema, validate
 
-from app.serializers import ObjectIdSchemaField
+from app.serializers import ObjectIdSchemaField, CursorSchemaField
 from app.serializers.user import UserInfoSchema
 from app.serializers.category import CategoryInfoSchema
+from app.utils.trending import trending_scorer
 
 
 class PostMasterSearchFormSchema(Schema):
@@ -10,6 +11,11 @@ class PostMasterSearchFormSchema(Schema):
     category_id = ObjectIdSchemaField(load_default=None, allow_none=True)
     page_no = fields.Integer(load_default=1, validate=validate.Range(min=1, error="페이지 번호는 1부터 입니다."))
     page_size = fields.Integer(load_default=20, validate=validate.OneOf(choices=(10, 20, 50, 100), error="조회 가능한 페이지 크기는 [10, 20, 50, 100] 입니다."))
+    cursor = CursorSchemaField(load_default=None, allow_none=True)
+
+
+class PostTrendingSearchFormSchema(Schema):
+    page_size = fields.Integer(load_default=20, validate=validate.OneOf(choices=(10, 20, 50, 100), error="조회 가능한 페이지 크기는 [10, 20, 50, 100] 입니다."))
 
 
 class PostCreateFormSchema(Schema):
@@ -22,11 +28,20 @@ class PostUpdateFormSchema(PostCreateFormSchema):
     pass
 
 
+class CommentPreviewSchema(Schema):
+    comment_id = ObjectIdSchemaField()
+    content = fields.String()
+    created_by = fields.Nested(UserInfoSchema, only=["email", "name"])
+    created_at = fields.DateTime()
+
+
 class PostMasterInfoSchema(Schema):
     id = ObjectIdSchemaField(data_key="post_id")
     title = fields.String()
     categories = fields.Nested(CategoryInfoSchema, only=["id", "name"], many=True)
     likes_cnt = fields.Integer()
+    comments_cnt = fields.Integer()
+    latest_comments = fields.Nested(CommentPreviewSchema, many=True)
 
     created_by = fields.Nested(UserInfoSchema, only=["email", "name"])
     created_at = fields.DateTime()
@@ -34,6 +49,14 @@ class PostMasterInfoSchema(Schema):
     is_deleted = fields.Boolean()
 
 
+class PostTrendingInfoSchema(PostMasterInfoSchema):
+    trending_score = fields.Method("get_trending_score", metadata={"projection": ["trend_score", "trend_epoch"]})
+
+    def get_trending_score(self, obj) -> float:
+        # 저장된 점수를 현재 시각 기준 점수로 변환
+        return round(trending_scorer.decay(obj.trend_score, obj.trend_epoch), 4)
+
+
 class PostDetailInfoSchema(PostMasterInfoSchema):
     content = fields.String()
     likes = fields.Nested(UserInfoSchema, only=["email", "name"], many=True)
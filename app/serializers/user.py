@@ -33,3 +33,7 @@ class UserUpdateFormSchema(Schema):
     password = fields.String(load_default=None, allow_none=True, validate=validate.Length(min=8, error="비밀번호는 8자 이상 입니다."))
     new_password = fields.String(load_default=None, allow_none=True, validate=validate.Length(min=8, error="비밀번호는 8자 이상 입니다."))
     subscribing = fields.Boolean(load_default=None, allow_none=True)
+
+
+class UserDeleteFormSchema(Schema):
+    password = fields.String(required=True, validate=validate.Length(min=8, error="비밀번호는 8자 이상 입니다."))
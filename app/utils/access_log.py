@@ -0,0 +1,122 @@
+import json
+import logging
+import random
+import sys
+from contextlib import nullcontext
+from datetime import datetime
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# 기록용 thread 종료 신호 (configure 로 queue 를 바꿀 때 이전 queue 에 넣음)
+_STOP = object()
+
+
+def new_request_id(header_value: Optional[str] = None) -> str:
+    # 앞단 (load balancer 등) 에서 받은 X-Request-ID 가 있으면 그대로 사용
+    if header_value and len(header_value) <= 64:
+        return header_value
+    return uuid4().hex
+
+
+class AccessLogger:
+    """
+    요청 1건당 JSON 한 줄의 access log 를 별도 thread 에서 출력
+
+    - 요청 thread 에서는 dict 를 queue 에 넣기만 하고, 출력 (stdout / 파일) 은 기록용 thread 에서 모아서 진행
+    - queue 가 가득 차면 기다리지 않고 버리며, 버린 개수는 다음 출력 때 "access_log_dropped" 한 줄로 남김
+    - sample_rate 비율로만 기록하고, 5xx 응답은 항상 기록
+    """
+
+    BATCH_SIZE = 256
+
+    def __init__(self, enabled: bool = True, path: Optional[str] = None, sample_rate: float = 1.0, queue_size: int = 10000):
+        self.enabled = enabled
+        self.path = path
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._dropped_lock = Lock()
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._worker: Optional[Thread] = None
+        self._worker_lock = Lock()
+
+    def configure(self, enabled: bool, path: Optional[str], sample_rate: float, queue_size: int):
+        # 이전 queue 를 처리하던 thread 는 남은 log 를 출력하고 종료한 뒤 queue 교체 (다음 기록 때 새 설정으로 thread 시작)
+        self._stop_worker()
+        self.enabled = enabled
+        self.path = path
+        self.sample_rate = sample_rate
+        self._queue = Queue(maxsize=queue_size)
+
+    def log(self, request_id: str, method: str, route: Optional[str], path: str, status: int, user_id: Optional[str], latency: float, mongo_seconds: float, mongo_commands: int):
+        if not self.enabled or (status < 500 and random.random() >= self.sample_rate):
+            return
+
+        entry = {
+            "ts": datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+            "request_id": request_id,
+            "method": method,
+            "route": route,
+            "path": path,
+            "status": status,
+            "user_id": user_id,
+            "latency_ms": round(latency * 1000, 3),
+            "mongo_ms": round(mongo_seconds * 1000, 3),
+            "mongo_commands": mongo_commands,
+        }
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(entry)
+        except Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _ensure_worker(self):
+        # fork 이후 (gunicorn 등) 에도 동작하도록 처음 기록할 때 thread 시작
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, args=(self._queue,), name="access-logger", daemon=True)
+                self._worker.start()
+
+    def _stop_worker(self):
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._queue.put(_STOP)
+                self._worker.join()
+            self._worker = None
+
+    def _run(self, queue: Queue):
+        with open(self.path, "a", encoding="utf-8") if self.path else nullcontext(sys.stdout) as stream:
+            stopped = False
+            while not stopped:
+                entries = self._drain(queue)
+                stopped = _STOP in entries
+                try:
+                    stream.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries if entry is not _STOP))
+                    stream.flush()
+                except Exception:
+                    logger.exception("access log write failed")
+
+    def _drain(self, queue: Queue) -> List[Dict]:
+        # 한 건은 기다려서 받고, 이미 쌓여 있는 것들은 BATCH_SIZE 까지 한 번에 출력
+        entries = [queue.get()]
+        while len(entries) < self.BATCH_SIZE:
+            try:
+                entries.append(queue.get_nowait())
+            except Empty:
+                break
+
+        # 요청 thread 에서 올리는 값을 읽고 초기화하는 사이에 버려진 개수가 빠지지 않도록 lock 안에서 처리
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            entries.append({"ts": datetime.utcnow().isoformat(timespec="milliseconds") + "Z", "event": "access_log_dropped", "count": dropped})
+        return entries
+
+
+access_logger: AccessLogger = AccessLogger()
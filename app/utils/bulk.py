@@ -0,0 +1,118 @@
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from bson import ObjectId
+from marshmallow import Schema, ValidationError
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+# (line 번호, 검증된 row) 목록을 받아서 (추가된 개수, [(line 번호, 실패 사유)]) 를 return 하는 함수
+InsertRows = Callable[[List[Tuple[int, Dict]]], Tuple[int, List[Tuple[int, str]]]]
+
+
+class BulkImportResult:
+    """대량 추가 결과 요약 (실패 사유는 최대 MAX_ERRORS 개까지만 보관)"""
+
+    MAX_ERRORS = 1000
+
+    def __init__(self):
+        self.total = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = list()
+
+    def add_error(self, line: int, message: Any):
+        self.failed += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append({"line": line, "message": message if isinstance(message, str) else json.dumps(message, ensure_ascii=False)})
+
+    def to_dict(self) -> Dict:
+        return {"total": self.total, "inserted": self.inserted, "failed": self.failed, "errors": self.errors}
+
+
+def import_jsonl(lines: Iterable[Union[bytes, str]], schema: Schema, insert_rows: InsertRows, chunk_size: int = 1000) -> BulkImportResult:
+    """
+    JSONL 을 한 줄씩 읽어서 schema 로 검증하고, chunk_size 개씩 모아서 insert_rows 로 추가
+
+    - 전체 파일을 메모리에 올리지 않으므로 업로드 크기와 상관없이 chunk 크기만큼의 메모리만 사용
+    - JSON 형식 오류 / 검증 실패 / DB 추가 실패는 line 번호와 함께 결과에 기록하고 나머지는 계속 진행
+    """
+    result, chunk = BulkImportResult(), list()
+
+    def flush():
+        inserted, failures = insert_rows(chunk)
+        result.inserted += inserted
+        for line, message in failures:
+            result.add_error(line, message)
+        chunk.clear()
+
+    for line_no, line in enumerate(lines, start=1):
+        try:
+            line = line.decode("utf-8") if isinstance(line, bytes) else line
+        except UnicodeDecodeError:
+            result.total += 1
+            result.add_error(line_no, "UTF-8 형식이 아닙니다.")
+            continue
+        if not line.strip():
+            continue
+
+        result.total += 1
+        try:
+            chunk.append((line_no, schema.load(json.loads(line))))
+        except ValueError:
+            result.add_error(line_no, "JSON 형식이 아닙니다.")
+        except ValidationError as e:
+            result.add_error(line_no, e.messages)
+
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+    return result
+
+
+def insert_documents(collection: Collection, documents: List[Tuple[int, Dict]], ordered: bool) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    (line 번호, SON) 목록을 insert_many 한 번으로 추가하고 (추가된 개수, 실패 목록) return
+
+    - ordered=True 면 처음 실패한 row 이후의 row 들은 추가되지 않으므로 함께 실패로 기록
+    """
+    if not documents:
+        return 0, list()
+
+    try:
+        collection.insert_many([document for _, document in documents], ordered=ordered)
+    except BulkWriteError as e:
+        failures = [(documents[error["index"]][0], error.get("errmsg", "DB 추가 실패")) for error in e.details.get("writeErrors", list())]
+        if ordered and failures:
+            first_index = e.details["writeErrors"][0]["index"]
+            failures += [(line, "앞선 row 의 실패로 추가되지 않았습니다.") for line, _ in documents[first_index + 1 :]]
+        return e.details.get("nInserted", 0), failures
+    return len(documents), list()
+
+
+def update_chunk(collection: Collection, query: Dict, update: Dict, chunk_size: int) -> int:
+    """
+    query 에 맞는 document 를 chunk_size 개까지만 update 하고 처리한 개수를 return (0 이면 남은 대상 없음)
+
+    - update 후에는 query 에서 빠지도록 (ex. $pull 한 값 / is_deleted=False) 작성해야 반복 호출로 전체를 처리할 수 있음
+    - update 조건에도 query 를 다시 넣어서, 그 사이 다른 요청이 바꾼 document 는 다시 변경하지 않음
+    """
+    ids = [document["_id"] for document in collection.find(query, {"_id": 1}).limit(chunk_size)]
+    if not ids:
+        return 0
+    collection.update_many({"_id": {"$in": ids}, **query}, update)
+    return len(ids)
+
+
+def iter_id_chunks(collection: Collection, query: Dict, chunk_size: int) -> Iterator[List[ObjectId]]:
+    # query 에 맞는 document 의 _id 를 오름차순으로 chunk_size 개씩 (마지막 _id 이후부터 이어서 조회하므로 skip 없음)
+    last_id = None
+    while True:
+        chunk_query = {**query, "_id": {"$gt": last_id}} if last_id is not None else query
+        ids = [document["_id"] for document in collection.find(chunk_query, {"_id": 1}).sort("_id", 1).limit(chunk_size)]
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
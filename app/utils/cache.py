@@ -0,0 +1,265 @@
+import hashlib
+import json
+import time
+from threading import Lock, RLock
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+from flask import Response
+from mongoengine import OperationError
+from pymongo.errors import PyMongoError
+
+from app.models.version import VersionCounter
+
+
+class AuthUserCache:
+    """
+    인증 토큰 -> (payload, 사용자 snapshot) 을 보관하는 프로세스 내부 캐시 (LRU + TTL)
+
+    - snapshot 은 password 를 제외한 User document 의 SON(dict) 이며, 요청마다 새 User 객체로 복원해서 사용
+    - 사용자 정보가 수정/삭제되면 invalidate(email=...) 로 해당 사용자의 토큰들을 모두 제거하고, 공유 세대 번호 (VersionCounter) 를 올림
+    - 다른 worker 프로세스는 check_interval 초마다 세대 번호를 확인해서 바뀌었으면 캐시 전체를 비움
+      (사용자 수정은 드물기 때문에 사용자별 버전 대신 세대 번호 하나만 사용, 다른 worker 에서는 최대 check_interval 초 동안 이전 정보로 인증됨)
+    """
+
+    NAMESPACE = "auth_user_cache"
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60, check_interval: float = 1):
+        self.check_interval = check_interval
+        self._lock = RLock()
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # (공유 세대 번호, 확인한 시각), 확인하지 못했으면 세대 번호는 None
+        self._generation: Tuple[Optional[int], float] = (None, 0.0)
+
+    def configure(self, maxsize: int, ttl: float, check_interval: float):
+        with self._lock:
+            self.check_interval = check_interval
+            self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+            self._generation = (None, 0.0)
+
+    @property
+    def needs_check(self) -> bool:
+        generation, checked_at = self._generation
+        return generation is None or time.monotonic() - checked_at >= self.check_interval
+
+    def check_generation(self):
+        # 공유 세대 번호가 바뀌었으면 (다른 worker 에서 사용자 수정/삭제) 캐시 전체 삭제 (DB 장애 시에는 비우고 다음 요청에서 다시 확인)
+        try:
+            generation = VersionCounter.get_version(self.NAMESPACE)
+        except PyMongoError:
+            generation = None
+        self._set_generation(generation, previous=self._generation[0])
+
+    def get(self, token: str) -> Optional[Tuple[Dict, Dict]]:
+        with self._lock:
+            return self._cache.get(token)
+
+    def set(self, token: str, payload: Dict, user_son: Dict):
+        with self._lock:
+            # 캐시에는 비밀번호 hash 를 보관하지 않음
+            self._cache[token] = (payload, {key: value for key, value in user_son.items() if key != "password"})
+
+    def invalidate(self, email: Optional[str] = None):
+        # email 이 없으면 이 프로세스의 캐시 전체 삭제, 있으면 해당 사용자의 토큰만 삭제하고 다른 worker 에도 알림 (공유 세대 번호 증가)
+        with self._lock:
+            if email is None:
+                self._cache.clear()
+                return
+
+            for token in [token for token, (_, user_son) in self._cache.items() if user_son.get("email") == email]:
+                self._cache.pop(token, None)
+
+        previous = self._generation[0]
+        try:
+            generation = VersionCounter.bump(self.NAMESPACE)
+        except (PyMongoError, OperationError):
+            generation = None
+        # 올린 세대 번호가 마지막으로 확인한 번호 바로 다음이면 그 사이 다른 worker 의 변경이 없으므로 나머지 캐시는 유지
+        self._set_generation(generation, previous=previous + 1 if previous is not None else None)
+
+    def _set_generation(self, generation: Optional[int], previous: Optional[int]):
+        with self._lock:
+            self._generation = (generation, time.monotonic() if generation is not None else 0.0)
+            if generation is None or generation != previous:
+                self._cache.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+
+auth_user_cache: AuthUserCache = AuthUserCache()
+
+
+class LocalCacheBackend:
+    """
+    프로세스 내부 LRU + TTL 캐시 (응답은 worker 프로세스마다 따로 보관)
+
+    - 세대 번호는 VersionCounter (MongoDB) 에 보관해서 모든 worker 프로세스가 공유 (카테고리 저장소와 같은 방식)
+    - 다른 프로세스에서 invalidate 한 경우 check_interval 초 안에 세대 번호가 바뀐 것을 확인하고 이전 세대 응답을 더 이상 사용하지 않음
+    - 같은 프로세스에서 invalidate 하면 바로 적용
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30, check_interval: float = 1):
+        self.check_interval = check_interval
+        self._lock = RLock()
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # namespace -> (세대 번호, 확인한 시각)
+        self._generations = dict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._cache[key] = value
+
+    def get_generation(self, namespace: str) -> int:
+        with self._lock:
+            generation, checked_at = self._generations.get(namespace, (None, 0.0))
+            if generation is not None and time.monotonic() - checked_at < self.check_interval:
+                return generation
+
+        # DB 장애 시에는 캐시를 사용하지 않음
+        try:
+            generation = VersionCounter.get_version(f"{namespace}_cache")
+        except PyMongoError:
+            return -1
+        self._set_generation(namespace, generation)
+        return generation
+
+    def bump_generation(self, namespace: str):
+        try:
+            generation = VersionCounter.bump(f"{namespace}_cache")
+        except (PyMongoError, OperationError):
+            # 공유 세대 번호를 올리지 못하면 이 프로세스의 캐시만 비우고 다음 조회 때 다시 확인
+            generation = None
+        self._set_generation(namespace, generation)
+
+    def _set_generation(self, namespace: str, generation: Optional[int]):
+        # 세대 번호가 바뀌면 이전 세대의 key 는 더 이상 조회되지 않으므로, 공간만 차지하지 않도록 같이 비워줌 (None 이면 다음 조회 때 다시 확인)
+        with self._lock:
+            previous = self._generations.get(namespace, (None, 0.0))[0]
+            self._generations[namespace] = (generation, time.monotonic() if generation is not None else 0.0)
+            if generation is None or generation != previous:
+                for key in [key for key in self._cache.keys() if key.startswith(f"{namespace}:")]:
+                    self._cache.pop(key, None)
+
+
+class RedisCacheBackend:
+    """같은 host 의 redis 를 공유 저장소로 사용하는 캐시 (모든 worker 프로세스가 같은 캐시/세대 번호를 사용)"""
+
+    def __init__(self, url: str, ttl: float = 30):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._error = redis.RedisError
+        self._ttl = max(int(ttl), 1)
+
+    def get(self, key: str) -> Optional[str]:
+        # redis 장애 시에는 캐시 miss 로 처리해서 요청이 실패하지 않도록 함
+        try:
+            value = self._redis.get(key)
+        except self._error:
+            return None
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str):
+        try:
+            self._redis.set(key, value, ex=self._ttl)
+        except self._error:
+            pass
+
+    def get_generation(self, namespace: str) -> int:
+        try:
+            return int(self._redis.get(f"{namespace}:generation") or 0)
+        except self._error:
+            return -1
+
+    def bump_generation(self, namespace: str):
+        try:
+            self._redis.incr(f"{namespace}:generation")
+        except self._error:
+            pass
+
+
+class ResponseCache:
+    """
+    정규화된 query parameter 를 key 로 JSON 응답(body + X- / ETag header)을 보관하는 캐시
+
+    - 쓰기 작업 시 invalidate() 로 세대 번호를 올려서, 이전 세대의 응답이 더 이상 사용되지 않도록 처리
+    - 댓글 수 / 미리보기처럼 자주 바뀌는 값은 invalidate(coalesce=True) 로 check_interval 초에 한 번만 세대 번호를 올림
+      (그 사이의 무효화는 모아두었다가 interval 이 지난 뒤 이 프로세스의 다음 조회 / 무효화 때 반영, 좋아요 수 / 인기 점수는 무효화하지 않고 ttl 로 반영)
+    - backend 가 설정되지 않으면 (configure(backend=None)) 캐시를 사용하지 않음
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.coalesce_interval = 1.0
+        self._backend = None
+        self._lock = Lock()
+        # (마지막으로 세대 번호를 올린 시각, 모아둔 무효화가 있는지)
+        self._invalidated: Tuple[float, bool] = (0.0, False)
+
+    def configure(self, backend: Optional[str], ttl: float = 30, maxsize: int = 1024, redis_url: Optional[str] = None, check_interval: float = 1):
+        self.coalesce_interval = check_interval
+        self._invalidated = (0.0, False)
+        if backend == "local":
+            self._backend = LocalCacheBackend(maxsize=maxsize, ttl=ttl, check_interval=check_interval)
+        elif backend == "redis":
+            self._backend = RedisCacheBackend(url=redis_url, ttl=ttl)
+        elif backend is None:
+            self._backend = None
+        else:
+            raise ValueError(f"unknown cache backend `{backend}`")
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None
+
+    def make_key(self, **params: Any) -> Optional[str]:
+        # 세대 번호 + 정렬된 parameter 의 hash 로 key 생성 (세대 번호를 확인할 수 없으면 캐시 사용 안 함)
+        if not self.enabled:
+            return None
+        if self._invalidated[1]:
+            self.invalidate(coalesce=True)
+        generation = self._backend.get_generation(self.namespace)
+        if generation < 0:
+            return None
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{generation}:{digest}"
+
+    def get_response(self, key: Optional[str]) -> Optional[Response]:
+        value = self._backend.get(key) if key else None
+        if value is None:
+            return None
+
+        cached = json.loads(value)
+        return Response(cached["body"], status=cached["status"], headers=cached["headers"], mimetype="application/json")
+
+    def lookup(self, **params: Any) -> Tuple[Optional[str], Optional[Response]]:
+        # make_key + get_response (세대 번호 확인 / redis 조회가 있으므로 비동기 서버에서는 thread pool 에서 실행)
+        key = self.make_key(**params)
+        return key, self.get_response(key)
+
+    def set_response(self, key: Optional[str], response: Response):
+        if not key:
+            return
+        headers = {name: value for name, value in response.headers.items() if name.startswith("X-") or name == "ETag"}
+        self._backend.set(key, json.dumps({"body": response.get_data(as_text=True), "status": response.status_code, "headers": headers}))
+
+    def invalidate(self, coalesce: bool = False):
+        if not self.enabled:
+            return
+        with self._lock:
+            invalidated_at, _ = self._invalidated
+            now = time.monotonic()
+            if coalesce and now - invalidated_at < self.coalesce_interval:
+                self._invalidated = (invalidated_at, True)
+                return
+            self._invalidated = (now, False)
+        self._backend.bump_generation(self.namespace)
+
+
+post_list_cache: ResponseCache = ResponseCache(namespace="post_list")
@@ -0,0 +1,37 @@
+from typing import Any, Dict, Optional
+
+from flask import Flask, Response, current_app, request
+from werkzeug.http import parse_etags, quote_etag, unquote_etag
+
+
+def make_etag(*parts: Any) -> str:
+    # 응답 내용을 결정하는 값 (버전 번호 등) 으로 weak ETag header 값 생성 (ex. W/"post-3-12")
+    return quote_etag("-".join(str(part) for part in parts), weak=True)
+
+
+def is_not_modified(etag: str, if_none_match: Optional[str]) -> bool:
+    # If-None-Match header 에 같은 ETag (또는 *) 가 있는지 확인 (GET 이므로 weak 비교)
+    if not if_none_match:
+        return False
+    return parse_etags(if_none_match).contains_weak(unquote_etag(etag)[0])
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status=304, headers={"ETag": etag})
+
+
+def etag_headers(etag: str, enabled: bool) -> Dict[str, str]:
+    # 200 응답에 붙일 header (CONDITIONAL_RESPONSES 가 꺼져 있으면 ETag 를 보내지 않음)
+    return {"ETag": etag} if enabled else dict()
+
+
+def _make_conditional(response: Response) -> Response:
+    # ETag 가 있는 GET 200 응답은 If-None-Match 와 비교해서 같으면 body 를 보내지 않고 304 로 응답 (WSGI / ASGI 모두 적용)
+    if response.status_code == 200 and "ETag" in response.headers and current_app.config["CONDITIONAL_RESPONSES"]:
+        return response.make_conditional(request)
+    return response
+
+
+def register_conditional_responses(app: Flask):
+    # after_request 훅은 등록 역순으로 실행되므로 register_metrics 뒤에 등록해야 metrics / access log 에 304 로 기록됨
+    app.after_request(_make_conditional)
@@ -0,0 +1,162 @@
+import atexit
+import time
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+# 모아둔 증감량 반영 함수 ({대상 id: 증감량}, 증감량은 int 이거나 + 로 합칠 수 있는 값)
+FlushFunc = Callable[[Dict[ObjectId, Any]], Any]
+# 대상 id 목록의 대상별 멤버 수 (멤버가 없는 대상은 빠져도 됨)
+CountMembers = Callable[[List[ObjectId]], Dict[ObjectId, int]]
+
+
+class CounterBuffer:
+    """
+    좋아요 수 같은 counter 의 증감량을 대상 document 별로 모아서 주기적으로 한 번에 반영 (write-behind)
+
+    - 같은 반영 함수 / 대상의 증감량은 + 로 합쳐서 대상마다 $inc 1번으로 반영 (좋아요가 몰리는 document 도 counter update 는 flush_interval 마다 1번)
+    - 증감량은 int 외에 + 로 합쳐지는 값도 됨 (ex. 여러 field 를 함께 올리는 NamedTuple, 합친 값이 거짓이면 반영하지 않음)
+    - flush_interval 초마다, 또는 기다리는 대상이 max_pending 개가 되면 별도 thread 에서 반영
+    - 반영에 실패한 증감량은 다시 합쳐서 다음 주기에 재시도하고, 정상 종료할 때 (atexit) 남은 증감량 반영
+    - 프로세스가 비정상 종료되면 반영 전 증감량은 유실됨 (좋아요 목록은 바로 저장되므로, 멤버 수 기준으로 다시 계산하는 reconcile_counters 로 복구)
+    - enabled 가 False 이면 모으지 않음 (호출하는 쪽에서 inline() 으로 좋아요 목록 update 에 $inc 를 함께 넣거나, 반영 함수를 바로 호출)
+    """
+
+    def __init__(self, enabled: bool = True, flush_interval: float = 1.0, max_pending: int = 1000):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.failed_flushes = 0
+        self._pending: Dict[Tuple[FlushFunc, ObjectId], Any] = dict()
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._wakeup = Event()
+        self._worker: Optional[Thread] = None
+        self._worker_lock = Lock()
+        atexit.register(self.flush)
+
+    def configure(self, enabled: bool, flush_interval: float, max_pending: int):
+        # 설정을 바꾸기 전에 모아둔 증감량은 반영
+        self.flush()
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def inline(self, field: str, delta: int) -> Dict[str, int]:
+        # 모으지 않을 때 좋아요 목록 update 에 함께 넣을 mongoengine update 인자 (ex. inc__likes_cnt=1)
+        return dict() if self.enabled else {f"inc__{field}": delta}
+
+    def add(self, flush: FlushFunc, target_id: ObjectId, delta: Any):
+        if not self.enabled or not delta:
+            return
+        with self._lock:
+            self._merge(flush, target_id, delta)
+            full = len(self._pending) >= self.max_pending
+        self._ensure_worker()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        # 모아둔 증감량을 반영 함수별로 1번씩 반영하고 반영한 대상 수 return (합친 값이 0 / 거짓인 대상은 제외)
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, dict()
+
+            grouped: Dict[FlushFunc, Dict[ObjectId, Any]] = dict()
+            for (flush, target_id), delta in pending.items():
+                if delta:
+                    grouped.setdefault(flush, dict())[target_id] = delta
+
+            flushed = 0
+            for flush, deltas in grouped.items():
+                try:
+                    flush(deltas)
+                except Exception:
+                    # 실패한 증감량은 그 사이에 모인 증감량과 합쳐서 다음 주기에 재시도
+                    self.failed_flushes += 1
+                    with self._lock:
+                        for target_id, delta in deltas.items():
+                            self._merge(flush, target_id, delta)
+                    continue
+                flushed += len(deltas)
+            return flushed
+
+    def _merge(self, flush: FlushFunc, target_id: ObjectId, delta: Any):
+        # self._lock 안에서 호출
+        key = (flush, target_id)
+        self._pending[key] = self._pending[key] + delta if key in self._pending else delta
+
+    def _ensure_worker(self):
+        # fork 이후 (gunicorn 등) 에도 동작하도록 처음 모을 때 thread 시작
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, name="counter-buffer", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+counter_buffer: CounterBuffer = CounterBuffer()
+
+
+def inc_counters(collection: Collection, field: str, deltas: Dict[ObjectId, int], extra: Optional[Dict[str, int]] = None) -> int:
+    # 대상별 증감량을 bulk_write 1번으로 반영 (extra 는 함께 올릴 field, ex. {"version": 1})
+    requests = [UpdateOne({"_id": target_id}, {"$inc": {field: delta, **(extra or dict())}}) for target_id, delta in deltas.items()]
+    return collection.bulk_write(requests, ordered=False).modified_count if requests else 0
+
+
+def array_sizes(collection: Collection, members_field: str) -> CountMembers:
+    # 멤버 목록을 document 안의 배열로 보관하는 경우 (댓글 / 대댓글 좋아요) 의 대상별 멤버 수
+    def count(target_ids: List[ObjectId]) -> Dict[ObjectId, int]:
+        pipeline = [{"$match": {"_id": {"$in": target_ids}}}, {"$project": {"members": {"$size": {"$ifNull": [f"${members_field}", []]}}}}]
+        return {item["_id"]: item["members"] for item in collection.aggregate(pipeline)}
+
+    return count
+
+
+def grouped_counts(collection: Collection, target_field: str) -> CountMembers:
+    # 멤버를 별도 collection 에 (대상, 멤버) 1건씩 보관하는 경우 (포스트 좋아요) 의 대상별 멤버 수
+    def count(target_ids: List[ObjectId]) -> Dict[ObjectId, int]:
+        pipeline = [{"$match": {target_field: {"$in": target_ids}}}, {"$group": {"_id": f"${target_field}", "members": {"$sum": 1}}}]
+        return {item["_id"]: item["members"] for item in collection.aggregate(pipeline)}
+
+    return count
+
+
+def find_counter_drift(collection: Collection, target_ids: List[ObjectId], count_field: str, count_members: CountMembers) -> Dict[ObjectId, Tuple[Optional[int], int]]:
+    # count_field 가 멤버 수와 다른 document 의 (저장된 값, 멤버 수)
+    members = count_members(target_ids)
+    items = collection.find({"_id": {"$in": target_ids}}, {count_field: 1})
+    return {item["_id"]: (item.get(count_field), members.get(item["_id"], 0)) for item in items if item.get(count_field) != members.get(item["_id"], 0)}
+
+
+def reconcile_counters(collection: Collection, target_ids: List[ObjectId], count_field: str, count_members: CountMembers, settle_seconds: float, extra: Optional[Dict[str, int]] = None) -> int:
+    """
+    count_field 를 멤버 수로 다시 계산 (비정상 종료로 유실된 증감량 복구), 수정한 document 수 return
+
+    - 다른 프로세스에 모여 있는 증감량이 있을 수 있으므로, 값이 다른 document 를 찾은 뒤 settle_seconds (flush 주기보다 길게) 기다렸다가
+      멤버 수를 다시 세어서 그대로인 document 만, 저장된 값도 그대로인 경우에만 수정 (그 사이 좋아요가 추가/취소되었으면 다음 reconcile 때 다시 확인)
+    - 기다리는 동안 멤버 수와 저장된 값이 둘 다 그대로이면, 그 사이의 좋아요 / 취소와 아직 반영되지 않은 증감량은 합쳐서 0 이므로 멤버 수로 덮어써도 됨
+      (다시 센 뒤에 추가된 좋아요의 증감량은 저장된 값이 아직 그대로이면 덮어쓴 값에 더해지고, 먼저 반영되었으면 조건에서 빠짐)
+    """
+    drift = find_counter_drift(collection, target_ids, count_field, count_members)
+    if not drift:
+        return 0
+
+    time.sleep(settle_seconds)
+    members = count_members(list(drift))
+    requests = [UpdateOne({"_id": target_id, count_field: count}, {"$set": {count_field: settled}, **({"$inc": extra} if extra else dict())}) for target_id, (count, settled) in drift.items() if members.get(target_id, 0) == settled]
+    return collection.bulk_write(requests, ordered=False).modified_count if requests else 0
@@ -0,0 +1,33 @@
+import base64
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cursor(created_at: datetime, object_id: ObjectId) -> str:
+    # (created_at(ms), _id) 를 url-safe 한 불투명 문자열로 변환
+    millis = (created_at.replace(tzinfo=None) - EPOCH) // timedelta(milliseconds=1)
+    return base64.urlsafe_b64encode(f"{millis}:{object_id}".encode("utf-8")).decode("utf-8").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    # encode_cursor 의 역변환 (형식이 잘못되면 ValueError)
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        millis, object_id = raw.split(":")
+        return EPOCH + timedelta(milliseconds=int(millis)), ObjectId(object_id)
+    except (TypeError, ValueError, InvalidId, UnicodeDecodeError):
+        raise ValueError(f"invalid cursor `{cursor}`")
+
+
+def make_next_cursor(items: List[Any], page_size: int) -> Optional[str]:
+    # 페이지가 가득 찼을 때만 마지막 아이템 (Document 또는 pymongo dict) 기준으로 다음 커서를 생성
+    if len(items) < page_size:
+        return None
+    if isinstance(items[-1], dict):
+        return encode_cursor(items[-1]["created_at"], items[-1]["_id"])
+    return encode_cursor(items[-1].created_at, items[-1].id)
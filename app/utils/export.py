@@ -0,0 +1,59 @@
+import json
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+from bson import ObjectId, DBRef
+from mongoengine import Document
+
+from app.api import ApiError
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def _json_default(value):
+    # ObjectId / 참조 / 날짜는 분석용으로 다루기 쉬운 문자열로 변환
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, DBRef):
+        return str(value.id)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def build_export_query(document_cls: Type[Document], updated_from: Optional[datetime] = None, updated_to: Optional[datetime] = None, fields: Optional[List[str]] = None, hidden_fields: Tuple[str, ...] = ()) -> Tuple[Dict, Dict]:
+    """
+    export 용 (filter, projection) 생성
+
+    - updated_from <= updated_at < updated_to 범위 조회
+    - fields 가 없으면 hidden_fields 를 제외한 모든 field, 있으면 해당 field 만 (+ _id) 조회
+    """
+    query = dict()
+    if updated_from or updated_to:
+        query["updated_at"] = dict()
+        if updated_from:
+            query["updated_at"]["$gte"] = updated_from
+        if updated_to:
+            query["updated_at"]["$lt"] = updated_to
+
+    available = {name: field.db_field for name, field in document_cls._fields.items() if name not in hidden_fields}
+    if not fields:
+        projection = {db_field: 1 for db_field in available.values()}
+    else:
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise ApiError(message=f"export 할 수 없는 field 입니다: {', '.join(unknown)}", status_code=422)
+        projection = {available[name]: 1 for name in fields}
+    projection["_id"] = 1
+    return query, projection
+
+
+def iter_ndjson(document_cls: Type[Document], query: Dict, projection: Dict, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    # batch 단위로 가져오는 pymongo cursor 를 그대로 한 줄씩 JSON 으로 변환 (document 객체 / marshmallow 를 거치지 않음)
+    # (updated_at, _id) 인덱스 순서로 조회해서 updated_at 범위 조건이 있어도 메모리 정렬 없이 인덱스 범위만 읽음
+    cursor = document_cls._get_collection().find(query, projection, batch_size=batch_size).sort([("updated_at", 1), ("_id", 1)])
+    try:
+        for item in cursor:
+            yield json.dumps(item, default=_json_default, ensure_ascii=False) + "\n"
+    finally:
+        cursor.close()
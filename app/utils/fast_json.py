@@ -0,0 +1,80 @@
+import re
+from typing import Any, Optional
+
+from flask import Response, current_app, jsonify as flask_jsonify
+
+try:
+    import orjson
+except ImportError:  # pip install orjson (poetry install -E fastjson)
+    orjson = None
+
+# stdlib json 과 표현이 달라지는 값: 0x7f ~ 0xff / 4 byte 문자 (raw_unicode_escape 결과가 json 과 다름), 1e-4 보다 작은 float
+_UNSAFE_BYTES = (b"\x7f", b"\xc2", b"\xc3", b"\xf0", b"\xf1", b"\xf2", b"\xf3", b"\xf4")
+_SMALL_FLOAT_MARKERS = (b"0.0000",)
+# 지수 표기 float (orjson 버전에 따라 1e16 / 1e+16, stdlib json 은 1e+16 / 1e-05, 문자열 안의 "1e5" 같은 값도 걸리지만 stdlib json 으로 다시 직렬화할 뿐)
+_FLOAT_EXPONENT = re.compile(rb"\d[eE][-+]?\d")
+
+
+class JsonEngine:
+    """
+    flask.jsonify 와 같은 byte 의 응답을 orjson 으로 만드는 JSON 직렬화
+
+    - JSON_SORT_KEYS / JSON_AS_ASCII / JSONIFY_MIMETYPE 설정을 그대로 따르고, flask.json.JSONEncoder 의 default (datetime 등) 도 그대로 사용
+    - orjson 이 없거나, engine 이 "flask" 이거나, 들여쓰기 출력 (debug / JSONIFY_PRETTYPRINT_REGULAR) 이면 flask.jsonify 사용
+    - stdlib json 과 표현이 다를 수 있는 결과 (작은 float, 지수 표기 float, 일부 문자) 나 orjson 이 처리하지 못하는 값 (64bit 를 넘는 정수 등) 은 stdlib json 으로 다시 직렬화
+    - NaN / Infinity 는 orjson 에서 null 로 출력됨 (stdlib json 은 JSON 표준이 아닌 NaN 출력)
+    """
+
+    ENGINES = ("orjson", "flask")
+
+    def __init__(self, engine: str = "orjson"):
+        self.engine = engine
+
+    def configure(self, engine: str):
+        if engine not in self.ENGINES:
+            raise ValueError(f"지원하지 않는 JSON engine 입니다: {engine}")
+        self.engine = engine
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine == "orjson" and orjson is not None
+
+    def dumps(self, data: Any) -> Optional[bytes]:
+        # flask.jsonify 의 body 와 같은 byte return (같은 결과를 보장할 수 없으면 None)
+        config = current_app.config
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if config["JSON_SORT_KEYS"]:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            body = orjson.dumps(data, default=current_app.json_encoder().default, option=option)
+        except orjson.JSONEncodeError:
+            return None
+
+        if any(marker in body for marker in _SMALL_FLOAT_MARKERS) or _FLOAT_EXPONENT.search(body):
+            return None
+        if config["JSON_AS_ASCII"] and not body.isascii():
+            # raw_unicode_escape 는 U+0100 ~ U+FFFF (ex. 한글) 를 json 과 같은 \uXXXX 로 출력 (U+0080 ~ U+00FF 는 latin-1 byte, 4 byte 문자는 \UXXXXXXXX 라서 제외)
+            if any(marker in body for marker in _UNSAFE_BYTES):
+                return None
+            body = body.decode("utf-8").encode("raw_unicode_escape")
+        return body + b"\n"
+
+    def jsonify(self, *args, **kwargs) -> Response:
+        if not self.enabled or current_app.config["JSONIFY_PRETTYPRINT_REGULAR"] or current_app.debug:
+            return flask_jsonify(*args, **kwargs)
+
+        if args and kwargs:
+            raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        data = args[0] if len(args) == 1 else args or kwargs
+        body = self.dumps(data)
+        if body is None:
+            return flask_jsonify(data)
+        return current_app.response_class(body, mimetype=current_app.config["JSONIFY_MIMETYPE"])
+
+
+json_engine: JsonEngine = JsonEngine()
+
+
+def jsonify(*args, **kwargs) -> Response:
+    # flask.jsonify 대신 사용 (APISPEC_FORMAT_RESPONSE 로도 등록)
+    return json_engine.jsonify(*args, **kwargs)
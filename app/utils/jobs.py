@@ -0,0 +1,84 @@
+import os
+import socket
+import time
+from typing import Callable, Dict, Optional
+
+from app.models.job import Job
+
+# 작업 이름 -> 처리 함수 (app.jobs 에서 @job_handler 로 등록)
+JOB_HANDLERS: Dict[str, Callable] = dict()
+
+
+def job_handler(name: str):
+    def wrapper(func: Callable) -> Callable:
+        JOB_HANDLERS[name] = func
+        return func
+
+    return wrapper
+
+
+class JobLeaseLost(Exception):
+    """소유 기간이 지나서 다른 worker 가 작업을 가져간 경우 (현재 worker 는 처리를 멈춤)"""
+
+
+class JobContext:
+    """처리 함수에 전달되는 chunk 크기 / 진행 상황 기록 함수"""
+
+    def __init__(self, job: Job, chunk_size: int, lease_seconds: float):
+        self.job = job
+        self.chunk_size = chunk_size
+        self.lease_seconds = lease_seconds
+
+    def progress(self, processed: int = 0, step: Optional[str] = None, total: Optional[int] = None):
+        # chunk 하나를 처리할 때마다 호출 (처리한 개수를 더하고 소유 기간 연장)
+        if step is not None:
+            # 단계를 시작할 때마다 처리 개수를 0 부터 다시 셈 (재시도하면 total 은 남은 대상으로 다시 계산되므로 이전 시도의 개수를 이어가면 100% 를 넘음)
+            self.job.processed, self.job.total = 0, total
+        if not self.job.report_progress(processed=self.job.processed + processed, lease_seconds=self.lease_seconds, step=step, total=total):
+            raise JobLeaseLost(str(self.job.id))
+
+
+class JobWorker:
+    """
+    job collection 에서 작업을 하나씩 가져와서 처리하는 worker (프로세스마다 1개, 여러 프로세스를 띄워서 병렬 처리)
+
+    - 처리 도중 에러가 나면 Job.mark_failed 로 재시도 예약 (max_attempts 를 넘으면 failed)
+    - 처리 함수가 없는 작업은 재시도 없이 failed
+    """
+
+    def __init__(self, chunk_size: int = 500, lease_seconds: float = 60, poll_interval: float = 1, retry_delay: float = 10, worker_id: Optional[str] = None):
+        self.chunk_size = chunk_size
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    def run(self, once: bool = False, log: Callable[[str], None] = print):
+        # once 이면 대기 중인 작업이 없어질 때까지만 처리
+        while True:
+            job = Job.claim_next(self.worker_id, lease_seconds=self.lease_seconds)
+            if job is None:
+                if once:
+                    return
+                time.sleep(self.poll_interval)
+                continue
+            log(f"[{job.name}] {job.id} 시작 (시도 {job.attempts}/{job.max_attempts})")
+            log(f"[{job.name}] {job.id} {self.run_job(job)}")
+
+    def run_job(self, job: Job) -> str:
+        handler = JOB_HANDLERS.get(job.name)
+        if handler is None:
+            job.max_attempts = job.attempts
+            job.mark_failed(error=f"등록되지 않은 작업입니다: {job.name}", retry_delay=self.retry_delay)
+            return Job.STATUS_FAILED
+
+        try:
+            handler(JobContext(job, chunk_size=self.chunk_size, lease_seconds=self.lease_seconds), **job.params)
+        except JobLeaseLost:
+            return "lease lost"
+        except Exception as e:
+            job.mark_failed(error=f"{type(e).__name__}: {getattr(e, 'message', None) or str(e)}", retry_delay=self.retry_delay)
+            return Job.STATUS_QUEUED if job.attempts < job.max_attempts else Job.STATUS_FAILED
+
+        job.mark_succeeded()
+        return Job.STATUS_SUCCEEDED
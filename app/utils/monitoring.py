@@ -0,0 +1,305 @@
+import atexit
+import hmac
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from flask import Flask, Response, current_app, g, has_app_context, request
+from pymongo import monitoring
+
+from app.utils.access_log import access_logger, new_request_id
+
+logger = logging.getLogger(__name__)
+
+# 요청 처리 시간 histogram 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """요청 1건의 요청 id / 시작 시각 / 응답 코드 / MongoDB 명령 수 및 시간"""
+
+    __slots__ = ("request_id", "started_at", "status_code", "mongo_count", "mongo_seconds")
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id
+        self.started_at = time.perf_counter()
+        self.status_code: Optional[int] = None
+        self.mongo_count = 0
+        self.mongo_seconds = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+
+# ASGI 에서 비동기로 처리되는 요청 정보 (asyncio task 마다 따로 유지, flask 요청은 g 에 보관)
+_async_request: ContextVar[Optional[RequestStats]] = ContextVar("async_request", default=None)
+
+
+def track_async_request(request_id: Optional[str] = None) -> RequestStats:
+    stats = RequestStats(request_id=request_id)
+    _async_request.set(stats)
+    return stats
+
+
+def untrack_async_request():
+    _async_request.set(None)
+
+
+def current_request() -> Optional[RequestStats]:
+    # flask 요청은 g 에 보관 (gevent 등 greenlet 단위 worker 에서도 요청마다 분리됨)
+    stats = _async_request.get()
+    if stats is None and has_app_context():
+        stats = g.get("request_stats")
+    return stats
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """pymongo 명령이 끝날 때마다 현재 요청의 MongoDB 명령 수 / 시간에 더함 (요청 밖에서 실행된 명령은 무시)"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event.duration_micros)
+
+    def failed(self, event):
+        self._record(event.duration_micros)
+
+    @staticmethod
+    def _record(duration_micros: int):
+        stats = current_request()
+        if stats is not None:
+            stats.mongo_count += 1
+            stats.mongo_seconds += duration_micros / 1000000
+
+
+mongo_command_listener: MongoCommandListener = MongoCommandListener()
+
+
+class RequestMetrics:
+    """
+    라우트(endpoint) 별 요청 처리 시간 histogram / 응답 코드별 요청 수 / MongoDB 명령 수 및 시간
+
+    - 요청이 끝날 때 lock 한 번으로 값만 더하고, 문자열 변환은 /metrics 조회 시에만 진행
+    - 라우트에 매칭되지 않은 요청은 "unmatched" 하나로 모아서 label 종류가 늘어나지 않도록 함
+    - 집계는 프로세스별이므로, worker 프로세스가 여러 개이면 shared_dir 을 지정해야 /metrics 가 모든 worker 의 합계를 보여줌
+      (shared_dir 이 없으면 조회할 때마다 임의의 worker 값이 보여서 counter 가 줄었다 늘었다 하는 것처럼 보임)
+    - shared_dir 이 있으면 write_interval 초마다 별도 thread 에서 자기 집계를 {pid}.json 으로 저장하고, /metrics 는 자기 값과 다른 worker 의 파일을 합쳐서 출력
+      (다른 worker 의 값은 최대 write_interval 초 늦게 반영, 종료된 worker 의 파일도 합계에 남도록 지우지 않으므로 서버를 시작하기 전에 디렉토리를 비워야 함)
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, shared_dir: Optional[str] = None, write_interval: float = 5.0):
+        self._lock = Lock()
+        self.buckets = tuple(buckets)
+        self.shared_dir = shared_dir
+        self.write_interval = write_interval
+        # (endpoint, method) -> [구간별 개수..., +Inf 개수]
+        self._bucket_counts: Dict[Tuple[str, str], List[int]] = dict()
+        self._duration_sum: Dict[Tuple[str, str], float] = dict()
+        self._statuses: Dict[Tuple[str, str, int], int] = dict()
+        self._mongo_commands: Dict[Tuple[str, str], int] = dict()
+        self._mongo_seconds: Dict[Tuple[str, str], float] = dict()
+        self._writer: Optional[Thread] = None
+        self._writer_lock = Lock()
+        self._stop = Event()
+        atexit.register(self.write_snapshot)
+
+    def configure(self, shared_dir: Optional[str], write_interval: float):
+        # 기존 저장 thread 는 멈추고, 다음 요청에서 새 설정으로 다시 시작
+        self._stop_writer()
+        self.shared_dir, self.write_interval = shared_dir, write_interval
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+    def observe(self, endpoint: Optional[str], method: str, status_code: int, duration: float, mongo_count: int = 0, mongo_seconds: float = 0.0):
+        key = (endpoint or "unmatched", method)
+        index = bisect_left(self.buckets, duration)
+        with self._lock:
+            counts = self._bucket_counts.get(key)
+            if counts is None:
+                counts = self._bucket_counts[key] = [0] * (len(self.buckets) + 1)
+            counts[index] += 1
+            self._duration_sum[key] = self._duration_sum.get(key, 0.0) + duration
+            self._statuses[key + (status_code,)] = self._statuses.get(key + (status_code,), 0) + 1
+            self._mongo_commands[key] = self._mongo_commands.get(key, 0) + mongo_count
+            self._mongo_seconds[key] = self._mongo_seconds.get(key, 0.0) + mongo_seconds
+        if self.shared_dir:
+            self._ensure_writer()
+
+    def reset(self):
+        with self._lock:
+            for values in (self._bucket_counts, self._duration_sum, self._statuses, self._mongo_commands, self._mongo_seconds):
+                values.clear()
+
+    def snapshot(self) -> Dict[str, List[list]]:
+        # 현재 프로세스의 집계를 JSON 으로 저장할 수 있는 형태로 복사 (key tuple + 값 목록)
+        with self._lock:
+            return {
+                "buckets": [list(key) + [list(counts)] for key, counts in self._bucket_counts.items()],
+                "duration_sum": [list(key) + [value] for key, value in self._duration_sum.items()],
+                "statuses": [list(key) + [value] for key, value in self._statuses.items()],
+                "mongo_commands": [list(key) + [value] for key, value in self._mongo_commands.items()],
+                "mongo_seconds": [list(key) + [value] for key, value in self._mongo_seconds.items()],
+            }
+
+    def write_snapshot(self):
+        # {shared_dir}/{pid}.json 을 임시 파일에 쓴 뒤 교체 (읽는 쪽에서 쓰는 도중의 파일을 보지 않도록)
+        if not self.shared_dir:
+            return
+        path = os.path.join(self.shared_dir, f"{os.getpid()}.json")
+        try:
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(f"{path}.tmp", path)
+        except OSError:
+            logger.exception("metrics snapshot 저장 실패")
+
+    def _other_snapshots(self) -> List[Dict[str, List[list]]]:
+        # 다른 worker 프로세스가 저장한 집계 (읽지 못한 파일은 건너뜀)
+        snapshots, own = list(), f"{os.getpid()}.json"
+        for name in sorted(os.listdir(self.shared_dir)):
+            if not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(self.shared_dir, name), encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                logger.warning("metrics snapshot 읽기 실패: %s", name)
+        return snapshots
+
+    def _ensure_writer(self):
+        # fork 이후 (gunicorn 등) 에도 동작하도록 처음 기록할 때 thread 시작
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._stop.clear()
+                self._writer = Thread(target=self._run, name="metrics-writer", daemon=True)
+                self._writer.start()
+
+    def _stop_writer(self):
+        with self._writer_lock:
+            if self._writer is not None and self._writer.is_alive():
+                self._stop.set()
+                self._writer.join()
+            self._writer = None
+
+    def _run(self):
+        while not self._stop.wait(self.write_interval):
+            self.write_snapshot()
+        self.write_snapshot()
+
+    def render(self) -> str:
+        # Prometheus text format (version 0.0.4), shared_dir 이 있으면 다른 worker 의 집계와 합쳐서 출력
+        snapshots = [self.snapshot()] + (self._other_snapshots() if self.shared_dir else list())
+        bucket_counts: Dict[Tuple[str, str], List[int]] = dict()
+        duration_sum: Dict[Tuple[str, str], float] = dict()
+        statuses: Dict[Tuple[str, str, int], int] = dict()
+        mongo_commands: Dict[Tuple[str, str], int] = dict()
+        mongo_seconds: Dict[Tuple[str, str], float] = dict()
+        for snapshot in snapshots:
+            for *key, counts in snapshot["buckets"]:
+                if len(counts) != len(self.buckets) + 1:
+                    # histogram 구간이 다른 설정으로 저장된 값은 제외
+                    continue
+                merged = bucket_counts.setdefault(tuple(key), [0] * len(counts))
+                for index, count in enumerate(counts):
+                    merged[index] += count
+            for values, items in ((duration_sum, snapshot["duration_sum"]), (statuses, snapshot["statuses"]), (mongo_commands, snapshot["mongo_commands"]), (mongo_seconds, snapshot["mongo_seconds"])):
+                for *key, value in items:
+                    values[tuple(key)] = values.get(tuple(key), 0) + value
+
+        lines = ["# HELP http_request_duration_seconds Request latency by route.", "# TYPE http_request_duration_seconds histogram"]
+        for (endpoint, method), counts in sorted(bucket_counts.items()):
+            labels, cumulative = _labels(endpoint=endpoint, method=method), 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {float(duration_sum.get((endpoint, method), 0.0))!r}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+        lines += ["# HELP http_requests_total Requests by route and status code.", "# TYPE http_requests_total counter"]
+        for (endpoint, method, status_code), count in sorted(statuses.items()):
+            lines.append(f"http_requests_total{{{_labels(endpoint=endpoint, method=method, status=status_code)}}} {count}")
+
+        lines += ["# HELP mongodb_commands_total MongoDB commands issued while handling requests, by route.", "# TYPE mongodb_commands_total counter"]
+        for (endpoint, method), count in sorted(mongo_commands.items()):
+            lines.append(f"mongodb_commands_total{{{_labels(endpoint=endpoint, method=method)}}} {count}")
+
+        lines += ["# HELP mongodb_command_seconds_total Time spent in MongoDB commands while handling requests, by route.", "# TYPE mongodb_command_seconds_total counter"]
+        for (endpoint, method), seconds in sorted(mongo_seconds.items()):
+            lines.append(f"mongodb_command_seconds_total{{{_labels(endpoint=endpoint, method=method)}}} {float(seconds)!r}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+request_metrics: RequestMetrics = RequestMetrics()
+
+
+def _before_request():
+    g.request_stats = RequestStats(request_id=new_request_id(request.headers.get("X-Request-ID")))
+
+
+def _after_request(response: Response) -> Response:
+    stats = g.get("request_stats")
+    if stats is not None:
+        stats.status_code = response.status_code
+        response.headers["X-Request-ID"] = stats.request_id
+    return response
+
+
+def _teardown_request(exc: Optional[BaseException]):
+    # 응답 코드를 기록하기 전에 끝난 요청 (처리되지 않은 에러) 은 500 으로 집계
+    stats = g.pop("request_stats", None)
+    if stats is None:
+        return
+
+    status_code, elapsed, user = stats.status_code or 500, stats.elapsed, g.get("user")
+    request_metrics.observe(request.endpoint, request.method, status_code, elapsed, stats.mongo_count, stats.mongo_seconds)
+    access_logger.log(
+        request_id=stats.request_id,
+        method=request.method,
+        route=request.endpoint,
+        path=request.path,
+        status=status_code,
+        user_id=str(user.id) if user is not None else None,
+        latency=elapsed,
+        mongo_seconds=stats.mongo_seconds,
+        mongo_commands=stats.mongo_count,
+    )
+
+
+def metrics_view():
+    # 라우트별 트래픽 / 에러율 / MongoDB 시간이 노출되지 않도록 METRICS_TOKEN 을 Authorization: Bearer 로 받은 경우에만 응답
+    expected = f"Bearer {current_app.config['METRICS_TOKEN']}"
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode("utf-8"), expected.encode("utf-8")):
+        return Response(status=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(request_metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def register_metrics(app: Flask):
+    # 요청 시작 / 종료 훅 (metrics 집계 및 access log) 및 /metrics 라우트 등록 (MongoDB 명령은 연결할 때 mongo_command_listener 를 등록해야 집계됨)
+    # /metrics 는 METRICS_TOKEN 이 설정된 경우에만 등록 (없으면 집계와 access log 만 진행)
+    request_metrics.configure(shared_dir=app.config["METRICS_SHARED_DIR"], write_interval=app.config["METRICS_WRITE_INTERVAL"])
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    if app.config["METRICS_TOKEN"]:
+        app.add_url_rule("/metrics", endpoint="metrics", view_func=metrics_view)
@@ -0,0 +1,41 @@
+import re
+import unicodedata
+from typing import List
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _normalize_words(text: str) -> List[str]:
+    # 전각/반각, 한글 자모 조합 차이를 없애고 소문자로 통일한 뒤 단어 단위로 분리
+    return WORD_PATTERN.findall(unicodedata.normalize("NFKC", text or "").lower())
+
+
+def normalize_text(text: str) -> str:
+    # 부분 일치 확인용으로 정규화한 문자열 (단어 사이는 공백 하나, 단어 외 문자 제외)
+    return " ".join(_normalize_words(text))
+
+
+def title_ngrams(title: str) -> List[str]:
+    """
+    포스트 제목의 검색용 n-gram 목록 (단어별 1-gram + 2-gram, 중복 제거)
+
+    - 한글은 음절 하나의 정보량이 커서 2-gram 으로도 부분 검색이 충분히 가능
+    - 1-gram 은 한 글자 검색어를 위해 함께 저장
+    """
+    grams = dict()
+    for word in _normalize_words(title):
+        for size in (1, 2):
+            for i in range(len(word) - size + 1):
+                grams[word[i : i + size]] = None
+    return list(grams)
+
+
+def query_ngrams(query: str) -> List[str]:
+    # 검색어는 단어별로 2-gram (한 글자 단어는 1-gram) 만 사용해서 최소한의 조건으로 검색
+    grams = dict()
+    for word in _normalize_words(query):
+        if len(word) == 1:
+            grams[word] = None
+        for i in range(len(word) - 1):
+            grams[word[i : i + 2]] = None
+    return list(grams)
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore
+from typing import Callable, Optional
+
+import bcrypt
+
+from app.api import ApiError
+
+
+class PasswordHasher:
+    """
+    bcrypt 해싱/검증을 전용 thread pool 에서 처리
+
+    - 요청 thread 는 자기 작업이 끝날 때까지 기다림 (요청 thread 를 비워주지는 않음)
+    - 대신 동시에 실행되는 bcrypt 를 workers 개로 제한해서, 로그인이 몰려도 CPU 는 workers 개만 사용하고 다른 요청 처리 thread 는 계속 동작 (bcrypt 는 계산 중 GIL 을 놓음)
+    - pool 에서 처리 중이거나 대기 중인 작업이 (workers + queue_limit) 개를 넘으면 기다리지 않고 바로 503
+    - 대기열에서 timeout 초 안에 끝나지 않으면 503 (아직 시작하지 않은 작업은 취소)
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 2, queue_limit: int = 32, timeout: Optional[float] = 10):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        self._slots = BoundedSemaphore(workers + queue_limit)
+
+    def configure(self, rounds: int, workers: int, queue_limit: int, timeout: Optional[float]):
+        self._executor.shutdown(wait=False)
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        self._slots = BoundedSemaphore(workers + queue_limit)
+
+    def _run(self, func: Callable, *args):
+        # 대기열이 가득 찼으면 기다리지 않고 거절 (자리는 작업이 끝날 때 done callback 에서 반환하므로 with 를 사용하지 않음)
+        if not self._slots.acquire(blocking=False):  # pylint: disable=consider-using-with
+            raise ApiError(message="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.", status_code=503)
+
+        try:
+            future = self._executor.submit(func, *args)
+        except RuntimeError:
+            self._slots.release()
+            raise ApiError(message="비밀번호 처리 실패", status_code=500)
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # 응답을 받을 요청이 없으므로 대기 중인 작업은 실행하지 않음 (취소되면 done callback 에서 자리 반환)
+            future.cancel()
+            raise ApiError(message="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.", status_code=503)
+
+    def hash(self, password: str) -> str:
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt(rounds=self.rounds)).decode("utf-8")
+
+    def check(self, password: str, hashed: str) -> bool:
+        return self._run(bcrypt.checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        # "$2b$12$..." 형식에서 work factor 를 읽어서 현재 설정과 다른지 확인
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher: PasswordHasher = PasswordHasher()
@@ -0,0 +1,117 @@
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type
+
+from bson import DBRef, ObjectId
+from mongoengine import Document, ListField, ReferenceField
+from mongoengine.base.datastructures import BaseList
+
+from app.utils.reads import Call, Find, ReadSteps, field_projection, run_steps, to_documents
+
+# 메모리 저장소 등 DB 조회 없이 참조 대상을 찾을 수 있는 document class 별 조회 함수 (ids -> documents)
+_resolvers: Dict[Type[Document], Callable[[List[ObjectId]], List[Document]]] = dict()
+
+
+def register_resolver(document_cls: Type[Document], resolver: Callable[[List[ObjectId]], List[Document]]):
+    _resolvers[document_cls] = resolver
+
+
+def get_resolver(document_cls: Type[Document]) -> Optional[Callable[[List[ObjectId]], List[Document]]]:
+    return _resolvers.get(document_cls)
+
+
+def _reference_field(document_cls: Type[Document], field_name: str) -> Tuple[ReferenceField, bool]:
+    # (참조 field, list 여부) return
+    field = document_cls._fields[field_name]
+    if isinstance(field, ListField) and isinstance(field.field, ReferenceField):
+        return field.field, True
+    if isinstance(field, ReferenceField):
+        return field, False
+    raise ValueError(f"'{document_cls.__name__}.{field_name}' is not a reference field")
+
+
+def _reference_id(value) -> Optional[ObjectId]:
+    # 아직 불러오지 않은 참조(DBRef/ObjectId)의 id, 이미 불러온 document 면 None
+    if isinstance(value, DBRef):
+        return value.id
+    if isinstance(value, ObjectId):
+        return value
+    return None
+
+
+def collect_reference_ids(documents: List[Document], field_names: Iterable[str]) -> Dict[Type[Document], Set[ObjectId]]:
+    # 참조 대상 document class 별로 불러와야 할 id 모으기
+    reference_ids = defaultdict(set)
+    for document in documents:
+        for field_name in field_names:
+            field, is_list = _reference_field(type(document), field_name)
+            value = document._data.get(field_name)
+            for item in (value or list()) if is_list else [value]:
+                reference_id = _reference_id(item)
+                if reference_id is not None:
+                    reference_ids[field.document_type].add(reference_id)
+    return reference_ids
+
+
+def attach_references(documents: List[Document], field_names: Iterable[str], resolved: Dict[Type[Document], Dict[ObjectId, Document]]):
+    # 불러온 document 들을 참조 field 에 채워넣어서, 직렬화할 때 document 마다 추가 조회가 일어나지 않도록 처리
+    for document in documents:
+        for field_name in field_names:
+            field, is_list = _reference_field(type(document), field_name)
+            targets = resolved.get(field.document_type, dict())
+            value = document._data.get(field_name)
+
+            if not is_list:
+                reference_id = _reference_id(value)
+                if reference_id in targets:
+                    document._data[field_name] = targets[reference_id]
+                continue
+
+            if not value:
+                continue
+            items = [targets.get(_reference_id(item), item) if _reference_id(item) is not None else item for item in value]
+            items = BaseList(items, document, field_name)
+            # 참조 대상이 모두 조회된 경우에만 dereference 완료로 표시 (없는 참조는 기존처럼 mongoengine 에서 처리)
+            items._dereferenced = all(_reference_id(item) is None for item in items)
+            document._data[field_name] = items
+
+
+def reference_only_fields(document_cls: Type[Document], field_names: Iterable[str], only: Optional[Dict[str, Sequence[str]]]) -> Dict[Type[Document], Optional[List[str]]]:
+    # 참조 대상 document class 별로 불러올 field 목록 (같은 class 를 참조하는 field 들의 합집합, 하나라도 지정이 없으면 전체 field)
+    only_fields = dict()
+    for field_name in field_names:
+        target_cls = _reference_field(document_cls, field_name)[0].document_type
+        names = (only or dict()).get(field_name)
+        if names is None or (target_cls in only_fields and only_fields[target_cls] is None):
+            only_fields[target_cls] = None
+        else:
+            only_fields[target_cls] = list(dict.fromkeys(only_fields.get(target_cls, list()) + list(names)))
+    return only_fields
+
+
+def prefetch_steps(documents: Iterable[Document], *field_names: str, only: Optional[Dict[str, Sequence[str]]] = None) -> ReadSteps[List[Document]]:
+    # prefetch_references 의 조회 단계 (WSGI / ASGI 공용)
+    documents = list(documents)
+    resolved, only_fields = dict(), reference_only_fields(type(documents[0]), field_names, only) if documents else dict()
+    for document_cls, reference_ids in collect_reference_ids(documents, field_names).items():
+        resolver = get_resolver(document_cls)
+        if resolver is not None:
+            targets = yield Call(resolver, (list(reference_ids),))
+        else:
+            fields = only_fields.get(document_cls)
+            targets = to_documents(document_cls, (yield Find(document_cls, {"_id": {"$in": list(reference_ids)}}, field_projection(document_cls, fields))), fields)
+        resolved[document_cls] = {item.id: item for item in targets}
+
+    attach_references(documents, field_names, resolved)
+    return documents
+
+
+def prefetch_references(documents: Iterable[Document], *field_names: str, only: Optional[Dict[str, Sequence[str]]] = None) -> List[Document]:
+    """
+    select_related 처럼 목록의 참조 field 들을 미리 불러오기
+
+    - 참조 대상 document class 마다 `$in` 조회 1번으로 처리 (ex. created_by / likes 가 모두 User 이면 한 번만 조회)
+    - only 로 참조 field 별 불러올 field 를 지정하면 해당 field 만 조회 (ex. 응답 schema 의 Nested only)
+    - register_resolver 로 등록된 class 는 DB 대신 등록된 조회 함수 사용
+    - 참조 field 의 값을 불러온 document 로 교체한 document list 를 return
+    """
+    return run_steps(prefetch_steps(documents, *field_names, only=only))
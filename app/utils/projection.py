@@ -0,0 +1,96 @@
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple, Type, Union
+
+from flask import current_app, has_request_context, request
+from flask_apispec.utils import resolve_annotations
+from marshmallow import Schema, fields
+from mongoengine import Document, ListField, ReferenceField
+from mongoengine.queryset import QuerySet
+
+
+class Projection(NamedTuple):
+    """
+    응답 schema 에서 계산한 조회 field 목록
+
+    - fields: queryset.only() 에 넘길 field 목록 (None 이면 제한 없음)
+    - references: 참조 field 이름 -> 참조 document 에서 불러올 field 목록 (prefetch_references 의 only)
+    """
+
+    fields: Optional[Tuple[str, ...]]
+    references: Dict[str, Tuple[str, ...]]
+
+
+NO_PROJECTION = Projection(fields=None, references=dict())
+
+
+def _schema_instance(schema: Union[Schema, Type[Schema]]) -> Schema:
+    return schema() if isinstance(schema, type) else schema
+
+
+@lru_cache(maxsize=None)
+def schema_projection(schema: Union[Schema, Type[Schema]], document_cls: Type[Document]) -> Projection:
+    """
+    marshmallow schema 가 출력하는 field 들만 조회하는 projection 계산 (schema / document class 별로 한 번만 계산)
+
+    - field 의 attribute (없으면 이름) 가 document field 이면 포함, document 에 없는 field 는 무시
+    - fields.Method 처럼 다른 field 로 계산하는 값은 metadata={"projection": [...]} 로 필요한 field 지정
+    - 참조 field 의 Nested schema (only= 포함) 는 참조 document 에서 불러올 field 로 계산
+    - document field 와 하나도 겹치지 않으면 (ex. ApiStatusSchema) 제한 없음
+    """
+    names, references = list(), dict()
+    for name, field in _schema_instance(schema).dump_fields.items():
+        if field.metadata.get("projection"):
+            names.extend(field.metadata["projection"])
+            continue
+
+        attribute = (field.attribute or name).split(".")[0]
+        document_field = document_cls._fields.get(attribute)
+        if document_field is None:
+            continue
+        names.append(attribute)
+
+        # 참조 field 는 Nested schema 로 참조 document 의 projection 계산
+        nested = field.inner if isinstance(field, fields.List) else field
+        reference = document_field.field if isinstance(document_field, ListField) else document_field
+        if isinstance(nested, fields.Nested) and isinstance(reference, ReferenceField):
+            reference_fields = schema_projection(nested.schema, reference.document_type).fields
+            if reference_fields is not None:
+                references[attribute] = reference_fields
+
+    if not names:
+        return NO_PROJECTION
+    return Projection(fields=tuple(dict.fromkeys(names)), references=references)
+
+
+def view_response_schema(view_func: Callable) -> Optional[Union[Schema, Type[Schema]]]:
+    # view 함수의 marshal_with 중 가장 작은 2xx 응답 코드의 schema
+    schemas = dict()
+    for option in resolve_annotations(view_func, "schemas").options:
+        schemas.update(option)
+    codes = sorted(code for code in schemas if isinstance(code, int) and 200 <= code < 300)
+    return schemas[codes[0]].get("schema") or None if codes else None
+
+
+def response_schema() -> Optional[Union[Schema, Type[Schema]]]:
+    # 현재 요청을 처리하는 view 함수의 응답 schema (요청 밖에서는 None)
+    if not has_request_context() or request.endpoint not in current_app.view_functions:
+        return None
+    return view_response_schema(current_app.view_functions[request.endpoint])
+
+
+def view_projection(view_func: Callable, document_cls: Type[Document]) -> Projection:
+    schema = view_response_schema(view_func)
+    return schema_projection(schema, document_cls) if schema is not None else NO_PROJECTION
+
+
+def response_projection(document_cls: Type[Document]) -> Projection:
+    # 현재 요청을 처리하는 view 함수의 응답 schema 로 projection 계산 (요청 밖에서는 제한 없음)
+    schema = response_schema()
+    return schema_projection(schema, document_cls) if schema is not None else NO_PROJECTION
+
+
+def project(queryset: QuerySet, only: Optional[Sequence[str]], exclude: Sequence[str] = ()) -> QuerySet:
+    # only 가 있으면 해당 field 만, 없으면 exclude 를 제외한 field 조회
+    if only:
+        return queryset.only(*only)
+    return queryset.exclude(*exclude) if exclude else queryset
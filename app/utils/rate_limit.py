@@ -0,0 +1,193 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from cachetools import LRUCache
+
+from app.api import ApiError
+
+try:
+    import fcntl
+except ImportError:  # Windows 에서는 shared backend 사용 불가 (local backend 사용)
+    fcntl = None
+
+# endpoint -> {key 종류 (ex. "ip", "email"): (허용 요청 수, 기간 초)}
+Limits = Dict[str, Dict[str, Tuple[int, float]]]
+
+# slot: (key hash, 남은 token 수, 마지막 확인 시각)
+_SLOT = struct.Struct("<Qdd")
+
+
+def _key_hash(key: str) -> int:
+    # 0 은 빈 slot 표시로 사용
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+def take_token(tokens: float, updated_at: float, capacity: float, rate: float, now: float, dry_run: bool = False) -> Tuple[float, float]:
+    # 마지막 확인 이후 지난 시간만큼 token 을 채우고 1개 사용 -> (남은 token 수, 다시 시도할 수 있을 때까지 남은 초, 사용할 수 있으면 0), dry_run 이면 사용하지 않고 확인만
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - (0 if dry_run else 1), 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class LocalRateLimitBackend:
+    """
+    프로세스 메모리에 token bucket 보관 (worker 프로세스마다 한도가 따로 적용됨)
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self._buckets = LRUCache(maxsize=maxsize)
+        self._lock = Lock()
+
+    def consume(self, key: str, capacity: float, rate: float, now: float, dry_run: bool = False) -> float:
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens, retry_after = take_token(tokens, updated_at, capacity, rate, now, dry_run=dry_run)
+            if not dry_run:
+                self._buckets[key] = (tokens, now)
+        return retry_after
+
+    def close(self):
+        self._buckets.clear()
+
+
+class SharedRateLimitBackend:
+    """
+    같은 host 의 worker 프로세스들이 mmap 으로 같이 여는 파일에 token bucket 보관
+
+    - slot 을 WAYS 개씩 묶은 set 단위로 저장 (key hash 로 set 을 정하고, set 안에 없는 key 는 가장 오래 확인하지 않은 slot 을 교체해서 가득 찬 bucket 으로 시작)
+    - set 단위 fcntl 잠금으로 프로세스 간, threading.Lock 으로 같은 프로세스의 thread 간 동시 수정 방지 (fcntl 잠금은 프로세스 단위라서 thread 끼리는 막지 못함)
+    - 파일은 /dev/shm 같은 메모리 파일시스템에 두는 것을 권장 (재시작 후 남아 있는 파일은 그대로 이어서 사용)
+    """
+
+    WAYS = 4
+
+    def __init__(self, path: str, slots: int = 65536):
+        if fcntl is None:
+            raise RuntimeError("shared rate limit backend 는 fcntl 을 지원하는 OS 에서만 사용할 수 있습니다")
+
+        self.path = path
+        self.sets = max(1, slots // self.WAYS)
+        self._set_size = self.WAYS * _SLOT.size
+        size = self.sets * self._set_size
+
+        # 다른 프로세스가 이미 만든 파일이면 크기만 맞춤 (줄이면 다른 프로세스의 mmap 이 깨지므로 늘리기만 함)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = Lock()
+
+    def consume(self, key: str, capacity: float, rate: float, now: float, dry_run: bool = False) -> float:
+        key_hash = _key_hash(key)
+        offset = (key_hash % self.sets) * self._set_size
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._set_size, offset)
+            try:
+                # set 안에서 같은 key 의 slot 을 찾고, 없으면 가장 오래된 slot (빈 slot 포함) 사용
+                position, oldest_position, oldest_at = None, offset, math.inf
+                for slot_position in range(offset, offset + self._set_size, _SLOT.size):
+                    slot_hash, tokens, updated_at = _SLOT.unpack_from(self._map, slot_position)
+                    if slot_hash == key_hash:
+                        position = slot_position
+                        break
+                    if updated_at < oldest_at:
+                        oldest_position, oldest_at = slot_position, updated_at
+                if position is None:
+                    position, tokens, updated_at = oldest_position, capacity, now
+
+                tokens, retry_after = take_token(tokens, updated_at, capacity, rate, now, dry_run=dry_run)
+                if not dry_run:
+                    _SLOT.pack_into(self._map, position, key_hash, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._set_size, offset)
+        return retry_after
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+def default_shared_path() -> str:
+    # 메모리 파일시스템 (/dev/shm) 이 있으면 사용, 없으면 임시 디렉토리
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "welcome_aboard_rate_limit")
+
+
+class RateLimiter:
+    """
+    라우트별 요청 한도 확인 (token bucket)
+
+    - limits 의 (허용 요청 수, 기간 초) 는 연속으로 허용 요청 수만큼 처리하고, 이후에는 기간 / 허용 요청 수 마다 1번씩 허용
+    - key 종류 (ex. 접속 IP, 로그인 email) 별로 따로 확인해서 하나라도 초과하면 429 (Retry-After header 포함)
+    - 모든 key 를 먼저 확인한 뒤에 token 을 사용하므로, 거절된 요청은 어느 key 의 한도도 쓰지 않음
+    - failure_keys 는 확인만 하고, token 은 실패한 요청 (ex. 비밀번호 불일치) 만 record_failure 로 사용
+    - backend: "shared" (host 의 worker 프로세스가 한도를 공유) / "local" (프로세스별) / None (확인 안 함)
+    """
+
+    BACKENDS = ("shared", "local")
+
+    def __init__(self):
+        self.limits: Limits = dict()
+        self._backend = None
+
+    def configure(self, backend: Optional[str], limits: Limits, path: Optional[str] = None, slots: int = 65536):
+        if backend is not None and backend not in self.BACKENDS:
+            raise ValueError(f"unknown rate limit backend `{backend}`")
+        if self._backend is not None:
+            self._backend.close()
+
+        self.limits = limits
+        if backend == "shared":
+            self._backend = SharedRateLimitBackend(path=path or default_shared_path(), slots=slots)
+        elif backend == "local":
+            self._backend = LocalRateLimitBackend(maxsize=slots)
+        else:
+            self._backend = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None
+
+    def check(self, endpoint: str, now: Optional[float] = None, failure_keys: Optional[Dict[str, Optional[str]]] = None, **keys: Optional[str]):
+        # 설정된 key 종류를 모두 확인한 뒤 keys 마다 token 1개씩 사용 (값이 없는 key 는 확인하지 않음)
+        limits = self.limits.get(endpoint)
+        if self._backend is None or not limits:
+            return
+
+        now = time.time() if now is None else now
+        checked = [(name, value, name in keys) for name, value in {**(failure_keys or dict()), **keys}.items() if name in limits and value]
+        retry_after = max((self._consume(endpoint, name, value, now, dry_run=True) for name, value, _ in checked), default=0.0)
+        for name, value, charged in checked:
+            if retry_after > 0:
+                break
+            if charged:
+                # 확인한 뒤 다른 요청이 먼저 사용한 경우
+                retry_after = self._consume(endpoint, name, value, now)
+        if retry_after > 0:
+            raise ApiError(message="요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.", status_code=429, headers={"Retry-After": str(math.ceil(retry_after))})
+
+    def record_failure(self, endpoint: str, now: Optional[float] = None, **keys: Optional[str]):
+        # 실패한 요청만 세는 key (check 의 failure_keys) 의 token 사용 (이미 초과한 경우는 무시)
+        limits = self.limits.get(endpoint)
+        if self._backend is None or not limits:
+            return
+
+        now = time.time() if now is None else now
+        for name, value in keys.items():
+            if name in limits and value:
+                self._consume(endpoint, name, value, now)
+
+    def _consume(self, endpoint: str, name: str, value: str, now: float, dry_run: bool = False) -> float:
+        count, period = self.limits[endpoint][name]
+        return self._backend.consume(f"{endpoint}:{name}:{value}", capacity=count, rate=count / period, now=now, dry_run=dry_run)
+
+
+rate_limiter: RateLimiter = RateLimiter()
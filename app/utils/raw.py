@@ -0,0 +1,157 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from bson import DBRef, ObjectId
+from marshmallow import Schema, fields
+from mongoengine import Document, EmbeddedDocumentField, ListField, ReferenceField
+from mongoengine.base import BaseDocument
+
+from app.utils.prefetch import get_resolver
+from app.utils.projection import response_schema
+from app.utils.reads import Call, Find, ReadSteps, run_steps
+from app.utils.schema_compiler import value_serializer
+
+# 참조 document class -> {id: raw document}
+Resolved = Dict[Type[Document], Dict[ObjectId, Dict]]
+
+_MISSING = object()
+
+
+def _scalar(field: fields.Field) -> Callable[[Any], Any]:
+    # marshmallow field 의 _serialize 와 같은 결과를 내는 변환 함수 (None 은 그대로 None, Nested 는 _compile 에서 처리)
+    convert = None if isinstance(field, (fields.Nested, fields.List)) else value_serializer(field)
+    if convert is None:
+        raise TypeError(f"raw 직렬화를 지원하지 않는 field 입니다: {type(field).__name__}")
+    return convert
+
+
+def _reference_id(value) -> Optional[ObjectId]:
+    return value.id if isinstance(value, DBRef) else value
+
+
+class RawSerializer:
+    """
+    marshmallow schema 를 미리 분석해서, Document 를 만들지 않고 pymongo 결과 (dict) 를 같은 JSON 으로 변환하는 직렬화 함수
+
+    - document_cls 가 있으면 field 이름 대신 db_field 로 값을 읽고, 값이 없으면 Document 와 같이 처리
+      (projection 으로 조회한 document 는 None, embedded document 는 field 기본값, DictField 안의 값은 marshmallow 와 같이 출력하지 않음)
+    - 참조 field 의 Nested schema 는 load_references 로 불러온 raw document 로 직렬화 (참조 대상이 없으면 목록에서 제외 / None)
+    - fields.Method 등 변환 방법을 알 수 없는 field 가 있으면 분석할 때 TypeError (해당 schema 는 Document + marshmallow 로 직렬화해야 함)
+    """
+
+    def __init__(self, schema: Union[Schema, Type[Schema]], document_cls: Optional[Type[BaseDocument]] = None, projected: bool = True):
+        self.document_cls = document_cls
+        # (data_key, db key, 기본값 함수, 변환 함수)
+        self._fields: List[Tuple[str, str, Optional[Callable[[], Any]], Callable[[Any, Resolved], Any]]] = list()
+        # db key -> (참조 document class, 참조 document 직렬화 함수)
+        self.references: Dict[str, Tuple[Type[Document], "RawSerializer"]] = dict()
+
+        schema = schema() if isinstance(schema, type) else schema
+        for name, field in schema.dump_fields.items():
+            attribute = field.attribute or name
+            document_field = document_cls._fields.get(attribute) if document_cls is not None else None
+            if document_cls is not None and document_field is None:
+                raise TypeError(f"'{document_cls.__name__}' 에 없는 field 입니다: {attribute}")
+            key = document_field.db_field if document_field is not None else attribute
+            default = self._default(document_field, projected)
+            self._fields.append((field.data_key or name, key, default, self._compile(field, document_field, key)))
+
+    @staticmethod
+    def _default(document_field, projected: bool) -> Optional[Callable[[], Any]]:
+        # document 에 값이 없을 때 Document 의 값 (mongoengine 은 only() 로 지정한 field 에는 기본값을 채우지 않음, document_cls 가 없으면 None -> 출력하지 않음)
+        if document_field is None:
+            return None
+        default = None if projected else document_field.default
+        return default if callable(default) else lambda: default
+
+    def _compile(self, field: fields.Field, document_field, key: str) -> Callable[[Any, Resolved], Any]:
+        if not isinstance(field, fields.Nested):
+            convert = _scalar(field)
+            return lambda value, resolved: None if value is None else convert(value)
+
+        is_list = isinstance(document_field, ListField)
+        inner = document_field.field if is_list else document_field
+
+        # 참조 field: 불러온 raw document 로 직렬화
+        if isinstance(inner, ReferenceField):
+            nested = RawSerializer(field.schema, inner.document_type)
+            if nested.references:
+                raise TypeError(f"참조 document 의 참조 field 는 raw 직렬화를 지원하지 않습니다: {key}")
+            self.references[key] = (inner.document_type, nested)
+            targets_of = lambda resolved: resolved.get(inner.document_type, dict())
+            if is_list:
+                return lambda value, resolved: None if value is None else [nested.dump(son, resolved) for son in (targets_of(resolved).get(_reference_id(item)) for item in value) if son is not None]
+            return lambda value, resolved: None if value is None or _reference_id(value) not in targets_of(resolved) else nested.dump(targets_of(resolved)[_reference_id(value)], resolved)
+
+        # embedded document / DictField: 저장된 dict 를 그대로 직렬화
+        nested = RawSerializer(field.schema, inner.document_type if isinstance(inner, EmbeddedDocumentField) else None, projected=False)
+        if field.many:
+            return lambda value, resolved: None if value is None else [nested.dump(item, resolved) for item in value]
+        return lambda value, resolved: None if value is None else nested.dump(value, resolved)
+
+    @property
+    def keys(self) -> List[str]:
+        # 직렬화에 필요한 db key 목록 (참조 document 조회 projection)
+        return [key for _, key, _, _ in self._fields]
+
+    def dump(self, son: Dict, resolved: Resolved) -> Dict:
+        data = dict()
+        for data_key, key, default, convert in self._fields:
+            value = son.get(key, _MISSING)
+            if value is _MISSING:
+                if default is None:
+                    continue
+                value = default()
+            data[data_key] = convert(value, resolved)
+        return data
+
+    def dump_many(self, sons: List[Dict], resolved: Optional[Resolved] = None) -> List[Dict]:
+        resolved = self.load_references(sons) if resolved is None else resolved
+        return [self.dump(son, resolved) for son in sons]
+
+    def dump_steps(self, sons: List[Dict]) -> ReadSteps[List[Dict]]:
+        # dump_many 의 조회 단계 (WSGI / ASGI 공용)
+        resolved = yield from self.reference_steps(sons)
+        return [self.dump(son, resolved) for son in sons]
+
+    def load_references(self, sons: List[Dict]) -> Resolved:
+        return run_steps(self.reference_steps(sons))
+
+    def reference_steps(self, sons: List[Dict]) -> ReadSteps[Resolved]:
+        # 참조 document class 마다 `$in` 조회 1번 (prefetch_references 와 같이 등록된 조회 함수가 있으면 사용)
+        reference_ids, keys = dict(), dict()
+        for key, (document_cls, nested) in self.references.items():
+            ids = reference_ids.setdefault(document_cls, dict())
+            keys.setdefault(document_cls, dict()).update(dict.fromkeys(nested.keys))
+            for son in sons:
+                value = son.get(key)
+                for item in value if isinstance(value, list) else [value] if value is not None else list():
+                    ids[_reference_id(item)] = None
+
+        resolved = dict()
+        for document_cls, ids in reference_ids.items():
+            if not ids:
+                continue
+            resolver = get_resolver(document_cls)
+            if resolver is not None:
+                resolved[document_cls] = {document.id: document.to_mongo() for document in (yield Call(resolver, (list(ids),)))}
+            else:
+                projection = dict.fromkeys(keys[document_cls], 1)
+                resolved[document_cls] = {son["_id"]: son for son in (yield Find(document_cls, {"_id": {"$in": list(ids)}}, projection))}
+        return resolved
+
+
+@lru_cache(maxsize=None)
+def raw_serializer(schema: Union[Schema, Type[Schema]], document_cls: Type[Document]) -> RawSerializer:
+    # schema / document class 별로 한 번만 분석
+    return RawSerializer(schema, document_cls)
+
+
+def dump_raw(sons: List[Dict], document_cls: Type[Document]) -> List[Dict]:
+    # 현재 요청을 처리하는 view 함수의 응답 schema (marshal_with) 와 같은 형식으로 raw document 목록 직렬화
+    return run_steps(dump_raw_steps(sons, document_cls))
+
+
+def dump_raw_steps(sons: List[Dict], document_cls: Type[Document]) -> ReadSteps[List[Dict]]:
+    # dump_raw 의 조회 단계 (WSGI / ASGI 공용)
+    return (yield from raw_serializer(response_schema(), document_cls).dump_steps(sons))
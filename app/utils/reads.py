@@ -0,0 +1,102 @@
+from types import FrameType
+from typing import Any, Callable, Dict, Generator, List, NamedTuple, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+from mongoengine import Document
+
+from app.api import ApiError
+
+T = TypeVar("T")
+
+
+class Find(NamedTuple):
+    # collection.find (결과는 raw document list)
+    document_cls: Type[Document]
+    filter: Dict
+    projection: Optional[Dict] = None
+    sort: Optional[List[Tuple[str, int]]] = None
+    skip: int = 0
+    limit: int = 0
+
+
+class Aggregate(NamedTuple):
+    # collection.aggregate (결과는 raw document list)
+    document_cls: Type[Document]
+    pipeline: List[Dict]
+
+
+class Call(NamedTuple):
+    # DB 조회 외의 blocking 작업 (카테고리 저장소, 응답 캐시, 등록된 조회 함수 등, ASGI 에서는 request context 없이 thread pool 에서 실행)
+    func: Callable
+    args: Tuple = ()
+
+
+Step = Union[Find, Aggregate, Call]
+ReadSteps = Generator[Step, Any, T]
+
+
+def run_steps(steps: ReadSteps[T], execute: Optional[Callable[[Step], Any]] = None) -> T:
+    """
+    읽기 API 의 조회 generator 를 pymongo 로 실행
+
+    - 조회 함수는 조회 조건 / 순서 / 직렬화만 정의하고 DB 호출은 단계 (Find / Aggregate / Call) 로 yield
+    - 같은 generator 를 ASGI app 에서는 motor 로 실행하므로, 조회 조건 / 캐시 / ETag / 직렬화 코드가 WSGI 와 공유됨
+    - 단계 실행 중 에러는 해당 yield 위치로 전달 (generator 안에서 ApiError 로 변환 가능)
+    """
+    execute = execute or execute_step
+    value, error = None, None
+    while True:
+        try:
+            step = advance(steps, value, error)
+        except StopIteration as e:
+            return e.value
+
+        value, error = None, None
+        try:
+            value = execute(step)
+        except Exception as e:
+            error = e
+
+
+def advance(steps: ReadSteps, value: Any, error: Optional[Exception]) -> Step:
+    # 이전 단계의 결과 (또는 에러) 를 전달하고 다음 단계를 받음 (끝나면 StopIteration)
+    return steps.throw(error) if error is not None else steps.send(value)
+
+
+def suspended_frames(steps: ReadSteps) -> List[FrameType]:
+    # 현재 단계를 yield 한 generator 들의 frame (안쪽부터, 느린 명령의 호출 함수 확인용)
+    frames = list()
+    while steps is not None and getattr(steps, "gi_frame", None) is not None:
+        frames.append(steps.gi_frame)
+        steps = steps.gi_yieldfrom
+    return frames[::-1]
+
+
+def execute_step(step: Step) -> Any:
+    if isinstance(step, Call):
+        return step.func(*step.args)
+    collection = step.document_cls._get_collection()
+    if isinstance(step, Aggregate):
+        return list(collection.aggregate(step.pipeline))
+    return list(collection.find(step.filter, step.projection, sort=step.sort, skip=step.skip, limit=step.limit))
+
+
+def find_one(find: Find, not_found_message: str, multiple_found_message: str) -> ReadSteps[Dict]:
+    # queryset.get(...) 과 같은 에러 처리 (없으면 404, 여러 개면 500)
+    sons = yield find._replace(limit=2)
+    if not sons:
+        raise ApiError(message=not_found_message, status_code=404)
+    if len(sons) > 1:
+        raise ApiError(message=multiple_found_message, status_code=500)
+    return sons[0]
+
+
+def field_projection(document_cls: Type[Document], fields: Optional[Sequence[str]], exclude: Sequence[str] = ()) -> Optional[Dict[str, int]]:
+    # projection.project 와 같은 조회 field 를 pymongo projection 으로 변환 (fields 가 있으면 해당 field 만, 없으면 exclude 를 제외한 field)
+    if fields:
+        return {document_cls._fields[name].db_field: 1 for name in fields}
+    return {document_cls._fields[name].db_field: 0 for name in exclude} or None
+
+
+def to_documents(document_cls: Type[Document], sons: List[Dict], fields: Optional[Sequence[str]] = None) -> List[Document]:
+    # queryset 으로 조회한 것과 같은 Document 로 변환 (only() 로 지정한 field 는 기본값을 채우지 않음)
+    return [document_cls._from_son(son, only_fields=list(fields or ())) for son in sons]
@@ -0,0 +1,203 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Union
+
+from flask import Flask
+from marshmallow import Schema, ValidationError, fields, missing
+from marshmallow.decorators import POST_DUMP, POST_LOAD, PRE_DUMP, PRE_LOAD, VALIDATES, VALIDATES_SCHEMA
+from marshmallow.utils import get_value
+
+from app.serializers import ObjectIdSchemaField
+
+
+def value_serializer(field: fields.Field) -> Optional[Callable[[Any], Any]]:
+    """
+    field._serialize 와 같은 결과를 내는 값 변환 함수 (None 이 아닌 값만 전달, 변환 방법을 알 수 없는 field 는 None)
+
+    - _serialize 를 재정의한 field (ex. fields.Method, 직접 만든 field) 는 None -> field.serialize 로 처리
+    """
+    serialize = type(field)._serialize
+    if serialize is ObjectIdSchemaField._serialize:
+        return lambda value: value if isinstance(value, str) else str(value)
+    if serialize is fields.String._serialize:
+        return lambda value: value.decode("utf-8") if isinstance(value, bytes) else str(value)
+    if serialize is fields.Number._serialize and type(field)._format_num is fields.Number._format_num and not field.as_string:
+        return field.num_type
+    if serialize is fields.Boolean._serialize:
+        return lambda value: value if value is True or value is False else field._serialize(value, None, None)
+    if serialize is fields.DateTime._serialize:
+        data_format = field.format or field.DEFAULT_FORMAT
+        return field.SERIALIZATION_FUNCS.get(data_format) or (lambda value: value.strftime(data_format))
+    if serialize is fields.List._serialize:
+        inner = value_serializer(field.inner)
+        if inner is None:
+            return None
+        return lambda value: [None if item is None else inner(item) for item in value]
+    if serialize is fields.Nested._serialize:
+        # nested schema 는 처음 사용할 때 분석 (자기 자신을 참조하는 schema 도 처리)
+        compiled = dict()
+
+        def dump_nested(value):
+            if "dump" not in compiled:
+                compiled["dump"] = compile_dump(field.schema) or field.schema.dump
+            return compiled["dump"](value, many=field.schema.many or field.many)
+
+        return dump_nested
+    return None
+
+
+def _get_value(key: str) -> Callable[[Any], Any]:
+    # marshmallow.utils.get_value 와 같은 순서로 값 조회 (obj[key] -> getattr)
+    if "." in key:
+        return lambda obj: get_value(obj, key, missing)
+
+    def get(obj):
+        if not hasattr(obj, "__getitem__"):
+            return getattr(obj, key, missing)
+        try:
+            return obj[key]
+        except (KeyError, IndexError, TypeError, AttributeError):
+            return getattr(obj, key, missing)
+
+    return get
+
+
+def _has_processors(schema: Schema, *tags: str) -> bool:
+    return any(schema._has_processors(tag) for tag in tags)
+
+
+def compile_dump(schema: Schema) -> Optional[Callable]:
+    """
+    schema.dump 과 같은 결과를 내는 함수 (field 별 값 조회 / 변환 함수를 미리 만들어 두고 호출만 함)
+
+    - pre_dump / post_dump, ordered, _serialize / get_attribute 재정의가 있는 schema 는 None (schema.dump 사용)
+    """
+    schema_cls = type(schema)
+    if _has_processors(schema, PRE_DUMP, POST_DUMP) or schema.ordered or schema_cls._serialize is not Schema._serialize or schema_cls.get_attribute is not Schema.get_attribute:
+        return None
+
+    # (data_key, 값 조회 함수, 값 변환 함수, field, field 이름)
+    entries = list()
+    for name, field in schema.dump_fields.items():
+        key = field.data_key if field.data_key is not None else name
+        convert = value_serializer(field) if field._CHECK_ATTRIBUTE else None
+        entries.append((key, _get_value(field.attribute or name), convert, field, name))
+
+    def dump_one(obj) -> Dict:
+        data = dict()
+        for key, get, convert, field, name in entries:
+            if convert is None:
+                value = field.serialize(name, obj, accessor=schema.get_attribute)
+                if value is not missing:
+                    data[key] = value
+                continue
+
+            value = get(obj)
+            if value is missing:
+                default = field.dump_default
+                value = default() if callable(default) else default
+                if value is missing:
+                    continue
+            data[key] = None if value is None else convert(value)
+        return data
+
+    def dump(obj, *, many: Optional[bool] = None) -> Union[Dict, List[Dict]]:
+        many = schema.many if many is None else bool(many)
+        if many and obj is not None:
+            return [dump_one(item) for item in obj]
+        return dump_one(obj)
+
+    return dump
+
+
+def compile_load(schema: Schema) -> Optional[Callable]:
+    """
+    schema.load 와 같은 결과 / 에러 메세지를 내는 함수 (field.deserialize 로 검증, 나머지 처리 과정 생략)
+
+    - hook (pre_load / post_load / validates / validates_schema), many, partial, ordered, 재정의한 handle_error 가 있으면 None (schema.load 사용)
+    - 정의되지 않은 key 가 있거나 many / partial / unknown 을 지정하면 schema.load 로 처리 (Unknown field 에러 등)
+    """
+    schema_cls = type(schema)
+    if _has_processors(schema, PRE_LOAD, POST_LOAD, VALIDATES, VALIDATES_SCHEMA) or schema.many or schema.partial or schema.ordered or schema_cls.handle_error is not Schema.handle_error or schema_cls._deserialize is not Schema._deserialize:
+        return None
+
+    # (입력 key, 결과 key, field)
+    entries = [(field.data_key if field.data_key is not None else name, field.attribute or name, field) for name, field in schema.load_fields.items()]
+    if any("." in attribute for _, attribute, _ in entries):
+        return None
+    known_keys = {key for key, _, _ in entries}
+    load_original = schema_cls.load.__get__(schema)
+
+    def load(data, *, many: Optional[bool] = None, partial=None, unknown: Optional[str] = None) -> Dict:
+        if many or partial or unknown is not None or not isinstance(data, Mapping) or not known_keys.issuperset(data):
+            return load_original(data, many=many, partial=partial, unknown=unknown)
+
+        result, errors = dict(), dict()
+        for key, attribute, field in entries:
+            try:
+                value = field.deserialize(data.get(key, missing), key, data)
+            except ValidationError as error:
+                errors[key] = error.messages
+                value = error.valid_data or missing
+            if value is not missing:
+                result[attribute] = value
+
+        if errors:
+            raise ValidationError(errors, data=data, valid_data=result)
+        return result
+
+    return load
+
+
+def compile_schema(schema: Union[Schema, Type[Schema]]) -> Schema:
+    """
+    schema instance 의 dump / load 를 미리 분석한 함수로 교체해서 return (class 이면 instance 를 만들어서 교체)
+
+    - 요청마다 schema instance 를 새로 만들지 않도록 같은 instance 를 계속 사용
+    - 분석할 수 없는 schema 는 기존 dump / load 그대로 사용
+    """
+    schema = schema() if isinstance(schema, type) else schema
+    if not isinstance(schema, Schema) or getattr(schema, "_compiled", False):
+        return schema
+
+    dump, load = compile_dump(schema), compile_load(schema)
+    if dump is not None:
+        schema.dump = dump
+    if load is not None:
+        schema.load = load
+    schema._compiled = True
+    return schema
+
+
+def _view_functions(app: Flask) -> Iterable[Callable]:
+    yield from app.view_functions.values()
+    # 에러 handler (ex. handle_api_error 의 marshal_with)
+    for handlers in app.error_handler_spec.values():
+        for handler_map in handlers.values():
+            yield from handler_map.values()
+
+
+def compile_view_schemas(app: Flask) -> int:
+    """
+    등록된 view / 에러 handler 의 use_kwargs / marshal_with schema 를 compile_schema 로 교체 (create_app 에서 라우트 등록 후 1번 호출)
+
+    - flask_apispec 은 annotation 에 저장된 schema 로 요청 검증 / 응답 직렬화를 하므로, 저장된 값을 교체하면 WSGI / ASGI 모두 적용
+    - 교체한 schema 개수 return
+    """
+    compiled, seen = 0, set()
+    for view_func in _view_functions(app):
+        apispec = getattr(view_func, "__apispec__", dict())
+        annotations = apispec.get("args", list()) + apispec.get("schemas", list())
+        for annotation in annotations:
+            if id(annotation) in seen:
+                continue
+            seen.add(id(annotation))
+            for option in annotation.options:
+                if "args" in option:
+                    option["args"] = compile_schema(option["args"])
+                    compiled += 1
+                    continue
+                for response in option.values():
+                    if isinstance(response, dict) and response.get("schema") is not None:
+                        response["schema"] = compile_schema(response["schema"])
+                        compiled += 1
+    return compiled
@@ -0,0 +1,226 @@
+import json
+import logging
+import random
+import sys
+from datetime import datetime
+from queue import Full, Queue
+from threading import Lock, Thread, local
+from types import FrameType
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from cachetools import TTLCache
+from flask import has_request_context, request
+from pymongo import monitoring
+
+from app.models.slow_query import SlowQuery
+from app.utils.reads import run_steps, suspended_frames
+
+# 기록 대상 명령 -> 조회 조건이 들어있는 key
+QUERY_KEYS = {"find": "filter", "aggregate": "pipeline", "count": "query", "distinct": "query", "findAndModify": "query", "update": "updates", "delete": "deletes"}
+# explain 명령에 넣을 수 없는 key (session / transaction / write concern)
+EXPLAIN_EXCLUDED_KEYS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+
+logger = logging.getLogger(__name__)
+
+# 기록용 thread 종료 신호 (configure 로 queue 를 바꿀 때 이전 queue 에 넣음)
+_STOP = object()
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    """
+    threshold_ms 보다 오래 걸린 MongoDB 명령을 slow_query (capped collection) 에 기록
+
+    - 요청 thread 에서는 조회 조건의 형태 (값은 "?") / 호출한 model 함수 / 소요 시간만 만들어서 queue 에 넣음
+    - explain (executionStats) 실행과 기록 추가는 별도 thread 에서 진행, queue 가 가득 차면 버림
+    - explain 은 sample_rate 비율로, 같은 형태의 조회는 explain_interval 초에 한 번만 실행
+    - 기록용 thread 에서 실행한 명령 (explain / 기록 추가) 은 다시 기록하지 않음
+    """
+
+    def __init__(self, threshold_ms: Optional[float] = None, sample_rate: float = 0.2, explain_interval: float = 300, queue_size: int = 256):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._explained = TTLCache(maxsize=1024, ttl=explain_interval)
+        self._commands: Dict[Tuple[Any, int], Dict] = dict()
+        self._worker: Optional[Thread] = None
+        self._worker_lock = Lock()
+        self._local = local()
+
+    def configure(self, threshold_ms: Optional[float], sample_rate: float, explain_interval: float, queue_size: int):
+        # 이전 queue 를 처리하던 thread 는 남은 기록을 처리하고 종료한 뒤 queue 교체 (다음 기록 때 새 queue 로 thread 시작)
+        self._stop_worker()
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self._explained = TTLCache(maxsize=1024, ttl=explain_interval)
+        self._queue = Queue(maxsize=queue_size)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms is not None
+
+    def started(self, event):
+        # succeeded / failed 이벤트에는 명령 내용이 없으므로 기록 대상 명령만 잠시 보관
+        if not self.enabled or event.command_name not in QUERY_KEYS or getattr(self._local, "recording", False):
+            return
+        if event.command.get(event.command_name) == SlowQuery._meta["collection"]:
+            return
+        self._commands[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        command = self._commands.pop((event.connection_id, event.request_id), None)
+        if command is None or event.duration_micros < self.threshold_ms * 1000:
+            return
+
+        # 이벤트는 명령을 실행한 thread 에서 호출되므로, 호출한 model 함수는 여기서 확인
+        record = {
+            "command": event.command_name,
+            "collection_name": str(command.get(event.command_name)),
+            "shape": query_shape(event.command_name, command),
+            "caller": find_caller(),
+            "endpoint": request.endpoint if has_request_context() else None,
+            "duration_ms": event.duration_micros / 1000,
+            "created_at": datetime.utcnow(),
+        }
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((event.database_name, command, record))
+        except Full:
+            self.dropped += 1
+
+    def _ensure_worker(self):
+        # fork 이후 (gunicorn 등) 에도 동작하도록 처음 기록할 때 thread 시작
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, args=(self._queue,), name="slow-query-recorder", daemon=True)
+                self._worker.start()
+
+    def _stop_worker(self):
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._queue.put(_STOP)
+                self._worker.join()
+            self._worker = None
+
+    def _run(self, queue: Queue):
+        self._local.recording = True
+        while True:
+            item = queue.get()
+            if item is _STOP:
+                return
+            self._record(*item)
+
+    def _record(self, database_name: str, command: Dict, record: Dict):
+        # explain 에 실패해도 실행 계획 없이 기록은 추가
+        try:
+            if self._should_explain(record):
+                record.update(summarize_plan(self._explain(database_name, command)))
+        except Exception:
+            logger.warning("slow query explain failed: %s %s", record["command"], record["collection_name"], exc_info=True)
+        try:
+            SlowQuery.insert_record(record)
+        except Exception:
+            logger.exception("slow query insert failed: %s %s", record["command"], record["collection_name"])
+
+    def _should_explain(self, record: Dict) -> bool:
+        key = (record["command"], record["collection_name"], record["shape"])
+        if key in self._explained or random.random() >= self.sample_rate:
+            return False
+        self._explained[key] = True
+        return True
+
+    @staticmethod
+    def _explain(database_name: str, command: Dict) -> Dict:
+        spec = {key: value for key, value in command.items() if key not in EXPLAIN_EXCLUDED_KEYS and not key.startswith("$")}
+        # 여러 건을 한 번에 보낸 update / delete 는 첫 번째 조건으로 확인 (explain 은 1건만 지원)
+        for key in ("updates", "deletes"):
+            if key in spec:
+                spec[key] = spec[key][:1]
+        return SlowQuery._get_db().client[database_name].command("explain", spec, verbosity="executionStats")
+
+
+def normalize(value: Any) -> Any:
+    # 조건의 값은 "?" 로 바꾸고 field / 연산자 구조만 남김 ($and, $or, pipeline 처럼 조건 목록인 경우는 각각 변환)
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+        return [normalize(item) for item in value]
+    return "?"
+
+
+def query_shape(command_name: str, command: Dict) -> str:
+    query = command.get(QUERY_KEYS[command_name]) or dict()
+    if command_name in ("update", "delete"):
+        query = query[0].get("q", dict()) if query else dict()
+
+    shape = {"filter": normalize(query)}
+    if command.get("sort"):
+        shape["sort"] = dict(command["sort"])
+    return json.dumps(shape, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stack_frames(frame: Optional[FrameType]) -> Iterator[FrameType]:
+    # 호출 stack 의 frame (run_steps 로 실행 중인 조회 generator 는 단계를 yield 한 generator 의 frame 으로 대신함)
+    while frame is not None:
+        if frame.f_code is run_steps.__code__:
+            yield from suspended_frames(frame.f_locals["steps"])
+        elif frame.f_globals.get("__name__") != run_steps.__module__:
+            yield frame
+        frame = frame.f_back
+
+
+def find_caller() -> Optional[str]:
+    # 호출 stack 에서 가장 가까운 model 함수 (ex. "Post.get_post_list"), 없으면 가장 가까운 app 안의 함수
+    fallback = None
+    for frame in _stack_frames(sys._getframe(1)):
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.models."):
+            local_vars = frame.f_locals
+            owner = local_vars.get("cls")
+            if not isinstance(owner, type) and "self" in local_vars:
+                owner = type(local_vars["self"])
+            return f"{owner.__name__ if isinstance(owner, type) else module}.{frame.f_code.co_name}"
+        if fallback is None and module.startswith("app.") and module != __name__:
+            fallback = f"{module}.{frame.f_code.co_name}"
+    return fallback
+
+
+def _iter_plan_nodes(value: Any) -> Iterator[Dict]:
+    # 실행 계획 안의 모든 dict (선택되지 않은 계획은 제외)
+    if isinstance(value, dict):
+        yield value
+        for key, item in value.items():
+            if key not in ("rejectedPlans", "allPlansExecution"):
+                yield from _iter_plan_nodes(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_plan_nodes(item)
+
+
+def summarize_plan(explain: Dict) -> Dict:
+    # explain 결과에서 전체 조회 (COLLSCAN) / index 조회 여부와 확인한 문서 수만 추출
+    stages, indexes, stats = list(), list(), None
+    for node in _iter_plan_nodes(explain):
+        if isinstance(node.get("stage"), str):
+            stages.append(node["stage"])
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+        if stats is None and "totalDocsExamined" in node:
+            stats = node
+
+    plan_stage = next((stage for stage in ("COLLSCAN", "IXSCAN", "IDHACK") if stage in stages), stages[0] if stages else None)
+    summary = {"plan_stage": plan_stage, "plan_indexes": list(dict.fromkeys(indexes))}
+    if stats is not None:
+        summary.update(n_returned=stats.get("nReturned"), docs_examined=stats.get("totalDocsExamined"), keys_examined=stats.get("totalKeysExamined"))
+    return summary
+
+
+slow_query_recorder: SlowQueryRecorder = SlowQueryRecorder()
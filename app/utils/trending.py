@@ -0,0 +1,68 @@
+import math
+import time
+from datetime import datetime
+from typing import Optional
+
+
+class TrendingScorer:
+    """
+    좋아요 / 댓글에 시간 감쇠 (half_life 마다 절반) 를 적용한 인기 점수 계산
+
+    - 이벤트마다 weight * 2^((t - epoch) / half_life) 를 포스트의 trend_score 에 $inc 로 더하면,
+      모든 포스트의 점수가 같은 비율로 감쇠하므로 저장된 값의 순서가 곧 현재 인기 순서 (주기적으로 전체를 다시 계산할 필요 없음)
+    - 값이 계속 커지지 않도록 epoch 는 EPOCH_HALF_LIVES 번의 half_life 마다 바뀌며 (모든 프로세스가 시각만으로 같은 epoch 를 계산),
+      이전 epoch 의 점수는 다음 이벤트 때 포스트별로 현재 epoch 기준으로 변환
+    - 이전 epoch 의 점수는 바뀐 직후 MERGE_HALF_LIVES 번의 half_life 동안만 순위에 함께 반영 (그 뒤에는 1/2^16 이하로 감쇠되어 무시)
+    """
+
+    EPOCH_HALF_LIVES = 256
+    MERGE_HALF_LIVES = 16
+
+    def __init__(self, half_life_hours: float = 24, like_weight: float = 1.0, comment_weight: float = 2.0):
+        self.half_life = half_life_hours * 3600
+        self.like_weight = like_weight
+        self.comment_weight = comment_weight
+
+    def configure(self, half_life_hours: float, like_weight: float, comment_weight: float):
+        self.half_life = half_life_hours * 3600
+        self.like_weight = like_weight
+        self.comment_weight = comment_weight
+
+    @property
+    def epoch_seconds(self) -> int:
+        return int(self.half_life * self.EPOCH_HALF_LIVES)
+
+    def epoch(self, now: Optional[float] = None) -> int:
+        # 현재 epoch 의 시작 시각 (unix time)
+        now = time.time() if now is None else now
+        return int(now // self.epoch_seconds) * self.epoch_seconds
+
+    def previous_epoch(self, now: Optional[float] = None) -> Optional[int]:
+        # 이전 epoch 의 점수가 아직 순위에 영향을 줄 수 있는 기간이면 이전 epoch 시작 시각, 아니면 None
+        now = time.time() if now is None else now
+        epoch = self.epoch(now)
+        return epoch - self.epoch_seconds if now - epoch < self.half_life * self.MERGE_HALF_LIVES else None
+
+    def delta(self, weight: float, epoch: int, now: Optional[float] = None) -> float:
+        # epoch 기준으로 저장할 이벤트 점수
+        now = time.time() if now is None else now
+        return weight * math.pow(2, (now - epoch) / self.half_life)
+
+    def rebase_factor(self, old_epoch: int, new_epoch: int) -> float:
+        # old_epoch 기준 점수 -> new_epoch 기준 점수
+        return math.pow(2, (old_epoch - new_epoch) / self.half_life)
+
+    def decay(self, score: Optional[float], epoch: Optional[int], now: Optional[float] = None) -> float:
+        # 저장된 점수를 현재 시각 기준 점수로 변환 (좋아요 취소 등으로 음수가 된 경우 0)
+        if not score or epoch is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return max(score * math.pow(2, (epoch - now) / self.half_life), 0.0)
+
+
+def utc_timestamp(value: datetime) -> float:
+    # document 에 저장된 UTC 시각 (timezone 없는 datetime) -> unix time
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+trending_scorer: TrendingScorer = TrendingScorer()
@@ -7,6 +7,8 @@ from app.views.user import UserView
 from app.views.category import CategoryView
 from app.views.post import PostMasterView, PostDetailView
 from app.views.comment import CommentListView, CommentInfoView
+from app.views.job import JobView
+from app.views.monitoring import MonitoringView
 
 bp: Blueprint = Blueprint("api", __name__)
 
@@ -22,6 +24,8 @@ def register_api(app: Flask):
     PostDetailView.register(bp, route_base="/posts/<object_id:post_id>", trailing_slash=False)
     CommentListView.register(bp, route_base="/comments", trailing_slash=False)
     CommentInfoView.register(bp, route_base="/comments/<object_id:comment_id>", trailing_slash=False)
+    JobView.register(bp, route_base="/jobs/<object_id:job_id>", trailing_slash=False)
+    MonitoringView.register(bp, route_base="/monitoring", trailing_slash=False)
 
     # 블루프린트를 app에 등록
     app.register_blueprint(bp)
@@ -32,4 +36,4 @@ def register_api(app: Flask):
 
 @marshal_with(ApiStatusSchema)
 def handle_api_error(err: ApiError):
-    return {"message": err.message, "status_code": err.status_code}, err.status_code
+    return {"message": err.message, "status_code": err.status_code}, err.status_code, err.headers
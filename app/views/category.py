@@ -1,13 +1,38 @@
 from typing import Optional
 
+from flask import current_app, request
 from flask_apispec import doc, use_kwargs, marshal_with
 from flask_classful import FlaskView, route
 
 from app.api import ApiStatusSchema
 from app.decorators.user import login_required, master_login_required
 from app.serializers.category import CategorySearchFormSchema, CategoryInfoSchema, CategoryCreateFormSchema, CategoryDeleteFormSchema
-from app.models.category import Category
-from app.models.post import Post
+from app.serializers.job import JobInfoSchema
+from app.models.category import Category, category_registry
+from app.models.job import Job
+from app.utils.conditional import etag_headers, is_not_modified, make_etag, not_modified_response
+from app.utils.fast_json import jsonify
+from app.utils.prefetch import prefetch_steps
+from app.utils.projection import response_projection
+from app.utils.raw import dump_raw_steps
+from app.utils.reads import Call, ReadSteps, run_steps
+
+
+def category_list_view_steps(name: Optional[str] = None) -> ReadSteps:
+    # 카테고리 저장소 버전이 If-None-Match 와 같으면 조회 / 직렬화 없이 304
+    etag = make_etag("category", (yield Call(lambda: category_registry.version)))
+    conditional = current_app.config["CONDITIONAL_RESPONSES"]
+    if conditional and is_not_modified(etag, request.headers.get("If-None-Match")):
+        return not_modified_response(etag)
+
+    # 카테고리는 저장소에서 조회하고, 작성자는 응답 schema 에 있는 field 만 조회
+    as_pymongo = current_app.config["RAW_LIST_RESPONSES"]
+    categories = yield Call(Category.get_category_list, (name, as_pymongo))
+    if as_pymongo:
+        response = jsonify((yield from dump_raw_steps(categories, Category)))
+        response.headers.extend(etag_headers(etag, enabled=conditional))
+        return response
+    return (yield from prefetch_steps(categories, "created_by", only=response_projection(Category).references)), 200, etag_headers(etag, enabled=conditional)
 
 
 class CategoryView(FlaskView):
@@ -18,7 +43,7 @@ class CategoryView(FlaskView):
     @marshal_with(ApiStatusSchema, code=500, description="조회 실패")
     @login_required
     def list(self, name: Optional[str] = None):
-        return Category.get_category_list(name=name), 200
+        return run_steps(category_list_view_steps(name=name))
 
     @route("/add", methods=["POST"])
     @doc(description="카테고리 추가 (관리자용)", summary="카테고리 추가 API")
@@ -32,9 +57,9 @@ class CategoryView(FlaskView):
         return {"message": "생성 성공"}, 201
 
     @route("/delete", methods=["DELETE"])
-    @doc(description="카테고리 삭제 (관리자용)", summary="카테고리 삭제 API")
+    @doc(description="카테고리 삭제 (관리자용, 포스트들에서 카테고리를 제거하는 작업은 백그라운드로 진행)", summary="카테고리 삭제 API")
     @use_kwargs(CategoryDeleteFormSchema)
-    @marshal_with(ApiStatusSchema, code=204, description="삭제 성공")
+    @marshal_with(JobInfoSchema, code=202, description="삭제 완료, 포스트 정리 작업 등록")
     @marshal_with(ApiStatusSchema, code=404, description="조회 실패")
     @marshal_with(ApiStatusSchema, code=422, description="요청 양식 미흡")
     @marshal_with(ApiStatusSchema, code=500, description="삭제 실패")
@@ -43,9 +68,8 @@ class CategoryView(FlaskView):
         # 카테고리 조회
         category = Category.get_category_by_name(name=name)
 
-        # 포스트들 중 해당 카테고리가 있으면 제거하기
-        Post.remove_category_from_all(category=category)
-
-        # 최종적으로 삭제
+        # 카테고리를 먼저 삭제 (이후로는 새 포스트에 추가되지 않고, 남은 참조는 조회 시 제외됨)
         category.delete_category()
-        return {"message": "삭제 성공"}, 204
+
+        # 포스트들에 남은 카테고리 참조는 chunk 단위 작업으로 제거 (진행 상황은 GET /jobs/<job_id>)
+        return Job.enqueue("category.remove_references", params={"category_id": category.id}), 202
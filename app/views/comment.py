@@ -1,12 +1,46 @@
+from datetime import datetime
+from typing import Optional, Tuple, List
+
 from bson import ObjectId
+from flask import current_app, request, g, Response, stream_with_context
 from flask_apispec import use_kwargs, marshal_with, doc
 from flask_classful import FlaskView, route
 
 from app.api import ApiStatusSchema
-from app.decorators.user import login_required
+from app.decorators.user import login_required, master_login_required
+from app.serializers.bulk import BulkImportFormSchema, BulkImportResultSchema
+from app.serializers.export import ExportFormSchema
 from app.serializers.comment import CommentListSearchFormSchema, CommentInfoSchema, CommentCreateFormSchema
 from app.models.comment import Comment
 from app.models.post import Post
+from app.utils.bulk import import_jsonl
+from app.utils.cursor import make_next_cursor
+from app.utils.export import build_export_query, iter_ndjson
+from app.utils.fast_json import jsonify
+from app.utils.prefetch import prefetch_steps
+from app.utils.projection import response_projection
+from app.utils.raw import dump_raw_steps
+from app.utils.reads import ReadSteps, run_steps
+
+
+def comment_list_view_steps(post_id: ObjectId, page_no: int, page_size: int, cursor: Optional[Tuple[datetime, ObjectId]] = None) -> ReadSteps:
+    # 포스트 확인 (댓글 조회 조건에만 사용하므로 id 만 조회)
+    post = yield from Post.post_detail_steps(post_id=post_id, fields=("id",))
+
+    # 댓글 목록 조회 (응답 schema 에 있는 field 만 조회)
+    projection, as_pymongo = response_projection(Comment), current_app.config["RAW_LIST_RESPONSES"]
+    comments = yield from Comment.comment_list_steps(page_no=page_no, page_size=page_size, post_id=post.id, cursor=cursor, fields=projection.fields, as_pymongo=as_pymongo)
+
+    # 다음 페이지 커서는 헤더로 전달 (응답 body 는 기존 형식 유지)
+    next_cursor = make_next_cursor(comments, page_size=page_size)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+    # pymongo dict 는 응답 schema 로 만든 raw 직렬화 함수로 직렬화
+    if as_pymongo:
+        response = jsonify((yield from dump_raw_steps(comments, Comment)))
+        response.headers.extend(headers)
+        return response
+    return (yield from prefetch_steps(comments, "post", "created_by", "likes", only=projection.references)), 200, headers
 
 
 class CommentListView(FlaskView):
@@ -17,12 +51,8 @@ class CommentListView(FlaskView):
     @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
     @marshal_with(ApiStatusSchema, code=500, description="댓글 목록 조회 실패")
     @login_required
-    def list(self, post_id: ObjectId, page_no: int, page_size: int):
-        # 포스트 조회
-        post = Post.get_post_detail(post_id=post_id)
-
-        # 댓글 목록 조회
-        return Comment.get_comment_list(page_no=page_no, page_size=page_size, post=post), 200
+    def list(self, post_id: ObjectId, page_no: int, page_size: int, cursor: Optional[Tuple[datetime, ObjectId]] = None):
+        return run_steps(comment_list_view_steps(post_id=post_id, page_no=page_no, page_size=page_size, cursor=cursor))
 
     @route("", methods=["POST"])
     @doc(description="댓글 추가", summary="댓글 추가 API")
@@ -32,13 +62,38 @@ class CommentListView(FlaskView):
     @marshal_with(ApiStatusSchema, code=500, description="댓글 추가 실패")
     @login_required
     def create(self, post_id: ObjectId, content: str):
-        # 포스트 조회
-        post = Post.get_post_detail(post_id=post_id)
+        # 포스트 확인 (댓글의 참조로만 사용하므로 id 만 조회)
+        post = Post.get_post_detail(post_id=post_id, fields=("id",))
 
         # 댓글 추가
         Comment.create_comment(post=post, content=content)
         return {"message": "댓글 추가 성공"}, 201
 
+    @route("/bulk", methods=["POST"])
+    @doc(description="댓글 대량 추가 (관리자용, 요청 body 는 한 줄에 댓글 하나씩인 JSONL)", summary="댓글 대량 추가 API")
+    @use_kwargs(BulkImportFormSchema, locations=("query",))
+    @marshal_with(BulkImportResultSchema, code=200, description="대량 추가 완료 (row 별 실패 사유 포함)")
+    @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
+    @marshal_with(ApiStatusSchema, code=500, description="댓글 대량 추가 실패")
+    @master_login_required
+    def bulk_create(self, ordered: bool, chunk_size: int):
+        result = import_jsonl(
+            request.stream,
+            schema=CommentCreateFormSchema(),
+            insert_rows=lambda rows: Comment.bulk_create_comments(rows=rows, created_by=g.user, ordered=ordered),
+            chunk_size=chunk_size,
+        )
+        return result.to_dict(), 200
+
+    @route("/export", methods=["GET"])
+    @doc(description="댓글 export (관리자용, NDJSON 스트리밍)", summary="댓글 export API")
+    @use_kwargs(ExportFormSchema, locations=("query",))
+    @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
+    @master_login_required
+    def export(self, updated_from: Optional[datetime] = None, updated_to: Optional[datetime] = None, field_names: Optional[List[str]] = None):
+        query, projection = build_export_query(Comment, updated_from=updated_from, updated_to=updated_to, fields=field_names)
+        return Response(stream_with_context(iter_ndjson(Comment, query=query, projection=projection)), mimetype="application/x-ndjson")
+
 
 class CommentInfoView(FlaskView):
     @route("", methods=["DELETE"])
@@ -65,7 +120,7 @@ class CommentInfoView(FlaskView):
     @login_required
     def like(self, comment_id: ObjectId):
         # 댓글 조회
-        comment = Comment.get_comment_by_id(comment_id=comment_id)
+        comment = Comment.get_comment_by_id(comment_id=comment_id, with_likes=False)
 
         # 댓글 좋아요 추가 진행
         comment.add_like()
@@ -80,7 +135,7 @@ class CommentInfoView(FlaskView):
     @login_required
     def unlike(self, comment_id: ObjectId):
         # 댓글 조회
-        comment = Comment.get_comment_by_id(comment_id=comment_id)
+        comment = Comment.get_comment_by_id(comment_id=comment_id, with_likes=False)
 
         # 댓글 좋아요 추가 진행
         comment.remove_like()
@@ -0,0 +1,19 @@
+from bson import ObjectId
+from flask_apispec import doc, marshal_with
+from flask_classful import FlaskView, route
+
+from app.api import ApiStatusSchema
+from app.decorators.user import master_login_required
+from app.serializers.job import JobInfoSchema
+from app.models.job import Job
+
+
+class JobView(FlaskView):
+    @route("", methods=["GET"])
+    @doc(description="백그라운드 작업 진행 상황 확인 (관리자용)", summary="작업 상태 조회 API")
+    @marshal_with(JobInfoSchema, code=200, description="조회 성공")
+    @marshal_with(ApiStatusSchema, code=404, description="조회 실패")
+    @marshal_with(ApiStatusSchema, code=500, description="조회 실패")
+    @master_login_required
+    def get_job(self, job_id: ObjectId):
+        return Job.get_job(job_id=job_id), 200
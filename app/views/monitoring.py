@@ -0,0 +1,21 @@
+from typing import Optional
+
+from flask_apispec import doc, use_kwargs, marshal_with
+from flask_classful import FlaskView, route
+
+from app.api import ApiStatusSchema
+from app.decorators.user import master_login_required
+from app.serializers.monitoring import SlowQuerySearchFormSchema, SlowQueryInfoSchema
+from app.models.slow_query import SlowQuery
+
+
+class MonitoringView(FlaskView):
+    @route("/slow-queries", methods=["GET"])
+    @doc(description="느린 MongoDB 명령 기록 확인 (관리자용)", summary="느린 조회 기록 API")
+    @use_kwargs(SlowQuerySearchFormSchema, locations=("query",))
+    @marshal_with(SlowQueryInfoSchema(many=True), code=200, description="조회 성공")
+    @marshal_with(ApiStatusSchema, code=403, description="권한 없음")
+    @marshal_with(ApiStatusSchema, code=500, description="조회 실패")
+    @master_login_required
+    def slow_queries(self, command: Optional[str] = None, collection: Optional[str] = None, plan_stage: Optional[str] = None, limit: int = 50):
+        return SlowQuery.get_slow_query_list(command=command, collection_name=collection, plan_stage=plan_stage, limit=limit), 200
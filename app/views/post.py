@@ -1,13 +1,82 @@
-from typing import Optional, List
+from datetime import datetime
+from functools import partial
+from typing import Optional, List, Tuple, Union, Dict
 
 from bson import ObjectId
+from flask import current_app, request, g, Response, stream_with_context
 from flask_apispec import use_kwargs, marshal_with, doc
 from flask_classful import FlaskView, route
 
 from app.api import ApiStatusSchema
-from app.decorators.user import login_required
-from app.serializers.post import PostMasterSearchFormSchema, PostCreateFormSchema, PostUpdateFormSchema, PostMasterInfoSchema, PostDetailInfoSchema
+from app.decorators.user import login_required, master_login_required
+from app.serializers.bulk import BulkImportFormSchema, BulkImportResultSchema
+from app.serializers.export import ExportFormSchema
+from app.serializers.post import PostMasterSearchFormSchema, PostTrendingSearchFormSchema, PostTrendingInfoSchema, PostCreateFormSchema, PostUpdateFormSchema, PostMasterInfoSchema, PostDetailInfoSchema
+from app.models.category import category_registry
 from app.models.post import Post
+from app.utils.bulk import import_jsonl
+from app.utils.cache import post_list_cache
+from app.utils.conditional import etag_headers, is_not_modified, make_etag, not_modified_response
+from app.utils.cursor import make_next_cursor
+from app.utils.export import build_export_query, iter_ndjson
+from app.utils.fast_json import jsonify
+from app.utils.prefetch import prefetch_references, prefetch_steps
+from app.utils.projection import response_projection
+from app.utils.raw import raw_serializer
+from app.utils.reads import Call, ReadSteps, run_steps
+
+
+def post_detail_etag(version: Optional[int], category_version: int) -> str:
+    # 포스트 version (좋아요 추가/취소 포함) + 카테고리 저장소 버전 (삭제된 카테고리는 포스트에서 제거되기 전에도 응답에서 제외되므로 함께 사용)
+    return make_etag("post", version or 0, category_version)
+
+
+def make_post_list_response(posts: List[Union[Post, Dict]], data: List[Dict], page_size: int, title: Optional[str], cache_key: Optional[str]) -> Response:
+    # 다음 페이지 커서는 헤더로 전달 (응답 body 는 기존 형식 유지, 제목 검색은 랭킹 순이므로 page_no 로만 조회)
+    next_cursor = make_next_cursor(posts, page_size=page_size) if not title else None
+
+    # 직렬화한 응답을 캐시에 저장 (marshal_with 와 같은 jsonify 사용)
+    response = jsonify(data)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    # 목록은 여러 포스트로 만들어지므로 body hash 를 ETag 로 사용 (캐시된 응답에도 함께 저장, If-None-Match 비교는 after_request 훅에서 처리)
+    if current_app.config["CONDITIONAL_RESPONSES"]:
+        response.add_etag(weak=True)
+    post_list_cache.set_response(cache_key, response)
+    return response
+
+
+def post_list_view_steps(page_no: int, page_size: int, title: Optional[str] = None, category_id: Optional[ObjectId] = None, cursor: Optional[Tuple[datetime, ObjectId]] = None) -> ReadSteps[Response]:
+    # 캐시된 응답이 있으면 조회/직렬화 없이 그대로 return
+    cache_key, cached_response = yield Call(partial(post_list_cache.lookup, page_no=page_no, page_size=page_size, title=title, category_id=category_id, cursor=cursor))
+    if cached_response is not None:
+        return cached_response
+
+    # 응답 schema 에 있는 field 만 조회 (RAW_LIST_RESPONSES 이면 Document 를 만들지 않고 pymongo dict 로 조회 / 같은 schema 로 만든 raw 직렬화 함수로 직렬화)
+    projection, as_pymongo = response_projection(Post), current_app.config["RAW_LIST_RESPONSES"]
+    posts = yield from Post.post_list_steps(page_no=page_no, page_size=page_size, title=title, category_id=category_id, cursor=cursor, fields=projection.fields, as_pymongo=as_pymongo)
+    if as_pymongo:
+        data = yield from raw_serializer(PostMasterInfoSchema, Post).dump_steps(posts)
+    else:
+        posts = yield from prefetch_steps(posts, "created_by", "categories", only=projection.references)
+        data = PostMasterInfoSchema(many=True).dump(posts)
+    return make_post_list_response(posts, data, page_size=page_size, title=title, cache_key=cache_key)
+
+
+def post_detail_view_steps(post_id: ObjectId) -> ReadSteps:
+    # If-None-Match 가 있으면 version 만 먼저 조회해서, 바뀌지 않았으면 포스트 조회 / 직렬화 없이 304
+    conditional, category_version = current_app.config["CONDITIONAL_RESPONSES"], (yield Call(lambda: category_registry.version))
+    if conditional and request.headers.get("If-None-Match"):
+        version = yield from Post.post_version_steps(post_id)
+        etag = post_detail_etag(version, category_version)
+        if version is not None and is_not_modified(etag, request.headers["If-None-Match"]):
+            return not_modified_response(etag)
+
+    # 응답 schema 에 있는 field (+ ETag 용 version) 만 조회하고, 작성자 / 카테고리 / 좋아요 사용자는 한 번에 불러옴
+    projection = response_projection(Post)
+    post = yield from Post.post_detail_steps(post_id=post_id, fields=projection.fields + ("version",) if projection.fields else None)
+    post = (yield from prefetch_steps([post], "created_by", "categories", "likes", only=projection.references))[0]
+    return post, 200, etag_headers(post_detail_etag(post.version, category_version), enabled=conditional)
 
 
 class PostMasterView(FlaskView):
@@ -18,8 +87,19 @@ class PostMasterView(FlaskView):
     @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
     @marshal_with(ApiStatusSchema, code=500, description="포스트 목록 조회 실패")
     @login_required
-    def get_list(self, page_no: int, page_size: int, title: Optional[str] = None, category_id: Optional[ObjectId] = None):
-        return Post.get_post_list(page_no=page_no, page_size=page_size, title=title, category_id=category_id), 200
+    def get_list(self, page_no: int, page_size: int, title: Optional[str] = None, category_id: Optional[ObjectId] = None, cursor: Optional[Tuple[datetime, ObjectId]] = None):
+        return run_steps(post_list_view_steps(page_no=page_no, page_size=page_size, title=title, category_id=category_id, cursor=cursor))
+
+    @route("/trending", methods=["GET"])
+    @doc(description="최근 좋아요 / 댓글이 많은 순 (시간 감쇠 적용) 으로 포스트 목록 조회", summary="인기 포스트 목록 조회 API")
+    @use_kwargs(PostTrendingSearchFormSchema)
+    @marshal_with(PostTrendingInfoSchema(many=True), code=200, description="인기 포스트 목록 조회 성공")
+    @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
+    @marshal_with(ApiStatusSchema, code=500, description="인기 포스트 목록 조회 실패")
+    @login_required
+    def get_trending_list(self, page_size: int):
+        projection = response_projection(Post)
+        return prefetch_references(Post.get_trending_list(page_size=page_size, fields=projection.fields), "created_by", "categories", only=projection.references), 200
 
     @route("", methods=["POST"])
     @doc(description="포스트 추가", summary="포스트 추가 API")
@@ -32,6 +112,31 @@ class PostMasterView(FlaskView):
         Post.create_post(title=title, content=content, category_ids=category_ids)
         return {"message": "생성 성공"}, 201
 
+    @route("/bulk", methods=["POST"])
+    @doc(description="포스트 대량 추가 (관리자용, 요청 body 는 한 줄에 포스트 하나씩인 JSONL)", summary="포스트 대량 추가 API")
+    @use_kwargs(BulkImportFormSchema, locations=("query",))
+    @marshal_with(BulkImportResultSchema, code=200, description="대량 추가 완료 (row 별 실패 사유 포함)")
+    @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
+    @marshal_with(ApiStatusSchema, code=500, description="포스트 대량 추가 실패")
+    @master_login_required
+    def bulk_add_posts(self, ordered: bool, chunk_size: int):
+        result = import_jsonl(
+            request.stream,
+            schema=PostCreateFormSchema(),
+            insert_rows=lambda rows: Post.bulk_create_posts(rows=rows, created_by=g.user, ordered=ordered),
+            chunk_size=chunk_size,
+        )
+        return result.to_dict(), 200
+
+    @route("/export", methods=["GET"])
+    @doc(description="포스트 export (관리자용, NDJSON 스트리밍)", summary="포스트 export API")
+    @use_kwargs(ExportFormSchema, locations=("query",))
+    @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
+    @master_login_required
+    def export(self, updated_from: Optional[datetime] = None, updated_to: Optional[datetime] = None, field_names: Optional[List[str]] = None):
+        query, projection = build_export_query(Post, updated_from=updated_from, updated_to=updated_to, fields=field_names, hidden_fields=("title_ngrams",))
+        return Response(stream_with_context(iter_ndjson(Post, query=query, projection=projection)), mimetype="application/x-ndjson")
+
 
 class PostDetailView(FlaskView):
     @route("", methods=["GET"])
@@ -42,7 +147,7 @@ class PostDetailView(FlaskView):
     @marshal_with(ApiStatusSchema, code=500, description="포스트 조회 실패")
     @login_required
     def get_post_detail(self, post_id: ObjectId):
-        return Post.get_post_detail(post_id=post_id), 200
+        return run_steps(post_detail_view_steps(post_id=post_id))
 
     @route("", methods=["PUT"])
     @doc(description="포스트 수정", summary="포스트 수정 API")
@@ -54,7 +159,7 @@ class PostDetailView(FlaskView):
     @login_required
     def update_post(self, post_id: ObjectId, title: str, content: str, category_ids: Optional[List[ObjectId]] = None):
         # 포스트 검색
-        post = Post.get_post_detail(post_id=post_id)
+        post = Post.get_post_detail(post_id=post_id, with_likes=False)
 
         # 포스트 수정
         post.update_post(title=title, content=content, category_ids=category_ids)
@@ -69,7 +174,7 @@ class PostDetailView(FlaskView):
     @login_required
     def delete_post(self, post_id: ObjectId):
         # 포스트 검색
-        post = Post.get_post_detail(post_id=post_id)
+        post = Post.get_post_detail(post_id=post_id, with_likes=False)
 
         # 포스트 삭제
         post.delete_post()
@@ -84,7 +189,7 @@ class PostDetailView(FlaskView):
     @login_required
     def add_like(self, post_id: ObjectId):
         # 포스트 검색
-        post = Post.get_post_detail(post_id=post_id)
+        post = Post.get_post_detail(post_id=post_id, with_likes=False)
 
         # 포스트 좋아요 추가하기
         post.add_like()
@@ -99,7 +204,7 @@ class PostDetailView(FlaskView):
     @login_required
     def remove_like(self, post_id: ObjectId):
         # 포스트 검색
-        post = Post.get_post_detail(post_id=post_id)
+        post = Post.get_post_detail(post_id=post_id, with_likes=False)
 
         # 포스트 좋아요 추가하기
         post.remove_like()
@@ -1,17 +1,29 @@
-import bcrypt
-from flask import g
+from datetime import datetime
+from flask import current_app, g, Response, stream_with_context
 from flask_classful import FlaskView, route
 from flask_apispec import use_kwargs, marshal_with, doc
-from typing import Optional
+from typing import Optional, List
 from marshmallow import ValidationError
 from mongoengine import OperationError
 
 from app.api import ApiError, ApiStatusSchema
-from app.serializers.user import UserCreateFormSchema, UserLoginFormSchema, UserInfoSchema, UserSearchFormSchema, UserUpdateFormSchema
+from app.serializers.user import UserCreateFormSchema, UserDeleteFormSchema, UserLoginFormSchema, UserInfoSchema, UserSearchFormSchema, UserUpdateFormSchema
 from app.serializers.auth_token import AuthTokenSchema
+from app.serializers.export import ExportFormSchema
 from app.models.user import User
 from app.models.auth_token import AuthToken
+from app.decorators.rate_limit import rate_limited
 from app.decorators.user import login_required, master_login_required
+from app.utils.export import build_export_query, iter_ndjson
+from app.utils.fast_json import jsonify
+from app.utils.password import password_hasher
+from app.utils.projection import response_projection
+from app.utils.raw import dump_raw
+from app.utils.reads import ReadSteps, run_steps
+
+
+def user_info_view_steps() -> ReadSteps:
+    return (yield from User.user_info_steps(email=g.user.email, fields=response_projection(User).fields)), 200
 
 
 class UserView(FlaskView):
@@ -20,7 +32,9 @@ class UserView(FlaskView):
     @use_kwargs(UserCreateFormSchema)
     @marshal_with(ApiStatusSchema, code=201, description="가입 성공")
     @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
+    @marshal_with(ApiStatusSchema, code=429, description="요청 한도 초과")
     @marshal_with(ApiStatusSchema, code=500, description="DB 업데이트 실패")
+    @rate_limited
     def signup(self, email: str, name: str, password: str, subscribing: Optional[bool] = False):
         # 이메일 중복 여부 확인
         if User.objects(email=email).count() > 0:
@@ -28,7 +42,7 @@ class UserView(FlaskView):
 
         # 사용자 생성해서 업데이트
         try:
-            new_user = User(email=email, name=name, password=bcrypt.hashpw(password=password.encode("utf-8"), salt=bcrypt.gensalt()))
+            new_user = User(email=email, name=name, password=password_hasher.hash(password))
             if subscribing is True:
                 new_user.subscribing = True
             new_user.save()
@@ -44,7 +58,9 @@ class UserView(FlaskView):
     @use_kwargs(UserLoginFormSchema)
     @marshal_with(AuthTokenSchema, code=200, description="로그인 성공")
     @marshal_with(ApiStatusSchema, code=401, description="로그인 실패")
+    @marshal_with(ApiStatusSchema, code=429, description="요청 한도 초과")
     @marshal_with(ApiStatusSchema, code=500, description="처리 도중 오류")
+    @rate_limited
     def login(self, email: str, password: str):
         # 사용자 정보 조회
         user = User.get_user_info(email=email)
@@ -53,6 +69,9 @@ class UserView(FlaskView):
         if user.check_pw(password=password) is not True:
             raise ApiError(message="비밀번호가 일치하지 않습니다", status_code=401)
 
+        # 설정된 work factor 와 다르게 저장된 비밀번호는 다시 hash
+        user.rehash_pw_if_needed(password=password)
+
         # 사용자의 토큰을 생성 후 return
         return AuthToken.get_new_token(email=user.email, is_master=user.is_master), 200
 
@@ -63,7 +82,7 @@ class UserView(FlaskView):
     @marshal_with(ApiStatusSchema, code=500, description="조회 실패")
     @login_required
     def info(self):
-        return User.get_user_info(email=g.user.email), 200
+        return run_steps(user_info_view_steps())
 
     @route("/update", methods=["PUT"])
     @doc(description="회원 정보 수정", summary="회원 정보 수정 api")
@@ -84,10 +103,41 @@ class UserView(FlaskView):
         user.update_user_info(change_pw=change_pw, password=password, new_password=new_password, subscribing=subscribing)
         return {"message": "회원 정보 수정 완료"}, 200
 
+    @route("/delete", methods=["DELETE"])
+    @doc(description="회원 탈퇴 (작성한 포스트 / 댓글 및 좋아요 정리는 백그라운드로 진행)", summary="회원 탈퇴 API")
+    @use_kwargs(UserDeleteFormSchema)
+    @marshal_with(ApiStatusSchema, code=200, description="탈퇴 완료")
+    @marshal_with(ApiStatusSchema, code=401, description="비밀번호 불일치")
+    @marshal_with(ApiStatusSchema, code=404, description="회원 확인 실패")
+    @marshal_with(ApiStatusSchema, code=422, description="요청 body 확인 필요")
+    @marshal_with(ApiStatusSchema, code=500, description="처리 도중 오류")
+    @login_required
+    def delete(self, password: str):
+        # 회원 정보 조회 & 비밀번호 확인
+        user = User.get_user_info(email=g.user.email)
+        if user.check_pw(password=password) is not True:
+            raise ApiError(message="비밀번호가 일치하지 않습니다", status_code=401)
+
+        # 탈퇴 처리 후 정리 작업 등록 (탈퇴한 사용자는 작업 상태를 조회할 수 없으므로 작업 정보는 return 하지 않음)
+        user.delete_user()
+        return {"message": "회원 탈퇴 완료"}, 200
+
     @route("/list", methods=["GET"])
     @doc(description="회원 목록 확인", summary="회원 리스트 확인 (임시용)")
     @use_kwargs(UserSearchFormSchema)
     @marshal_with(UserInfoSchema(many=True), code=200, description="사용자 리스트 조회 (임시)")
     @master_login_required
     def list(self, page_no: int, page_size: int, email: Optional[str] = None):
-        return User.get_user_list(page_no=page_no, page_size=page_size, email=email), 200
+        fields = response_projection(User).fields
+        if current_app.config["RAW_LIST_RESPONSES"]:
+            return jsonify(dump_raw(list(User.get_user_list(page_no=page_no, page_size=page_size, email=email, fields=fields, as_pymongo=True)), User))
+        return User.get_user_list(page_no=page_no, page_size=page_size, email=email, fields=fields), 200
+
+    @route("/export", methods=["GET"])
+    @doc(description="회원 export (관리자용, NDJSON 스트리밍)", summary="회원 export API")
+    @use_kwargs(ExportFormSchema, locations=("query",))
+    @marshal_with(ApiStatusSchema, code=422, description="잘못된 데이터가 입력되었습니다")
+    @master_login_required
+    def export(self, updated_from: Optional[datetime] = None, updated_to: Optional[datetime] = None, field_names: Optional[List[str]] = None):
+        query, projection = build_export_query(User, updated_from=updated_from, updated_to=updated_to, fields=field_names, hidden_fields=("password",))
+        return Response(stream_with_context(iter_ndjson(User, query=query, projection=projection)), mimetype="application/x-ndjson")
@@ -0,0 +1,3 @@
+from app.asgi import create_asgi_app
+
+app = create_asgi_app(is_localhost=True)
@@ -0,0 +1,117 @@
+"""
+API 벤치마크 실행
+
+    python -m benchmarks                                   # mongomock (메모리) + 프로세스 안의 test client
+    python -m benchmarks --mongodb-uri mongodb://127.0.0.1:27017 --output baseline.json
+    python -m benchmarks --mongodb-uri mongodb://127.0.0.1:27017 --compare baseline.json
+    python -m benchmarks --mongodb-uri mongodb://127.0.0.1:27017 --target http://127.0.0.1:8000   # 실행 중인 서버 측정
+
+--db 로 지정한 DB 는 실행할 때마다 지우고 새로 데이터를 생성하므로 벤치마크 전용 DB 를 사용해야 함
+"""
+import argparse
+import os
+import sys
+
+import mongoengine
+from pymongo import monitoring
+
+from app.config import Config, LocalhostConfig
+from benchmarks.mongo_ops import MongoOpCounter
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="API 부하 테스트 / 벤치마크")
+    parser.add_argument("--mongodb-uri", default=None, help="mongod 주소 (없으면 mongomock 사용)")
+    parser.add_argument("--db", default="welcome_aboard_bench", help="벤치마크 전용 DB 이름 (실행할 때마다 초기화)")
+    parser.add_argument("--target", default=None, help="실행 중인 서버 주소 (없으면 프로세스 안에서 test client 로 요청, MongoDB 명령 수는 집계 안 됨)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=6000)
+    parser.add_argument("--likes", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=100, help="endpoint 별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mode", choices=("isolated", "mixed"), default="isolated")
+    parser.add_argument("--endpoint", action="append", default=None, help="이름에 포함된 endpoint 만 실행 (여러 번 지정 가능)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=None, help="비밀번호 hash work factor (기본값은 설정값)")
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 경로 (baseline)")
+    parser.add_argument("--compare", default=None, help="비교할 baseline JSON 경로 (회귀가 있으면 exit code 1)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 허용 증가 비율")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="회귀로 판단할 최소 p95 증가량 (ms)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.db in (Config.MONGODB_DB, LocalhostConfig.MONGODB_DB):
+        print(f"'{args.db}' 는 서비스 DB 입니다. 벤치마크 전용 DB 를 지정하세요.", file=sys.stderr)
+        return 2
+
+    # MongoDB 명령 수 집계 (command listener 는 연결 전에 등록해야 함)
+    op_counter = MongoOpCounter() if args.target is None else None
+    if op_counter is not None:
+        if args.mongodb_uri:
+            monitoring.register(op_counter)
+        else:
+            op_counter.install_mongomock()
+
+    # create_app 이 벤치마크 DB 로 연결하도록 설정 변경
+    LocalhostConfig.MONGODB_URI = args.mongodb_uri or "mongomock://localhost"
+    LocalhostConfig.MONGODB_DB = args.db
+    if args.bcrypt_rounds:
+        LocalhostConfig.BCRYPT_ROUNDS = args.bcrypt_rounds
+    # access log 는 기록 비용은 그대로 두고 출력만 버림 (결과 표가 묻히지 않도록)
+    LocalhostConfig.ACCESS_LOG_PATH = os.devnull
+    # 로그인 / 가입은 같은 IP 로 반복 요청하므로 한도 확인 비용은 그대로 두고 허용 요청 수만 늘림
+    LocalhostConfig.RATE_LIMITS = {endpoint: {name: (10 ** 9, period) for name, (_, period) in limits.items()} for endpoint, limits in LocalhostConfig.RATE_LIMITS.items()}
+
+    from app import create_app
+    from app.utils.password import password_hasher
+    from benchmarks.data import Dataset, generate_dataset
+    from benchmarks.runner import BenchmarkRunner, HttpTransport, TestClientTransport, compare_reports, format_report, load_report, meta_mismatches, save_report
+    from benchmarks.scenarios import SCENARIOS, ScenarioContext, missing_scenarios
+
+    app = create_app(is_localhost=True)
+
+    # 시나리오가 없는 라우트가 있으면 실행하지 않음 (새 라우트가 측정에서 빠지지 않도록)
+    missing = missing_scenarios(app)
+    if missing:
+        print("시나리오가 없는 라우트가 있습니다 (benchmarks/scenarios.py 에 추가 필요):\n  " + "\n  ".join(missing), file=sys.stderr)
+        return 2
+
+    # 데이터 생성
+    database = mongoengine.get_db()
+    database.client.drop_database(database.name)
+    dataset = generate_dataset(password_hash=password_hasher.hash(Dataset.PASSWORD), users=args.users, categories=args.categories, posts=args.posts, comments=args.comments, likes=args.likes, seed=args.seed)
+    print(f"dataset: {dataset.summary()}")
+
+    endpoints = sorted(endpoint for endpoint in SCENARIOS if not args.endpoint or any(name in endpoint for name in args.endpoint))
+    transport = HttpTransport(args.target) if args.target else TestClientTransport(app)
+    runner = BenchmarkRunner(app, ScenarioContext(app, dataset), transport, op_counter, concurrency=args.concurrency, seed=args.seed)
+    report = runner.run(endpoints, requests_per_endpoint=args.requests, mode=args.mode)
+    report["meta"].update(backend="mongod" if args.mongodb_uri else "mongomock", target=args.target or "test_client")
+    print(format_report(report))
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"saved: {args.output}")
+
+    if args.compare:
+        baseline = load_report(args.compare)
+        mismatches = meta_mismatches(baseline, report)
+        if mismatches:
+            print("baseline 과 측정 조건이 다릅니다:\n  " + "\n  ".join(mismatches), file=sys.stderr)
+            return 2
+
+        regressions = compare_reports(baseline, report, tolerance=args.tolerance, min_delta_ms=args.min_delta_ms)
+        for regression in regressions:
+            print(f"[REGRESSION] {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("baseline 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
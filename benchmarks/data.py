@@ -0,0 +1,150 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+from bson import ObjectId
+
+from app.models.category import Category, CategoryRegistry
+from app.models.comment import Comment
+from app.models.post import Post, PostLike, CommentPreview
+from app.models.user import User
+from app.models.version import VersionCounter
+from app.utils import ngram
+from app.utils.trending import trending_scorer
+
+# 제목 생성용 단어 (한글/영문 혼합, n-gram 검색 벤치마크에서 검색어로도 사용)
+TITLE_WORDS = ["서울", "맛집", "여행", "후기", "개발", "파이썬", "몽고", "질문", "공유", "추천", "flask", "mongo", "python", "review", "guide", "tips", "weekly", "news"]
+
+
+def zipf_weights(size: int, exponent: float = 1.1) -> List[float]:
+    # 순위가 높을수록 (index 가 작을수록) 많이 선택되는 가중치 (소수의 인기 사용자/포스트에 활동이 몰리는 분포)
+    return [1.0 / (rank ** exponent) for rank in range(1, size + 1)]
+
+
+class Dataset:
+    """생성된 벤치마크 데이터의 id 목록 (요청 시나리오에서 대상 선택에 사용)"""
+
+    PASSWORD = "benchmark1234"
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        # (id, email, is_master), 0번은 관리자
+        self.users: List[Tuple[ObjectId, str, bool]] = list()
+        self.categories: List[Tuple[ObjectId, str]] = list()
+        # (id, 작성자 index)
+        self.posts: List[Tuple[ObjectId, int]] = list()
+        # (id, post id, 작성자 index)
+        self.comments: List[Tuple[ObjectId, ObjectId, int]] = list()
+        self.user_weights: List[float] = list()
+        self.post_weights: List[float] = list()
+
+    @property
+    def master(self) -> Tuple[ObjectId, str, bool]:
+        return self.users[0]
+
+    def pick_user(self, rng: random.Random) -> int:
+        return rng.choices(range(len(self.users)), weights=self.user_weights)[0]
+
+    def pick_post(self, rng: random.Random) -> Tuple[ObjectId, int]:
+        return rng.choices(self.posts, weights=self.post_weights)[0]
+
+    def pick_comment(self, rng: random.Random) -> Tuple[ObjectId, ObjectId, int]:
+        return rng.choice(self.comments)
+
+    def summary(self) -> Dict:
+        return {"seed": self.seed, "users": len(self.users), "categories": len(self.categories), "posts": len(self.posts), "comments": len(self.comments)}
+
+
+def _insert(document_cls, documents: Sequence[Dict], batch_size: int = 1000):
+    collection = document_cls._get_collection()
+    for start in range(0, len(documents), batch_size):
+        collection.insert_many(documents[start : start + batch_size], ordered=False)
+
+
+def generate_dataset(password_hash: str, users: int = 200, categories: int = 10, posts: int = 2000, comments: int = 6000, likes: int = 10000, days: int = 90, seed: int = 0) -> Dataset:
+    """
+    사용자 / 카테고리 / 포스트 / 댓글 / 좋아요를 insert_many 로 한 번에 추가
+
+    - 작성자 / 댓글이 달리는 포스트 / 좋아요 대상은 zipf 분포로 선택 (일부 사용자와 인기 포스트에 몰림)
+    - 작성 시각은 최근 days 일 사이에 퍼뜨리고, 포스트는 최신일수록 인기가 높도록 정렬
+    - 모든 사용자의 비밀번호는 Dataset.PASSWORD (password_hash 는 미리 계산해서 전달)
+    """
+    rng, dataset, now = random.Random(seed), Dataset(seed=seed), datetime.utcnow()
+    epoch = trending_scorer.epoch()
+
+    def random_time() -> datetime:
+        return now - timedelta(seconds=rng.uniform(0, days * 86400))
+
+    def add_trend_score(post_doc: Dict, weight: float, at: datetime):
+        # 인기 점수 (좋아요 시각은 보관하지 않으므로 임의의 시각으로 계산)
+        post_doc["trend_score"] = post_doc.get("trend_score", 0.0) + trending_scorer.delta(weight, epoch, (at - datetime(1970, 1, 1)).total_seconds())
+        post_doc["trend_epoch"] = epoch
+
+    # 사용자
+    user_docs = list()
+    for index in range(users):
+        created_at = random_time()
+        user = User(email=f"bench{index}@example.com", name=f"사용자{index}", password=password_hash, subscribing=rng.random() < 0.3, is_master=index == 0, created_at=created_at, updated_at=created_at)
+        user_docs.append(dict(user.to_mongo(), _id=ObjectId()))
+        dataset.users.append((user_docs[-1]["_id"], user.email, user.is_master))
+    dataset.user_weights = zipf_weights(users)
+    _insert(User, user_docs)
+
+    # 카테고리 (관리자가 생성)
+    category_docs = list()
+    for index in range(categories):
+        category = Category(name=f"카테고리{index}", created_by=dataset.master[0], created_at=random_time())
+        category_docs.append(dict(category.to_mongo(), _id=ObjectId()))
+        dataset.categories.append((category_docs[-1]["_id"], category.name))
+    if category_docs:
+        _insert(Category, category_docs)
+        VersionCounter.bump(CategoryRegistry.VERSION_NAME)
+    category_weights = zipf_weights(categories)
+
+    # 포스트 (최신 포스트일수록 앞쪽 순위 -> 조회/댓글/좋아요가 많이 몰림)
+    post_docs = list()
+    for index in range(posts):
+        author = dataset.pick_user(rng)
+        title = " ".join(rng.sample(TITLE_WORDS, k=rng.randint(2, 5))) + f" {index}"
+        created_at = random_time()
+        post = Post(title=title, title_ngrams=ngram.title_ngrams(title), content="본문 " * rng.randint(5, 200), created_by=dataset.users[author][0], created_at=created_at, updated_at=created_at)
+        if dataset.categories:
+            post.categories = list(dict.fromkeys(dataset.categories[i][0] for i in rng.choices(range(categories), weights=category_weights, k=rng.randint(0, 3))))
+        post_docs.append(dict(post.to_mongo(), _id=ObjectId()))
+    post_docs.sort(key=lambda doc: doc["created_at"], reverse=True)
+    user_index = {user[0]: index for index, user in enumerate(dataset.users)}
+    dataset.posts = [(doc["_id"], user_index[doc["created_by"]]) for doc in post_docs]
+    dataset.post_weights = zipf_weights(posts)
+
+    # 좋아요 (포스트 / 사용자 모두 zipf 분포, 같은 사용자는 한 번만)
+    liked, like_docs = dict(), list()
+    for _ in range(likes):
+        post_index, liker = rng.choices(range(posts), weights=dataset.post_weights)[0], dataset.pick_user(rng)
+        liked.setdefault(post_index, dict())[dataset.users[liker][0]] = None
+    for post_index, user_ids in liked.items():
+        post_docs[post_index]["likes_cnt"] = len(user_ids)
+        for user_id in user_ids:
+            liked_at = random_time()
+            like_docs.append({"post": post_docs[post_index]["_id"], "user": user_id, "created_at": liked_at})
+            add_trend_score(post_docs[post_index], trending_scorer.like_weight, liked_at)
+
+    # 댓글 (포스트의 comments_cnt / latest_comments 도 함께 채움)
+    comment_docs, post_comments = list(), dict()
+    for _ in range(comments):
+        post_index, author = rng.choices(range(posts), weights=dataset.post_weights)[0], dataset.pick_user(rng)
+        post_id, created_at = dataset.posts[post_index][0], random_time()
+        comment = Comment(post=post_id, content="댓글 " * rng.randint(1, 30), created_by=dataset.users[author][0], created_at=created_at, updated_at=created_at)
+        comment_docs.append(dict(comment.to_mongo(), _id=ObjectId()))
+        dataset.comments.append((comment_docs[-1]["_id"], post_id, author))
+        post_comments.setdefault(post_index, list()).append((comment_docs[-1], author))
+    for post_index, items in post_comments.items():
+        items.sort(key=lambda item: (item[0]["created_at"], item[0]["_id"]), reverse=True)
+        post_docs[post_index]["comments_cnt"] = len(items)
+        for doc, _ in items:
+            add_trend_score(post_docs[post_index], trending_scorer.comment_weight, doc["created_at"])
+        post_docs[post_index]["latest_comments"] = [CommentPreview.make_son(doc["_id"], doc["content"], {"email": dataset.users[author][1], "name": f"사용자{author}"}, doc["created_at"]) for doc, author in items[: Post.LATEST_COMMENTS_SIZE]]
+    _insert(Post, post_docs)
+    _insert(PostLike, like_docs)
+    _insert(Comment, comment_docs)
+
+    return dataset
@@ -0,0 +1,98 @@
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional
+
+from pymongo import monitoring
+
+# mongomock Collection 메서드 -> 실제 서버에서 실행되는 명령 이름
+MONGOMOCK_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "aggregate": "aggregate",
+    "count_documents": "aggregate",
+    "distinct": "distinct",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "replace_one": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "bulk_write": "bulkWrite",
+}
+
+
+class MongoOpCounter(monitoring.CommandListener):
+    """
+    endpoint 별 MongoDB 명령 수 집계
+
+    - 요청을 처리하는 thread 에 track(endpoint) 로 지정된 endpoint 로 기록 (데이터 준비 등 track 밖의 명령은 제외)
+    - 실제 mongod 는 pymongo command 이벤트로, mongomock 은 Collection 메서드 호출로 집계 (install_mongomock)
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.counts: Dict[str, Counter] = defaultdict(Counter)
+
+    @contextmanager
+    def track(self, endpoint: str):
+        self._local.endpoint = endpoint
+        try:
+            yield
+        finally:
+            self._local.endpoint = None
+
+    def record(self, command_name: str):
+        endpoint: Optional[str] = getattr(self._local, "endpoint", None)
+        if endpoint is None:
+            return
+        with self._lock:
+            self.counts[endpoint][command_name] += 1
+
+    def started(self, event):
+        self.record(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def install_mongomock(self):
+        """
+        mongomock 은 command 이벤트를 발생시키지 않으므로 Collection 메서드를 감싸서 집계 (내부에서 다른 메서드를 호출하는 경우는 바깥 호출만 집계)
+
+        - mongomock 은 thread-safe 하지 않아서 동시 요청 중 "OrderedDict mutated during iteration" 이 발생하므로, 명령 / cursor 결과 계산을 하나의 lock 으로 직렬화
+        - mongomock 은 capped collection 을 만들 수 없으므로 (ex. slow_query) 옵션 없이 일반 collection 으로 생성
+        """
+        import mongomock.collection
+        import mongomock.database
+
+        create_collection = mongomock.database.Database.create_collection
+        mongomock.database.Database.create_collection = lambda database, name, **kwargs: create_collection(database, name)
+
+        lock = threading.RLock()
+        for method_name, command_name in MONGOMOCK_COMMANDS.items():
+            original = getattr(mongomock.collection.Collection, method_name, None)
+            if original is not None:
+                setattr(mongomock.collection.Collection, method_name, self._wrap(original, command_name, lock))
+        mongomock.collection.Collection._get_dataset = self._wrap(mongomock.collection.Collection._get_dataset, None, lock)
+
+    def _wrap(self, method, command_name: Optional[str], lock: threading.RLock):
+        @wraps(method)
+        def _wrapper(*args, **kwargs):
+            depth = getattr(self._local, "depth", 0)
+            if depth == 0 and command_name is not None:
+                self.record(command_name)
+            self._local.depth = depth + 1
+            try:
+                with lock:
+                    return method(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+
+        return _wrapper
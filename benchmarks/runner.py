@@ -0,0 +1,226 @@
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from flask import Flask
+
+from benchmarks.mongo_ops import MongoOpCounter
+from benchmarks.scenarios import ACCEPTED_STATUS_CODES, SCENARIOS, BenchRequest, ScenarioContext, registered_endpoints
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    # 선형 보간 백분위수 (values 는 정렬되지 않아도 됨)
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class TestClientTransport:
+    """Flask test client 로 프로세스 안에서 요청 (thread 마다 client 를 따로 사용)"""
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, request: BenchRequest) -> int:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client(use_cookies=False)
+        response = client.open(request.path, method=request.method, headers=request.headers, query_string=request.query, json=request.json_body, data=request.data)
+        # 스트리밍 응답 (export) 도 끝까지 읽은 시간으로 측정
+        response.get_data()
+        return response.status_code
+
+
+class HttpTransport:
+    """실행 중인 서버 (gunicorn / uvicorn 등) 로 HTTP 요청"""
+
+    def __init__(self, base_url: str):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self._requests = requests
+        self._local = threading.local()
+
+    def send(self, request: BenchRequest) -> int:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        response = session.request(request.method, self.base_url + request.path, headers=request.headers, params=request.query, json=request.json_body, data=request.data)
+        return response.status_code
+
+
+class EndpointResult:
+    def __init__(self):
+        self.latencies: List[float] = list()
+        self.status_codes = Counter()
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def to_dict(self, mongo_ops: Optional[Counter], method: str, rule: str) -> Dict:
+        requests = len(self.latencies)
+        result = {
+            "method": method,
+            "rule": rule,
+            "requests": requests,
+            "errors": self.errors,
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+            "latency_ms": {
+                "p50": round(percentile(self.latencies, 50) * 1000, 3),
+                "p95": round(percentile(self.latencies, 95) * 1000, 3),
+                "p99": round(percentile(self.latencies, 99) * 1000, 3),
+                "mean": round(sum(self.latencies) / requests * 1000, 3) if requests else 0.0,
+                "max": round(max(self.latencies) * 1000, 3) if requests else 0.0,
+            },
+            "throughput": round(requests / self.elapsed, 2) if self.elapsed else 0.0,
+            "mongo_ops": None,
+            "mongo_ops_per_request": None,
+        }
+        if mongo_ops is not None:
+            result["mongo_ops"] = {name: round(count / requests, 3) for name, count in sorted(mongo_ops.items())} if requests else dict()
+            result["mongo_ops_per_request"] = round(sum(mongo_ops.values()) / requests, 3) if requests else 0.0
+        return result
+
+
+class BenchmarkRunner:
+    """
+    등록된 라우트별 시나리오를 thread pool 로 동시에 실행하고 endpoint 별 지연시간 / 처리량 / MongoDB 명령 수를 집계
+
+    - isolated: endpoint 마다 따로 concurrency 만큼 동시 실행 (endpoint 별 처리량 측정)
+    - mixed: 모든 endpoint 의 요청을 섞어서 동시에 실행 (실제 트래픽에 가까운 경합 측정, 처리량은 전체 기준)
+    - 요청 준비 (삭제할 데이터 추가, 좋아요 상태 맞추기 등) 는 측정 시간과 명령 수에서 제외
+    """
+
+    def __init__(self, app: Flask, context: ScenarioContext, transport, op_counter: Optional[MongoOpCounter], concurrency: int = 8, seed: int = 0):
+        self.app = app
+        self.context = context
+        self.transport = transport
+        self.op_counter = op_counter
+        self.concurrency = concurrency
+        self.seed = seed
+        self.results: Dict[str, EndpointResult] = defaultdict(EndpointResult)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _rng(self) -> random.Random:
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            rng = self._local.rng = random.Random(f"{self.seed}:{threading.get_ident()}")
+        return rng
+
+    def _execute(self, endpoint: str):
+        request = SCENARIOS[endpoint](self.context, self._rng())
+
+        started = time.perf_counter()
+        if self.op_counter is not None:
+            with self.op_counter.track(endpoint):
+                status_code = self.transport.send(request)
+        else:
+            status_code = self.transport.send(request)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            result = self.results[endpoint]
+            result.latencies.append(elapsed)
+            result.status_codes[status_code] += 1
+            if status_code >= 400 and status_code not in ACCEPTED_STATUS_CODES.get(endpoint, ()):
+                result.errors += 1
+
+    def _run_phase(self, endpoints: List[str]) -> float:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for future in [executor.submit(self._execute, endpoint) for endpoint in endpoints]:
+                future.result()
+        return time.perf_counter() - started
+
+    def run(self, endpoints: List[str], requests_per_endpoint: int, mode: str = "isolated", warmup: int = 5) -> Dict:
+        # 캐시 / 인덱스 / 토큰 준비를 위해 endpoint 마다 몇 번 먼저 실행 (집계에서 제외)
+        for endpoint in endpoints:
+            for _ in range(warmup):
+                self._execute(endpoint)
+        self.results.clear()
+        if self.op_counter is not None:
+            self.op_counter.counts.clear()
+
+        started = time.perf_counter()
+        if mode == "isolated":
+            for endpoint in endpoints:
+                self.results[endpoint].elapsed = self._run_phase([endpoint] * requests_per_endpoint)
+        elif mode == "mixed":
+            tasks = [endpoint for endpoint in endpoints for _ in range(requests_per_endpoint)]
+            random.Random(self.seed).shuffle(tasks)
+            elapsed = self._run_phase(tasks)
+            for endpoint in endpoints:
+                self.results[endpoint].elapsed = elapsed
+        else:
+            raise ValueError(f"unknown mode `{mode}`")
+        wall_seconds = time.perf_counter() - started
+
+        routes = {endpoint: (method, rule) for endpoint, method, rule in registered_endpoints(self.app)}
+        total_requests = sum(len(result.latencies) for result in self.results.values())
+        return {
+            "meta": {"created_at": datetime.utcnow().isoformat(), "mode": mode, "concurrency": self.concurrency, "requests_per_endpoint": requests_per_endpoint, "dataset": self.context.dataset.summary()},
+            "total": {"requests": total_requests, "errors": sum(result.errors for result in self.results.values()), "wall_seconds": round(wall_seconds, 3), "throughput": round(total_requests / wall_seconds, 2) if wall_seconds else 0.0},
+            "endpoints": {endpoint: self.results[endpoint].to_dict(self.op_counter.counts.get(endpoint, Counter()) if self.op_counter is not None else None, *routes.get(endpoint, ("", ""))) for endpoint in endpoints},
+        }
+
+
+def meta_mismatches(baseline: Dict, current: Dict) -> List[str]:
+    # 측정 조건 (실행 방식 / 동시 요청 수 / 데이터 크기 / DB / 대상 서버) 이 다르면 비교 결과를 신뢰할 수 없으므로 다른 항목 목록 return
+    keys = ("mode", "concurrency", "requests_per_endpoint", "dataset", "backend", "target")
+    return [f"{key}: {baseline['meta'].get(key)} != {current['meta'].get(key)}" for key in keys if baseline.get("meta", dict()).get(key) != current["meta"].get(key)]
+
+
+def compare_reports(baseline: Dict, current: Dict, tolerance: float = 0.2, min_delta_ms: float = 1.0) -> List[str]:
+    """
+    baseline 대비 느려졌거나 MongoDB 명령 수가 늘어난 endpoint 목록 (빈 list 면 통과)
+
+    - p95 가 tolerance 비율 이상, 그리고 min_delta_ms 이상 늘어나면 회귀로 판단 (짧은 요청의 측정 오차 제외)
+    - 요청당 MongoDB 명령 수가 0.5 이상 늘었거나, baseline 에 없던 에러가 생긴 경우도 회귀로 판단
+    """
+    regressions = list()
+    for endpoint, now in current.get("endpoints", dict()).items():
+        before = baseline.get("endpoints", dict()).get(endpoint)
+        if before is None:
+            continue
+
+        p95_before, p95_now = before["latency_ms"]["p95"], now["latency_ms"]["p95"]
+        if p95_now > p95_before * (1 + tolerance) and p95_now - p95_before >= min_delta_ms:
+            regressions.append(f"{endpoint}: p95 {p95_before:.2f}ms -> {p95_now:.2f}ms")
+
+        ops_before, ops_now = before.get("mongo_ops_per_request"), now.get("mongo_ops_per_request")
+        if ops_before is not None and ops_now is not None and ops_now - ops_before >= 0.5:
+            regressions.append(f"{endpoint}: mongo ops/request {ops_before:.2f} -> {ops_now:.2f}")
+
+        if now["errors"] and not before["errors"]:
+            regressions.append(f"{endpoint}: {now['errors']} errors (status {now['status_codes']})")
+    return regressions
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"{'endpoint':<40} {'req':>5} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9} {'ops/req':>8}"]
+    for endpoint, result in report["endpoints"].items():
+        latency, ops = result["latency_ms"], result["mongo_ops_per_request"]
+        lines.append(f"{endpoint:<40} {result['requests']:>5} {result['errors']:>4} {latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f} {result['throughput']:>9.1f} {'-' if ops is None else f'{ops:.2f}':>8}")
+    total = report["total"]
+    lines.append(f"total: {total['requests']} requests / {total['errors']} errors / {total['wall_seconds']}s / {total['throughput']} req/s")
+    return "\n".join(lines)
+
+
+def save_report(report: Dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load_report(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,312 @@
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from flask import Flask
+
+from app.models.auth_token import AuthToken
+from app.models.category import Category, CategoryRegistry
+from app.models.comment import Comment
+from app.models.job import Job
+from app.models.post import Post, PostLike
+from app.models.user import User
+from app.models.version import VersionCounter
+from app.utils import ngram
+from benchmarks.data import Dataset, TITLE_WORDS
+
+
+class BenchRequest:
+    """벤치마크 요청 1건 (test client / HTTP client 공통 형식)"""
+
+    def __init__(self, method: str, path: str, headers: Optional[Dict] = None, query: Optional[Dict] = None, json_body: Optional[Dict] = None, data: Optional[bytes] = None):
+        self.method = method
+        self.path = path
+        self.headers = headers or dict()
+        self.query = query or dict()
+        self.json_body = json_body
+        self.data = data
+
+
+class ScenarioContext:
+    """시나리오들이 공유하는 데이터 (토큰 캐시, 실행마다 겹치지 않는 이름 생성)"""
+
+    def __init__(self, app: Flask, dataset: Dataset):
+        self.app = app
+        self.dataset = dataset
+        self.run_id = str(ObjectId())[-6:]
+        self._tokens = dict()
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def headers(self, user_index: int) -> Dict:
+        # 사용자별 토큰은 처음 한 번만 발급 (로그인 API 를 거치지 않으므로 bcrypt 비용 없음)
+        with self._lock:
+            if user_index not in self._tokens:
+                _, email, is_master = self.dataset.users[user_index]
+                with self.app.app_context():
+                    self._tokens[user_index] = AuthToken.get_new_token(email=email, is_master=is_master).token
+            return {"X-Auth-Token": self._tokens[user_index]}
+
+    @property
+    def master_headers(self) -> Dict:
+        return self.headers(0)
+
+    def unique_name(self, prefix: str) -> str:
+        with self._lock:
+            self._sequence += 1
+            return f"{prefix}{self.run_id}{self._sequence:x}"
+
+    @staticmethod
+    def recent(days: int = 7) -> str:
+        return (datetime.utcnow() - timedelta(days=days)).isoformat()
+
+
+Scenario = Callable[[ScenarioContext, random.Random], BenchRequest]
+SCENARIOS: Dict[str, Scenario] = dict()
+# 에러로 집계하지 않는 응답 코드 (ex. 같은 사용자/대상이 동시에 선택되어 좋아요가 이미 처리된 경우의 409)
+ACCEPTED_STATUS_CODES: Dict[str, Tuple[int, ...]] = dict()
+
+
+def scenario(endpoint: str, accept: Tuple[int, ...] = ()):
+    def wrapper(func: Scenario) -> Scenario:
+        SCENARIOS[endpoint] = func
+        ACCEPTED_STATUS_CODES[endpoint] = accept
+        return func
+
+    return wrapper
+
+
+def _random_title(rng: random.Random) -> str:
+    return " ".join(rng.sample(TITLE_WORDS, k=rng.randint(2, 4)))
+
+
+def _jsonl(rows: List[Dict]) -> bytes:
+    return "\n".join(json.dumps(row, ensure_ascii=False) for row in rows).encode("utf-8")
+
+
+def _set_liked(document_cls, document_id: ObjectId, user_id: ObjectId, liked: bool):
+    # 좋아요 추가/취소 요청이 409 가 되지 않도록 요청 전에 상태를 맞춰둠 (측정 대상 아님, 포스트 좋아요는 post_like 에 보관)
+    collection = document_cls._get_collection()
+    if document_cls is Post:
+        if PostLike.add(document_id, user_id) if liked else PostLike.remove(document_id, user_id):
+            collection.update_one({"_id": document_id}, {"$inc": {"likes_cnt": 1 if liked else -1}})
+        return
+    if liked:
+        collection.update_one({"_id": document_id, "likes": {"$ne": user_id}}, {"$push": {"likes": user_id}, "$inc": {"likes_cnt": 1}})
+    else:
+        collection.update_one({"_id": document_id, "likes": user_id}, {"$pull": {"likes": user_id}, "$inc": {"likes_cnt": -1}})
+
+
+# ---------- 사용자 ----------
+@scenario("api.UserView:signup")
+def signup(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("POST", "/user/signup", json_body={"email": f"{ctx.unique_name('signup')}@example.com", "name": "신규", "password": Dataset.PASSWORD})
+
+
+@scenario("api.UserView:login")
+def login(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    _, email, _ = ctx.dataset.users[ctx.dataset.pick_user(rng)]
+    return BenchRequest("POST", "/user/login", json_body={"email": email, "password": Dataset.PASSWORD})
+
+
+@scenario("api.UserView:info")
+def user_info(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("GET", "/user/info", headers=ctx.headers(ctx.dataset.pick_user(rng)))
+
+
+@scenario("api.UserView:update")
+def user_update(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("PUT", "/user/update", headers=ctx.headers(ctx.dataset.pick_user(rng)), json_body={"subscribing": rng.random() < 0.5})
+
+
+@scenario("api.UserView:list")
+def user_list(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("GET", "/user/list", headers=ctx.master_headers, query={"page_no": rng.randint(1, 5), "page_size": 20})
+
+
+@scenario("api.UserView:export")
+def user_export(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("GET", "/user/export", headers=ctx.master_headers, query={"updated_from": ctx.recent()})
+
+
+@scenario("api.UserView:delete")
+def user_delete(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    # 탈퇴할 사용자를 먼저 추가 (측정 대상 아님, 비밀번호 hash 는 생성된 사용자의 것을 그대로 사용)
+    collection, email, now = User._get_collection(), f"{ctx.unique_name('leave')}@example.com", datetime.utcnow()
+    password_hash = collection.find_one({"_id": ctx.dataset.master[0]}, {"password": 1})["password"]
+    collection.insert_one({"email": email, "name": "탈퇴", "password": password_hash, "subscribing": False, "is_master": False, "is_deleted": False, "created_at": now, "updated_at": now})
+    with ctx.app.app_context():
+        token = AuthToken.get_new_token(email=email, is_master=False).token
+    return BenchRequest("DELETE", "/user/delete", headers={"X-Auth-Token": token}, json_body={"password": Dataset.PASSWORD})
+
+
+# ---------- 카테고리 ----------
+@scenario("api.CategoryView:list")
+def category_list(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    query = {"name": "카테고리"} if rng.random() < 0.3 else dict()
+    return BenchRequest("GET", "/category/list", headers=ctx.headers(ctx.dataset.pick_user(rng)), query=query)
+
+
+@scenario("api.CategoryView:add")
+def category_add(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("POST", "/category/add", headers=ctx.master_headers, json_body={"name": ctx.unique_name("a")})
+
+
+@scenario("api.CategoryView:delete")
+def category_delete(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    # 삭제할 카테고리를 먼저 추가 (측정 대상 아님)
+    name = ctx.unique_name("d")
+    Category._get_collection().insert_one({"name": name, "created_by": ctx.dataset.master[0], "created_at": datetime.utcnow()})
+    VersionCounter.bump(CategoryRegistry.VERSION_NAME)
+    return BenchRequest("DELETE", "/category/delete", headers=ctx.master_headers, json_body={"name": name})
+
+
+# ---------- 포스트 ----------
+@scenario("api.PostMasterView:get_list")
+def post_list(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    # 첫 페이지 위주, 일부는 다음 페이지 / 카테고리 필터 / 제목 검색
+    query, roll = {"page_size": 20}, rng.random()
+    if roll < 0.15 and ctx.dataset.categories:
+        query["category_id"] = str(rng.choice(ctx.dataset.categories)[0])
+    elif roll < 0.3:
+        query["title"] = rng.choice(TITLE_WORDS)
+    elif roll < 0.45:
+        query["page_no"] = rng.randint(2, 10)
+    return BenchRequest("GET", "/posts", headers=ctx.headers(ctx.dataset.pick_user(rng)), query=query)
+
+
+@scenario("api.PostMasterView:get_trending_list")
+def post_trending_list(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("GET", "/posts/trending", headers=ctx.headers(ctx.dataset.pick_user(rng)), query={"page_size": 20})
+
+
+@scenario("api.PostMasterView:add_post")
+def post_add(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    category_ids = [str(category_id) for category_id, _ in rng.sample(ctx.dataset.categories, k=min(len(ctx.dataset.categories), rng.randint(0, 2)))]
+    return BenchRequest("POST", "/posts", headers=ctx.headers(ctx.dataset.pick_user(rng)), json_body={"title": _random_title(rng), "content": "본문 " * 50, "category_ids": category_ids})
+
+
+@scenario("api.PostMasterView:bulk_add_posts")
+def post_bulk_add(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    rows = [{"title": _random_title(rng), "content": "본문 " * 20} for _ in range(20)]
+    return BenchRequest("POST", "/posts/bulk", headers=ctx.master_headers, data=_jsonl(rows))
+
+
+@scenario("api.PostMasterView:export")
+def post_export(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("GET", "/posts/export", headers=ctx.master_headers, query={"updated_from": ctx.recent(days=1)})
+
+
+@scenario("api.PostDetailView:get_post_detail")
+def post_detail(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    post_id, _ = ctx.dataset.pick_post(rng)
+    return BenchRequest("GET", f"/posts/{post_id}", headers=ctx.headers(ctx.dataset.pick_user(rng)))
+
+
+@scenario("api.PostDetailView:update_post")
+def post_update(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    post_id, author = ctx.dataset.pick_post(rng)
+    return BenchRequest("PUT", f"/posts/{post_id}", headers=ctx.headers(author), json_body={"title": _random_title(rng), "content": "수정된 본문 " * 20})
+
+
+@scenario("api.PostDetailView:delete_post")
+def post_delete(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    # 삭제할 포스트를 먼저 추가 (측정 대상 아님)
+    author, title, now = ctx.dataset.pick_user(rng), _random_title(rng), datetime.utcnow()
+    post = Post(title=title, title_ngrams=ngram.title_ngrams(title), content="삭제용", created_by=ctx.dataset.users[author][0], created_at=now, updated_at=now)
+    post_id = Post._get_collection().insert_one(post.to_mongo()).inserted_id
+    return BenchRequest("DELETE", f"/posts/{post_id}", headers=ctx.headers(author))
+
+
+@scenario("api.PostDetailView:add_like", accept=(409,))
+def post_like(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    (post_id, _), user = ctx.dataset.pick_post(rng), ctx.dataset.pick_user(rng)
+    _set_liked(Post, post_id, ctx.dataset.users[user][0], liked=False)
+    return BenchRequest("PUT", f"/posts/{post_id}/like", headers=ctx.headers(user))
+
+
+@scenario("api.PostDetailView:remove_like", accept=(409,))
+def post_unlike(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    (post_id, _), user = ctx.dataset.pick_post(rng), ctx.dataset.pick_user(rng)
+    _set_liked(Post, post_id, ctx.dataset.users[user][0], liked=True)
+    return BenchRequest("DELETE", f"/posts/{post_id}/like", headers=ctx.headers(user))
+
+
+# ---------- 댓글 ----------
+@scenario("api.CommentListView:list")
+def comment_list(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    post_id, _ = ctx.dataset.pick_post(rng)
+    return BenchRequest("GET", "/comments", headers=ctx.headers(ctx.dataset.pick_user(rng)), query={"post_id": str(post_id), "page_size": 20})
+
+
+@scenario("api.CommentListView:create")
+def comment_create(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    post_id, _ = ctx.dataset.pick_post(rng)
+    return BenchRequest("POST", "/comments", headers=ctx.headers(ctx.dataset.pick_user(rng)), json_body={"post_id": str(post_id), "content": "댓글 " * 10})
+
+
+@scenario("api.CommentListView:bulk_create")
+def comment_bulk_create(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    rows = [{"post_id": str(ctx.dataset.pick_post(rng)[0]), "content": "댓글 " * 5} for _ in range(20)]
+    return BenchRequest("POST", "/comments/bulk", headers=ctx.master_headers, data=_jsonl(rows))
+
+
+@scenario("api.CommentListView:export")
+def comment_export(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("GET", "/comments/export", headers=ctx.master_headers, query={"updated_from": ctx.recent(days=1)})
+
+
+@scenario("api.CommentInfoView:delete")
+def comment_delete(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    # 삭제할 댓글을 먼저 추가 (측정 대상 아님)
+    (post_id, _), author, now = ctx.dataset.pick_post(rng), ctx.dataset.pick_user(rng), datetime.utcnow()
+    comment = Comment(post=post_id, content="삭제용", created_by=ctx.dataset.users[author][0], created_at=now, updated_at=now)
+    comment_id = Comment._get_collection().insert_one(comment.to_mongo()).inserted_id
+    Post._get_collection().update_one({"_id": post_id}, {"$inc": {"comments_cnt": 1}})
+    return BenchRequest("DELETE", f"/comments/{comment_id}", headers=ctx.headers(author))
+
+
+@scenario("api.CommentInfoView:like", accept=(409,))
+def comment_like(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    (comment_id, _, _), user = ctx.dataset.pick_comment(rng), ctx.dataset.pick_user(rng)
+    _set_liked(Comment, comment_id, ctx.dataset.users[user][0], liked=False)
+    return BenchRequest("PUT", f"/comments/{comment_id}/like", headers=ctx.headers(user))
+
+
+@scenario("api.CommentInfoView:unlike", accept=(409,))
+def comment_unlike(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    (comment_id, _, _), user = ctx.dataset.pick_comment(rng), ctx.dataset.pick_user(rng)
+    _set_liked(Comment, comment_id, ctx.dataset.users[user][0], liked=True)
+    return BenchRequest("DELETE", f"/comments/{comment_id}/like", headers=ctx.headers(user))
+
+
+def registered_endpoints(app: Flask) -> List[Tuple[str, str, str]]:
+    # register_api 로 등록된 (endpoint, method, rule) 목록
+    routes = list()
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.startswith("api."):
+            for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+                routes.append((rule.endpoint, method, rule.rule))
+    return sorted(routes)
+
+
+def missing_scenarios(app: Flask) -> List[str]:
+    # 시나리오가 없는 라우트 목록 (라우트를 추가하면 시나리오도 같이 추가해야 벤치마크가 실행됨)
+    return [f"{method} {rule} ({endpoint})" for endpoint, method, rule in registered_endpoints(app) if endpoint not in SCENARIOS]
+
+
+# ---------- 백그라운드 작업 ----------
+@scenario("api.JobView:get_job")
+def job_detail(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    # 조회할 작업을 먼저 등록 (측정 대상 아님, worker 가 없으므로 queued 상태로 남음)
+    job_id = Job._get_collection().insert_one({"name": "benchmark.noop", "params": {}, "status": Job.STATUS_QUEUED, "run_at": datetime.utcnow() + timedelta(days=1)}).inserted_id
+    return BenchRequest("GET", f"/jobs/{job_id}", headers=ctx.master_headers)
+
+
+# ---------- 모니터링 ----------
+@scenario("api.MonitoringView:slow_queries")
+def slow_queries(ctx: ScenarioContext, rng: random.Random) -> BenchRequest:
+    return BenchRequest("GET", "/monitoring/slow-queries", headers=ctx.master_headers, query={"limit": 50})
@@ -0,0 +1,128 @@
+"""
+목록 응답 직렬화의 row 당 비용 측정 (DB 조회 제외)
+
+    python -m benchmarks.serialization                 # page_size=100
+    python -m benchmarks.serialization --rows 50 --repeat 500
+
+- document: pymongo 결과 -> Document._from_son (only 지정) -> 참조 document 채우기 -> marshmallow dump
+- compiled: document 와 같지만 marshmallow dump 대신 compile_dump 결과 사용 (COMPILED_SCHEMAS 경로)
+- raw: pymongo 결과 -> RawSerializer.dump (RAW_LIST_RESPONSES 경로)
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Sequence, Tuple, Type
+
+from bson import ObjectId
+from marshmallow import Schema
+from mongoengine import Document
+
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.post import CommentPreview, Post
+from app.models.user import User
+from app.serializers.category import CategoryInfoSchema
+from app.serializers.comment import CommentInfoSchema
+from app.serializers.post import PostMasterInfoSchema
+from app.serializers.user import UserInfoSchema
+from app.utils.prefetch import attach_references
+from app.utils.projection import schema_projection
+from app.utils.raw import RawSerializer
+from app.utils.schema_compiler import compile_dump
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization", description="목록 응답 직렬화 row 당 비용 비교 (Document vs raw)")
+    parser.add_argument("--rows", type=int, default=100, help="응답 1개의 row 수 (page_size)")
+    parser.add_argument("--repeat", type=int, default=200, help="측정 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def make_rows(rows: int, seed: int) -> Dict[Type[Document], Tuple[List[Dict], Dict[Type[Document], Dict[ObjectId, Document]]]]:
+    # document class 별 (pymongo 결과 목록, 참조 document class -> {id: document})
+    rng = random.Random(seed)
+    now = datetime(2021, 1, 1)
+    users = [User(id=ObjectId(), email=f"user{i}@example.com", name=f"user{i}", password="x", created_at=now, updated_at=now) for i in range(20)]
+    categories = [Category(id=ObjectId(), name=f"category{i}", created_by=users[0], created_at=now) for i in range(5)]
+    posts = [
+        Post(
+            id=ObjectId(),
+            title=f"title {i}",
+            content="content " * 20,
+            categories=rng.sample(categories, 2),
+            created_by=rng.choice(users),
+            likes=rng.sample(users, 5),
+            likes_cnt=5,
+            comments_cnt=3,
+            latest_comments=[CommentPreview(comment_id=ObjectId(), content="comment", created_by={"email": user.email, "name": user.name}, created_at=now) for user in rng.sample(users, 3)],
+            created_at=now + timedelta(minutes=i),
+            updated_at=now + timedelta(minutes=i),
+        )
+        for i in range(rows)
+    ]
+    comments = [Comment(id=ObjectId(), post=rng.choice(posts), content=f"comment {i}", likes=rng.sample(users, 3), likes_cnt=3, created_by=rng.choice(users), created_at=now, updated_at=now) for i in range(rows)]
+
+    references = {User: {user.id: user for user in users}, Category: {category.id: category for category in categories}, Post: {post.id: post for post in posts}}
+    # 사용자 / 카테고리 목록도 rows 개로 맞춤
+    documents = {Post: posts, Comment: comments, User: (users * rows)[:rows], Category: (categories * rows)[:rows]}
+    return {document_cls: ([document.to_mongo().to_dict() for document in items], references) for document_cls, items in documents.items()}
+
+
+def document_dump(schema: Schema, document_cls: Type[Document], sons: List[Dict], references: Dict[Type[Document], Dict[ObjectId, Document]], compiled: bool = False) -> Callable[[], List[Dict]]:
+    only_fields = schema_projection(schema, document_cls).fields
+    reference_fields = [name for name in RawSerializer(schema, document_cls).references]
+    schema_dump = (compile_dump(schema) if compiled else None) or schema.dump
+
+    def dump() -> List[Dict]:
+        documents = [document_cls._from_son(son, only_fields=only_fields, created=True) for son in sons]
+        attach_references(documents, reference_fields, references)
+        return schema_dump(documents)
+
+    return dump
+
+
+def raw_dump(schema: Schema, document_cls: Type[Document], sons: List[Dict], references: Dict[Type[Document], Dict[ObjectId, Document]]) -> Callable[[], List[Dict]]:
+    serializer = RawSerializer(schema, document_cls)
+    resolved = {cls: {item_id: document.to_mongo() for item_id, document in documents.items()} for cls, documents in references.items()}
+    return lambda: serializer.dump_many(sons, resolved)
+
+
+def measure(func: Callable[[], List[Dict]], repeat: int) -> float:
+    # 가장 빠른 1회 실행 시간 (초)
+    func()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    rows = make_rows(args.rows, args.seed)
+    targets: Sequence[Tuple[str, Schema, Type[Document]]] = [
+        ("post", PostMasterInfoSchema(many=True), Post),
+        ("comment", CommentInfoSchema(many=True), Comment),
+        ("user", UserInfoSchema(many=True), User),
+        ("category", CategoryInfoSchema(many=True), Category),
+    ]
+
+    print(f"rows: {args.rows}, repeat: {args.repeat} (µs/row)")
+    print(f"{'schema':<10}{'document':>12}{'compiled':>12}{'raw':>12}{'speedup':>10}")
+    for name, schema, document_cls in targets:
+        sons, references = rows[document_cls]
+        document, compiled, raw = document_dump(schema, document_cls, sons, references), document_dump(schema, document_cls, sons, references, compiled=True), raw_dump(schema, document_cls, sons, references)
+        if not document() == compiled() == raw():
+            print(f"{name}: document / compiled / raw 결과가 다릅니다", file=sys.stderr)
+            return 1
+        document_us, compiled_us, raw_us = (measure(func, args.repeat) / len(sons) * 1e6 for func in (document, compiled, raw))
+        print(f"{name:<10}{document_us:>12.1f}{compiled_us:>12.1f}{raw_us:>12.1f}{document_us / raw_us:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import pytest
+from flask import Flask
+
+from benchmarks.data import zipf_weights
+from benchmarks.runner import compare_reports, percentile
+from benchmarks.scenarios import missing_scenarios
+
+
+def _report(p95: float, ops: float = 2.0, errors: int = 0):
+    return {"endpoints": {"api.PostMasterView:get_list": {"latency_ms": {"p95": p95}, "mongo_ops_per_request": ops, "errors": errors, "status_codes": {}}}}
+
+
+class TestPercentile:
+    @pytest.mark.parametrize("p, expected", [(0, 1.0), (50, 3.0), (100, 5.0), (95, 4.8)])
+    def test_interpolation(self, p, expected):
+        assert percentile([5.0, 1.0, 3.0, 2.0, 4.0], p) == pytest.approx(expected)
+
+    def test_empty(self):
+        assert percentile([], 99) == 0.0
+
+
+class TestCompareReports:
+    def test_no_regression_within_tolerance(self):
+        assert compare_reports(_report(10.0), _report(11.5), tolerance=0.2) == []
+
+    def test_small_absolute_change_ignored(self):
+        assert compare_reports(_report(1.0), _report(1.8), tolerance=0.2, min_delta_ms=1.0) == []
+
+    def test_latency_regression(self):
+        assert len(compare_reports(_report(10.0), _report(15.0), tolerance=0.2)) == 1
+
+    def test_mongo_ops_regression(self):
+        assert len(compare_reports(_report(10.0, ops=2.0), _report(10.0, ops=3.0))) == 1
+
+    def test_new_errors(self):
+        assert len(compare_reports(_report(10.0), _report(10.0, errors=3))) == 1
+
+
+class TestDataset:
+    def test_zipf_weights_are_skewed(self):
+        weights = zipf_weights(100)
+        assert weights == sorted(weights, reverse=True) and weights[0] > 50 * weights[-1]
+
+
+class TestScenarios:
+    def test_every_route_has_scenario(self, app: Flask):
+        assert missing_scenarios(app) == []
@@ -1,7 +1,13 @@
+from datetime import datetime
+
+import mongoengine
 import pytest
-from flask import Flask
+from flask import Flask, g
 from flask.testing import FlaskClient
 
+from app.models.category import category_registry
+from app.models.user import User
+
 
 @pytest.fixture()
 def app() -> Flask:
@@ -13,3 +19,30 @@ def app() -> Flask:
 @pytest.fixture()
 def client(app: Flask) -> FlaskClient:
     return app.test_client(use_cookies=False)
+
+
+@pytest.fixture()
+def db(monkeypatch):
+    # test 마다 빈 mongomock DB 에 연결 (카테고리 저장소도 새 DB 기준으로 다시 불러옴)
+    mongoengine.disconnect()
+    connection = mongoengine.connect(db="welcome_aboard_test", host="mongomock://localhost")
+    monkeypatch.setattr(category_registry, "_version", None)
+    yield connection
+    connection.drop_database("welcome_aboard_test")
+    mongoengine.disconnect()
+
+
+@pytest.fixture()
+def make_user(db):
+    def make(name: str) -> User:
+        return User(email=f"{name}@example.com", name=name, password="x", created_at=datetime(2021, 1, 1), updated_at=datetime(2021, 1, 1)).save()
+
+    return make
+
+
+@pytest.fixture()
+def author(make_user) -> User:
+    # 모델 함수가 사용하는 g.user 를 지정한 request context 에서 실행 (다른 사용자로 바꿀 때는 g.user 를 직접 지정)
+    with Flask(__name__).test_request_context():
+        g.user = make_user("author")
+        yield g.user
@@ -0,0 +1,60 @@
+import time
+
+from bson import ObjectId
+
+from app.models.category import Category, CategoryRegistry, category_registry
+from app.models.version import VersionCounter
+
+
+def add_category(author, name: str, bump: bool = True) -> Category:
+    # 저장만 하고 버전은 bump 가 True 일 때만 올림 (다른 프로세스가 카테고리를 추가한 경우)
+    category = Category(name=name, created_by=author).save()
+    if bump:
+        VersionCounter.bump(CategoryRegistry.VERSION_NAME)
+    return category
+
+
+class TestCategoryRegistry:
+    def test_refresh(self, author):
+        for name in ("나중", "가장먼저", "Flask"):
+            add_category(author, name)
+        registry = CategoryRegistry(check_interval=60)
+        assert [category.name for category in registry.search()] == ["Flask", "가장먼저", "나중"]
+        assert [category.name for category in registry.search(name="flask")] == ["Flask"]
+        assert registry.version == 3
+
+    def test_invalidate_checks_version(self, author):
+        # invalidate 는 버전만 다시 확인하므로, 버전이 그대로이면 다시 불러오지 않음
+        registry = CategoryRegistry(check_interval=60)
+        registry.refresh()
+        add_category(author, "몰래", bump=False)
+        registry.invalidate()
+        assert registry.get_by_name("몰래") is None
+
+        VersionCounter.bump(CategoryRegistry.VERSION_NAME)
+        registry.invalidate()
+        assert registry.get_by_name("몰래") is not None
+
+    def test_check_interval(self, author):
+        # 다른 저장소 (다른 worker 프로세스) 에서 카테고리를 추가하고 버전을 올리면 check_interval 이 지난 뒤 다시 불러옴
+        registry = CategoryRegistry(check_interval=0.05)
+        registry.refresh()
+        Category.create_category(name="새카테고리")
+        assert category_registry.get_by_name("새카테고리") is not None
+        assert registry.get_by_name("새카테고리") is None
+        time.sleep(0.06)
+        assert registry.get_by_name("새카테고리") is not None
+
+    def test_force_refresh(self, author):
+        registry = CategoryRegistry(check_interval=60)
+        registry.refresh()
+        add_category(author, "관리자")
+        assert registry.get_by_name("관리자") is None
+        assert registry.get_by_name("관리자", force_refresh=True) is not None
+
+    def test_get_many(self, author):
+        # 존재하지 않는 id 는 제외, 중복은 한 번만 (요청한 순서 유지)
+        first, second = add_category(author, "첫째"), add_category(author, "둘째")
+        registry = CategoryRegistry(check_interval=60)
+        assert registry.get_many([second.id, ObjectId(), first.id, second.id]) == [second, first]
+        assert registry.get_by_id(ObjectId()) is None
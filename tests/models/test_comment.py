@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.jobs  # noqa: F401 (작업 처리 함수 등록)
+from app.models.comment import Comment
+from app.models.job import Job
+from app.models.post import CommentPreview, Post
+from app.utils.jobs import JobWorker
+from app.utils.trending import trending_scorer, utc_timestamp
+
+
+def make_comment(post: Post, author, content: str, created_at: datetime = datetime(2021, 1, 1)) -> Comment:
+    return Comment(post=post, content=content, created_by=author, created_at=created_at, updated_at=created_at).save()
+
+
+def walk_cursor(post: Post, page_size: int):
+    # 커서로 마지막 페이지까지 조회한 페이지별 댓글 id 목록
+    pages, cursor = list(), None
+    while True:
+        page = list(Comment.get_comment_list(page_no=1, page_size=page_size, post=post, cursor=cursor))
+        pages.append([comment.id for comment in page])
+        if len(page) < page_size:
+            return pages
+        cursor = (page[-1].created_at, page[-1].id)
+
+
+class TestCommentListCursor:
+    def test_pages(self, author):
+        post = Post(title="제목", content="본문", created_by=author).save()
+        comments = [make_comment(post, author, f"댓글 {i}", created_at=datetime(2021, 1, 1 + i)) for i in range(5)]
+        assert walk_cursor(post, page_size=2) == [[comments[0].id, comments[1].id], [comments[2].id, comments[3].id], [comments[4].id]]
+
+    def test_same_created_at(self, author):
+        # 작성 시각이 모두 같으면 _id 순으로 이어서 조회 (빠지거나 겹치는 댓글 없음)
+        post = Post(title="제목", content="본문", created_by=author).save()
+        comments = [make_comment(post, author, f"댓글 {i}") for i in range(5)]
+        assert sum(walk_cursor(post, page_size=2), []) == [comment.id for comment in comments]
+
+    def test_matches_page_no(self, author):
+        post = Post(title="제목", content="본문", created_by=author).save()
+        for i in range(7):
+            make_comment(post, author, f"댓글 {i}", created_at=datetime(2021, 1, 1 + i % 2))
+        by_page = [comment.id for page_no in range(1, 5) for comment in Comment.get_comment_list(page_no=page_no, page_size=2, post=post)]
+        assert sum(walk_cursor(post, page_size=2), []) == by_page and len(by_page) == 7
+
+    def test_other_posts_and_deleted(self, author):
+        post, other = Post(title="제목", content="본문", created_by=author).save(), Post(title="다른 제목", content="본문", created_by=author).save()
+        kept = make_comment(post, author, "댓글")
+        make_comment(other, author, "다른 포스트 댓글")
+        Comment(post=post, content="삭제된 댓글", created_by=author, created_at=datetime(2021, 1, 1), updated_at=datetime(2021, 1, 1), is_deleted=True).save()
+        assert walk_cursor(post, page_size=2) == [[kept.id]]
+
+
+def add_comment(post: Post, author, minute: int) -> Comment:
+    # create_comment 와 같이 댓글 저장 후 댓글 수 / 미리보기 반영 (작성 시각은 순서를 확인할 수 있도록 지정)
+    comment = make_comment(post, author, f"댓글 {minute}", created_at=datetime(2021, 1, 1, 0, minute))
+    Post.add_comment_previews({post.id: (1, [preview_of(comment, author)])})
+    return comment
+
+
+def preview_of(comment: Comment, author) -> dict:
+    return CommentPreview.make_son(comment.id, comment.content, {"email": author.email, "name": author.name}, comment.created_at)
+
+
+def comment_stats(post: Post):
+    son = Post._get_collection().find_one({"_id": post.id}, {"comments_cnt": 1, "latest_comments": 1})
+    return son.get("comments_cnt", 0), [item["comment_id"] for item in son.get("latest_comments", list())]
+
+
+class TestCommentPreviews:
+    def test_create_comment(self, author):
+        post = Post(title="제목", content="본문", created_by=author).save()
+        Comment.create_comment(post=post, content="댓글")
+        comment = Comment.objects.get(post=post)
+        assert comment_stats(post) == (1, [comment.id])
+        assert Post.objects.get(id=post.id).latest_comments[0].created_by == {"email": author.email, "name": author.name}
+
+    def test_concurrent_adds_out_of_order(self, author):
+        # 동시에 추가된 댓글의 반영 순서는 작성 순서와 다를 수 있음 ($sort + $slice 로 어떤 순서로 반영해도 최신 댓글만 남음)
+        post = Post(title="제목", content="본문", created_by=author).save()
+        comments = [make_comment(post, author, f"댓글 {minute}", created_at=datetime(2021, 1, 1, 0, minute)) for minute in range(6)]
+        for index in (4, 0, 5, 2, 1, 3):
+            Post.add_comment_previews({post.id: (1, [preview_of(comments[index], author)])})
+        assert comment_stats(post) == (6, [comments[5].id, comments[4].id, comments[3].id])
+
+    def test_bulk_add_merged(self, author):
+        # 대량 추가는 포스트별 한 번의 update 로, 이미 있던 미리보기와 합쳐서 최신 댓글만 남김
+        post, other = Post(title="제목", content="본문", created_by=author).save(), Post(title="다른 제목", content="본문", created_by=author).save()
+        add_comment(post, author, 5)
+        first = add_comment(post, author, 10)
+        comments = [make_comment(post, author, f"댓글 {minute}", created_at=datetime(2021, 1, 1, 0, minute)) for minute in (15, 20)]
+        other_comment = make_comment(other, author, "다른 포스트 댓글")
+        Post.add_comment_previews({post.id: (2, [preview_of(comment, author) for comment in comments[::-1]]), other.id: (1, [preview_of(other_comment, author)])})
+        assert comment_stats(post) == (4, [comments[1].id, comments[0].id, first.id])
+        assert comment_stats(other) == (1, [other_comment.id])
+
+    def test_delete_refills_preview(self, author):
+        post = Post(title="제목", content="본문", created_by=author).save()
+        comments = [add_comment(post, author, minute) for minute in range(5)]
+        comments[4].delete_comment()
+        assert comment_stats(post) == (4, [comments[3].id, comments[2].id, comments[1].id])
+
+    def test_delete_outside_preview(self, author):
+        post = Post(title="제목", content="본문", created_by=author).save()
+        comments = [add_comment(post, author, minute) for minute in range(5)]
+        comments[0].delete_comment()
+        assert comment_stats(post) == (4, [comments[4].id, comments[3].id, comments[2].id])
+
+    def test_delete_twice_decrements_once(self, author):
+        post = Post(title="제목", content="본문", created_by=author).save()
+        comments = [add_comment(post, author, minute) for minute in range(2)]
+        comments[1].delete_comment()
+        comments[1].delete_comment()
+        assert comment_stats(post) == (1, [comments[0].id])
+
+    def test_delete_last_comment(self, author):
+        post = Post(title="제목", content="본문", created_by=author).save()
+        add_comment(post, author, 0).delete_comment()
+        assert comment_stats(post) == (0, [])
+
+    def test_delete_subtracts_comment_score(self, author):
+        # 댓글 삭제는 댓글 작성 시각 기준 점수를 빼므로, 시간이 지나서 삭제해도 인기 점수는 댓글 전으로 돌아감
+        post, created_at = Post(title="제목", content="본문", created_by=author).save(), (datetime.utcnow() - timedelta(hours=24)).replace(microsecond=0)
+        comment = make_comment(post, author, "댓글", created_at=created_at)
+        Post.add_trend_score(post.id, trending_scorer.comment_weight, now=utc_timestamp(created_at))
+        comment.delete_comment()
+        stored = Post._get_collection().find_one(post.id)
+        assert stored["trend_score"] == pytest.approx(0.0, abs=trending_scorer.delta(trending_scorer.comment_weight, stored["trend_epoch"]) * 1e-9)
+
+
+class TestReconcileCommentStats:
+    def test_restore_drift(self, author):
+        post, untouched = Post(title="제목", content="본문", created_by=author).save(), Post(title="다른 제목", content="본문", created_by=author).save()
+        comments = [add_comment(post, author, minute) for minute in range(4)]
+        Comment(post=post, content="삭제된 댓글", created_by=author, created_at=datetime(2021, 1, 2), updated_at=datetime(2021, 1, 2), is_deleted=True).save()
+        Post._get_collection().update_one({"_id": post.id}, {"$set": {"comments_cnt": 9, "latest_comments": list()}})
+        version = Post.objects.get(id=post.id).version
+
+        assert Comment.reconcile_post_stats([post.id, untouched.id]) == 1
+        assert comment_stats(post) == (4, [comments[3].id, comments[2].id, comments[1].id]) and Post.objects.get(id=post.id).version == version + 1
+        assert Comment.reconcile_post_stats([post.id, untouched.id]) == 0
+
+    def test_job(self, author):
+        # 모든 포스트를 chunk 단위로 다시 계산하는 백그라운드 작업
+        posts = [Post(title=f"제목 {i}", content="본문", created_by=author).save() for i in range(3)]
+        for post in posts:
+            add_comment(post, author, 0)
+        Post._get_collection().update_many(dict(), {"$set": {"comments_cnt": 0, "latest_comments": list()}})
+
+        Job.enqueue("post.reconcile_comment_stats")
+        assert JobWorker(chunk_size=2).run_job(Job.claim_next("worker", lease_seconds=60)) == Job.STATUS_SUCCEEDED
+        assert [comment_stats(post)[0] for post in posts] == [1, 1, 1] and Job.objects.get().processed == 3
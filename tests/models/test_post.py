@@ -0,0 +1,273 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from flask import g
+from mongoengine import Q
+
+import app.jobs  # noqa: F401 (작업 처리 함수 등록)
+from app.api import ApiError
+from app.models.job import Job
+from app.models.post import LikesDelta, Post, PostLike
+from app.utils import ngram
+from app.utils.counter import counter_buffer
+from app.utils.jobs import JobWorker
+from app.utils.trending import trending_scorer, utc_timestamp
+
+
+def make_post(author, title: str, created_at: datetime = datetime(2021, 1, 1), **kwargs) -> Post:
+    return Post(title=title, title_ngrams=ngram.title_ngrams(title), content="본문", created_by=author, created_at=created_at, updated_at=created_at, **kwargs).save()
+
+
+def count_post_writes(monkeypatch) -> list:
+    # 포스트 collection 에 보내는 update 목록 (bulk_write 는 request 마다 1건)
+    collection, writes = Post._get_collection(), list()
+
+    class CountingCollection:
+        def __getattr__(self, name):
+            return getattr(collection, name)
+
+        def update_one(self, filter, update, **kwargs):
+            writes.append(update)
+            return collection.update_one(filter, update, **kwargs)
+
+        def bulk_write(self, requests, **kwargs):
+            writes.extend(requests)
+            return collection.bulk_write(requests, **kwargs)
+
+    monkeypatch.setattr(Post, "_get_collection", classmethod(lambda cls: CountingCollection()))
+    return writes
+
+
+def walk_cursor(page_size: int, **kwargs):
+    # 커서로 마지막 페이지까지 조회한 포스트 id 목록
+    post_ids, cursor = list(), None
+    while True:
+        page = list(Post.get_post_list(page_no=1, page_size=page_size, cursor=cursor, **kwargs))
+        post_ids.extend(post.id for post in page)
+        if len(page) < page_size:
+            return post_ids
+        cursor = (page[-1].created_at, page[-1].id)
+
+
+class TestPostListCursor:
+    def test_same_created_at(self, author):
+        # created_at 이 모두 같아도 _id 로 이어서 조회해서 빠지거나 겹치는 포스트가 없음
+        posts = [make_post(author, f"제목 {i}") for i in range(5)]
+        assert walk_cursor(page_size=2) == [post.id for post in reversed(posts)]
+
+    def test_matches_page_no(self, author):
+        for i in range(7):
+            make_post(author, f"제목 {i}", created_at=datetime(2021, 1, 1 + i % 3))
+        by_page = [post.id for page_no in range(1, 5) for post in Post.get_post_list(page_no=page_no, page_size=2)]
+        assert walk_cursor(page_size=2) == by_page and len(by_page) == 7
+
+    @pytest.mark.parametrize("title", ["여행", "!!"])
+    def test_reject_cursor_with_title(self, author, title):
+        # n-gram 검색 / 부분 일치 검색 모두 cursor 와 함께 요청하면 422
+        post = make_post(author, "여행 !! 후기")
+        with pytest.raises(ApiError) as e:
+            Post.get_post_list(page_no=1, page_size=10, title=title, cursor=(post.created_at, post.id))
+        assert e.value.status_code == 422
+
+
+class TestPostSearch:
+    def test_ranking(self, author):
+        # 제목 대비 일치 비율이 높은 순 -> 최신순
+        long_title = make_post(author, "제주 여행 맛집 총정리", created_at=datetime(2021, 1, 3))
+        old_exact = make_post(author, "제주 여행", created_at=datetime(2021, 1, 1))
+        new_exact = make_post(author, "제주 여행", created_at=datetime(2021, 1, 2))
+        make_post(author, "서울 맛집")
+        posts = Post.search_post_list(title="제주 여행", search_query=Q(is_deleted=False), page_no=1, page_size=10)
+        assert [post.id for post in posts] == [new_exact.id, old_exact.id, long_title.id]
+
+    def test_ngrams_from_other_words_excluded(self, author):
+        # 검색어 n-gram 이 제목의 서로 다른 단어에서 나온 경우는 제외 ("abc" 는 "ab bc" 에 포함되지 않음)
+        make_post(author, "ab bc", created_at=datetime(2021, 1, 2))
+        matched = make_post(author, "ABC 후기", created_at=datetime(2021, 1, 1))
+        assert [post.id for post in Post.get_post_list(page_no=1, page_size=10, title="abc")] == [matched.id]
+
+    def test_ranking_windows(self, author, monkeypatch):
+        # 점수는 최신 SEARCH_CANDIDATES_SIZE 개씩 묶어서 계산 (더 오래된 포스트는 제목이 정확히 일치해도 다음 묶음에서 이어짐)
+        monkeypatch.setattr(Post, "SEARCH_CANDIDATES_SIZE", 2)
+        exact = make_post(author, "여행", created_at=datetime(2021, 1, 1))
+        newer = [make_post(author, f"여행 후기 {i}", created_at=datetime(2021, 1, 2 + i)) for i in range(2)]
+        assert [post.id for post in Post.get_post_list(page_no=1, page_size=10, title="여행")] == [newer[1].id, newer[0].id, exact.id]
+        assert [post.id for post in Post.get_post_list(page_no=2, page_size=2, title="여행")] == [exact.id]
+
+    def test_reads_past_filtered_candidates(self, author, monkeypatch):
+        # 검색어를 포함하지 않는 후보가 SEARCH_CANDIDATES_SIZE 개보다 많아도 그보다 오래된 일치 포스트를 이어서 읽음
+        monkeypatch.setattr(Post, "SEARCH_CANDIDATES_SIZE", 2)
+        matched = [make_post(author, f"abc {i}", created_at=datetime(2021, 1, 1 + i)) for i in range(3)]
+        for i in range(5):
+            make_post(author, "ab bc", created_at=datetime(2021, 2, 1 + i))
+        pages = [[post.id for post in Post.get_post_list(page_no=page_no, page_size=2, title="abc")] for page_no in (1, 2, 3)]
+        assert pages == [[matched[2].id, matched[1].id], [matched[0].id], []]
+
+    def test_icontains_fallback(self, author):
+        # n-gram 을 만들 수 없는 검색어는 부분 일치 검색, page_no 로 이어서 조회
+        matched = [make_post(author, f"후기 !! {i}", created_at=datetime(2021, 1, 1 + i)) for i in range(3)]
+        make_post(author, "후기")
+        pages = [[post.id for post in Post.get_post_list(page_no=page_no, page_size=2, title="!!")] for page_no in (1, 2)]
+        assert pages == [[matched[2].id, matched[1].id], [matched[0].id]]
+
+    def test_icontains_fallback_with_cursor(self, author):
+        post = make_post(author, "후기 !!")
+        with pytest.raises(ApiError) as e:
+            Post.get_post_list(page_no=1, page_size=10, title="!!", cursor=(post.created_at, post.id))
+        assert e.value.status_code == 422
+
+
+class TestTrendScore:
+    def test_retry_until_rebased(self, author, monkeypatch):
+        # 이전 epoch 점수 변환이 다른 요청과 겹쳐서 여러 번 실패해도 점수는 반영됨
+        now = time.time()
+        epoch = trending_scorer.epoch(now)
+        post = make_post(author, "제목", trend_score=1.0, trend_epoch=epoch - trending_scorer.epoch_seconds)
+        collection, conflicts = Post._get_collection(), iter(range(5))
+
+        class ConflictingCollection:
+            def __getattr__(self, name):
+                return getattr(collection, name)
+
+            def update_one(self, filter, update):
+                if "$set" in update and "$inc" not in update and next(conflicts, None) is not None:
+                    # 변환 직전에 다른 요청이 이전 epoch 점수를 바꾼 상황
+                    collection.update_one({"_id": filter["_id"]}, {"$inc": {"trend_score": 1.0}})
+                return collection.update_one(filter, update)
+
+        monkeypatch.setattr(Post, "_get_collection", classmethod(lambda cls: ConflictingCollection()))
+        Post.add_trend_score(post.id, 1.0, now=now)
+
+        stored = collection.find_one(post.id)
+        assert stored["trend_epoch"] == epoch
+        assert trending_scorer.decay(stored["trend_score"], epoch, now) == pytest.approx(1.0, rel=1e-3)
+
+    def test_unlike_subtracts_like_score(self, author, monkeypatch):
+        # 좋아요 취소는 좋아요를 누른 시각 기준 점수를 빼므로, 시간이 지나서 취소해도 좋아요 전 점수로 돌아감
+        monkeypatch.setattr(counter_buffer, "enabled", False)
+        post, liked_at = make_post(author, "제목"), (datetime.utcnow() - timedelta(hours=24)).replace(microsecond=0)
+        PostLike._get_collection().insert_one({"post": post.id, "user": author.id, "created_at": liked_at})
+        Post.add_trend_score(post.id, trending_scorer.like_weight, now=utc_timestamp(liked_at))
+        post.remove_like()
+
+        # (저장된 점수는 epoch 기준이라 값이 크므로 현재 이벤트 점수 대비 오차로 비교, 현재 시각 기준으로 빼면 음수가 됨)
+        stored = Post._get_collection().find_one(post.id)
+        assert stored["likes_cnt"] == -1 and stored["trend_score"] == pytest.approx(0.0, abs=trending_scorer.delta(trending_scorer.like_weight, stored["trend_epoch"]) * 1e-9)
+
+    def test_likes_delta_across_epochs(self):
+        # 모으는 사이에 epoch 가 바뀌면 나중 epoch 기준으로 합침
+        now = time.time()
+        epoch = trending_scorer.epoch(now)
+        merged = LikesDelta.event(1, now=epoch - 1) + LikesDelta.event(1, now=now)
+        assert merged.epoch == epoch and merged.likes == 2 and merged.changes == 2
+        assert merged.score == pytest.approx(trending_scorer.delta(trending_scorer.like_weight, epoch, epoch - 1) + trending_scorer.delta(trending_scorer.like_weight, epoch, now))
+
+
+class TestPostLikes:
+    @pytest.fixture(autouse=True)
+    def buffered(self, db, monkeypatch):
+        # 좋아요 수는 모아두고 test 에서 직접 flush
+        monkeypatch.setattr(counter_buffer, "enabled", True)
+        monkeypatch.setattr(counter_buffer, "_ensure_worker", lambda: None)
+        yield
+        counter_buffer.flush()
+
+    def test_likes_write_post_once_per_flush(self, author, make_user, monkeypatch):
+        # 좋아요 / 취소는 post_like 에만 쓰고, 포스트 document 는 flush 때 좋아요 수 / 인기 점수 / version 을 $inc 1번으로 반영
+        post = make_post(author, "제목")
+        writes = count_post_writes(monkeypatch)
+        for name in ("a", "b", "c"):
+            g.user = make_user(name)
+            post.add_like()
+        with pytest.raises(ApiError) as e:
+            post.add_like()
+        assert e.value.status_code == 409
+        post.remove_like()
+        assert writes == list()
+
+        assert counter_buffer.flush() == 1 and len(writes) == 1
+        stored = Post._get_collection().find_one(post.id)
+        assert stored["likes_cnt"] == 2 and stored["version"] == post.version + 1 and PostLike.objects(post=post.id).count() == 2
+
+    def test_unbuffered_like_writes_post_once(self, author, monkeypatch):
+        monkeypatch.setattr(counter_buffer, "enabled", False)
+        post = make_post(author, "제목")
+        writes = count_post_writes(monkeypatch)
+        post.add_like()
+        assert len(writes) == 1 and Post._get_collection().find_one(post.id)["version"] == post.version + 1
+
+    def test_net_zero_likes_bump_version(self, author, make_user):
+        # 좋아요 수가 합쳐서 그대로여도 좋아요 목록이 바뀌었으므로 version 은 증가
+        post, reader = make_post(author, "제목"), make_user("reader")
+        PostLike.add(post.id, author.id)
+        g.user = reader
+        post.add_like()
+        g.user = author
+        post.remove_like()
+
+        assert counter_buffer.flush() == 1
+        stored = Post._get_collection().find_one(post.id)
+        assert stored["likes_cnt"] == 0 and stored["version"] == post.version + 1
+
+    def test_flush_merges_counter_and_trend(self, author, make_user):
+        post = make_post(author, "제목")
+        for name in ("a", "b", "c"):
+            g.user = make_user(name)
+            post.add_like()
+        post.remove_like()
+        assert counter_buffer.flush() == 1
+
+        stored = Post._get_collection().find_one(post.id)
+        assert stored["likes_cnt"] == 2 and stored["version"] == post.version + 1 and not stored.get("likes")
+        assert trending_scorer.decay(stored["trend_score"], stored["trend_epoch"]) == pytest.approx(2 * trending_scorer.like_weight, rel=1e-3)
+
+    def test_flush_rebases_previous_epoch(self, author):
+        now = time.time()
+        epoch = trending_scorer.epoch(now)
+        post = make_post(author, "제목", trend_score=1.0, trend_epoch=epoch - trending_scorer.epoch_seconds)
+        Post.add_likes_counts({post.id: LikesDelta.event(1, now=now), ObjectId(): LikesDelta.event(1, now=now)}, now=now)
+
+        stored = Post._get_collection().find_one(post.id)
+        assert stored["likes_cnt"] == 1 and stored["trend_epoch"] == epoch
+        assert trending_scorer.decay(stored["trend_score"], epoch, now) == pytest.approx(trending_scorer.like_weight, rel=1e-3)
+
+    def test_detail_matches_likes(self, author, make_user):
+        # 아직 반영되지 않은 증감량이 있어도 상세 조회의 좋아요 수는 좋아요 목록과 일치
+        post, reader = make_post(author, "제목"), make_user("reader")
+        post.add_like()
+        g.user = reader
+        post.add_like()
+
+        detail = Post.get_post_detail(post.id)
+        assert [user.id for user in detail.likes] == [author.id, reader.id] and detail.likes_cnt == 2
+        assert Post.get_post_detail(post.id, with_likes=False).likes_cnt == 0
+
+    def test_reconcile(self, author):
+        post = make_post(author, "제목", likes_cnt=5)
+        PostLike.add(post.id, author.id)
+        assert Post.reconcile_likes_cnt([post.id], settle_seconds=0) == 1
+        assert Post.objects.get(id=post.id).likes_cnt == 1
+
+    def test_remove_user_likes(self, author, make_user):
+        posts, other = [make_post(author, f"제목 {i}", likes_cnt=1) for i in range(3)], make_user("other")
+        for post in posts:
+            PostLike.add(post.id, author.id)
+        PostLike.add(posts[0].id, other.id)
+
+        assert Post.remove_user_likes_chunk(author.id, chunk_size=2) == 2
+        assert Post.remove_user_likes_chunk(author.id, chunk_size=2) == 1
+        assert Post.remove_user_likes_chunk(author.id, chunk_size=2) == 0
+        assert [Post.objects.get(id=post.id).likes_cnt for post in posts] == [0, 0, 0] and PostLike.objects(user=other.id).count() == 1
+
+    def test_move_likes_job(self, author, make_user):
+        # 포스트 document 에 좋아요 목록이 있던 (기존) 포스트는 post_like 로 옮김 (이미 옮긴 좋아요는 건너뜀)
+        reader = make_user("reader")
+        posts = [make_post(author, f"제목 {i}", likes=[author, reader], likes_cnt=2) for i in range(3)]
+        PostLike.add(posts[0].id, author.id)
+
+        Job.enqueue("post.move_likes")
+        assert JobWorker(chunk_size=2).run_job(Job.claim_next("worker", lease_seconds=60)) == Job.STATUS_SUCCEEDED
+        assert PostLike.objects.count() == 6 and Post._get_collection().count_documents({"likes": {"$exists": True}}) == 0
+        assert Post.get_post_detail(posts[1].id).likes_cnt == 2
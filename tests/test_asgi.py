@@ -0,0 +1,186 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import jwt
+import mongoengine
+import pytest
+from flask import Flask
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+from app.asgi import AsgiApp
+from app.models.category import Category, category_registry
+from app.models.comment import Comment
+from app.models.post import LikesDelta, Post, PostLike
+from app.utils import ngram
+from app.utils.access_log import access_logger
+from app.utils.cache import auth_user_cache, post_list_cache
+
+
+class FakeMotorCursor:
+    """motor cursor 대역 (mongomock 결과를 async for 로 전달)"""
+
+    def __init__(self, items):
+        self._items = iter(list(items))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeMotorDatabase:
+    """motor database 대역 (mongomock 으로 실행하고, 조회한 collection 이름 기록)"""
+
+    def __init__(self):
+        self.commands = list()
+
+    def __getitem__(self, name: str):
+        collection, commands = mongoengine.connection.get_db()[name], self.commands
+
+        class FakeMotorCollection:
+            def find(self, *args, **kwargs):
+                commands.append(("find", name))
+                return FakeMotorCursor(collection.find(*args, **kwargs))
+
+            def aggregate(self, pipeline):
+                commands.append(("aggregate", name))
+                return FakeMotorCursor(collection.aggregate(pipeline))
+
+        return FakeMotorCollection()
+
+
+@pytest.fixture()
+def flask_app(app, db, monkeypatch) -> Flask:
+    # 응답 캐시 없이 (캐시된 응답끼리 비교하지 않도록) mongomock DB 로 실행
+    monkeypatch.setattr(post_list_cache, "_backend", None)
+    monkeypatch.setattr(access_logger, "enabled", False)
+    return app
+
+
+@pytest.fixture()
+def asgi_app(flask_app) -> AsgiApp:
+    return AsgiApp(flask_app, sync_workers=2, database=FakeMotorDatabase())
+
+
+@pytest.fixture()
+def data(flask_app, make_user) -> Dict:
+    author, reader = make_user("author"), make_user("reader")
+    travel, food = Category(name="여행", created_by=author).save(), Category(name="음식", created_by=reader).save()
+    category_registry.invalidate()
+
+    posts = list()
+    for i in range(12):
+        created_at = datetime(2021, 1, 1) + timedelta(hours=i)
+        title = f"제주 여행 {i}" if i % 2 else f"맛집 {i}"
+        posts.append(Post(title=title, title_ngrams=ngram.title_ngrams(title), content="본문", categories=[travel] if i % 2 else [food], likes_cnt=1, created_by=author, created_at=created_at, updated_at=created_at).save())
+        PostLike.add(posts[-1].id, reader.id)
+    for i in range(12):
+        created_at = datetime(2021, 1, 2) + timedelta(minutes=i)
+        Comment(post=posts[-1], content=f"댓글 {i}", likes=[author], likes_cnt=1, created_by=reader, created_at=created_at, updated_at=created_at).save()
+
+    token = jwt.encode(payload={"email": reader.email, "is_master": False}, key=flask_app.config["TOKEN_KEY"], algorithm=flask_app.config["ALGORITHM"])
+    return {"headers": {"X-Auth-Token": token if isinstance(token, str) else token.decode("utf-8")}, "post": posts[-1], "category": travel}
+
+
+def wsgi_get(flask_app: Flask, path: str, headers: Dict) -> Tuple[int, Dict, bytes]:
+    # test client 의 응답 객체는 없는 Content-Type 을 채우므로 WSGI 서버가 받는 그대로 비교
+    app_iter, status, response_headers = run_wsgi_app(flask_app.wsgi_app, EnvironBuilder(path=path, headers=headers).get_environ())
+    return int(status.split(" ", 1)[0]), {name.lower(): value for name, value in response_headers.items()}, b"".join(app_iter)
+
+
+def asgi_get(asgi_app: AsgiApp, path: str, headers: Dict) -> Tuple[int, Dict, bytes]:
+    # ASGI 서버 대신 scope / receive / send 로 직접 호출
+    path, _, query_string = path.partition("?")
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query_string.encode("utf-8"),
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+        "server": ("localhost", 80),
+    }
+    messages: List[Dict] = list()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start, body = messages[0], b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], {name.decode("latin-1"): value.decode("latin-1") for name, value in start["headers"]}, body
+
+
+def compare(flask_app: Flask, asgi_app: AsgiApp, path: str, headers: Dict) -> Tuple[int, Dict, bytes]:
+    # 인증 사용자 캐시를 비우고 호출 (ASGI 도 토큰의 사용자를 DB 에서 조회하도록)
+    auth_user_cache.invalidate()
+    wsgi_status, wsgi_headers, wsgi_body = wsgi_get(flask_app, path, headers)
+    auth_user_cache.invalidate()
+    asgi_status, asgi_headers, asgi_body = asgi_get(asgi_app, path, headers)
+
+    assert asgi_status == wsgi_status
+    assert asgi_body == wsgi_body
+    # 요청마다 달라지는 header (request id, make_conditional 의 Date) 는 제외
+    assert {name: value for name, value in asgi_headers.items() if name not in ("x-request-id", "date")} == {name: value for name, value in wsgi_headers.items() if name not in ("x-request-id", "date")}
+    return wsgi_status, wsgi_headers, wsgi_body
+
+
+@pytest.fixture(params=[True, False], ids=["raw", "document"])
+def raw_list_responses(request, flask_app, monkeypatch) -> bool:
+    monkeypatch.setitem(flask_app.config, "RAW_LIST_RESPONSES", request.param)
+    return request.param
+
+
+@pytest.fixture()
+def conditional_responses(flask_app, monkeypatch):
+    monkeypatch.setitem(flask_app.config, "CONDITIONAL_RESPONSES", True)
+
+
+class TestAsgiResponses:
+    def test_post_list(self, flask_app, asgi_app, data, raw_list_responses):
+        status, headers, _ = compare(flask_app, asgi_app, "/posts?page_size=10", data["headers"])
+        assert status == 200 and headers["x-next-cursor"]
+        compare(flask_app, asgi_app, f"/posts?page_size=10&cursor={headers['x-next-cursor']}", data["headers"])
+        compare(flask_app, asgi_app, f"/posts?page_size=10&category_id={data['category'].id}", data["headers"])
+        compare(flask_app, asgi_app, "/posts?page_size=10&title=여행", data["headers"])
+        compare(flask_app, asgi_app, "/posts?page_size=10&title=!!", data["headers"])
+        assert ("aggregate", "post") in asgi_app.database.commands
+
+    def test_post_detail(self, flask_app, asgi_app, data, raw_list_responses, conditional_responses):
+        status, headers, _ = compare(flask_app, asgi_app, f"/posts/{data['post'].id}", data["headers"])
+        assert status == 200 and headers["etag"]
+        status, _, body = compare(flask_app, asgi_app, f"/posts/{data['post'].id}", {**data["headers"], "If-None-Match": headers["etag"]})
+        assert status == 304 and body == b""
+        # 좋아요가 추가되면 (좋아요 수와 함께) 포스트 version 이 바뀌어서 이전 ETag 로는 다시 조회
+        PostLike.add(data["post"].id, data["post"].created_by.id)
+        Post.add_likes_counts({data["post"].id: LikesDelta.event(1)})
+        assert compare(flask_app, asgi_app, f"/posts/{data['post'].id}", {**data["headers"], "If-None-Match": headers["etag"]})[0] == 200
+        assert compare(flask_app, asgi_app, f"/posts/{'0' * 24}", data["headers"])[0] == 404
+
+    def test_comment_list(self, flask_app, asgi_app, data, raw_list_responses):
+        status, headers, _ = compare(flask_app, asgi_app, f"/comments?post_id={data['post'].id}&page_size=10", data["headers"])
+        assert status == 200 and headers["x-next-cursor"]
+        compare(flask_app, asgi_app, f"/comments?post_id={data['post'].id}&page_size=10&cursor={headers['x-next-cursor']}", data["headers"])
+
+    def test_category_list(self, flask_app, asgi_app, data, raw_list_responses, conditional_responses):
+        status, headers, _ = compare(flask_app, asgi_app, "/category/list", data["headers"])
+        assert status == 200 and headers["etag"]
+        compare(flask_app, asgi_app, "/category/list?name=여", data["headers"])
+        assert compare(flask_app, asgi_app, "/category/list", {**data["headers"], "If-None-Match": headers["etag"]})[0] == 304
+
+    def test_user_info(self, flask_app, asgi_app, data):
+        assert compare(flask_app, asgi_app, "/user/info", data["headers"])[0] == 200
+        assert ("find", "user") in asgi_app.database.commands
+
+    def test_errors(self, flask_app, asgi_app, data):
+        assert compare(flask_app, asgi_app, "/posts?page_size=10", dict())[0] == 401
+        assert compare(flask_app, asgi_app, "/posts?page_size=10", {"X-Auth-Token": "invalid"})[0] == 401
+        assert compare(flask_app, asgi_app, "/posts?page_size=abc", data["headers"])[0] == 422
+        assert compare(flask_app, asgi_app, f"/posts?page_size=10&title=여행&cursor=MTYwOTQ1OTIwMDAwMDo1ZmVlNmJiMDAwMDAwMDAwMDAwMDAwMDA", data["headers"])[0] == 422
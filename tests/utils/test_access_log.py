@@ -0,0 +1,93 @@
+import json
+import time
+from queue import Queue
+from threading import Thread
+
+import pytest
+
+from app.utils.access_log import _STOP, AccessLogger, new_request_id
+
+
+def _log(logger: AccessLogger, status: int = 200, request_id: str = "req-1"):
+    logger.log(request_id=request_id, method="GET", route="api.UserView:info", path="/user/info", status=status, user_id="u1", latency=0.0125, mongo_seconds=0.002, mongo_commands=1)
+
+
+@pytest.fixture()
+def logger(monkeypatch) -> AccessLogger:
+    logger = AccessLogger(queue_size=2)
+    monkeypatch.setattr(logger, "_ensure_worker", lambda: None)
+    return logger
+
+
+class TestAccessLogger:
+    def test_entry_fields(self, logger):
+        _log(logger)
+        entry = logger._queue.get_nowait()
+        assert entry["request_id"] == "req-1" and entry["latency_ms"] == 12.5 and entry["mongo_ms"] == 2.0 and entry["user_id"] == "u1"
+
+    def test_dropped_on_overflow(self, logger):
+        for _ in range(5):
+            _log(logger)
+        assert logger._queue.qsize() == 2 and logger.dropped == 3
+
+    def test_dropped_count_written(self, logger):
+        for _ in range(3):
+            _log(logger)
+        entries = logger._drain(logger._queue)
+        assert entries[-1]["event"] == "access_log_dropped" and entries[-1]["count"] == 1 and logger.dropped == 0
+
+    def test_dropped_from_many_threads(self, logger):
+        threads = [Thread(target=lambda: [_log(logger) for _ in range(500)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert logger.dropped == 8 * 500 - 2
+
+    def test_sampling_keeps_server_errors(self, logger):
+        logger.sample_rate = 0.0
+        _log(logger, status=200)
+        _log(logger, status=503)
+        assert [entry["status"] for entry in logger._drain(logger._queue)] == [503]
+
+    def test_disabled(self, logger):
+        logger.enabled = False
+        _log(logger)
+        assert logger._queue.empty()
+
+    def test_written_as_json_lines(self, tmp_path):
+        path = tmp_path / "access.log"
+        logger = AccessLogger(path=str(path))
+        _log(logger, request_id="a")
+        _log(logger, request_id="b")
+        for _ in range(100):
+            if path.exists() and len(path.read_text().splitlines()) == 2:
+                break
+            time.sleep(0.01)
+        assert [json.loads(line)["request_id"] for line in path.read_text().splitlines()] == ["a", "b"]
+
+    def test_write_failure_logged(self, tmp_path, caplog):
+        # JSON 으로 바꿀 수 없는 값이 있어도 기록용 thread 는 종료되지 않고 logging 으로 남김
+        queue: Queue = Queue()
+        for entry in ({"request_id": object()}, _STOP):
+            queue.put(entry)
+        AccessLogger(path=str(tmp_path / "access.log"))._run(queue)
+        assert "access log write failed" in caplog.text
+
+    def test_configure_stops_worker(self, tmp_path):
+        # 이전 queue 의 log 는 이전 경로에 출력하고 thread 는 종료 (새 설정의 thread 만 남음)
+        old_path, new_path = tmp_path / "old.log", tmp_path / "new.log"
+        logger = AccessLogger(path=str(old_path))
+        _log(logger, request_id="a")
+        worker = logger._worker
+        logger.configure(enabled=True, path=str(new_path), sample_rate=1.0, queue_size=8)
+        assert not worker.is_alive() and logger._worker is None
+        assert [json.loads(line)["request_id"] for line in old_path.read_text().splitlines()] == ["a"]
+
+
+class TestRequestId:
+    def test_header_reused(self):
+        assert new_request_id("abc-123") == "abc-123"
+
+    def test_generated_when_missing_or_too_long(self):
+        assert len(new_request_id(None)) == 32 and new_request_id("x" * 100) != "x" * 100
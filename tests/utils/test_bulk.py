@@ -0,0 +1,25 @@
+import json
+
+from marshmallow import Schema, fields
+
+from app.utils.bulk import import_jsonl
+
+
+class RowSchema(Schema):
+    title = fields.String(required=True)
+
+
+class TestImportJsonl:
+    def test_chunked_insert_and_failures(self):
+        chunks = list()
+
+        def insert_rows(rows):
+            chunks.append([line for line, _ in rows])
+            return len(rows), list()
+
+        lines = [json.dumps({"title": str(i)}).encode("utf-8") for i in range(5)] + [b"{broken", b"", json.dumps({}).encode("utf-8")]
+        result = import_jsonl(lines, schema=RowSchema(), insert_rows=insert_rows, chunk_size=2)
+
+        assert chunks == [[1, 2], [3, 4], [5]]
+        assert result.to_dict()["total"] == 7 and result.inserted == 5 and result.failed == 2
+        assert [error["line"] for error in result.errors] == [6, 8]
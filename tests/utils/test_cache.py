@@ -0,0 +1,120 @@
+import time
+
+import pytest
+from flask import Response
+
+from app.utils.cache import AuthUserCache, ResponseCache
+
+
+@pytest.fixture()
+def cache(db) -> AuthUserCache:
+    cache = AuthUserCache(maxsize=2, ttl=60, check_interval=0)
+    cache.check_generation()
+    return cache
+
+
+class TestAuthUserCache:
+    def test_password_not_cached(self, cache):
+        cache.set("token-a", payload={"email": "a@test.com"}, user_son={"email": "a@test.com", "password": "hash"})
+        _, user_son = cache.get("token-a")
+        assert "password" not in user_son
+
+    def test_lru_eviction(self, cache):
+        cache.set("token-a", payload={}, user_son={"email": "a@test.com"})
+        cache.set("token-b", payload={}, user_son={"email": "b@test.com"})
+        cache.get("token-a")
+        cache.set("token-c", payload={}, user_son={"email": "c@test.com"})
+        assert cache.get("token-a") is not None and cache.get("token-b") is None
+
+    def test_ttl_expire(self):
+        cache = AuthUserCache(maxsize=2, ttl=0.01, check_interval=0)
+        cache.set("token-a", payload={}, user_son={"email": "a@test.com"})
+        time.sleep(0.02)
+        assert cache.get("token-a") is None
+
+    def test_invalidate_by_email(self, cache):
+        cache.set("token-a", payload={}, user_son={"email": "a@test.com"})
+        cache.set("token-b", payload={}, user_son={"email": "b@test.com"})
+        cache.invalidate(email="a@test.com")
+        assert cache.get("token-a") is None and cache.get("token-b") is not None
+
+    def test_invalidate_other_process(self, cache):
+        # 다른 worker 에서 사용자를 수정하면 세대 번호를 확인할 때 캐시 전체 삭제
+        cache.set("token-a", payload={}, user_son={"email": "a@test.com"})
+        AuthUserCache(check_interval=0).invalidate(email="b@test.com")
+        assert cache.needs_check and cache.get("token-a") is not None
+        cache.check_generation()
+        assert cache.get("token-a") is None
+
+    def test_check_interval(self, db):
+        cache = AuthUserCache(maxsize=2, ttl=60, check_interval=60)
+        cache.check_generation()
+        assert not cache.needs_check
+        cache.invalidate(email="a@test.com")
+        assert not cache.needs_check
+
+
+def make_response_cache(check_interval: float = 0) -> ResponseCache:
+    cache = ResponseCache(namespace="test")
+    cache.configure(backend="local", ttl=60, maxsize=16, check_interval=check_interval)
+    return cache
+
+
+class TestResponseCache:
+    @pytest.fixture()
+    def cache(self, db) -> ResponseCache:
+        return make_response_cache()
+
+    def test_hit(self, cache):
+        key = cache.make_key(page_no=1, page_size=20)
+        cache.set_response(key, Response('[{"post_id":"1"}]', headers={"X-Next-Cursor": "abc", "ETag": 'W/"123"', "Vary": "Origin"}, mimetype="application/json"))
+
+        response = cache.get_response(cache.make_key(page_size=20, page_no=1))
+        assert response.get_data(as_text=True) == '[{"post_id":"1"}]' and response.headers["X-Next-Cursor"] == "abc"
+        assert response.headers["ETag"] == 'W/"123"' and "Vary" not in response.headers
+
+    def test_invalidate(self, cache):
+        key = cache.make_key(page_no=1, page_size=20)
+        cache.set_response(key, Response("[]", mimetype="application/json"))
+        cache.invalidate()
+        assert cache.get_response(cache.make_key(page_no=1, page_size=20)) is None
+
+    def test_disabled(self):
+        cache = ResponseCache(namespace="test")
+        assert cache.make_key(page_no=1) is None and cache.get_response(None) is None
+
+    def test_invalidate_other_process(self, db):
+        # worker 프로세스마다 따로 만든 캐시도 세대 번호를 공유하므로, 한 쪽에서 invalidate 하면 다른 쪽도 이전 응답을 사용하지 않음
+        writer, reader = make_response_cache(), make_response_cache()
+        for cache in (writer, reader):
+            cache.set_response(cache.make_key(page_no=1), Response("[]", mimetype="application/json"))
+        writer.invalidate()
+        assert reader.get_response(reader.make_key(page_no=1)) is None and writer.get_response(writer.make_key(page_no=1)) is None
+
+    def test_check_interval(self, db):
+        # 다른 프로세스의 invalidate 는 check_interval 이 지난 뒤 확인
+        writer, reader = make_response_cache(), make_response_cache(check_interval=0.05)
+        reader.set_response(reader.make_key(page_no=1), Response("[]", mimetype="application/json"))
+        writer.invalidate()
+        assert reader.get_response(reader.make_key(page_no=1)) is not None
+        time.sleep(0.06)
+        assert reader.get_response(reader.make_key(page_no=1)) is None
+
+    def test_coalesce(self, db):
+        # coalesce 무효화는 check_interval 안에 한 번만 세대 번호를 올리고, 나머지는 interval 이 지난 뒤 다음 조회 때 반영
+        cache = make_response_cache(check_interval=0.05)
+        cache.invalidate(coalesce=True)
+        first = cache.make_key(page_no=1)
+        cache.set_response(first, Response("[]", mimetype="application/json"))
+        cache.invalidate(coalesce=True)
+        cache.invalidate(coalesce=True)
+        assert cache.make_key(page_no=1) == first and cache.get_response(first) is not None
+        time.sleep(0.06)
+        assert cache.get_response(cache.make_key(page_no=1)) is None
+
+    def test_invalidate_not_coalesced(self, db):
+        cache = make_response_cache(check_interval=60)
+        cache.invalidate(coalesce=True)
+        key = cache.make_key(page_no=1)
+        cache.invalidate()
+        assert cache.make_key(page_no=1) != key
@@ -0,0 +1,62 @@
+import pytest
+from flask import Flask, jsonify
+
+from app.utils.conditional import etag_headers, is_not_modified, make_etag, not_modified_response, register_conditional_responses
+
+
+@pytest.fixture()
+def client():
+    app = Flask(__name__)
+    app.config["CONDITIONAL_RESPONSES"] = True
+    register_conditional_responses(app)
+
+    @app.route("/tagged")
+    def tagged():
+        response = jsonify([1, 2, 3])
+        response.add_etag(weak=True)
+        return response
+
+    @app.route("/untagged")
+    def untagged():
+        return jsonify([1, 2, 3])
+
+    return app.test_client()
+
+
+class TestEtag:
+    def test_make_etag(self):
+        assert make_etag("post", 3, 12) == 'W/"post-3-12"'
+
+    @pytest.mark.parametrize(
+        "if_none_match, expected",
+        [(None, False), ("", False), ('W/"post-3-12"', True), ('"post-3-12"', True), ('"a", W/"post-3-12"', True), ("*", True), ('W/"post-4-12"', False)],
+    )
+    def test_is_not_modified(self, if_none_match, expected):
+        assert is_not_modified(make_etag("post", 3, 12), if_none_match) is expected
+
+    def test_not_modified_response(self):
+        response = not_modified_response(make_etag("category", 1))
+        assert response.status_code == 304 and response.get_data() == b"" and response.headers["ETag"] == 'W/"category-1"'
+
+    def test_etag_headers_disabled(self):
+        assert etag_headers(make_etag("category", 1), enabled=False) == dict()
+
+
+class TestConditionalResponses:
+    def test_not_modified(self, client):
+        etag = client.get("/tagged").headers["ETag"]
+        response = client.get("/tagged", headers={"If-None-Match": etag})
+        assert response.status_code == 304 and response.get_data() == b"" and response.headers["ETag"] == etag
+
+    def test_modified(self, client):
+        response = client.get("/tagged", headers={"If-None-Match": 'W/"other"'})
+        assert response.status_code == 200 and response.json == [1, 2, 3]
+
+    def test_without_etag(self, client):
+        response = client.get("/untagged", headers={"If-None-Match": "*"})
+        assert response.status_code == 200 and "ETag" not in response.headers
+
+    def test_disabled(self, client):
+        client.application.config["CONDITIONAL_RESPONSES"] = False
+        etag = client.get("/tagged").headers["ETag"]
+        assert client.get("/tagged", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,145 @@
+import time
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from app.utils import counter
+from app.utils.counter import CounterBuffer, array_sizes, find_counter_drift, grouped_counts, inc_counters, reconcile_counters
+
+
+class FakeTarget:
+    """반영 함수 대역 (호출마다 받은 증감량 기록, fail 횟수만큼 에러)"""
+
+    def __init__(self, fail: int = 0):
+        self.calls, self.fail = list(), fail
+
+    def __call__(self, deltas):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("write failed")
+        self.calls.append(dict(deltas))
+
+
+@pytest.fixture()
+def buffer() -> CounterBuffer:
+    return CounterBuffer(enabled=True, flush_interval=60, max_pending=1000)
+
+
+@pytest.fixture()
+def collection():
+    return mongomock.MongoClient().db.post
+
+
+class TestCounterBuffer:
+    def test_merge_deltas(self, buffer):
+        target, post_id, other_id = FakeTarget(), ObjectId(), ObjectId()
+        for delta in (1, 1, 1, -1):
+            buffer.add(target, post_id, delta)
+        buffer.add(target, other_id, 1)
+        assert buffer.flush() == 2 and target.calls == [{post_id: 2, other_id: 1}] and buffer.pending == 0
+
+    def test_skip_zero(self, buffer):
+        target, post_id = FakeTarget(), ObjectId()
+        buffer.add(target, post_id, 1)
+        buffer.add(target, post_id, -1)
+        assert buffer.flush() == 0 and target.calls == list()
+
+    def test_group_by_target(self, buffer):
+        posts, comments, target_id = FakeTarget(), FakeTarget(), ObjectId()
+        buffer.add(posts, target_id, 1)
+        buffer.add(comments, target_id, 1)
+        buffer.flush()
+        assert posts.calls == [{target_id: 1}] and comments.calls == [{target_id: 1}]
+
+    def test_retry_failed(self, buffer):
+        target, post_id = FakeTarget(fail=1), ObjectId()
+        buffer.add(target, post_id, 2)
+        assert buffer.flush() == 0 and buffer.failed_flushes == 1
+
+        # 실패한 증감량은 그 사이에 모인 증감량과 합쳐서 다시 반영
+        buffer.add(target, post_id, 1)
+        assert buffer.flush() == 1 and target.calls == [{post_id: 3}]
+
+    def test_flush_when_full(self):
+        buffer, target = CounterBuffer(enabled=True, flush_interval=60, max_pending=3), FakeTarget()
+        for _ in range(3):
+            buffer.add(target, ObjectId(), 1)
+        deadline = time.monotonic() + 5
+        while not target.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(target.calls) == 1 and len(target.calls[0]) == 3
+
+    def test_disabled(self):
+        buffer, target = CounterBuffer(enabled=False), FakeTarget()
+        buffer.add(target, ObjectId(), 1)
+        assert buffer.pending == 0 and buffer.inline("likes_cnt", -1) == {"inc__likes_cnt": -1}
+
+    def test_inline_when_enabled(self, buffer):
+        assert buffer.inline("likes_cnt", 1) == dict()
+
+
+class TestCounterWrites:
+    def test_inc_counters(self, collection):
+        post_ids = [collection.insert_one({"likes_cnt": 1, "version": 0}).inserted_id for _ in range(2)]
+        inc_counters(collection, "likes_cnt", {post_ids[0]: 3, post_ids[1]: -1}, extra={"version": 1})
+        assert [(post["likes_cnt"], post["version"]) for post in collection.find().sort("_id", 1)] == [(4, 1), (0, 1)]
+
+    def test_find_drift(self, collection):
+        ok = collection.insert_one({"likes": [1, 2], "likes_cnt": 2}).inserted_id
+        drifted = collection.insert_one({"likes": [1, 2], "likes_cnt": 1}).inserted_id
+        legacy = collection.insert_one({"likes_cnt": 1}).inserted_id
+        assert find_counter_drift(collection, [ok, drifted, legacy], "likes_cnt", array_sizes(collection, "likes")) == {drifted: (1, 2), legacy: (1, 0)}
+
+
+class TestReconcileCounters:
+    @pytest.fixture(autouse=True)
+    def during_settle(self, monkeypatch):
+        # settle 동안 다른 요청 / worker 가 한 작업을 흉내내는 함수 목록
+        actions = list()
+        monkeypatch.setattr(counter.time, "sleep", lambda seconds: [action() for action in actions])
+        return actions
+
+    def test_restore_lost_deltas(self, collection):
+        # 좋아요 목록은 저장되었지만 증감량이 반영되기 전에 프로세스가 종료된 경우
+        buffer, users = CounterBuffer(enabled=True, flush_interval=60), [ObjectId() for _ in range(3)]
+        post_id = collection.insert_one({"likes": list(), "likes_cnt": 0}).inserted_id
+        for user in users:
+            collection.update_one({"_id": post_id, "likes": {"$ne": user}}, {"$push": {"likes": user}})
+            buffer.add(lambda deltas: inc_counters(collection, "likes_cnt", deltas), post_id, 1)
+        del buffer
+
+        assert reconcile_counters(collection, [post_id], "likes_cnt", array_sizes(collection, "likes"), settle_seconds=0) == 1
+        assert collection.find_one(post_id)["likes_cnt"] == 3
+
+    def test_pending_delta_not_overwritten(self, collection, during_settle):
+        # 다른 프로세스에 모여 있던 증감량이 settle 동안 반영되면 덮어쓰지 않음 (덮어쓰면 +1 이 두 번 반영됨)
+        post_id = collection.insert_one({"likes": [ObjectId()], "likes_cnt": 0}).inserted_id
+        during_settle.append(lambda: inc_counters(collection, "likes_cnt", {post_id: 1}))
+        assert reconcile_counters(collection, [post_id], "likes_cnt", array_sizes(collection, "likes"), settle_seconds=0) == 0
+        assert collection.find_one(post_id)["likes_cnt"] == 1
+
+    def test_new_like_during_settle(self, collection, during_settle):
+        post_id = collection.insert_one({"likes": [ObjectId()], "likes_cnt": 0}).inserted_id
+        during_settle.append(lambda: collection.update_one({"_id": post_id}, {"$push": {"likes": ObjectId()}}))
+        assert reconcile_counters(collection, [post_id], "likes_cnt", array_sizes(collection, "likes"), settle_seconds=0) == 0
+
+    def test_empty_members(self, collection):
+        post_ids = [collection.insert_one({"likes": list(), "likes_cnt": 2}).inserted_id, collection.insert_one({"likes_cnt": 1}).inserted_id]
+        assert reconcile_counters(collection, post_ids, "likes_cnt", array_sizes(collection, "likes"), settle_seconds=0, extra={"version": 1}) == 2
+        assert [(post["likes_cnt"], post["version"]) for post in collection.find().sort("_id", 1)] == [(0, 1), (0, 1)]
+
+    def test_grouped_members(self, collection, during_settle):
+        # 멤버를 별도 collection 에 보관하는 경우 (포스트 좋아요), settle 동안 좋아요가 추가된 포스트는 제외
+        likes = collection.database.post_like
+        post_ids = [collection.insert_one({"likes_cnt": 0}).inserted_id for _ in range(3)]
+        likes.insert_many([{"post": post_ids[0], "user": ObjectId()}, {"post": post_ids[0], "user": ObjectId()}, {"post": post_ids[1], "user": ObjectId()}])
+        collection.update_one({"_id": post_ids[2]}, {"$set": {"likes_cnt": 1}})
+        during_settle.append(lambda: likes.insert_one({"post": post_ids[1], "user": ObjectId()}))
+        assert reconcile_counters(collection, post_ids, "likes_cnt", grouped_counts(likes, "post"), settle_seconds=0) == 2
+        assert [post["likes_cnt"] for post in collection.find().sort("_id", 1)] == [2, 0, 0]
+
+    def test_no_drift(self, collection, during_settle):
+        post_id = collection.insert_one({"likes": [ObjectId()], "likes_cnt": 1}).inserted_id
+        during_settle.append(lambda: pytest.fail("값이 같으면 기다리지 않음"))
+        assert reconcile_counters(collection, [post_id], "likes_cnt", array_sizes(collection, "likes"), settle_seconds=0) == 0
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.utils.cursor import encode_cursor, decode_cursor
+
+
+class TestCursor:
+    def test_round_trip(self):
+        created_at, object_id = datetime(2022, 3, 1, 12, 30, 15, 123000), ObjectId()
+        assert decode_cursor(encode_cursor(created_at, object_id)) == (created_at, object_id)
+
+    @pytest.mark.parametrize("cursor", ["", "zzz", "bm90LWEtY3Vyc29y"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
@@ -0,0 +1,32 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.api import ApiError
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.user import User
+from app.utils.export import build_export_query, iter_ndjson
+
+
+class TestExport:
+    def test_range_in_index_order(self, author):
+        # updated_at 범위 안의 document 를 (updated_at, _id) 순서로 한 줄씩 출력
+        posts = [Post(title=f"제목 {i}", content="본문", created_by=author, updated_at=datetime(2021, 1, 1 + i % 3)).save() for i in range(6)]
+        query, projection = build_export_query(Post, updated_from=datetime(2021, 1, 2), fields=["title", "updated_at"])
+        rows = [json.loads(line) for line in iter_ndjson(Post, query=query, projection=projection, batch_size=2)]
+
+        expected = sorted((post for post in posts if post.updated_at >= datetime(2021, 1, 2)), key=lambda post: (post.updated_at, post.id))
+        assert [row["_id"] for row in rows] == [str(post.id) for post in expected]
+        assert set(rows[0]) == {"_id", "title", "updated_at"}
+
+    def test_unknown_field(self, db):
+        with pytest.raises(ApiError) as e:
+            build_export_query(Post, fields=["title_ngrams"], hidden_fields=("title_ngrams",))
+        assert e.value.status_code == 422
+
+    @pytest.mark.parametrize("document_cls", [Post, Comment, User])
+    def test_sort_index(self, document_cls):
+        # export 정렬과 같은 순서의 인덱스가 있어야 범위 조회 시 메모리 정렬이 생기지 않음
+        assert ("updated_at", "id") in [tuple(index["fields"]) for index in document_cls._meta["indexes"]]
@@ -0,0 +1,53 @@
+from datetime import date, datetime
+
+import pytest
+from flask import Flask, jsonify as flask_jsonify
+
+from app.utils.fast_json import JsonEngine
+
+pytest.importorskip("orjson")
+
+
+@pytest.fixture()
+def app() -> Flask:
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture()
+def engine() -> JsonEngine:
+    return JsonEngine(engine="orjson")
+
+
+SAMPLES = [
+    {"b": 1, "a": [1.5, -0.0, 1e15, 123456.789, True, None], "c": {"z": "ascii"}},
+    [{"title": "서울 맛집 여행", "name": "홍길동", "control": "\t\n\x01 ", "quote": '"\\/'}],
+    {"created_at": datetime(2021, 1, 2, 3, 4, 5), "day": date(2021, 1, 2)},
+]
+
+
+class TestJsonEngine:
+    @pytest.mark.parametrize("data", SAMPLES)
+    def test_same_bytes_as_flask(self, app, engine, data):
+        assert engine.jsonify(data).get_data() == flask_jsonify(data).get_data()
+
+    @pytest.mark.parametrize("data", SAMPLES)
+    def test_same_bytes_without_ascii_escape(self, app, engine, data):
+        app.config["JSON_AS_ASCII"], app.config["JSON_SORT_KEYS"] = False, False
+        assert engine.jsonify(data).get_data() == flask_jsonify(data).get_data()
+
+    @pytest.mark.parametrize("data", [{"small": 1e-05}, {"large": [1e16, 1.5e20, -1e300]}, {"emoji": "😀", "latin": "é", "del": "\x7f"}, {"big": 2 ** 70}, {1: "int key"}])
+    def test_fallback_to_stdlib(self, app, engine, data):
+        assert engine.dumps(data) is None
+        assert engine.jsonify(data).get_data() == flask_jsonify(data).get_data()
+
+    def test_flask_engine(self, app):
+        engine = JsonEngine(engine="flask")
+        assert not engine.enabled and engine.jsonify({"a": 1}).get_data() == flask_jsonify({"a": 1}).get_data()
+        with pytest.raises(ValueError):
+            engine.configure(engine="ujson")
+
+    def test_args_and_kwargs(self, app, engine):
+        assert engine.jsonify(1, 2).get_data() == flask_jsonify(1, 2).get_data()
+        assert engine.jsonify(a=1).get_data() == flask_jsonify(a=1).get_data()
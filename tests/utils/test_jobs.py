@@ -0,0 +1,104 @@
+import pytest
+
+from app.models.job import Job
+from app.utils.jobs import JOB_HANDLERS, JobContext, JobLeaseLost, JobWorker, job_handler
+
+
+class FakeJob:
+    """DB 없이 worker 동작만 확인하기 위한 Job 대역"""
+
+    def __init__(self, name: str, attempts: int = 1, max_attempts: int = 3, owned: bool = True):
+        self.id, self.name, self.params = "job-1", name, dict()
+        self.attempts, self.max_attempts, self.owned = attempts, max_attempts, owned
+        self.processed, self.step, self.total, self.result = 0, None, None, None
+
+    def report_progress(self, processed, lease_seconds, step=None, total=None):
+        self.processed, self.step, self.total = processed, step or self.step, total if total is not None else self.total
+        return self.owned
+
+    def mark_succeeded(self):
+        self.result = "succeeded"
+        return True
+
+    def mark_failed(self, error, retry_delay):
+        self.result = f"failed: {error}"
+        return True
+
+
+@pytest.fixture(autouse=True)
+def handlers():
+    saved = dict(JOB_HANDLERS)
+    yield
+    JOB_HANDLERS.clear()
+    JOB_HANDLERS.update(saved)
+
+
+class TestJobWorker:
+    def test_chunked_progress(self):
+        @job_handler("test.chunks")
+        def chunks(ctx: JobContext):
+            for size in (3, 3, 1):
+                ctx.progress(size)
+
+        job = FakeJob("test.chunks")
+        assert JobWorker().run_job(job) == Job.STATUS_SUCCEEDED and job.processed == 7
+
+    def test_progress_per_step(self):
+        @job_handler("test.steps")
+        def steps(ctx: JobContext):
+            for step, total in (("posts", 4), ("comments", 2)):
+                ctx.progress(step=step, total=total)
+                for _ in range(total):
+                    ctx.progress(1)
+
+        job = FakeJob("test.steps")
+        assert JobWorker().run_job(job) == Job.STATUS_SUCCEEDED and (job.step, job.processed, job.total) == ("comments", 2, 2)
+
+    def test_progress_restarts_on_retry(self, db):
+        # 재시도는 남은 대상으로 total 을 다시 계산하므로, 이전 시도에서 처리한 개수는 이어서 세지 않음
+        remaining = [5]
+
+        @job_handler("test.retry")
+        def retry(ctx: JobContext):
+            ctx.progress(step="items", total=remaining[0])
+            while remaining[0]:
+                remaining[0] -= 1
+                ctx.progress(1)
+                if remaining[0] == 2 and ctx.job.attempts == 1:
+                    raise RuntimeError("boom")
+
+        worker = JobWorker(retry_delay=0)
+        Job.enqueue("test.retry")
+        assert worker.run_job(Job.claim_next("worker", lease_seconds=60)) == Job.STATUS_QUEUED
+        assert worker.run_job(Job.claim_next("worker", lease_seconds=60)) == Job.STATUS_SUCCEEDED
+        job = Job.objects.get()
+        assert (job.attempts, job.processed, job.total) == (2, 2, 2)
+
+    def test_retry_scheduled(self):
+        @job_handler("test.error")
+        def error(ctx: JobContext):
+            raise RuntimeError("boom")
+
+        job = FakeJob("test.error", attempts=1, max_attempts=3)
+        assert JobWorker().run_job(job) == Job.STATUS_QUEUED and job.result == "failed: RuntimeError: boom"
+
+    def test_last_attempt_failed(self):
+        @job_handler("test.error")
+        def error(ctx: JobContext):
+            raise RuntimeError("boom")
+
+        assert JobWorker().run_job(FakeJob("test.error", attempts=3, max_attempts=3)) == Job.STATUS_FAILED
+
+    def test_unknown_job_not_retried(self):
+        job = FakeJob("test.unknown", attempts=1, max_attempts=3)
+        assert JobWorker().run_job(job) == Job.STATUS_FAILED and job.max_attempts == 1
+
+    def test_lease_lost_stops_without_marking(self):
+        @job_handler("test.lease")
+        def lease(ctx: JobContext):
+            ctx.progress(1)
+
+        job = FakeJob("test.lease", owned=False)
+        with pytest.raises(JobLeaseLost):
+            JobContext(job, chunk_size=10, lease_seconds=60).progress(1)
+        assert JobWorker().run_job(job) == "lease lost" and job.result is None
@@ -0,0 +1,91 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, g
+
+from app.utils.monitoring import RequestMetrics, RequestStats, mongo_command_listener, register_metrics, track_async_request, untrack_async_request
+
+
+@pytest.fixture()
+def metrics() -> RequestMetrics:
+    return RequestMetrics(buckets=(0.1, 1.0))
+
+
+class TestRequestMetrics:
+    def test_cumulative_buckets(self, metrics):
+        metrics.observe("api.PostMasterView:get_list", "GET", 200, 0.05)
+        metrics.observe("api.PostMasterView:get_list", "GET", 200, 0.5)
+        metrics.observe("api.PostMasterView:get_list", "GET", 500, 5.0)
+        text = metrics.render()
+        labels = 'endpoint="api.PostMasterView:get_list",method="GET"'
+        assert f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="1.0"}} 2' in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+        assert f"http_request_duration_seconds_count{{{labels}}} 3" in text
+        assert f'http_requests_total{{{labels},status="500"}} 1' in text
+
+    def test_unmatched_endpoint(self, metrics):
+        metrics.observe(None, "GET", 404, 0.01)
+        assert 'http_requests_total{endpoint="unmatched",method="GET",status="404"} 1' in metrics.render()
+
+    def test_mongo_totals(self, metrics):
+        metrics.observe("api.UserView:info", "GET", 200, 0.01, mongo_count=2, mongo_seconds=0.004)
+        metrics.observe("api.UserView:info", "GET", 200, 0.01, mongo_count=1, mongo_seconds=0.002)
+        assert 'mongodb_commands_total{endpoint="api.UserView:info",method="GET"} 3' in metrics.render()
+
+    def test_merge_other_workers(self, tmp_path):
+        # 다른 worker 가 저장한 집계를 합쳐서 출력 (자기 파일은 현재 값으로 대신함)
+        other = RequestMetrics(buckets=(0.1, 1.0))
+        other.observe("api.UserView:info", "GET", 200, 0.5, mongo_count=2)
+        (tmp_path / "99999.json").write_text(json.dumps(other.snapshot()))
+
+        metrics = RequestMetrics(buckets=(0.1, 1.0), shared_dir=str(tmp_path))
+        metrics._ensure_writer = lambda: None
+        metrics.observe("api.UserView:info", "GET", 200, 0.05, mongo_count=1)
+        metrics.write_snapshot()
+        text = metrics.render()
+        labels = 'endpoint="api.UserView:info",method="GET"'
+        assert f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+        assert f"http_request_duration_seconds_count{{{labels}}} 2" in text
+        assert f"mongodb_commands_total{{{labels}}} 3" in text
+
+
+class TestMetricsView:
+    @pytest.fixture()
+    def make_client(self):
+        def make(token):
+            app = Flask(__name__)
+            app.config.update(METRICS_TOKEN=token, METRICS_SHARED_DIR=None, METRICS_WRITE_INTERVAL=5)
+            register_metrics(app)
+            return app.test_client()
+
+        return make
+
+    def test_not_registered_without_token(self, make_client):
+        assert make_client(None).get("/metrics").status_code == 404
+
+    def test_requires_token(self, make_client):
+        client = make_client("secret")
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200 and b"http_requests_total" in response.data
+
+
+class TestMongoCommandListener:
+    def test_recorded_on_flask_request(self):
+        with Flask(__name__).app_context():
+            g.request_stats = RequestStats()
+            mongo_command_listener.succeeded(SimpleNamespace(duration_micros=1500))
+            mongo_command_listener.failed(SimpleNamespace(duration_micros=500))
+            assert g.request_stats.mongo_count == 2 and g.request_stats.mongo_seconds == pytest.approx(0.002)
+
+    def test_recorded_on_async_request(self):
+        stats = track_async_request()
+        try:
+            mongo_command_listener.succeeded(SimpleNamespace(duration_micros=1000))
+        finally:
+            untrack_async_request()
+        mongo_command_listener.succeeded(SimpleNamespace(duration_micros=1000))
+        assert stats.mongo_count == 1
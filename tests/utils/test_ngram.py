@@ -0,0 +1,15 @@
+from app.utils.ngram import normalize_text, title_ngrams, query_ngrams
+
+
+class TestNgram:
+    def test_query_grams_are_subset_of_title_grams(self):
+        assert set(query_ngrams("환영 합니다")) <= set(title_ngrams("신입 사원 환영합니다!"))
+
+    def test_single_character_query(self):
+        assert query_ngrams("목") == ["목"] and "목" in title_ngrams("제목")
+
+    def test_normalize(self):
+        assert title_ngrams("ＡＢ") == title_ngrams("ab")
+
+    def test_normalize_text(self):
+        assert normalize_text("  ＡＢＣ,  후기!! ") == "abc 후기" and "abc" not in normalize_text("ab bc")
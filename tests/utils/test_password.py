@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from app.api import ApiError
+from app.utils.password import PasswordHasher
+
+
+@pytest.fixture()
+def hasher() -> PasswordHasher:
+    return PasswordHasher(rounds=4, workers=1, queue_limit=0, timeout=5)
+
+
+class TestPasswordHasher:
+    def test_hash_and_check(self, hasher):
+        hashed = hasher.hash("qwer1234")
+        assert hasher.check("qwer1234", hashed) and not hasher.check("qwer12345", hashed)
+
+    def test_needs_rehash(self, hasher):
+        assert not hasher.needs_rehash(hasher.hash("qwer1234"))
+        assert hasher.needs_rehash(PasswordHasher(rounds=5).hash("qwer1234"))
+
+    def test_reject_when_queue_full(self, hasher):
+        started, release = threading.Event(), threading.Event()
+        worker = threading.Thread(target=hasher._run, args=(lambda: started.set() or release.wait(),))
+        worker.start()
+        started.wait()
+        try:
+            with pytest.raises(ApiError) as e:
+                hasher.hash("qwer1234")
+            assert e.value.status_code == 503
+        finally:
+            release.set()
+            worker.join()
+
+    def test_cancel_on_timeout(self):
+        # 대기열에서 timeout 이 지난 작업은 취소되어 worker 가 비어도 실행되지 않음
+        hasher, started, release = PasswordHasher(rounds=4, workers=1, queue_limit=1, timeout=0.05), threading.Event(), threading.Event()
+        worker = threading.Thread(target=hasher._run, args=(lambda: started.set() or release.wait(),))
+        worker.start()
+        started.wait()
+        try:
+            calls = list()
+            with pytest.raises(ApiError) as e:
+                hasher._run(calls.append, "queued")
+            assert e.value.status_code == 503
+        finally:
+            release.set()
+            worker.join()
+        assert hasher.check("qwer1234", hasher.hash("qwer1234")) and calls == list()
@@ -0,0 +1,91 @@
+from collections import Counter
+
+import mongomock
+import pytest
+
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.user import User
+from app.serializers.comment import CommentInfoSchema
+from app.serializers.post import PostMasterInfoSchema
+from app.utils.prefetch import prefetch_references
+from app.utils.projection import schema_projection
+
+
+@pytest.fixture()
+def find_counts(monkeypatch) -> Counter:
+    # collection 별 find 호출 수 (mongomock 은 command 이벤트가 없으므로 find 를 감싸서 집계)
+    counts, find = Counter(), mongomock.collection.Collection.find
+
+    def counted_find(self, *args, **kwargs):
+        counts[self.name] += 1
+        return find(self, *args, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "find", counted_find)
+    return counts
+
+
+@pytest.fixture()
+def posts(make_user, author):
+    users = [make_user(f"user{i}") for i in range(3)]
+    categories = [Category(name=f"카테고리{i}", created_by=author).save() for i in range(2)]
+    for i in range(6):
+        Post(title=f"제목 {i}", content="본문", created_by=users[i % 3], categories=categories[: i % 3], likes=users[: i % 2 + 1]).save()
+    return users, categories
+
+
+class TestPrefetchReferences:
+    def test_resolved_objects(self, posts):
+        users, categories = posts
+        prefetched = prefetch_references(Post.objects.order_by("+id"), "created_by", "categories", "likes")
+        assert [post.created_by.email for post in prefetched] == [users[i % 3].email for i in range(6)]
+        assert [[category.name for category in post.categories] for post in prefetched] == [[category.name for category in categories[: i % 3]] for i in range(6)]
+        assert all(isinstance(user, User) for post in prefetched for user in post.likes)
+
+    def test_fewer_queries(self, posts, find_counts):
+        # 참조 대상 class 마다 `$in` 조회 1번 (created_by / likes 가 모두 User 이므로 User 조회는 1번, 카테고리는 저장소에서 조회)
+        expected = PostMasterInfoSchema(many=True).dump(Post.objects.order_by("+id"))
+        find_counts.clear()
+
+        prefetched = prefetch_references(Post.objects.order_by("+id"), "created_by", "categories", "likes")
+        assert PostMasterInfoSchema(many=True).dump(prefetched) == expected
+        assert find_counts["user"] == 1 and find_counts["category"] <= 1
+
+    def test_without_prefetch(self, posts, find_counts):
+        # 비교용: prefetch 없이 직렬화하면 포스트마다 작성자 조회
+        PostMasterInfoSchema(many=True).dump(list(Post.objects.order_by("+id")))
+        assert find_counts["user"] >= 6
+
+    def test_only_projection(self, posts):
+        # only 로 지정한 field 만 불러오고, 직렬화 결과는 전체 조회와 같음
+        projection = schema_projection(PostMasterInfoSchema, Post)
+        prefetched = prefetch_references(Post.objects.order_by("+id"), "created_by", "categories", only=projection.references)
+        created_by = prefetched[0].created_by
+        assert set(projection.references["created_by"]) == {"email", "name"}
+        # 저장된 값이 있어도 불러오지 않은 field 는 기본값 (created_at 은 2021-01-01 로 저장됨)
+        assert created_by.email == posts[0][0].email and created_by.password is None and created_by.created_at != posts[0][0].created_at
+        assert PostMasterInfoSchema(many=True).dump(prefetched) == PostMasterInfoSchema(many=True).dump(Post.objects.order_by("+id"))
+
+    def test_shared_target_class(self, posts, find_counts):
+        # created_by 와 likes 가 같은 class 이면 only 는 합집합으로 1번 조회
+        post = Post.objects.order_by("+id").first()
+        comment = Comment(post=post, content="댓글", created_by=posts[0][1], likes=posts[0][:2]).save()
+        find_counts.clear()
+
+        projection = schema_projection(CommentInfoSchema, Comment)
+        prefetched = prefetch_references(Comment.objects(id=comment.id), "post", "created_by", "likes", only=projection.references)[0]
+        assert find_counts["user"] == 1 and find_counts["post"] == 1
+        assert prefetched.created_by.email == posts[0][1].email and [user.email for user in prefetched.likes] == [user.email for user in posts[0][:2]]
+
+    def test_missing_reference(self, posts):
+        # 삭제된 참조는 그대로 두고 (mongoengine 기본 처리), 나머지만 채움
+        users, _ = posts
+        post = Post.objects(likes__size=2).first()
+        User.objects(id=users[1].id).delete()
+        prefetched = prefetch_references([post], "likes")[0]
+        assert not prefetched._data["likes"]._dereferenced
+        assert isinstance(prefetched._data["likes"][0], User)
+
+    def test_empty(self, db):
+        assert prefetch_references([], "created_by") == list()
@@ -0,0 +1,38 @@
+from app.api import ApiStatusSchema
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.user import User
+from app.serializers.comment import CommentInfoSchema
+from app.serializers.post import PostMasterInfoSchema, PostTrendingInfoSchema
+from app.serializers.user import UserInfoSchema
+from app.utils.prefetch import reference_only_fields
+from app.utils.projection import NO_PROJECTION, schema_projection
+
+
+class TestSchemaProjection:
+    def test_list_fields(self):
+        projection = schema_projection(PostMasterInfoSchema(many=True), Post)
+        assert set(projection.fields) == {"id", "title", "categories", "likes_cnt", "comments_cnt", "latest_comments", "created_by", "created_at", "updated_at", "is_deleted"}
+        assert set(projection.references["created_by"]) == {"email", "name"} and set(projection.references["categories"]) == {"id", "name"}
+
+    def test_password_not_loaded(self):
+        assert "password" not in schema_projection(UserInfoSchema(many=True), User).fields
+
+    def test_method_field_dependencies(self):
+        assert {"trend_score", "trend_epoch"} <= set(schema_projection(PostTrendingInfoSchema(many=True), Post).fields)
+
+    def test_nested_only_on_reference(self):
+        projection = schema_projection(CommentInfoSchema(many=True), Comment)
+        assert set(projection.references["post"]) == {"id", "title"} and set(projection.references["likes"]) == {"email", "name"}
+
+    def test_unrelated_schema(self):
+        assert schema_projection(ApiStatusSchema, Post) == NO_PROJECTION
+
+
+class TestReferenceOnlyFields:
+    def test_union_for_same_document(self):
+        only_fields = reference_only_fields(Comment, ["created_by", "likes"], {"created_by": ("email",), "likes": ("email", "name")})
+        assert only_fields[User] == ["email", "name"]
+
+    def test_unrestricted_field_wins(self):
+        assert reference_only_fields(Comment, ["created_by", "likes"], {"likes": ("email",)})[User] is None
@@ -0,0 +1,185 @@
+import multiprocessing
+
+import pytest
+from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app.api import ApiError
+from app.decorators.rate_limit import rate_limited
+from app.utils.rate_limit import LocalRateLimitBackend, RateLimiter, SharedRateLimitBackend, fcntl, take_token
+
+LIMITS = {"api.UserView:login": {"ip": (3, 60), "email": (2, 60)}}
+
+
+def consume_many(path: str, count: int, queue):
+    backend = SharedRateLimitBackend(path=path, slots=64)
+    queue.put(sum(backend.consume("login:ip:1.1.1.1", capacity=50, rate=50 / 3600, now=1000.0) == 0 for _ in range(count)))
+
+
+@pytest.fixture()
+def login(monkeypatch):
+    # load balancer 1개 뒤에서 실행되는 login 라우트 (X-Forwarded-For 의 마지막 값이 접속 IP)
+    limiter = RateLimiter()
+    limiter.configure(backend="local", limits={"login": {"ip": (3, 60), "ip_email": (2, 60), "email": (2, 60)}})
+    monkeypatch.setattr("app.decorators.rate_limit.rate_limiter", limiter)
+
+    app = Flask(__name__)
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+
+    @app.route("/login/<email>/<password>", methods=["POST"])
+    @rate_limited
+    def login(email: str, password: str):
+        if password != "right":
+            raise ApiError(message="잘못된 비밀번호", status_code=401)
+        return "", 200
+
+    @app.errorhandler(ApiError)
+    def handle_api_error(e: ApiError):
+        return "", e.status_code
+
+    client = app.test_client()
+    return lambda ip, email, password="right": client.post(f"/login/{email}/{password}", headers={"X-Forwarded-For": ip}).status_code
+
+
+class TestTakeToken:
+    def test_refill(self):
+        tokens, retry_after = take_token(0.0, updated_at=100.0, capacity=3, rate=0.5, now=102.0)
+        assert (tokens, retry_after) == (0.0, 0.0)
+
+    def test_capacity(self):
+        tokens, _ = take_token(1.0, updated_at=0.0, capacity=3, rate=0.5, now=1000.0)
+        assert tokens == 2.0
+
+    def test_retry_after(self):
+        tokens, retry_after = take_token(0.5, updated_at=100.0, capacity=3, rate=0.5, now=100.0)
+        assert tokens == 0.5 and retry_after == 1.0
+
+    def test_clock_moved_back(self):
+        tokens, retry_after = take_token(1.0, updated_at=200.0, capacity=3, rate=0.5, now=100.0)
+        assert (tokens, retry_after) == (0.0, 0.0)
+
+
+@pytest.fixture(params=["local", "shared"])
+def limiter(request, tmp_path) -> RateLimiter:
+    if request.param == "shared" and fcntl is None:
+        pytest.skip("fcntl 미지원")
+    limiter = RateLimiter()
+    limiter.configure(backend=request.param, limits=LIMITS, path=str(tmp_path / "rate_limit"), slots=64)
+    yield limiter
+    limiter.configure(backend=None, limits=dict())
+
+
+class TestRateLimiter:
+    def test_reject_after_limit(self, limiter):
+        for _ in range(2):
+            limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", email="a@test.com")
+        with pytest.raises(ApiError) as e:
+            limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", email="a@test.com")
+        assert e.value.status_code == 429 and e.value.headers == {"Retry-After": "30"}
+
+    def test_keys_are_separate(self, limiter):
+        for email in ("a@test.com", "b@test.com", "c@test.com"):
+            limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", email=email)
+        # IP 한도 (3) 초과
+        with pytest.raises(ApiError):
+            limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", email="d@test.com")
+        limiter.check("api.UserView:login", now=100.0, ip="2.2.2.2", email="d@test.com")
+
+    def test_refill(self, limiter):
+        for _ in range(2):
+            limiter.check("api.UserView:login", now=100.0, email="a@test.com")
+        limiter.check("api.UserView:login", now=130.0, email="a@test.com")
+
+    def test_rejected_request_keeps_tokens(self, limiter):
+        # email 한도로 거절된 요청은 IP 한도를 쓰지 않음
+        for _ in range(2):
+            limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", email="a@test.com")
+        with pytest.raises(ApiError):
+            limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", email="a@test.com")
+        limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", email="b@test.com")
+
+    def test_failure_keys(self, limiter):
+        # failure_keys 는 확인만 하고, record_failure 로 실패한 요청만 셈
+        for _ in range(5):
+            limiter.check("api.UserView:login", now=100.0, failure_keys={"email": "a@test.com"})
+        for _ in range(2):
+            limiter.record_failure("api.UserView:login", now=100.0, email="a@test.com")
+        with pytest.raises(ApiError) as e:
+            limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", failure_keys={"email": "a@test.com"})
+        assert e.value.headers == {"Retry-After": "30"}
+        limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1", failure_keys={"email": "b@test.com"})
+
+    def test_unconfigured(self, limiter):
+        for _ in range(10):
+            limiter.check("api.UserView:signup", now=100.0, ip="1.1.1.1")
+            limiter.check("api.UserView:login", now=100.0, ip=None, email=None, name="a")
+
+    def test_disabled(self):
+        limiter = RateLimiter()
+        limiter.configure(backend=None, limits=LIMITS)
+        for _ in range(10):
+            limiter.check("api.UserView:login", now=100.0, ip="1.1.1.1")
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            RateLimiter().configure(backend="memcached", limits=LIMITS)
+
+
+@pytest.mark.skipif(fcntl is None, reason="fcntl 미지원")
+class TestSharedRateLimitBackend:
+    def test_shared_between_processes(self, tmp_path):
+        # 4개 프로세스가 같은 key 로 20번씩 요청해도 전체 허용 횟수는 capacity (50) 만큼
+        path, queue = str(tmp_path / "rate_limit"), multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=consume_many, args=(path, 20, queue)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=30)
+        assert sum(queue.get(timeout=5) for _ in processes) == 50
+
+    def test_reopen_keeps_state(self, tmp_path):
+        path = str(tmp_path / "rate_limit")
+        backend = SharedRateLimitBackend(path=path, slots=64)
+        assert backend.consume("key", capacity=1, rate=1 / 60, now=100.0) == 0
+        backend.close()
+        assert SharedRateLimitBackend(path=path, slots=64).consume("key", capacity=1, rate=1 / 60, now=100.0) == 60
+
+    def test_evict_oldest_in_set(self, tmp_path):
+        # set 이 1개 (slot 4개) 이면 5번째 key 는 가장 오래 확인하지 않은 key 를 교체
+        backend = SharedRateLimitBackend(path=str(tmp_path / "rate_limit"), slots=4)
+        for i, key in enumerate(("a", "b", "c", "d")):
+            backend.consume(key, capacity=1, rate=1 / 60, now=100.0 + i)
+        backend.consume("e", capacity=1, rate=1 / 60, now=110.0)
+        assert backend.consume("a", capacity=1, rate=1 / 60, now=110.0) == 0
+        assert backend.consume("d", capacity=1, rate=1 / 60, now=110.0) > 0
+
+
+class TestLocalRateLimitBackend:
+    def test_lru_eviction(self):
+        backend = LocalRateLimitBackend(maxsize=2)
+        for key in ("a", "b", "c"):
+            backend.consume(key, capacity=1, rate=1 / 60, now=100.0)
+        assert backend.consume("a", capacity=1, rate=1 / 60, now=100.0) == 0
+        assert backend.consume("c", capacity=1, rate=1 / 60, now=100.0) > 0
+
+
+class TestRateLimited:
+    def test_client_ip_from_proxy(self, login):
+        # 같은 load balancer 를 거쳐도 X-Forwarded-For 의 접속 IP 별로 따로 확인
+        assert [login("1.1.1.1", f"user{i}@test.com") for i in range(4)] == [200, 200, 200, 429]
+        assert login("2.2.2.2", "user0@test.com") == 200
+
+    def test_email_limit_per_ip(self, login):
+        # 다른 IP 에서 같은 email 로 한도를 넘겨도 해당 사용자의 로그인은 막히지 않음
+        assert [login("1.1.1.1", "victim@test.com") for _ in range(3)] == [200, 200, 429]
+        assert login("2.2.2.2", "Victim@test.com") == 200
+
+    def test_failed_logins_from_many_ips(self, login):
+        # 여러 IP 에서 한 계정의 비밀번호를 추측하면 email 한도 (실패한 요청만) 로 막힘
+        assert [login(f"1.1.1.{i}", "victim@test.com", password="wrong") for i in range(3)] == [401, 401, 429]
+        assert login("2.2.2.2", "victim@test.com") == 429
+
+    def test_successful_logins_not_counted(self, login):
+        # 정상 로그인은 email 한도를 쓰지 않음
+        assert [login(f"1.1.1.{i}", "user@test.com") for i in range(5)] == [200] * 5
+        assert login("2.2.2.2", "user@test.com", password="wrong") == 401
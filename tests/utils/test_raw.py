@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from marshmallow import Schema, fields
+
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.post import CommentPreview, Post
+from app.models.user import User
+from app.serializers.category import CategoryInfoSchema
+from app.serializers.comment import CommentInfoSchema
+from app.serializers.post import PostMasterInfoSchema, PostTrendingInfoSchema
+from app.serializers.user import UserInfoSchema
+from app.utils.raw import RawSerializer
+
+
+def make_user(name: str) -> User:
+    return User(id=ObjectId(), email=f"{name}@example.com", name=name, password="x", created_at=datetime(2021, 1, 1, 9, 30), updated_at=datetime(2021, 1, 2))
+
+
+@pytest.fixture()
+def documents():
+    author, liker = make_user("author"), make_user("liker")
+    category = Category(id=ObjectId(), name="여행", created_by=author)
+    post = Post(
+        id=ObjectId(),
+        title="제목",
+        content="본문",
+        categories=[category],
+        created_by=author,
+        likes=[liker],
+        likes_cnt=1,
+        comments_cnt=1,
+        latest_comments=[CommentPreview(comment_id=ObjectId(), content="댓글", created_by={"email": liker.email, "name": liker.name}, created_at=datetime(2021, 1, 3))],
+        created_at=datetime(2021, 1, 2, 12, 0, 0, 123000),
+        updated_at=datetime(2021, 1, 2, 12, 0, 0, 123000),
+    )
+    comment = Comment(id=ObjectId(), post=post, content="댓글", likes=[author, liker], likes_cnt=2, created_by=liker, created_at=datetime(2021, 1, 3), updated_at=datetime(2021, 1, 3))
+    resolved = {User: {user.id: user.to_mongo() for user in (author, liker)}, Category: {category.id: category.to_mongo()}, Post: {post.id: post.to_mongo()}}
+    return {"user": author, "category": category, "post": post, "comment": comment, "resolved": resolved}
+
+
+class TestRawSerializer:
+    @pytest.mark.parametrize(
+        "schema, document_cls, name",
+        [
+            (PostMasterInfoSchema, Post, "post"),
+            (CommentInfoSchema, Comment, "comment"),
+            (UserInfoSchema, User, "user"),
+            (CategoryInfoSchema, Category, "category"),
+        ],
+    )
+    def test_same_as_marshmallow(self, documents, schema, document_cls, name):
+        document = documents[name]
+        serializer = RawSerializer(schema(many=True), document_cls)
+        assert serializer.dump(document.to_mongo().to_dict(), documents["resolved"]) == schema(many=True).dump([document])[0]
+
+    def test_missing_reference_skipped(self, documents):
+        son = documents["post"].to_mongo().to_dict()
+        son["categories"].append(ObjectId())
+        data = RawSerializer(PostMasterInfoSchema, Post).dump(son, documents["resolved"])
+        assert [category["category_id"] for category in data["categories"]] == [str(documents["category"].id)]
+
+    def test_projected_missing_field_is_none(self, documents):
+        # only() 로 조회한 Document 와 같이 값이 없는 field 는 기본값이 아닌 None
+        son = documents["post"].to_mongo().to_dict()
+        del son["comments_cnt"]
+        assert RawSerializer(PostMasterInfoSchema, Post).dump(son, documents["resolved"])["comments_cnt"] is None
+
+    def test_embedded_default(self, documents):
+        son = documents["post"].to_mongo().to_dict()
+        del son["latest_comments"][0]["content"]
+        data = RawSerializer(PostMasterInfoSchema, Post).dump(son, documents["resolved"])
+        assert data["latest_comments"][0]["content"] is None and "created_by" in data["latest_comments"][0]
+
+    def test_references_collected(self):
+        serializer = RawSerializer(CommentInfoSchema, Comment)
+        assert set(serializer.references) == {"post", "likes", "created_by"}
+        assert set(serializer.references["post"][1].keys) == {"_id", "title"}
+
+    def test_method_field_not_supported(self):
+        with pytest.raises(TypeError):
+            RawSerializer(PostTrendingInfoSchema, Post)
+
+    def test_without_document_class(self):
+        class Schema_(Schema):
+            count = fields.Integer()
+            name = fields.String(data_key="title")
+
+        assert RawSerializer(Schema_).dump({"count": 3.0, "name": "a"}, dict()) == {"count": 3, "title": "a"}
+        assert RawSerializer(Schema_).dump({}, dict()) == {}
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api import ApiError
+from app.models.post import Post
+from app.models.user import User
+from app.utils.reads import Call, Find, field_projection, find_one, run_steps
+
+
+def make_posts(author, count: int):
+    return [Post(title=f"제목 {i}", content="본문", created_by=author, created_at=datetime(2021, 1, 1) + timedelta(hours=i)).save() for i in range(count)]
+
+
+class TestRunSteps:
+    def test_find(self, author):
+        posts = make_posts(author, 5)
+
+        def steps():
+            sons = yield Find(Post, {"is_deleted": False}, {"title": 1}, sort=[("created_at", -1)], skip=1, limit=2)
+            return sons
+
+        assert run_steps(steps()) == [{"_id": post.id, "title": post.title} for post in (posts[3], posts[2])]
+
+    def test_call(self):
+        def steps():
+            return (yield Call(sum, ([1, 2, 3],)))
+
+        assert run_steps(steps()) == 6
+
+    def test_error_thrown_into_steps(self):
+        # 단계 실행 중 에러는 yield 한 위치에서 처리할 수 있음
+        def fail():
+            raise RuntimeError("failed")
+
+        def steps():
+            try:
+                yield Call(fail)
+            except RuntimeError as e:
+                return str(e)
+
+        assert run_steps(steps()) == "failed"
+
+
+class TestFindOne:
+    def test_found(self, author):
+        assert run_steps(find_one(Find(User, {"email": author.email}), "없음", "여러 개"))["_id"] == author.id
+
+    def test_not_found(self, db):
+        with pytest.raises(ApiError) as e:
+            run_steps(find_one(Find(User, {"email": "nobody@example.com"}), "없음", "여러 개"))
+        assert e.value.status_code == 404
+
+    def test_multiple_found(self, make_user):
+        make_user("first")
+        make_user("second")
+        with pytest.raises(ApiError) as e:
+            run_steps(find_one(Find(User, {}), "없음", "여러 개"))
+        assert e.value.status_code == 500
+
+
+class TestFieldProjection:
+    def test_db_field(self):
+        assert field_projection(Post, ("id", "title")) == {"_id": 1, "title": 1}
+
+    def test_exclude(self):
+        assert field_projection(Post, None, exclude=("content",)) == {"content": 0}
+        assert field_projection(Post, None) is None
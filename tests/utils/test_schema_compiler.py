@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from marshmallow import Schema, ValidationError, fields, post_dump, validate
+
+from app.models.post import CommentPreview, Post
+from app.models.user import User
+from app.serializers.post import PostCreateFormSchema, PostMasterInfoSchema, PostMasterSearchFormSchema, PostTrendingInfoSchema
+from app.serializers.user import UserCreateFormSchema
+from app.utils.schema_compiler import compile_dump, compile_load, compile_schema
+
+
+@pytest.fixture()
+def post() -> Post:
+    author = User(id=ObjectId(), email="author@example.com", name="author")
+    return Post(
+        id=ObjectId(),
+        title="제목",
+        content="본문",
+        created_by=author,
+        likes_cnt=1,
+        comments_cnt=1,
+        trend_score=2.0,
+        trend_epoch=0,
+        latest_comments=[CommentPreview(comment_id=ObjectId(), content="댓글", created_by={"email": author.email, "name": author.name}, created_at=datetime(2021, 1, 3))],
+        created_at=datetime(2021, 1, 2, 12, 0, 0, 123000),
+        updated_at=datetime(2021, 1, 2),
+    )
+
+
+class TestCompileDump:
+    @pytest.mark.parametrize("schema", [PostMasterInfoSchema(), PostMasterInfoSchema(many=True), PostTrendingInfoSchema(many=True)])
+    def test_same_as_marshmallow(self, post, schema):
+        obj = [post, post] if schema.many else post
+        assert compile_dump(schema)(obj) == schema.dump(obj)
+
+    def test_missing_and_default(self):
+        class Sample(Schema):
+            name = fields.String()
+            count = fields.Integer(dump_default=0)
+            flag = fields.Boolean()
+
+        schema = Sample()
+        for obj in ({}, {"name": b"bytes", "flag": "false"}, {"name": None, "count": "3"}):
+            assert compile_dump(schema)(obj) == schema.dump(obj)
+
+    def test_hooks_not_compiled(self):
+        class Hooked(Schema):
+            name = fields.String()
+
+            @post_dump
+            def upper(self, data, **kwargs):
+                return data
+
+        assert compile_dump(Hooked()) is None
+
+
+class TestCompileLoad:
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"title": "제목", "content": "본문"},
+            {"title": "제목", "content": "본문", "category_ids": [str(ObjectId())]},
+            {"title": "x" * 101},
+            {"title": 1, "content": "본문", "category_ids": ["invalid"]},
+        ],
+    )
+    def test_same_as_marshmallow(self, data):
+        schema = PostCreateFormSchema()
+        try:
+            expected = schema.load(data)
+        except ValidationError as error:
+            with pytest.raises(ValidationError) as compiled_error:
+                compile_load(schema)(data)
+            assert compiled_error.value.messages == error.messages and compiled_error.value.valid_data == error.valid_data
+        else:
+            assert compile_load(schema)(data) == expected
+
+    def test_load_default(self):
+        schema = PostMasterSearchFormSchema()
+        assert compile_load(schema)({"page_size": "50"}) == schema.load({"page_size": "50"})
+
+    def test_unknown_field_falls_back(self):
+        schema = UserCreateFormSchema()
+        with pytest.raises(ValidationError) as error:
+            compile_load(schema)({"email": "a@example.com", "password": "12345678", "name": "a", "unknown": 1})
+        assert "unknown" in error.value.messages
+
+    def test_validator_messages(self):
+        class Sample(Schema):
+            size = fields.Integer(required=True, validate=validate.OneOf((10, 20), error="10 / 20 만 가능"))
+
+        schema = Sample()
+        for data in ({}, {"size": 30}, {"size": "a"}):
+            with pytest.raises(ValidationError) as expected:
+                schema.load(data)
+            with pytest.raises(ValidationError) as compiled:
+                compile_load(schema)(data)
+            assert compiled.value.messages == expected.value.messages
+
+
+class TestCompileSchema:
+    def test_class_to_shared_instance(self):
+        schema = compile_schema(PostCreateFormSchema)
+        assert isinstance(schema, PostCreateFormSchema) and compile_schema(schema) is schema
+        assert "dump" in vars(schema) and "load" in vars(schema)
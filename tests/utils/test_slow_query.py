@@ -0,0 +1,117 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.models.post import Post
+from app.models.slow_query import SlowQuery
+from app.utils.reads import run_steps
+from app.utils.slow_query import SlowQueryRecorder, find_caller, query_shape, summarize_plan
+
+COLLSCAN_EXPLAIN = {
+    "queryPlanner": {"winningPlan": {"stage": "LIMIT", "inputStage": {"stage": "COLLSCAN", "filter": {"title": {"$regex": "a"}}}}, "rejectedPlans": [{"stage": "IXSCAN", "indexName": "title_1"}]},
+    "executionStats": {"nReturned": 20, "totalKeysExamined": 0, "totalDocsExamined": 5000, "executionStages": {"stage": "LIMIT"}},
+}
+IXSCAN_EXPLAIN = {
+    "queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "is_deleted_1_created_at_-1__id_-1"}}},
+    "executionStats": {"nReturned": 20, "totalKeysExamined": 20, "totalDocsExamined": 20},
+}
+
+
+def _events(recorder: SlowQueryRecorder, command: dict, duration_ms: float, request_id: int = 1):
+    command_name = next(iter(command))
+    recorder.started(SimpleNamespace(command_name=command_name, command=command, connection_id=("localhost", 27017), request_id=request_id))
+    recorder.succeeded(SimpleNamespace(command_name=command_name, database_name="test", connection_id=("localhost", 27017), request_id=request_id, duration_micros=int(duration_ms * 1000)))
+
+
+@pytest.fixture()
+def recorder(monkeypatch) -> SlowQueryRecorder:
+    recorder = SlowQueryRecorder(threshold_ms=50)
+    monkeypatch.setattr(recorder, "_ensure_worker", lambda: None)
+    return recorder
+
+
+class TestQueryShape:
+    def test_values_replaced(self):
+        command = {"find": "post", "filter": {"title": {"$regex": "abc", "$options": "i"}, "is_deleted": False, "categories": {"$in": [1, 2]}}, "sort": {"created_at": -1}}
+        assert query_shape("find", command) == '{"filter":{"title":{"$regex":"?","$options":"?"},"is_deleted":"?","categories":{"$in":"?"}},"sort":{"created_at":-1}}'
+
+    def test_logical_operators_kept(self):
+        command = {"find": "post", "filter": {"$or": [{"a": 1}, {"b": 2}]}}
+        assert query_shape("find", command) == '{"filter":{"$or":[{"a":"?"},{"b":"?"}]}}'
+
+    def test_update_uses_first_statement(self):
+        command = {"update": "post", "updates": [{"q": {"categories": 1}, "u": {"$pull": {"categories": 1}}, "multi": True}]}
+        assert query_shape("update", command) == '{"filter":{"categories":"?"}}'
+
+
+class TestSummarizePlan:
+    def test_collscan(self):
+        summary = summarize_plan(COLLSCAN_EXPLAIN)
+        assert summary == {"plan_stage": "COLLSCAN", "plan_indexes": [], "n_returned": 20, "docs_examined": 5000, "keys_examined": 0}
+
+    def test_ixscan(self):
+        summary = summarize_plan(IXSCAN_EXPLAIN)
+        assert summary["plan_stage"] == "IXSCAN" and summary["plan_indexes"] == ["is_deleted_1_created_at_-1__id_-1"]
+
+
+class TestSlowQueryRecorder:
+    def test_slow_command_queued(self, recorder):
+        _events(recorder, {"find": "post", "filter": {"is_deleted": False}}, duration_ms=120)
+        _, _, record = recorder._queue.get_nowait()
+        assert record["collection_name"] == "post" and record["duration_ms"] == 120
+
+    def test_fast_command_ignored(self, recorder):
+        _events(recorder, {"find": "post", "filter": {}}, duration_ms=10)
+        assert recorder._queue.empty() and not recorder._commands
+
+    def test_own_collection_ignored(self, recorder):
+        _events(recorder, {"find": "slow_query", "filter": {}}, duration_ms=120)
+        assert recorder._queue.empty()
+
+    def test_recording_thread_ignored(self, recorder):
+        recorder._local.recording = True
+        _events(recorder, {"explain": {"find": "post"}}, duration_ms=120)
+        _events(recorder, {"find": "post", "filter": {}}, duration_ms=120, request_id=2)
+        assert recorder._queue.empty()
+
+    def test_queue_full_dropped(self, monkeypatch):
+        recorder = SlowQueryRecorder(threshold_ms=50, queue_size=1)
+        monkeypatch.setattr(recorder, "_ensure_worker", lambda: None)
+        for request_id in range(3):
+            _events(recorder, {"find": "post", "filter": {}}, duration_ms=120, request_id=request_id)
+        assert recorder.dropped == 2
+
+    def test_disabled(self, monkeypatch):
+        recorder = SlowQueryRecorder(threshold_ms=None)
+        _events(recorder, {"find": "post", "filter": {}}, duration_ms=1000)
+        assert recorder._queue.empty()
+
+    def test_failures_logged(self, recorder, monkeypatch, caplog):
+        def fail(*args):
+            raise RuntimeError("not available")
+
+        monkeypatch.setattr(recorder, "_should_explain", lambda record: True)
+        monkeypatch.setattr(recorder, "_explain", fail)
+        monkeypatch.setattr(SlowQuery, "insert_record", fail)
+        with caplog.at_level(logging.WARNING, logger="app.utils.slow_query"):
+            recorder._record("test", {"find": "post", "filter": {}}, {"command": "find", "collection_name": "post"})
+        assert [(record.levelname, record.getMessage()) for record in caplog.records] == [("WARNING", "slow query explain failed: find post"), ("ERROR", "slow query insert failed: find post")]
+        assert all(record.exc_info for record in caplog.records)
+
+    def test_configure_stops_worker(self, monkeypatch):
+        # 이전 queue 의 기록은 처리하고 thread 는 종료 (새 queue 를 처리하는 thread 만 남음)
+        recorder, recorded = SlowQueryRecorder(threshold_ms=50), list()
+        monkeypatch.setattr(recorder, "_record", lambda *item: recorded.append(item))
+        recorder._ensure_worker()
+        worker = recorder._worker
+        recorder._queue.put(("test", {"find": "post"}, {"command": "find"}))
+        recorder.configure(threshold_ms=50, sample_rate=0.2, explain_interval=300, queue_size=8)
+        assert not worker.is_alive() and recorder._worker is None and recorded == [("test", {"find": "post"}, {"command": "find"})]
+
+
+class TestFindCaller:
+    def test_read_steps(self):
+        # run_steps 로 실행하는 조회 generator 는 단계를 yield 한 model 함수로 기록
+        assert run_steps(Post.post_version_steps(ObjectId()), execute=lambda step: [{"version": find_caller()}]) == "Post.post_version_steps"
@@ -0,0 +1,42 @@
+import pytest
+
+from app.utils.trending import TrendingScorer
+
+HOUR = 3600
+
+
+@pytest.fixture()
+def scorer() -> TrendingScorer:
+    return TrendingScorer(half_life_hours=1, like_weight=1.0, comment_weight=2.0)
+
+
+class TestTrendingScorer:
+    def test_half_life(self, scorer):
+        epoch = scorer.epoch(100 * HOUR)
+        score = scorer.delta(scorer.like_weight, epoch, now=100 * HOUR)
+        assert scorer.decay(score, epoch, now=100 * HOUR) == pytest.approx(1.0)
+        assert scorer.decay(score, epoch, now=102 * HOUR) == pytest.approx(0.25)
+
+    def test_stored_order_is_decayed_order(self, scorer):
+        # 1시간 전 댓글 2개 (2 * 2 * 0.5) 보다 방금 누른 좋아요 3개 (3) 가 높음
+        epoch, now = scorer.epoch(100 * HOUR), 100 * HOUR
+        old = 2 * scorer.delta(scorer.comment_weight, epoch, now=now - HOUR)
+        new = 3 * scorer.delta(scorer.like_weight, epoch, now=now)
+        assert old < new and scorer.decay(old, epoch, now) == pytest.approx(2.0)
+        assert scorer.decay(new, epoch, now) == pytest.approx(3.0)
+
+    def test_rebase_keeps_decayed_score(self, scorer):
+        now = 300 * HOUR
+        epoch = scorer.epoch(now)
+        old_epoch = epoch - scorer.epoch_seconds
+        score = scorer.delta(scorer.like_weight, old_epoch, now=epoch - HOUR)
+        rebased = score * scorer.rebase_factor(old_epoch, epoch)
+        assert scorer.decay(rebased, epoch, now) == pytest.approx(scorer.decay(score, old_epoch, now))
+
+    def test_previous_epoch_window(self, scorer):
+        epoch = scorer.epoch(1000 * HOUR)
+        assert scorer.previous_epoch(epoch + HOUR) == epoch - scorer.epoch_seconds
+        assert scorer.previous_epoch(epoch + scorer.MERGE_HALF_LIVES * HOUR) is None
+
+    def test_negative_score_is_zero(self, scorer):
+        assert scorer.decay(-1.0, 0, now=HOUR) == 0.0 and scorer.decay(None, None) == 0.0
@@ -5,6 +5,11 @@ import pytest
 from flask import current_app
 from flask.testing import FlaskClient
 
+from app.models.job import Job
+from app.models.user import User
+from app.utils.access_log import access_logger
+from app.utils.password import password_hasher
+
 
 @pytest.fixture()
 def user_login_form() -> Dict:
@@ -43,3 +48,27 @@ class TestUser:
         def test_check_user_info(self, user_info):
             assert user_info.json is not None
             assert user_info.json["is_master"] is False
+
+
+class TestUserDelete:
+    @pytest.fixture()
+    def user(self, app, db, monkeypatch) -> User:
+        # 실제 DB 대신 mongomock, bcrypt 는 최소 work factor 로
+        monkeypatch.setattr(access_logger, "enabled", False)
+        monkeypatch.setattr(password_hasher, "rounds", 4)
+        return User(email="leaving@example.com", name="leaving", password=password_hasher.hash("qwer1234")).save()
+
+    @pytest.fixture()
+    def headers(self, app, user: User) -> Dict:
+        token = jwt.encode(payload={"email": user.email, "is_master": False}, key=app.config["TOKEN_KEY"], algorithm=app.config["ALGORITHM"])
+        return {"X-Auth-Token": token if isinstance(token, str) else token.decode("utf-8")}
+
+    def test_delete_enqueues_cascade(self, client: FlaskClient, user: User, headers: Dict):
+        response = client.delete("/user/delete", data={"password": "qwer1234"}, headers=headers)
+        assert response.status_code == 200 and "job_id" not in response.json
+        assert User.objects.get(id=user.id).is_deleted is True
+        assert Job.objects.get(name="user.delete_cascade").params == {"user_id": user.id}
+
+    def test_wrong_password(self, client: FlaskClient, user: User, headers: Dict):
+        assert client.delete("/user/delete", data={"password": "wrong-password"}, headers=headers).status_code == 401
+        assert User.objects.get(id=user.id).is_deleted is False and Job.objects.count() == 0